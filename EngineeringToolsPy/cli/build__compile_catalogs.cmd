@@ -0,0 +1,2 @@
+python -c "import sys; sys.path.insert(0, '../src'); import EngineeringTools.special.etp as etp; print(etp.compile_catalogs())"
+pause
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# pylint: disable=line-too-long,no-else-return,missing-function-docstring,missing-class-docstring,empty-docstring,invalid-name
+"""forward mode automatic differentiation through UVal and quantities
+
+An input marked by L{variable} carries the derivative 1 with respect to
+itself (a L{Dual} number as value of the quantity). All formulas written with
+quantities, UVal and L{tools.functions} then return the exact first
+derivatives together with the value, in one pass. L{derivative} gives them as
+UVal with the unit of output / input (or as quantity), so they are unit
+correct like every other result.
+
+An array valued variable stands for independent points, the derivatives are
+element-wise (diagonal of the Jacobian).
+
+# doctest
+# reset new format defaults for test
+>>> from EngineeringTools.quantities import qnt
+>>> qnt.FORMAT_DEFAULT['totalWidth'] = 14
+>>> qnt.FORMAT_DEFAULT['decimalPosition'] = 10
+>>> qnt.FORMAT_DEFAULT['thousands_sep'] = ' '
+
+natural frequency of a cylinder and its sensitivity to the piston diameter
+
+>>> from EngineeringTools.fluidpower_eng.cylinder import Cylinder
+>>> D = variable(ETQ.Distance(63., 'mm'), 'D')
+>>> cyl = Cylinder(D=D, dA=ETQ.Distance(36., 'mm'), stroke_length=ETQ.Distance(500., 'mm'))
+>>> f = cyl.naturalFrequency(ETQ.Distance(0., 'mm'), ETQ.Mass(800., 'kg'))
+>>> print(f)
+        25.7   Hz (Frequency)
+>>> dfdD = derivative(f, D)
+>>> dfdD.check_units({'second':-1, 'meter':-1})
+>>> print('{:.4f} Hz/mm'.format(float(dfdD.get_value()) / 1000.))
+0.4876 Hz/mm
+"""
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+# run doctest, workaround relative import
+if __name__ == '__main__':
+    import sys
+    import doctest        # pylint: disable=import-outside-toplevel
+    module_name = 'EngineeringTools.autodiff'                  # pylint: disable=invalid-name
+    module = __import__(module_name, fromlist=['*'], level=0)  # pylint: disable=invalid-name
+    module._setup_doctest()                                    # pylint: disable=protected-access
+    print(doctest.testmod(module, optionflags=doctest.ELLIPSIS))
+    sys.exit()
+
+import numpy as np
+
+from . import quantities as ETQ
+from .uval import UVal
+from .firstorder import FirstOrder, EngineeringTools_firstorder_Error, nominal
+from .uncertainty import _split
+
+__all__ = ['EngineeringTools_autodiff_Error', 'Dual', 'variable', 'primal', 'derivative', 'gradient', 'value_and_gradient']
+
+
+class EngineeringTools_autodiff_Error(EngineeringTools_firstorder_Error):
+    """Exception: automatic differentiation"""
+
+
+class Variable:
+    """independent variable, compared by identity; units: UVal units of the input"""
+
+    __slots__ = ('name', 'units')
+
+    def __init__(self, name, units):
+        self.name = name
+        self.units = units
+
+    def __repr__(self):
+        return 'Variable({!r})'.format(self.name)
+
+
+class Dual(FirstOrder):
+    """value with the first derivatives with respect to variables (dual number)
+
+    >>> x = Dual(3., {'x':1.})
+    >>> y = x**2 + 2. * x
+    >>> print(y, y.derivatives['x'])
+    15.0 8.0
+    """
+
+    __slots__ = ()
+
+
+def _units(x):
+    if isinstance(x, ETQ.Quantity):
+        return x.uval.get_uval_units()
+    elif isinstance(x, UVal):
+        return x.get_uval_units()
+    return {}
+
+
+def _dual(x):
+    value, wrap = _split(x)
+    if isinstance(value, FirstOrder) and not isinstance(value, Dual):
+        raise EngineeringTools_autodiff_Error('not a dual number: {}'.format(type(value).__name__))
+    return value, wrap
+
+
+def variable(x, name=None):
+    """x marked as independent variable, same kind as x
+
+    @param x: quantity, UVal or number (float or array)
+    @param name: name of the variable in the gradient
+    """
+    value, wrap = _split(x)
+    if isinstance(value, FirstOrder):
+        raise EngineeringTools_autodiff_Error('x is already a {}'.format(type(value).__name__))
+    return wrap(Dual(value, {Variable(name, _units(x)):np.ones_like(value) if np.ndim(value) > 0 else 1.}))
+
+
+def primal(y):
+    """value of y without derivatives, same kind as y"""
+    value, wrap = _dual(y)
+    return wrap(nominal(value))
+
+
+def _derivative(y, key, d, quantity=None):
+    result = UVal(d, _units(y)) / UVal(1., key.units)
+    return quantity(result) if quantity is not None else result
+
+
+def derivative(y, x, quantity=None):
+    """derivative dy/dx
+
+    @param y: result of a calculation with the variable x
+    @param x: the variable as returned by L{variable}
+    @param quantity: quantity class of the derivative, default: UVal
+    """
+    value, _ = _dual(y)
+    xvalue, _ = _dual(x)
+    if not isinstance(xvalue, Dual) or len(xvalue.derivatives) != 1:
+        raise EngineeringTools_autodiff_Error('x is not a variable')
+    key = next(iter(xvalue.derivatives))
+    d = value.derivatives.get(key, 0.) if isinstance(value, Dual) else 0.
+    return _derivative(y, key, d * np.ones_like(nominal(value)) if np.ndim(nominal(value)) > 0 else d, quantity)
+
+
+def gradient(y):
+    """all derivatives of y as UVal
+
+    @return: dict {variable name: derivative}
+    """
+    value, _ = _dual(y)
+    if not isinstance(value, Dual):
+        return {}
+    return {key.name:_derivative(y, key, d) for key, d in value.derivatives.items()}
+
+
+def value_and_gradient(function, wrt, **kwargs):
+    """value and gradient of function(**wrt, **kwargs) with respect to the inputs in wrt
+
+    @param wrt: dict {name: input} of the variables
+    @return: (value of the same kind as the result, dict {name: derivative as UVal})
+    """
+    variables = {name:variable(x, name) for name, x in wrt.items()}
+    y = function(**variables, **kwargs)
+    derivatives = {name:derivative(y, x) for name, x in variables.items()}
+    return primal(y), derivatives
+
+
+################################################################################
+# test
+################################################################################
+def _setup_doctest():
+    ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+# eof
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# pylint: disable=line-too-long,no-else-return,missing-function-docstring,missing-class-docstring,empty-docstring
+"""numbers with first order derivatives
+
+A L{FirstOrder} number carries its value (float or numpy array) and the
+derivatives with respect to a set of sources (dict {source: derivative}). The
+derivatives are propagated by the chain rule through the arithmetic operators
+and the numpy functions (np.sqrt, np.sin, ...), so a FirstOrder number can be
+used as value of an UVal or a Quantity: the units are checked by UVal, the
+derivatives are carried along.
+
+This is the common core of the linear uncertainty propagation
+(L{uncertainty.Uncertain}) and of the forward mode automatic differentiation.
+Comparisons use the values only.
+
+    >>> x = FirstOrder(3., {'x':1.})
+    >>> y = FirstOrder(2., {'y':1.})
+    >>> f = x**2 * y + np.sin(y)
+    >>> print(f.value == 9. * 2. + np.sin(2.))
+    True
+    >>> print(f.derivatives['x'], round(f.derivatives['y'], 6))      # 2*x*y, x**2 + cos(y)
+    12.0 8.583853
+"""
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+# run doctest, workaround relative import
+if __name__ == '__main__':
+    import sys
+    import doctest        # pylint: disable=import-outside-toplevel
+    module_name = 'EngineeringTools.firstorder'                # pylint: disable=invalid-name
+    module = __import__(module_name, fromlist=['*'], level=0)  # pylint: disable=invalid-name
+    print(doctest.testmod(module, optionflags=doctest.ELLIPSIS))
+    sys.exit()
+
+import numbers
+import numpy as np
+
+
+class EngineeringTools_firstorder_Error(Exception):
+    """Exception: first order numbers"""
+
+
+def nominal(value):
+    """value without derivatives"""
+    return value.value if isinstance(value, FirstOrder) else value
+
+
+class FirstOrder:
+    """value with first order derivatives with respect to sources
+
+    @param value: float or numpy array
+    @param derivatives: dict {source: derivative}, derivatives are floats or arrays broadcastable to value
+    """
+
+    __slots__ = ('value', 'derivatives')
+
+    def __init__(self, value, derivatives=None):
+        self.value = value
+        self.derivatives = dict(derivatives) if derivatives else {}
+
+    @classmethod
+    def _make(cls, value, derivatives):
+        obj = cls.__new__(cls)
+        obj.value = value
+        obj.derivatives = derivatives
+        return obj
+
+    def __repr__(self):
+        return '{}({!r}, {!r})'.format(type(self).__name__, self.value, self.derivatives)
+
+    def format(self, fmt):
+        """string of the value, fmt formats plain numbers or arrays"""
+        return fmt(self.value)
+
+    def __str__(self):
+        return self.format(str)
+
+    # ------------------------------------------------------------------------
+    # chain rule
+    def _coerce(self, other):
+        if isinstance(other, FirstOrder):
+            if type(other) is not type(self):
+                raise EngineeringTools_firstorder_Error('can not combine {} and {}'.format(type(self).__name__, type(other).__name__))
+            return other
+        if isinstance(other, (numbers.Number, np.ndarray)):
+            return None
+        raise EngineeringTools_firstorder_Error('wrong type: {}'.format(type(other)))
+
+    def _unary(self, value, dvalue):
+        """result with derivatives d(result)/d(source) = dvalue * d(self)/d(source)"""
+        return self._make(value, {key:dvalue * d for key, d in self.derivatives.items()})
+
+    def _binary(self, other, value, dself, dother):
+        """result of f(self, other) with the partial derivatives dself, dother"""
+        derivatives = {key:dself * d for key, d in self.derivatives.items()}
+        if other is not None:
+            for key, d in other.derivatives.items():
+                derivatives[key] = derivatives[key] + dother * d if key in derivatives else dother * d
+        return self._make(value, derivatives)
+
+    def __add__(self, other):
+        fo = self._coerce(other)
+        if fo is None:
+            return self._unary(self.value + other, 1.)
+        return self._binary(fo, self.value + fo.value, 1., 1.)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        fo = self._coerce(other)
+        if fo is None:
+            return self._unary(self.value - other, 1.)
+        return self._binary(fo, self.value - fo.value, 1., -1.)
+
+    def __rsub__(self, other):
+        self._coerce(other)
+        return self._unary(other - self.value, -1.)
+
+    def __mul__(self, other):
+        fo = self._coerce(other)
+        if fo is None:
+            return self._unary(self.value * other, other)
+        return self._binary(fo, self.value * fo.value, fo.value, self.value)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        fo = self._coerce(other)
+        if fo is None:
+            return self._unary(self.value / other, 1. / other)
+        value = self.value / fo.value
+        return self._binary(fo, value, 1. / fo.value, -value / fo.value)
+
+    def __rtruediv__(self, other):
+        self._coerce(other)
+        value = other / self.value
+        return self._unary(value, -value / self.value)
+
+    def __pow__(self, other):
+        fo = self._coerce(other)
+        if fo is None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                dvalue = np.where(np.equal(other, 0), 0., other * self.value ** (other - 1))
+            return self._unary(self.value ** other, dvalue if np.ndim(dvalue) else float(dvalue))
+        value = self.value ** fo.value
+        return self._binary(fo, value, fo.value * self.value ** (fo.value - 1), value * np.log(self.value))
+
+    def __rpow__(self, other):
+        self._coerce(other)
+        value = other ** self.value
+        return self._unary(value, value * np.log(other))
+
+    def __neg__(self):
+        return self._unary(-self.value, -1.)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return self._unary(np.abs(self.value), np.sign(self.value))
+
+    def __float__(self):
+        return float(self.value)
+
+    def __lt__(self, other):
+        return self.value < nominal(other)
+
+    def __le__(self, other):
+        return self.value <= nominal(other)
+
+    def __gt__(self, other):
+        return self.value > nominal(other)
+
+    def __ge__(self, other):
+        return self.value >= nominal(other)
+
+    def __eq__(self, other):
+        return self.value == nominal(other)
+
+    def __ne__(self, other):
+        return self.value != nominal(other)
+
+    __hash__ = None
+
+    # ------------------------------------------------------------------------
+    # numpy functions
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != '__call__' or kwargs or ufunc not in _UFUNCS:
+            return NotImplemented
+        return _UFUNCS[ufunc](*inputs)
+
+
+def _unary_ufunc(function, derivative):
+    def ufunc(x):
+        return x._unary(function(x.value), derivative(x.value))  # pylint: disable=protected-access
+    return ufunc
+
+
+def _arctan2(y, x):
+    yv, xv = nominal(y), nominal(x)
+    r2 = yv**2 + xv**2
+    value = np.arctan2(yv, xv)
+    if isinstance(y, FirstOrder):
+        return y._binary(x if isinstance(x, FirstOrder) else None, value, xv / r2, -yv / r2)  # pylint: disable=protected-access
+    return x._unary(value, -yv / r2)  # pylint: disable=protected-access
+
+
+def _select(condition):
+    """maximum, minimum: the derivatives of the selected argument"""
+    def ufunc(a, b):
+        first = condition(nominal(a), nominal(b))
+        value = np.where(first, nominal(a), nominal(b))
+        if isinstance(a, FirstOrder):
+            return a._binary(b if isinstance(b, FirstOrder) else None, value, first * 1., 1. - first)  # pylint: disable=protected-access
+        return b._unary(value, 1. - first)  # pylint: disable=protected-access
+    return ufunc
+
+
+def _nominal_ufunc(ufunc):
+    def function(*inputs):
+        return ufunc(*(nominal(x) for x in inputs))
+    return function
+
+
+_UFUNCS = {
+    np.add:lambda a, b: a + b if isinstance(a, FirstOrder) else b + a,
+    np.subtract:lambda a, b: a - b if isinstance(a, FirstOrder) else b.__rsub__(a),
+    np.multiply:lambda a, b: a * b if isinstance(a, FirstOrder) else b * a,
+    np.true_divide:lambda a, b: a / b if isinstance(a, FirstOrder) else b.__rtruediv__(a),
+    np.power:lambda a, b: a ** b if isinstance(a, FirstOrder) else b.__rpow__(a),
+    np.negative:lambda x: -x,
+    np.positive:lambda x: x,
+    np.absolute:abs,
+    np.sqrt:_unary_ufunc(np.sqrt, lambda v: 0.5 / np.sqrt(v)),
+    np.square:_unary_ufunc(np.square, lambda v: 2. * v),
+    np.exp:_unary_ufunc(np.exp, np.exp),
+    np.log:_unary_ufunc(np.log, lambda v: 1. / v),
+    np.log10:_unary_ufunc(np.log10, lambda v: 1. / (v * np.log(10.))),
+    np.sin:_unary_ufunc(np.sin, np.cos),
+    np.cos:_unary_ufunc(np.cos, lambda v: -np.sin(v)),
+    np.tan:_unary_ufunc(np.tan, lambda v: 1. / np.cos(v)**2),
+    np.arcsin:_unary_ufunc(np.arcsin, lambda v: 1. / np.sqrt(1. - v**2)),
+    np.arccos:_unary_ufunc(np.arccos, lambda v: -1. / np.sqrt(1. - v**2)),
+    np.arctan:_unary_ufunc(np.arctan, lambda v: 1. / (1. + v**2)),
+    np.arctan2:_arctan2,
+    np.maximum:_select(np.greater_equal),
+    np.minimum:_select(np.less_equal),
+    np.sign:_nominal_ufunc(np.sign),
+    np.isfinite:_nominal_ufunc(np.isfinite),
+    np.isnan:_nominal_ufunc(np.isnan),
+    np.less:_nominal_ufunc(np.less),
+    np.less_equal:_nominal_ufunc(np.less_equal),
+    np.greater:_nominal_ufunc(np.greater),
+    np.greater_equal:_nominal_ufunc(np.greater_equal),
+    np.equal:_nominal_ufunc(np.equal),
+    np.not_equal:_nominal_ufunc(np.not_equal),
+}
+
+# eof
@@ -5,8 +5,11 @@ __author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
 __email__   = "marthoch@users.noreply.github.com"
 __license__ = "BSD 3-clause"
 
+import numpy as np
+
 from .. import quantities as Q # depricated
 #from .. import quantities as ETQ
+from ..uval import UVal
 from ..tools import geo_circle
 from EngineeringTools.tools import functions 
 from .oil import Oil
@@ -58,7 +61,7 @@ class Cylinder:
             if V0:
                 self.volumeB_0 = Q.Volume(V0)
             else:
-                self.volumeB_0 = Q.Volume(self.areaA * self.position_upperLimit, displayUnit='cm3')
+                self.volumeB_0 = Q.Volume(self.areaB * self.position_upperLimit, displayUnit='cm3')
 
     def __repr__(self):
         return """Cylinder:
@@ -85,11 +88,17 @@ piston area B         = {pistonAreaB}
                    fluid=self.fluid)
 
     def validPosition(self, position):
+        """position as Distance, all positions of an array must be within the stroke"""
         position = Q.Distance(position)
-        if not (self.position_lowerLimit <= position <= self.position_upperLimit): # pylint: disable=unneeded-not,superfluous-parens
+        if not np.all((self.position_lowerLimit <= position) & (position <= self.position_upperLimit)):
             raise Exception('position is out of range')
         return position
 
+    def strokePositions(self, n=1000):
+        """n positions equally spaced over the stroke, as array valued Distance"""
+        lower, upper = self.position_lowerLimit.get_value(), self.position_upperLimit.get_value()
+        return Q.Distance(np.linspace(lower, upper, n), 'm', displayUnit=self.position_lowerLimit.get_displayUnit())
+
     @property
     def areaA(self):
         return Q.Area((self.pistion_diameter.uval**2 - self.rod_diameter_A.uval**2) * Q.PI/4.)
@@ -154,6 +163,55 @@ piston area B         = {pistonAreaB}
         kh = self.stiffness(position)
         return Q.Frequency(functions.sqrt(kh / mass) * 1. / (2.* Q.PI))
 
-    def naturalFrequency_plot(self, mass):
-        pass
+    def naturalFrequency_map(self, mass, position=None, n=1000):
+        """natural frequency over the stroke for several masses in one vectorized evaluation
+
+        >>> cyl = Cylinder(D=Q.Distance(63., 'mm'), dA=Q.Distance(36., 'mm'), stroke_length=Q.Distance(500., 'mm'))
+        >>> position, f = cyl.naturalFrequency_map(Q.Mass(np.array([400., 800.]), 'kg'), Q.Distance(np.array([-200., -100., 0., 100., 200.]), 'mm'))
+        >>> np.round(f.get_value('Hz'), 1).tolist()
+        [[55.7, 38.1, 36.4, 41.2, 65.1], [39.4, 26.9, 25.7, 29.1, 46.1]]
+
+        @param mass: Mass, float or array
+        @param position: Distance (array), default: L{strokePositions}(n)
+        @return: (position, frequency), frequency is a Frequency array of shape (number of masses, number of positions)
+        """
+        position = self.strokePositions(n) if position is None else self.validPosition(position)
+        with np.errstate(divide='ignore'):   # without dead volume the stiffness is infinite at the end of the stroke
+            kh = self.stiffness(position)
+        mass = Q.Mass(mass).uval
+        kh = UVal(np.atleast_1d(kh.get_value())[np.newaxis, :], kh.get_uval_units())
+        mass = UVal(np.atleast_1d(mass.get_value())[:, np.newaxis], mass.get_uval_units())
+        return position, Q.Frequency(functions.sqrt(kh / mass) * 1. / (2.* Q.PI))
+
+    def naturalFrequency_minimum(self, mass, position=None, n=1000):
+        """position and value of the lowest natural frequency over the stroke for each mass
+
+        @return: (position, frequency) as arrays with one value per mass
+        """
+        position, f = self.naturalFrequency_map(mass, position, n)
+        i = np.argmin(np.where(np.isnan(f.get_value()), np.inf, f.get_value()), axis=1)
+        rows = np.arange(len(i))
+        return Q.Distance(np.atleast_1d(position.get_value())[i], 'm', displayUnit=position.get_displayUnit()), Q.Frequency(f.get_value()[rows, i], 'Hz', displayUnit=f.get_displayUnit())
+
+    def naturalFrequency_plot(self, mass, n=1000, ax=None):
+        """plot the natural frequency over the stroke with the minimum marked, one curve per mass
+
+        @param ax: matplotlib axes, default: new figure
+        @return: ax
+        """
+        import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+        if ax is None:
+            _, ax = plt.subplots(1, 1)
+        mass = Q.Mass(mass)
+        position, f = self.naturalFrequency_map(mass, n=n)
+        position_min, f_min = self.naturalFrequency_minimum(mass, position)
+        for m, fi in zip(np.atleast_1d(mass.get_value('kg')), f.get_value('Hz')):
+            ax.plot(position.get_value('mm'), fi, label='{:g} kg'.format(m))
+        ax.plot(position_min.get_value('mm'), f_min.get_value('Hz'), 'kx', label='minimum')
+        ax.set_xlabel('position in mm')
+        ax.set_ylabel('natural frequency in Hz')
+        ax.set_ylim(0., 5. * np.max(f_min.get_value('Hz')))
+        ax.grid(True)
+        ax.legend()
+        return ax
 # EOF
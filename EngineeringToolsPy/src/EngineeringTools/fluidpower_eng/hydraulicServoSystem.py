@@ -5,15 +5,24 @@ __author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
 __email__   = "marthoch@users.noreply.github.com"
 __license__ = "BSD 3-clause"
 
+# run doctest, workaround relative import
+if __name__ == '__main__':
+    import sys
+    import doctest # pylint: disable=import-outside-toplevel
+    module_name = 'EngineeringTools.fluidpower_eng.hydraulicServoSystem'  # pylint: disable=invalid-name
+    module = __import__(module_name, fromlist=['*'], level=0)  # pylint: disable=invalid-name
+    print(doctest.testmod(module, optionflags=doctest.ELLIPSIS))
+    sys.exit()
+
+from fractions import Fraction
+import numpy as np
+import scipy.interpolate
 
 from .. import quantities as ETQ
 from EngineeringTools.tools import functions
 from ..container import Obj
-
-try:
-    import control as pc
-except ImportError:
-    pc = None
+from ..uval import UVal
+from ..tools.lti import TransferFunction
 
 
 class HydraulicServoSystem__Jelali_4_(Obj):
@@ -65,26 +74,221 @@ class HydraulicServoSystem__Jelali_4_(Obj):
                             self.cylinder.areaRatio**2 * self.fluid.bulkmodulus / self.cylinder.volume_B(xP) )))
 
     def Dh__Jelali_4_248(self, xP, xV , pS, pT, pA0, pB0, mass):
-        a = self.cylinder.areaRatio
-        return 1./ (2.*a/(ETQ.Scalar(1., '1').uval+a**3) * (-a**2*self.fluid.bulkmodulus / self.cylinder.volume_B(xP) * self.valve.KQpB1__Jelali_4_228(xV , xV, pS, pT, pA0, pB0)
-                    - self.fluid.bulkmodulus / self.cylinder.volume_A(xP) * self.valve.KQpA1__Jelali_4_227(xV , xV, pS, pT, pA0, pB0))* self.omegah__Jelali_4_247(xP, mass))
-
-
-    def G_KQ(self,xP, xV , pS, pT, pA0, pB0):
-        return pc.tf([self.KQ__Jelali_4_240(xP, xV , pS, pT, pA0, pB0).get_value() ], [1])
-
-
-
-    def G_a_xV(self, xP, xV , pS, pT, pA0, pB0, mass):
-        return pc.tf(self.cylinder.areaA / mass * [self.KQ__Jelali_4_240(xP, xV , pS, pT, pA0, pB0)])
-
-
-    def G_xV_vV(self, xP, xV, pS, pT, pA0, pB0, mass):
-        Dh = self.Dh__Jelali_4_242(xP, xV, pS, pT, pA0, pB0, mass)
-        omegah = self.omegah(xP, mass)
-        return pc.tf([1.], [1., 2.*Dh*omegah, omegah**2])
-
+        """hydraulic damping ratio (dimensionless), 2 Dh omegah = (E/V_A KQpA - a**3 E/V_B KQpB) / (1 + a**3)
 
+        from the pressure split of eqs 4.236, 4.237; the valve gives KQpA >= 0, KQpB <= 0, both chambers damp.
+        Dh is 0 at xV = 0 (critical lap).
+        """
+        a = self.cylinder.areaRatio
+        return ((self.fluid.bulkmodulus / self.cylinder.volume_A(xP) * self.valve.KQpA1__Jelali_4_227(xV , xV, pS, pT, pA0, pB0)
+                 - a**3 * self.fluid.bulkmodulus / self.cylinder.volume_B(xP) * self.valve.KQpB1__Jelali_4_228(xV , xV, pS, pT, pA0, pB0))
+                / ((ETQ.Scalar(1., '1').uval + a**3) * 2. * self.omegah__Jelali_4_247(xP, mass)))
+
+
+    def operatingPressures(self, xV, pS, pT, load):
+        """chamber pressures pA0, pB0 of the steady motion against the load (pA0 AA - pB0 AB = load)
+
+        from the flows of the four edges with the area ratio a = AB / AA:
+        xV >= 0: pB0 - pT = a**2 (pS - pA0), xV < 0: pS - pB0 = a**2 (pA0 - pT)
+
+        @param xV, pS, pT, load: floats or arrays in iso units
+        @return: pA0, pB0 in Pa
+        """
+        AA, AB = self.cylinder.areaA.get_value(), self.cylinder.areaB.get_value()
+        a = AB / AA
+        pL = load / AA
+        pA0 = np.where(np.asarray(xV) >= 0., (pL + a * pT + a**3 * pS) / (1. + a**3), (pL + a * pS + a**3 * pT) / (1. + a**3))
+        pB0 = np.where(np.asarray(xV) >= 0., pT + a**2 * (pS - pA0), pS - a**2 * (pA0 - pT))
+        return pA0, pB0
+
+
+    def gain_table(self, xP, xV, pS, load, mass, pT=None):
+        """gains KQ (4.240), Ch (4.241), Th (4.242), omegah (4.247) and Dh (4.248) on the grid of operating points xP x xV x pS x load
+
+        The pressures pA0, pB0 of each point follow from the load, see
+        L{operatingPressures}, the spool position is also the operating
+        point xV0 of Th. The terms shared by the gains (E / V_A, E / V_B, the
+        roots of the pressure drops, the valve gains) are evaluated once on
+        the broadcast grid; the tables equal the methods for single points.
+
+        Th keeps the sign of eq 4.242: the flows fall with the chamber
+        pressures (KQpA >= 0 >= KQpB), so Th is negative and |Th| is the time
+        constant; Th is -inf and Dh is 0 at xV = 0.
+
+        Points where the load cannot be held at the supply pressure (pA0
+        outside pT .. pS) have no operating point: GainTable.valid is False
+        there and the gains are NaN (pA0, pB0 are kept).
+
+        @param xP: piston positions, Distance (array, ascending)
+        @param xV: spool positions -1..1 (array, ascending)
+        @param pS: supply pressures, Pressure (array, ascending)
+        @param load: external forces, Force (array, ascending)
+        @param mass: moved mass
+        @param pT: tank pressure, default 0
+        @return: L{GainTable}
+
+        >>> from EngineeringTools.fluidpower_eng.cylinder import Cylinder
+        >>> from EngineeringTools.fluidpower_eng.proportionalValve import ProportionalValve
+        >>> system = HydraulicServoSystem__Jelali_4_(ProportionalValve(ETQ.Flowrate(40., 'Liter/min'), ETQ.Pressure(70., 'bar')),
+        ...                                          Cylinder(D=ETQ.Distance(50., 'mm'), dA=ETQ.Distance(28., 'mm'), stroke_length=ETQ.Distance(400., 'mm')))
+        >>> table = system.gain_table(ETQ.Distance(np.linspace(-150., 150., 7), 'mm'), np.array([-1., -0.5, 0.5, 1.]),
+        ...                           ETQ.Pressure(np.array([100., 160., 210.]), 'bar'), ETQ.Force(np.array([-10., 0., 10.]), 'kN'), ETQ.Mass(200., 'kg'))
+        >>> table.shape
+        (7, 4, 3, 3)
+        >>> omegah = table.uval('omegah')
+        >>> print(ETQ.VelocityAngular(omegah).get_value('rad/sec')[3, 0, 0, 0].round(1))
+        211.2
+        >>> print(round(table('omegah', xP=0.025, xV=0.75, pS=130e5, load=5e3), 1))
+        207.4
+        >>> print(round(table('Th', xP=0.025, xV=0.75, pS=130e5, load=5e3), 4))
+        -0.0055
+        """
+        pT = ETQ.Pressure(pT).get_value() if pT is not None else 0.
+        axes = {'xP':self.cylinder.validPosition(ETQ.Distance(xP)).get_value(), 'xV':ETQ.Scalar(xV).get_value(),
+                'pS':ETQ.Pressure(pS).get_value(), 'load':ETQ.Force(load).get_value()}
+        m = ETQ.Mass(mass).get_value()
+        shape = tuple(np.size(values) for values in axes.values())
+        # axis k as array broadcastable to the grid
+        xP, xV, pS, load = (np.reshape(np.asarray(values, dtype=float), tuple(-1 if i == k else 1 for i in range(4))) for k, values in enumerate(axes.values()))
+        E = self.fluid.bulkmodulus.get_value()
+        AP = self.cylinder.areaP.get_value()
+        a = self.cylinder.areaRatio.get_value()
+        Cv1 = self.valve.Cv1.get_value()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            EA = E / self.cylinder.volume_A(ETQ.Distance(xP, 'm')).get_value()
+            EB = E / self.cylinder.volume_B(ETQ.Distance(xP, 'm')).get_value()
+            pA0, pB0 = self.operatingPressures(xV, pS, pT, load)
+            positive = xV >= 0.
+            rootA = np.sqrt(np.where(positive, pS - pA0, pA0 - pT))     # edge of chamber A carrying the flow
+            rootB = np.sqrt(np.where(positive, pB0 - pT, pS - pB0))
+            # valve gains, Jelali eq 4.225 .. 4.228 with xV0 = xV
+            KQxA = Cv1 * rootA
+            KQxB = -Cv1 * rootB
+            KQpA = np.where(positive, 1., -1.) * Cv1 * xV / (2. * np.sqrt(np.where(positive, pA0 - pT, pS - pA0)))
+            KQpB = np.where(positive, -1., 1.) * Cv1 * xV / (2. * np.sqrt(np.where(positive, pB0 - pT, pS - pB0)))
+            Ch = EA + a**2 * EB
+            omegah = np.sqrt(AP**2 / m * Ch)
+            values = {'KQ':EA * KQxA - a * EB * KQxB,
+                      'Ch':Ch,
+                      'Th':1. / (a * EB * KQpB / (1. + a**3) - EA * KQpA / (1. + a**3)),
+                      'omegah':omegah,
+                      'Dh':(EA * KQpA - a**3 * EB * KQpB) / ((1. + a**3) * 2. * omegah),
+                      'pA0':pA0, 'pB0':pB0}
+        # the pressure drops of all edges in the gains are >= 0 (see operatingPressures) for pT <= pA0 <= pS
+        valid = np.broadcast_to((pA0 >= pT) & (pA0 <= pS), shape)
+        values = {name:np.where(valid | (name in ('pA0', 'pB0')), np.broadcast_to(value, shape), np.nan) for name, value in values.items()}
+        return GainTable(axes, values, _GAIN_UNITS, valid=valid)
+
+
+    def G_KQ(self, xP, xV, pS, pT, pA0, pB0, KQ=None):
+        """static gain xV -> d(pL)/dt, L{tools.lti.TransferFunction}
+
+        @param KQ: gain (e.g. array of a L{GainTable}) instead of the calculation from the operating point
+        """
+        if KQ is None:
+            KQ = self.KQ__Jelali_4_240(xP, xV, pS, pT, pA0, pB0)
+        return TransferFunction([_iso_value(KQ)], [1.])
+
+
+    def G_a_xV(self, xP, xV, pS, pT, pA0, pB0, mass, KQ=None):
+        """xV -> acceleration: AA / mass KQ / s, L{tools.lti.TransferFunction}"""
+        if KQ is None:
+            KQ = self.KQ__Jelali_4_240(xP, xV, pS, pT, pA0, pB0)
+        return TransferFunction([self.cylinder.areaA.get_value() / _iso_value(mass) * _iso_value(KQ)], [1., 0.])
+
+
+    def G_xV_vV(self, xP, xV, pS, pT, pA0, pB0, mass, Dh=None, omegah=None):
+        """1 / (s**2 + 2 Dh omegah s + omegah**2), L{tools.lti.TransferFunction}
+
+        @param Dh, omegah: values (e.g. arrays of a L{GainTable}) instead of the calculation from the operating point
+        @raise ValueError: Dh not dimensionless or not positive (e.g. at xV = 0)
+        """
+        if Dh is None:
+            Dh = self.Dh__Jelali_4_248(xP, xV, pS, pT, pA0, pB0, mass)
+        if omegah is None:
+            omegah = self.omegah__Jelali_4_247(xP, mass)
+        uval = Dh.uval if isinstance(Dh, ETQ.Quantity) else Dh
+        if isinstance(uval, UVal) and uval.get_uval_units():
+            raise ValueError('damping ratio Dh has to be dimensionless, has units {}'.format(uval.get_uval_units()))
+        Dh, omegah = _iso_value(Dh), _iso_value(omegah)
+        if not np.all(np.asarray(Dh) > 0.):
+            raise ValueError('damping ratio Dh has to be positive, min is {}'.format(np.min(Dh)))
+        return TransferFunction([1.], [1., 2. * Dh * omegah, omegah**2])
+
+
+def _iso_value(x):
+    return x.get_value() if isinstance(x, (ETQ.Quantity, UVal)) else x
+
+
+_GAIN_UNITS = {'KQ':{'kilogram':1, 'meter':-1, 'second':-3},
+               'Ch':{'kilogram':1, 'meter':-4, 'second':-2},
+               'Th':{'second':1},
+               'omegah':{'second':-1},
+               'Dh':{},
+               'pA0':{'kilogram':1, 'meter':-1, 'second':-2},
+               'pB0':{'kilogram':1, 'meter':-1, 'second':-2}}
+
+
+class GainTable:
+    """gains on a regular grid of operating points, see L{HydraulicServoSystem__Jelali_4_.gain_table}
+
+    axes: dict {'xP', 'xV', 'pS', 'load': ascending values in iso units}
+    values: dict {gain name: array with the shape of the grid, iso units}
+    valid: bool array with the shape of the grid, False where there is no operating point (gains are NaN)
+    """
+
+    AXES = ('xP', 'xV', 'pS', 'load')
+
+    def __init__(self, axes, values, units, valid=None):
+        for name, values_ in axes.items():
+            if np.ndim(values_) != 1 or np.any(np.diff(values_) <= 0.):
+                raise ValueError('axis {} has to be 1-D and strictly ascending'.format(name))
+        self.axes = axes
+        self.values = values
+        self.units = units
+        self.valid = np.ones(self.shape, dtype=bool) if valid is None else np.asarray(valid, dtype=bool)
+        self._interpolators = {}
+
+    @property
+    def shape(self):
+        return tuple(len(self.axes[name]) for name in self.AXES)
+
+    @property
+    def names(self):
+        return list(self.values)
+
+    def __repr__(self):
+        return 'GainTable({}, shape={})'.format(', '.join(self.names), self.shape)
+
+    def uval(self, name):
+        """table of one gain as UVal"""
+        return UVal(self.values[name], {unit:Fraction(exponent) for unit, exponent in self.units[name].items()})
+
+    def interpolator(self, name):
+        """scipy RegularGridInterpolator (linear) of a gain, points (xP, xV, pS, load) in iso units; built once
+
+        name None: the validity, 1. where there is an operating point. Invalid grid points of a gain
+        are set to 0 (a NaN would spoil its neighbours), see L{__call__}.
+        """
+        if name not in self._interpolators:
+            if len(self.axes) != 4 or any(len(self.axes[axis]) < 2 for axis in self.AXES):
+                raise ValueError('interpolation needs at least two values on each axis')
+            values = self.valid.astype(float) if name is None else np.where(self.valid, self.values[name], 0.)
+            self._interpolators[name] = scipy.interpolate.RegularGridInterpolator([self.axes[axis] for axis in self.AXES], values)
+        return self._interpolators[name]
+
+    def __call__(self, name, xP, xV, pS, load):
+        """gain at operating points by linear interpolation, floats or arrays in iso units (quantities are converted)
+
+        @raise ValueError: a point depends on a grid point without operating point (see valid)
+        """
+        point = [value.get_value() if isinstance(value, ETQ.Quantity) else value for value in (xP, xV, pS, load)]
+        points = np.stack(np.broadcast_arrays(*point), axis=-1)
+        invalid = self.interpolator(None)(points) < 1. - 1e-9
+        if np.any(invalid):
+            raise ValueError('no operating point at {} of the points: the load cannot be held at the supply pressure'.format(np.count_nonzero(invalid)))
+        result = self.interpolator(name)(points)
+        return float(result.reshape(-1)[0]) if all(np.ndim(value) == 0 for value in point) else result
 
 
 class HydraulicServoSystemSymmetric(Obj):
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-module-docstring,missing-function-docstring,missing-class-docstring,no-else-return,invalid-name,multiple-statements
+"""hydraulic lines (pipes, hoses) by the method of characteristics
+
+A L{Line} is divided into n segments of equal length dx. Pressure p and flow
+Q (positive from end 0 to end L) are known at the n + 1 nodes; one time step
+follows the characteristics dx/dt = +-c (c = sqrt(E / rho)):
+
+    C+: p_i + B Q_i = p_R + B Q_R - F(Q_R)      C-: p_i - B Q_i = p_S - B Q_S + F(Q_S)
+
+with the impedance B = rho c / A and the steady friction F over dx (laminar
+Hagen-Poiseuille, turbulent Blasius above Re = 2300). The feet R, S are the
+neighbour nodes when dt = dx / c, otherwise they are interpolated linearly
+(Courant number c dt / dx < 1, e.g. to get a common time step for lines of
+different length; this adds numerical damping).
+
+Parameters may be arrays of length M: the M lines are advanced together,
+the states are arrays (M, n + 1) and one time step is a few numpy operations
+on them. L{simulate_line} runs a line with given pressures or flows at the
+ends. Inside a time-domain simulation the line is a two-port: at each step
+L{Line.characteristics} gives p_0 = Cm + B Q_0 and p_L = Cp - B Q_L for the
+new time level, the coupled model solves its boundary with them, then
+L{Line.advance} takes one pressure or flow per end.
+
+# doctest
+2 m hose, pressure step of 100 bar at end 0, end L closed
+
+>>> from EngineeringTools.fluidpower_eng.oil import get_oil
+>>> line = Line(ETQ.Distance(2., 'm'), ETQ.Distance(10., 'mm'), fluid=get_oil('S2M46'), temperature=ETQ.TemperatureAbsolute(40., 'degC'))
+>>> print('c = {:.1f} m/s, dt = {:.2f} us'.format(line.c[0], line.dt * 1e6))
+c = 1066.6 m/s, dt = 93.75 us
+>>> res = simulate_line(line, ETQ.Time(0.5, 's'), p0=ETQ.Pressure(100., 'bar'), QL=0.)
+>>> print(len(res), round(float(res.pL.max()) / 1e5, 1))
+5334 197.3
+
+the wave arrives at the closed end after L / c, the laminar friction damps
+the oscillation with the time constant d**2 / (16 nu) = 0.136 s
+
+>>> print(np.round(res.pL[[20, 21, 5333]] / 1e5, 1).tolist())
+[0.0, 196.6, 102.6]
+"""
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+# run doctest, workaround relative import
+if __name__ == '__main__':
+    import sys
+    import doctest # pylint: disable=import-outside-toplevel
+    module_name = 'EngineeringTools.fluidpower_eng.line'       # pylint: disable=invalid-name
+    module = __import__(module_name, fromlist=['*'], level=0)  # pylint: disable=invalid-name
+    module._setup_doctest()                                    # pylint: disable=protected-access
+    print(doctest.testmod(module, optionflags=doctest.ELLIPSIS))
+    sys.exit()
+
+import numpy as np
+
+from .. import quantities as ETQ
+from .oil import get_oil
+
+__all__ = ['LineError', 'Line', 'LineResult', 'simulate_line']
+
+_QUANTITIES = {'p0':ETQ.Pressure, 'pL':ETQ.Pressure, 'Q0':ETQ.Flowrate, 'QL':ETQ.Flowrate}
+DEFAULT_OIL = 'ShellTellusS2M46'
+
+
+class LineError(Exception):
+    """Exception: hydraulic line"""
+
+
+def _iso(value, quantity):
+    """value of a quantity in iso units (float or array), unit checked"""
+    value = quantity(value).get_value()
+    return float(value) if np.ndim(value) == 0 else np.asarray(value, dtype=float)
+
+
+def _signal(value, quantity):
+    """constant quantity (or number in iso units) or callable(t) -> value in iso units"""
+    if value is None or callable(value):
+        return value
+    elif isinstance(value, ETQ.Quantity):
+        return _iso(value, quantity)
+    return value
+
+
+class Line:
+    """hydraulic line, or M lines with the same number of segments
+
+    c, B, A, dx, theta: wave speed, impedance, area, segment length, Courant number, arrays (M,)
+    p, Q: state at the nodes, arrays (M, n + 1)
+
+    @param length, diameter: Distance (inner diameter), arrays for M lines
+    @param fluid: Oil for density, bulk modulus and viscosity, default: L{DEFAULT_OIL}
+    @param temperature: temperature of the viscosity, default 40 degC
+    @param viscosity: kinematic viscosity instead of the one of the fluid
+    @param bulkmodulus: effective bulk modulus (e.g. of a hose), default: of the fluid
+    @param segments: number of segments n
+    @param dt: time step, Time or seconds, default: the largest stable one, min(dx / c)
+    @param turbulent: turbulent friction (Blasius) above Re = 2300, else laminar only
+    """
+
+    def __init__(self, length, diameter, fluid=None, temperature=None, viscosity=None, bulkmodulus=None, segments=20, dt=None, turbulent=True):
+        fluid = fluid if fluid is not None else get_oil(DEFAULT_OIL)
+        if segments < 1:
+            raise LineError('a line needs at least one segment')
+        L = _iso(length, ETQ.Distance)
+        d = _iso(diameter, ETQ.Distance)
+        rho = _iso(fluid.density, ETQ.Density)
+        E = _iso(bulkmodulus, ETQ.Stress) if bulkmodulus is not None else _iso(fluid.bulkmodulus, ETQ.Stress)
+        if viscosity is not None:
+            nu = _iso(viscosity, ETQ.ViscosityKinematic)
+        else:
+            nu = fluid.viscosityKinematic(temperature if temperature is not None else ETQ.TemperatureAbsolute(40., 'degC')).get_value()
+        self.batch = any(np.ndim(x) > 0 for x in (L, d, E, nu))
+        L, d, E, nu = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float)) for x in (L, d, E, nu)))
+        if np.any(L <= 0.) or np.any(d <= 0.):
+            raise LineError('length and diameter must be positive')
+        self.size = len(L)
+        self.segments = n = int(segments)
+        self.length, self.diameter, self.rho, self.nu = L, d, rho, nu
+        self.A = A = np.pi / 4. * d**2
+        self.c = np.sqrt(E / rho)
+        self.dx = L / n
+        dt_max = float(np.min(self.dx / self.c))
+        self.dt = dt = dt_max if dt is None else _iso(dt, ETQ.Time) if isinstance(dt, ETQ.Quantity) else float(dt)
+        if dt <= 0. or dt > dt_max * (1. + 1e-12):
+            raise LineError('time step {:g} s is not in 0 .. dx / c = {:g} s'.format(dt, dt_max))
+        self.theta = np.minimum(self.c * dt / self.dx, 1.)
+        self._interpolate = bool(np.any(self.theta < 1.))
+        self.B = rho * self.c / A
+        # friction over dx: F = Q kL (laminar) or Q kT |Q|**0.75 (Blasius)
+        self._kL = (32. * rho * nu * self.dx / (d**2 * A))[:, np.newaxis]
+        self._kT = (self.dx * rho / (2. * d * A**2) * 0.3164 * (d / (A * nu))**-0.25)[:, np.newaxis]
+        # an interpolated characteristic covers theta dx only
+        self._fL = self._kL * self.theta[:, np.newaxis]
+        self._fT = self._kT * self.theta[:, np.newaxis]
+        self._Qcrit = (2300. * A * nu / d)[:, np.newaxis]
+        self.turbulent = turbulent
+        self._B = self.B[:, np.newaxis]
+        self._theta = self.theta[:, np.newaxis]
+        self.t = 0.
+        self.p = np.zeros((self.size, n + 1))
+        self.Q = np.zeros((self.size, n + 1))
+
+    def __repr__(self):
+        return 'Line({} lines, {} segments, dt={:g} s)'.format(self.size, self.segments, self.dt)
+
+    @property
+    def resistance(self):
+        """laminar resistance of the whole line, Pa s / m^3 (array M)"""
+        return self._kL[:, 0] * self.segments
+
+    def reset(self, p=0., Q=0.):
+        """initial state, p and Q in iso units: floats, arrays (M,) or (M, n + 1)"""
+        self.t = 0.
+        self.p[...] = np.asarray(p, dtype=float).reshape(-1, 1) if np.ndim(p) == 1 else p
+        self.Q[...] = np.asarray(Q, dtype=float).reshape(-1, 1) if np.ndim(Q) == 1 else Q
+
+    def _friction(self, Q):
+        if not self.turbulent:
+            return self._fL * Q
+        absQ = np.abs(Q)
+        turbulent = absQ > self._Qcrit
+        if not turbulent.any():
+            return self._fL * Q
+        return Q * np.where(turbulent, self._fT * absQ**0.75, self._fL)
+
+    def _compatibility(self):
+        """Cp at the nodes 1..n, Cm at the nodes 0..n-1 for the new time level"""
+        s = self._B * self.Q - self._friction(self.Q)
+        a, b = self.p + s, self.p - s
+        if self._interpolate:
+            return a[:, 1:] - self._theta * (a[:, 1:] - a[:, :-1]), b[:, :-1] - self._theta * (b[:, :-1] - b[:, 1:])
+        return a[:, :-1], b[:, 1:]
+
+    def characteristics(self):
+        """(Cm, Cp, B) of the ends for the new time level: p_0 = Cm + B Q_0, p_L = Cp - B Q_L, arrays (M,)"""
+        Cp, Cm = self._compatibility()
+        return Cm[:, 0], Cp[:, -1], self.B
+
+    def advance(self, p0=None, Q0=None, pL=None, QL=None):
+        """one time step, with the pressure or the flow at each end (floats or arrays (M,), iso units)
+
+        Q0: flow into the line at end 0, QL: flow out of the line at end L
+        """
+        if (p0 is None) == (Q0 is None) or (pL is None) == (QL is None):
+            raise LineError('give either pressure or flow at each end')
+        Cp, Cm = self._compatibility()
+        p, Q, B = self.p, self.Q, self.B
+        p[:, 1:-1] = 0.5 * (Cp[:, :-1] + Cm[:, 1:])
+        Q[:, 1:-1] = (Cp[:, :-1] - Cm[:, 1:]) / (2. * self._B)
+        if p0 is not None:
+            p[:, 0] = p0
+            Q[:, 0] = (p0 - Cm[:, 0]) / B
+        else:
+            Q[:, 0] = Q0
+            p[:, 0] = Cm[:, 0] + B * Q0
+        if pL is not None:
+            p[:, -1] = pL
+            Q[:, -1] = (Cp[:, -1] - pL) / B
+        else:
+            Q[:, -1] = QL
+            p[:, -1] = Cp[:, -1] - B * QL
+        self.t += self.dt
+
+
+class LineResult:
+    """output of L{simulate_line}: time t (steps + 1,) and the pressures and flows at the ends p0, Q0, pL, QL (steps + 1, M), iso units"""
+
+    def __init__(self, t, data, batch):
+        self.t = t
+        self.data = data
+        for name, values in data.items():
+            setattr(self, name, values if batch else values[:, 0])
+
+    def __len__(self):
+        return len(self.t)
+
+    def __repr__(self):
+        return 'LineResult({} samples)'.format(len(self))
+
+    def quantity(self, name):
+        """output as quantity, e.g. quantity('pL') -> Pressure"""
+        if name == 't':
+            return ETQ.Time(self.t, 's')
+        cls = _QUANTITIES[name]
+        return cls(getattr(self, name), cls._isoUnit)  # pylint: disable=protected-access
+
+
+def simulate_line(line, t_end, p0=None, Q0=None, pL=None, QL=None, reset=True):
+    """simulate a line with given pressure or flow at each end
+
+    @param t_end: Time or seconds
+    @param p0, Q0, pL, QL: one per end; quantity, number (iso units) or callable(t) -> iso value (float or array (M,))
+    @param reset: start from p = 0, Q = 0 (or keep the state of the line)
+    @return: L{LineResult}
+    """
+    signals = {name:_signal(value, quantity) for name, value, quantity in
+               (('p0', p0, ETQ.Pressure), ('Q0', Q0, ETQ.Flowrate), ('pL', pL, ETQ.Pressure), ('QL', QL, ETQ.Flowrate))}
+    if (signals['p0'] is None) == (signals['Q0'] is None) or (signals['pL'] is None) == (signals['QL'] is None):
+        raise LineError('give either pressure or flow at each end')
+    t_end = _iso(t_end, ETQ.Time) if isinstance(t_end, ETQ.Quantity) else float(t_end)
+    steps = int(round(t_end / line.dt))
+    if reset:
+        line.reset()
+    t = line.t + line.dt * np.arange(steps + 1)
+    data = {name:np.empty((steps + 1, line.size)) for name in ('p0', 'Q0', 'pL', 'QL')}
+    constant = {name:value for name, value in signals.items() if value is not None and not callable(value)}
+    functions = {name:value for name, value in signals.items() if callable(value)}
+    p, Q = line.p, line.Q
+    out_p0, out_Q0, out_pL, out_QL = data['p0'], data['Q0'], data['pL'], data['QL']
+    out_p0[0], out_Q0[0], out_pL[0], out_QL[0] = p[:, 0], Q[:, 0], p[:, -1], Q[:, -1]
+    for k in range(1, steps + 1):
+        values = dict(constant)
+        for name, function in functions.items():
+            values[name] = function(t[k])
+        line.advance(**values)
+        out_p0[k], out_Q0[k], out_pL[k], out_QL[k] = p[:, 0], Q[:, 0], p[:, -1], Q[:, -1]
+    return LineResult(t, data, line.batch)
+
+
+################################################################################
+# test
+################################################################################
+def _setup_doctest():
+    ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+# eof
@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-module-docstring,missing-function-docstring,missing-class-docstring,no-else-return,invalid-name,multiple-statements
+"""steady state of hydraulic networks
+
+A L{Network} is a graph of nodes connected by turbulent orifices
+(L{orifice.OrificeTurbulent}) and the four control edges of
+L{proportionalValve.ProportionalValve}s. Nodes have a fixed pressure (supply,
+tank), a fixed external flow (pump) or are free. Cylinders take the flow of
+their velocity from the nodes A and B; the velocity is given, or unknown and
+follows from the force balance with a given load.
+
+All elements are given as quantities and unit checked once when they are
+added; L{Network.solve} then runs Newton iterations on plain floats: the
+residuals are the flow balances of the free nodes (and the force balances of
+the cylinders), the Jacobian is a sparse matrix with a fixed pattern. The start
+values are the pressures of the network with linearized (laminar) orifices, the
+steps are damped by a line search on the sum of the squared scaled residuals.
+Boundary values (pressures, flows, spool positions, velocities, loads) may be
+arrays of length N: the N cases are solved together, as one block diagonal
+sparse system per iteration. A case with a free node without open connection
+(e.g. a closed valve without underlap) has no solution, its values are NaN and
+it is marked as not converged; the other cases are solved. A case whose Newton
+step still increases the residual after the line search stops as not converged.
+
+The orifice flow sign(dp) sqrt(|dp|) has an infinite slope at dp = 0, it is
+replaced by dp / sqrt(|dp| + dp_laminar), i.e. a laminar transition below
+dp_laminar (default 100 Pa, the flow error at 1 bar is 0.05 %).
+
+# doctest
+# reset new format defaults for test
+>>> from EngineeringTools.quantities import qnt
+>>> qnt.FORMAT_DEFAULT['totalWidth'] = 14
+>>> qnt.FORMAT_DEFAULT['decimalPosition'] = 10
+>>> qnt.FORMAT_DEFAULT['thousands_sep'] = ' '
+
+two equal orifices in series
+
+>>> from EngineeringTools.fluidpower_eng.orifice import OrificeTurbulent
+>>> net = Network()
+>>> net.add_node('S', pressure=ETQ.Pressure(100., 'bar'))
+>>> net.add_node('M')
+>>> net.add_node('T', pressure=ETQ.Pressure(0., 'bar'))
+>>> net.add_orifice('S', 'M', OrificeTurbulent(A=ETQ.Area(2., 'mm^2')))
+>>> net.add_orifice('M', 'T', OrificeTurbulent(A=ETQ.Area(2., 'mm^2')))
+>>> sol = net.solve()
+>>> print(round(sol.pressure('M').get_value('bar'), 6), round(sol.flow('S-M').get_value('Liter/min'), 2))
+50.0 8.52
+
+valve - cylinder axis under load, speed for several spool positions
+
+>>> from EngineeringTools.fluidpower_eng.proportionalValve import ProportionalValve
+>>> from EngineeringTools.fluidpower_eng.cylinder import Cylinder
+>>> net = Network()
+>>> net.add_node('S', pressure=ETQ.Pressure(210., 'bar'))
+>>> net.add_node('T', pressure=ETQ.Pressure(0., 'bar'))
+>>> net.add_node('A'); net.add_node('B')
+>>> net.add_valve('valve', 'S', 'T', 'A', 'B', ProportionalValve(ETQ.Flowrate(40., 'Liter/min'), ETQ.Pressure(70., 'bar')), np.array([0.25, 0.5, 1.]))
+>>> net.add_cylinder('cyl', 'A', 'B', Cylinder(D=ETQ.Distance(50., 'mm'), dA=ETQ.Distance(28., 'mm'), stroke_length=ETQ.Distance(400., 'mm')), load=ETQ.Force(10., 'kN'))
+>>> sol = net.solve()
+>>> print(sol.converged.all(), np.round(sol.velocity('cyl').get_value('mm/s'), 1).tolist())
+True [120.4, 240.8, 481.7]
+>>> print(np.round(sol.pressure('A').get_value('bar'), 1).tolist())
+[176.8, 176.8, 176.8]
+"""
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+# run doctest, workaround relative import
+if __name__ == '__main__':
+    import sys
+    import doctest # pylint: disable=import-outside-toplevel
+    module_name = 'EngineeringTools.fluidpower_eng.network'    # pylint: disable=invalid-name
+    module = __import__(module_name, fromlist=['*'], level=0)  # pylint: disable=invalid-name
+    module._setup_doctest()                                    # pylint: disable=protected-access
+    print(doctest.testmod(module, optionflags=doctest.ELLIPSIS))
+    sys.exit()
+
+from fractions import Fraction
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+
+from .. import quantities as ETQ
+from ..tools import functions
+
+__all__ = ['NetworkError', 'Network', 'NetworkSolution']
+
+# flow per sqrt(pressure): m^3/s / sqrt(Pa)
+_CONDUCTANCE_UNITS = {'meter':Fraction(7, 2), 'kilogram':Fraction(-1, 2)}
+
+
+class NetworkError(Exception):
+    """Exception: hydraulic network"""
+
+
+def _iso(value, quantity):
+    """value of a quantity in iso units (float or array), unit checked"""
+    value = quantity(value).get_value()
+    return float(value) if np.ndim(value) == 0 else np.asarray(value, dtype=float)
+
+
+class Network:
+    """graph of nodes, orifices, valves and cylinders, see module documentation
+
+    Boundary values may be arrays of the same length N (cases solved together).
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self._node_index = {}
+        self._pressure = {}       # node: fixed pressure
+        self._flow = {}           # node: external inflow
+        self.edges = []           # (name, node1, node2)
+        self._edge_index = {}
+        self._K = []              # conductance, m^3/s / sqrt(Pa)
+        self.cylinders = []       # (name, nodeA, nodeB, AA, AB, velocity, load)
+        self._cylinder_index = {}
+
+    def __repr__(self):
+        return 'Network({} nodes, {} edges, {} cylinders)'.format(len(self.nodes), len(self.edges), len(self.cylinders))
+
+    def add_node(self, name, pressure=None, flow=None):
+        """node
+
+        @param pressure: fixed pressure (Pressure), None: free node
+        @param flow: external flow into the free node (Flowrate), e.g. of a pump
+        """
+        if name in self._node_index:
+            raise NetworkError('node "{}" exists already'.format(name))
+        if pressure is not None and flow is not None:
+            raise NetworkError('node "{}": give either a fixed pressure or a flow'.format(name))
+        self._node_index[name] = len(self.nodes)
+        self.nodes.append(name)
+        if pressure is not None:
+            self._pressure[name] = _iso(pressure, ETQ.Pressure)
+        if flow is not None:
+            self._flow[name] = _iso(flow, ETQ.Flowrate)
+
+    def _node(self, name):
+        if name not in self._node_index:
+            raise NetworkError('node "{}" is not in the network'.format(name))
+        return self._node_index[name]
+
+    def _add_edge(self, name, node1, node2, K):
+        if name in self._edge_index:
+            raise NetworkError('edge "{}" exists already'.format(name))
+        self._node(node1); self._node(node2)
+        if np.any(np.asarray(K) < 0.):
+            raise NetworkError('edge "{}": negative conductance'.format(name))
+        self._edge_index[name] = len(self.edges)
+        self.edges.append((name, node1, node2))
+        self._K.append(K)
+
+    def add_orifice(self, node1, node2, orifice, name=None):
+        """turbulent orifice (OrificeTurbulent) from node1 to node2, the edge is named "node1-node2" by default"""
+        K = orifice.Cq.uval * orifice.A.uval * functions.sqrt(2. / orifice.fluid.density.uval)
+        K.check_units(_CONDUCTANCE_UNITS)
+        self._add_edge(name if name is not None else '{}-{}'.format(node1, node2), node1, node2, K.get_value())
+
+    def add_valve(self, name, P, T, A, B, valve, xV):
+        """4/3 way ProportionalValve, adds the edges name:PA, name:BT, name:PB, name:AT
+
+        @param xV: spool position -1..1, number or array
+        """
+        Cv1 = valve.Cv1
+        Cv1.check_units(_CONDUCTANCE_UNITS)
+        xV = np.clip(_iso(xV, ETQ.Scalar), -1., 1.)
+        lap = valve.underlap1.get_value()
+        opening1, opening2 = np.maximum(xV + lap, 0.), np.maximum(-xV + lap, 0.)
+        for edge, node1, node2, opening in (('PA', P, A, opening1), ('BT', B, T, opening1), ('PB', P, B, opening2), ('AT', A, T, opening2)):
+            self._add_edge('{}:{}'.format(name, edge), node1, node2, Cv1.get_value() * opening)
+
+    def add_cylinder(self, name, A, B, cylinder, velocity=None, load=None):
+        """cylinder between the nodes A and B
+
+        @param velocity: given piston velocity (Velocity), positive extends (flow into A)
+        @param load: force against the positive direction (Force), the velocity is then unknown
+        """
+        if (velocity is None) == (load is None):
+            raise NetworkError('cylinder "{}": give either velocity or load'.format(name))
+        if name in self._cylinder_index:
+            raise NetworkError('cylinder "{}" exists already'.format(name))
+        self._node(A); self._node(B)
+        self._cylinder_index[name] = len(self.cylinders)
+        self.cylinders.append((name, A, B, _iso(cylinder.areaA, ETQ.Area), _iso(cylinder.areaB, ETQ.Area),
+                               _iso(velocity, ETQ.Velocity) if velocity is not None else None,
+                               _iso(load, ETQ.Force) if load is not None else None))
+
+    # ------------------------------------------------------------------------
+    def _batch_size(self):
+        values = list(self._pressure.values()) + list(self._flow.values()) + self._K
+        values += [c[5] for c in self.cylinders if c[5] is not None] + [c[6] for c in self.cylinders if c[6] is not None]
+        sizes = {np.size(value) for value in values if np.ndim(value) > 0}
+        if len(sizes) > 1:
+            raise NetworkError('array valued boundary conditions have different lengths: {}'.format(sorted(sizes)))
+        return (sizes.pop(), True) if sizes else (1, False)
+
+    def _compile(self):
+        """index and value arrays in iso units for the solver"""
+        if not self._pressure:
+            raise NetworkError('at least one node needs a fixed pressure')
+        if not self.edges:
+            raise NetworkError('network has no edges')
+        N, batch = self._batch_size()
+        n = len(self.nodes)
+        fixed = np.array([node in self._pressure for node in self.nodes])
+        free_index = np.full(n, -1)
+        free_index[~fixed] = np.arange(np.count_nonzero(~fixed))
+        n_free = int(np.count_nonzero(~fixed))
+        pfix = np.zeros((n, N))
+        for node, value in self._pressure.items():
+            pfix[self._node_index[node]] = value
+        ext = np.zeros((n, N))
+        for node, value in self._flow.items():
+            ext[self._node_index[node]] = value
+        i = np.array([self._node_index[e[1]] for e in self.edges])
+        j = np.array([self._node_index[e[2]] for e in self.edges])
+        K = np.empty((len(self.edges), N))
+        for e, value in enumerate(self._K):
+            K[e] = value
+        # cylinders: fixed velocities act like external flows, loads add an unknown velocity and a force balance
+        cylA = np.array([self._node_index[c[1]] for c in self.cylinders], dtype=int)
+        cylB = np.array([self._node_index[c[2]] for c in self.cylinders], dtype=int)
+        AA = np.array([c[3] for c in self.cylinders], dtype=float)
+        AB = np.array([c[4] for c in self.cylinders], dtype=float)
+        unknown = np.array([c[5] is None for c in self.cylinders], dtype=bool)
+        velocity = np.zeros((len(self.cylinders), N))
+        load = np.zeros((len(self.cylinders), N))
+        for c, cyl in enumerate(self.cylinders):
+            if cyl[5] is not None:
+                velocity[c] = cyl[5]
+            else:
+                load[c] = cyl[6]
+        return {'N':N, 'batch':batch, 'n':n, 'fixed':fixed, 'free_index':free_index, 'n_free':n_free, 'pfix':pfix, 'ext':ext,
+                'i':i, 'j':j, 'K':K, 'cylA':cylA, 'cylB':cylB, 'AA':AA, 'AB':AB, 'unknown':unknown, 'velocity':velocity, 'load':load}
+
+    def solve(self, dp_laminar=None, rtol=1e-10, maxiter=50, p0=None):
+        """steady state
+
+        @param dp_laminar: pressure drop of the laminar transition of the orifices, default 100 Pa
+        @param rtol: tolerance of the flow balances relative to the largest orifice flow (and of the force balances relative to the largest pressure)
+        @param maxiter: maximum number of Newton iterations
+        @param p0: initial pressure of the free nodes (Pressure), default: solution of the network with laminarized orifices
+        @return: L{NetworkSolution}, cases with isolated nodes are NaN and not converged
+        @raise NetworkError: no case has a solution
+        """
+        c = self._compile()
+        d = _iso(dp_laminar, ETQ.Pressure) if dp_laminar is not None else 100.
+        p0 = _iso(p0, ETQ.Pressure) if p0 is not None else None
+        isolated = _isolated(c)
+        solvable = ~isolated.any(axis=0)
+        if not solvable.any():
+            raise NetworkError('nodes without open connection: {}'.format(', '.join(str(node) for node, flag in zip(self.nodes, isolated.any(axis=1)) if flag)))
+        if solvable.all():
+            return _Solver(c, d).solve(self, rtol, maxiter, p0)
+        sol = _Solver(_select_cases(c, solvable), d).solve(self, rtol, maxiter, p0[..., solvable] if np.ndim(p0) > 0 else p0)
+        return _expand(sol, solvable)
+
+
+def _isolated(c):
+    """free nodes without open connection, bool (n, N)"""
+    open_ = np.zeros((c['n'], c['N']))
+    np.add.at(open_, c['i'], c['K'])
+    np.add.at(open_, c['j'], c['K'])
+    return ~c['fixed'][:, np.newaxis] & (open_ <= 0.)
+
+
+def _select_cases(c, cases):
+    """compiled network of a part of the cases"""
+    c = dict(c)
+    for key in ('pfix', 'ext', 'K', 'velocity', 'load'):
+        c[key] = c[key][:, cases]
+    c['N'] = c['pfix'].shape[1]
+    return c
+
+
+class _Solver:
+    """damped Newton iteration on the flow and force balances, all cases in one sparse system"""
+
+    def __init__(self, c, dp_laminar):
+        self.c = c
+        self.d = dp_laminar
+        N, n_free = c['N'], c['n_free']
+        unknown = np.nonzero(c['unknown'])[0]
+        self.unknown = unknown
+        self.n_var = n_var = n_free + len(unknown)
+        self.p_ref = max(float(np.max(np.abs(c['pfix']))), 1e5)
+        self.q_ref = float(np.max(c['K'])) * np.sqrt(self.p_ref)
+        if self.q_ref <= 0.:
+            raise NetworkError('all edges are closed')
+        # fixed sparsity pattern of one case: edge entries (4 per edge) and constant cylinder entries
+        free = c['free_index']
+        i, j = c['i'], c['j']
+        rows = np.stack([free[i], free[i], free[j], free[j]])
+        cols = np.stack([free[i], free[j], free[i], free[j]])
+        sign = np.array([-1., 1., 1., -1.])[:, np.newaxis] * np.ones_like(rows, dtype=float)
+        valid = (rows >= 0) & (cols >= 0)
+        self.edge_rows, self.edge_cols = rows[valid], cols[valid]
+        self.edge_sign, self.edge_which = sign[valid], np.nonzero(valid)[1]
+        const_rows, const_cols, const_values = [], [], []
+        for k, cyl in enumerate(unknown):
+            var = n_free + k
+            a, b = free[c['cylA'][cyl]], free[c['cylB'][cyl]]
+            if a >= 0:
+                const_rows += [a, var]; const_cols += [var, a]; const_values += [-c['AA'][cyl], 1.]
+            if b >= 0:
+                const_rows += [b, var]; const_cols += [var, b]; const_values += [c['AB'][cyl], -c['AB'][cyl] / c['AA'][cyl]]
+        self.const_rows = np.array(const_rows, dtype=int)
+        self.const_cols = np.array(const_cols, dtype=int)
+        self.const_values = np.array(const_values, dtype=float)
+        # the N cases as blocks of a block diagonal matrix
+        offset = np.arange(N) * n_var
+        self.rows = np.concatenate([(self.edge_rows[:, np.newaxis] + offset).ravel(), (self.const_rows[:, np.newaxis] + offset).ravel()])
+        self.cols = np.concatenate([(self.edge_cols[:, np.newaxis] + offset).ravel(), (self.const_cols[:, np.newaxis] + offset).ravel()])
+        self.const_data = np.repeat(self.const_values, N)
+        scale = np.full(n_var, 1. / self.q_ref)
+        scale[n_free:] = 1. / self.p_ref
+        self.scale = scale[:, np.newaxis]
+        self.incidence = scipy.sparse.csr_matrix((np.concatenate([-np.ones(len(i)), np.ones(len(j))]),
+                                                  (np.concatenate([i, j]), np.concatenate([np.arange(len(i)), np.arange(len(j))]))),
+                                                 shape=(c['n'], len(i)))
+
+    def pressures(self, x):
+        c = self.c
+        P = c['pfix'].copy()
+        P[~c['fixed']] = x[:c['n_free']]
+        return P
+
+    def velocities(self, x):
+        c = self.c
+        v = c['velocity'].copy()
+        v[self.unknown] = x[c['n_free']:]
+        return v
+
+    def edge_flows(self, P, laminar=False):
+        """flows of the edges and their derivatives by the pressure drop
+
+        @param laminar: orifices linearized as K dp / sqrt(p_ref), for the initial estimate
+        """
+        c = self.c
+        dp = P[c['i']] - P[c['j']]
+        if laminar:
+            g = c['K'] / np.sqrt(self.p_ref)
+            return g * dp, g
+        root = np.sqrt(np.abs(dp) + self.d)
+        return c['K'] * dp / root, c['K'] * (0.5 * np.abs(dp) + self.d) / root**3
+
+    def residual(self, x, laminar=False):
+        """flow balances of the free nodes (m^3/s) and force balances / AA (Pa), shape (n_var, N)"""
+        c = self.c
+        P, v = self.pressures(x), self.velocities(x)
+        q, g = self.edge_flows(P, laminar)
+        r = c['ext'] + self.incidence @ q
+        np.add.at(r, c['cylA'], -c['AA'][:, np.newaxis] * v)
+        np.add.at(r, c['cylB'], c['AB'][:, np.newaxis] * v)
+        u = self.unknown
+        force = P[c['cylA'][u]] - (c['AB'][u] / c['AA'][u])[:, np.newaxis] * P[c['cylB'][u]] - c['load'][u] / c['AA'][u][:, np.newaxis]
+        return np.concatenate([r[~c['fixed']], force]), g
+
+    def jacobian(self, g):
+        N = self.c['N']
+        data = np.concatenate([(self.edge_sign[:, np.newaxis] * g[self.edge_which]).ravel(), self.const_data])
+        size = self.n_var * N
+        return scipy.sparse.csc_matrix((data, (self.rows, self.cols)), shape=(size, size))
+
+    def newton_step(self, F, g):
+        N, n_var = self.c['N'], self.n_var
+        try:
+            dx = scipy.sparse.linalg.splu(self.jacobian(g)).solve(-F.T.ravel())
+        except RuntimeError as err:
+            raise NetworkError('singular Jacobian, is a node without open connection? ({})'.format(err)) from None
+        dx = dx.reshape(N, n_var).T
+        if not np.all(np.isfinite(dx)):
+            raise NetworkError('singular Jacobian, is a node without open connection?')
+        return dx
+
+    def initial(self, p0):
+        """start values: given pressures, else the solution of the network with laminarized orifices (one linear solve)"""
+        c = self.c
+        x = np.zeros((self.n_var, c['N']))
+        x[:c['n_free']] = np.mean(c['pfix'][c['fixed']], axis=0) if p0 is None else p0
+        if p0 is None:
+            F, g = self.residual(x, laminar=True)
+            x = x + self.newton_step(F, g)
+        return x
+
+    def merit(self, F):
+        """0.5 |F scale|**2 per case, smooth (a max norm keeps the line search steps tiny)"""
+        return 0.5 * np.sum((F * self.scale)**2, axis=0)
+
+    def solve(self, network, rtol, maxiter, p0):
+        c = self.c
+        N = c['N']
+        x = self.initial(p0)
+        F, g = self.residual(x)
+        merit = self.merit(F)
+        converged = np.max(np.abs(F * self.scale), axis=0) <= rtol
+        stalled = np.zeros(N, dtype=bool)
+        iterations = 0
+        while not (converged | stalled).all() and iterations < maxiter:
+            iterations += 1
+            dx = self.newton_step(F, g)
+            dx[:, converged | stalled] = 0.
+            # backtracking line search (Armijo) on the merit function, per case; its slope along dx is -2 merit
+            alpha = np.ones(N)
+            for _ in range(30):
+                x_new = x + alpha * dx
+                F_new, g_new = self.residual(x_new)
+                merit_new = self.merit(F_new)
+                worse = (merit_new > (1. - 2e-4 * alpha) * merit) & ~converged & ~stalled
+                if not worse.any():
+                    break
+                alpha = np.where(worse, 0.5 * alpha, alpha)
+            # no descent after the halvings: keep the last iterate, the case does not converge
+            x_new[:, worse], F_new[:, worse], g_new[:, worse], merit_new[worse] = x[:, worse], F[:, worse], g[:, worse], merit[worse]
+            stalled |= worse
+            x, F, g, merit = x_new, F_new, g_new, merit_new
+            converged = np.max(np.abs(F * self.scale), axis=0) <= rtol
+        return NetworkSolution(network, self.pressures(x), self.edge_flows(self.pressures(x))[0], self.velocities(x),
+                               converged, iterations, np.max(np.abs(F * self.scale), axis=0), c['batch'])
+
+
+def _expand(sol, cases):
+    """solution of all N cases from the solution of the selected cases (bool (N,)), the others NaN and not converged"""
+    def full(values, fill):
+        result = np.full(values.shape[:-1] + (len(cases),), fill, dtype=values.dtype)
+        result[..., cases] = values
+        return result
+    return NetworkSolution(sol.network, full(sol.P, np.nan), full(sol.q, np.nan), full(sol.v, np.nan), full(sol.converged, False),
+                           sol.iterations, full(sol.residual, np.nan), sol.batch)
+
+
+class NetworkSolution:
+    """steady state of a L{Network}
+
+    P: pressures of all nodes (n_nodes, N), q: flows of all edges (n_edges, N), v: velocities of the cylinders (n_cylinders, N), iso units
+    converged: bool array (N,), iterations: Newton iterations, residual: scaled residual (N,)
+    """
+
+    def __init__(self, network, P, q, v, converged, iterations, residual, batch=True):
+        self.network = network
+        self.P, self.q, self.v = P, q, v
+        self.converged = converged
+        self.iterations = iterations
+        self.residual = residual
+        self.batch = batch
+
+    def __repr__(self):
+        return 'NetworkSolution({} cases, {} converged, {} iterations)'.format(len(self.converged), int(np.count_nonzero(self.converged)), self.iterations)
+
+    def _value(self, values):
+        return values if self.batch else float(values[0])
+
+    def pressure(self, node):
+        """pressure of a node, Pressure (array valued for N cases)"""
+        return ETQ.Pressure(self._value(self.P[self.network._node(node)]), 'Pa')  # pylint: disable=protected-access
+
+    def flow(self, edge):
+        """flow of an edge from node1 to node2, Flowrate"""
+        if edge not in self.network._edge_index:  # pylint: disable=protected-access
+            raise NetworkError('edge "{}" is not in the network'.format(edge))
+        return ETQ.Flowrate(self._value(self.q[self.network._edge_index[edge]]), 'm^3/sec')  # pylint: disable=protected-access
+
+    def velocity(self, cylinder):
+        """piston velocity of a cylinder, Velocity"""
+        if cylinder not in self.network._cylinder_index:  # pylint: disable=protected-access
+            raise NetworkError('cylinder "{}" is not in the network'.format(cylinder))
+        return ETQ.Velocity(self._value(self.v[self.network._cylinder_index[cylinder]]), 'm/s')  # pylint: disable=protected-access
+
+
+################################################################################
+# test
+################################################################################
+def _setup_doctest():
+    ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+# eof
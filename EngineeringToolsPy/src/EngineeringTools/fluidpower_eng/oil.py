@@ -1,26 +1,233 @@
 #!/usr/bin/env python3
 # pylint: disable-msg=line-too-long,missing-module-docstring,missing-function-docstring,missing-class-docstring,no-else-return,invalid-name,multiple-statements
+"""hydraulic oils
+
+The oil data is in the data files oils.txt (scalar properties) and
+oils_viscosity.txt (kinematic viscosity over temperature), loaded once into an
+L{OilDatabase}. The viscosity model of an oil is fitted once per database
+and model, and evaluated for arrays of temperatures.
+
+# doctest
+>>> oil = get_oil('Tellus S2 M 46')
+>>> nu = oil.viscosityKinematic(ETQ.TemperatureAbsolute(40., 'degC'))
+>>> type(nu).__name__, round(nu.get_value('cSt'), 6)
+('ViscosityKinematic', 46.0)
+>>> T = ETQ.TemperatureAbsolute.iso_array([0., 20., 40., 60., 100.], 'degC')
+>>> print(np.round(oil.viscosityKinematic(T).get_value('cSt'), 1).tolist())
+[580.0, 144.1, 46.0, 18.8, 6.7]
+>>> print(np.round(oil.viscosityDynamic(T).get_value('mPa*sec'), 1).tolist())
+[509.8, 126.7, 40.4, 16.6, 5.9]
+
+Walther (ASTM D341) fitted to the same points
+
+>>> walther = Oil_ShellTellusS2M46(viscosity_model='walther')
+>>> print(np.round(walther.viscosityKinematic(T).get_value('cSt'), 1).tolist())
+[583.5, 133.8, 45.7, 20.4, 6.7]
+"""
 
 __author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
 __email__   = "marthoch@users.noreply.github.com"
 __license__ = "BSD 3-clause"
 
+# run doctest, workaround relative import
+if __name__ == '__main__':
+    import sys
+    import doctest # pylint: disable=import-outside-toplevel
+    module_name = 'EngineeringTools.fluidpower_eng.oil'        # pylint: disable=invalid-name
+    module = __import__(module_name, fromlist=['*'], level=0)  # pylint: disable=invalid-name
+    module._setup_doctest()                                    # pylint: disable=protected-access
+    print(doctest.testmod(module, optionflags=doctest.ELLIPSIS))
+    sys.exit()
+
+import os
+import numpy as np
+
 from .. import quantities as Q
 from .. import quantities as ETQ
-from EngineeringTools.tools import functions
+from ..tools import catalog as ETTcatalog
+
+__all__ = ['Oil', 'Oil_ShellTellusS2M46', 'ViscosityCurve', 'OilDatabase', 'oil_database', 'get_oil']
+
+OILS_FILENAME = os.path.join(os.path.dirname(__file__), 'oils.txt')
+OILS_VISCOSITY_FILENAME = os.path.join(os.path.dirname(__file__), 'oils_viscosity.txt')
+
+# attribute of Oil: (Quantity, unit in the data file)
+PROPERTIES = {'density':(ETQ.Density, 'kg/m3'),
+              'bulkmodulus':(ETQ.Stress, 'N/mm2'),
+              'heat_capacity_specific':(ETQ.HeatCapacitySpecific, 'kJ/(kg.K)')}
+
+
+class ViscosityCurve:
+    """kinematic viscosity over absolute temperature, fitted once to the data points
+
+    models:
+     - 'log_quadratic': ln(nu) = k0 + k1 T + k2 T**2 (nu in m^2/s, T in K), exact through three points
+     - 'walther': ASTM D341, log10(log10(nu + 0.7)) = A - B log10(T) (nu in cSt, T in K)
+    More points than parameters are fitted by least squares.
+
+    >>> curve = ViscosityCurve(ETQ.TemperatureAbsolute.iso_array([0., 40., 100.], 'degC'), ETQ.ViscosityKinematic.iso_array([580., 46., 6.7], 'cSt'))
+    >>> curve(ETQ.TemperatureAbsolute.iso_array([40.], 'degC')) * 1e6
+    array([46.])
+
+    @param T: temperatures in K
+    @param nu: kinematic viscosities in m^2/s
+    @param model: 'log_quadratic' or 'walther'
+    """
+
+    MODELS = {'log_quadratic':3, 'walther':2}
+
+    def __init__(self, T, nu, model='log_quadratic'):
+        if model not in self.MODELS:
+            raise ETTcatalog.CatalogError('viscosity model "{}" is not known. Use: {}'.format(model, ', '.join(self.MODELS)))
+        T = np.asarray(T, dtype=float)
+        order = np.argsort(T, kind='stable')
+        self.T = np.ascontiguousarray(T[order])
+        self.nu = np.ascontiguousarray(np.asarray(nu, dtype=float)[order])
+        if len(np.unique(self.T)) < self.MODELS[model] or np.any(self.nu <= 0.):
+            raise ETTcatalog.CatalogError('viscosity model "{}" needs at least {} distinct temperatures and positive viscosities'.format(model, self.MODELS[model]))
+        self.T.setflags(write=False)
+        self.nu.setflags(write=False)
+        self.model = model
+        if model == 'log_quadratic':
+            self.coefficients = np.polyfit(self.T, np.log(self.nu), 2)
+        else:
+            self.coefficients = np.polyfit(np.log10(self.T), np.log10(np.log10(self.nu * 1e6 + 0.7)), 1)
+
+    def __repr__(self):
+        return 'ViscosityCurve({!r}, {} points, {:g} K .. {:g} K)'.format(self.model, len(self.T), self.T[0], self.T[-1])
+
+    def __call__(self, T):
+        """kinematic viscosity in m^2/s at the temperatures T in K (float or array)"""
+        if self.model == 'log_quadratic':
+            return np.exp(np.polyval(self.coefficients, T))
+        return (10.**(10.**np.polyval(self.coefficients, np.log10(T))) - 0.7) * 1e-6
+
+
+class OilDatabase:
+    """oils indexed by all their identifiers (id, name, trade names)
+
+    >>> db = oil_database()
+    >>> db.identify('Tellus S2 M 68')
+    'ShellTellusS2M68'
+
+    @param properties: L{ETTcatalog.Catalog} of scalar properties, one row per oil
+    @param viscosity: L{ETTcatalog.Catalog} of viscosity points (columns T in K, nu in m^2/s)
+    """
+
+    def __init__(self, properties, viscosity):
+        self.catalog = properties
+        self._index = {}
+        for row, name in enumerate(properties.names):
+            for identifier in [name, properties.column('name')[row]] + self._identifiers(row):
+                self._index.setdefault(identifier, name)
+                self._index.setdefault(identifier.lower(), name)
+        self._points = {}
+        T, nu = viscosity.column('T'), viscosity.column('nu')
+        for name in np.unique(viscosity.names):
+            rows = np.nonzero(viscosity.names == name)[0]
+            self._points[name] = (T[rows], nu[rows])
+        self._curves = {}
+
+    def __len__(self):
+        return len(self.catalog)
+
+    def identify(self, identifier):
+        """id of an oil by any of its identifiers"""
+        name = self._index.get(identifier)
+        if name is None:
+            name = self._index.get(str(identifier).lower())
+        if name is None:
+            raise ETTcatalog.CatalogError('oil "{}" is not in the database'.format(identifier))
+        return name
+
+    def _identifiers(self, row):
+        return [item.strip() for item in self.catalog.column('identifiers')[row].split(',') if item.strip()]
+
+    def value(self, identifier, key):
+        """scalar property in ISO units, NaN if not available"""
+        return self.catalog.value(self.identify(identifier), key)
+
+    def viscosity_points(self, identifier):
+        """(T in K, nu in m^2/s) or None"""
+        return self._points.get(self.identify(identifier))
+
+    def viscosity_curve(self, identifier, model=None):
+        """fitted L{ViscosityCurve} or None if the oil has no viscosity data
+
+        @param model: viscosity model, default: the model of the data file
+        """
+        name = self.identify(identifier)
+        if model is None:
+            model = self.catalog.column('viscosity_model')[self.catalog.position(name)] or 'log_quadratic'
+        key = (name, model)
+        if key not in self._curves:
+            points = self._points.get(name)
+            self._curves[key] = ViscosityCurve(points[0], points[1], model) if points is not None else None
+        return self._curves[key]
+
+    def oil(self, identifier, viscosity_model=None):
+        """oil as instance of its class in this module"""
+        name = self.identify(identifier)
+        cls = globals()[self.catalog.column('class')[self.catalog.position(name)]]
+        return cls(name, viscosity_model=viscosity_model)
+
+
+_databases = {}
+
+
+def _viscosity_catalog(catalog):
+    """viscosity catalog (T in degC, nu in cSt) converted to ISO units"""
+    columns = {'T':ETQ.TemperatureAbsolute.iso_array(catalog.column('T'), 'degC'),
+               'nu':ETQ.ViscosityKinematic.iso_array(catalog.column('nu'), 'cSt')}
+    return ETTcatalog.Catalog(catalog.names, columns, index_name=catalog.index_name, source=catalog.source)
+
+
+def oil_database(filename=OILS_FILENAME, filename_viscosity=OILS_VISCOSITY_FILENAME):
+    """the oil database, loaded once per process and file version"""
+    properties = ETTcatalog.load_catalog(filename, units=PROPERTIES, skiprows=1)
+    viscosity = ETTcatalog.load_catalog(filename_viscosity, skiprows=2)
+    key = (filename, filename_viscosity)
+    entry = _databases.get(key)
+    if entry is not None and entry[0] == (properties, viscosity):
+        return entry[1]
+    database = OilDatabase(properties, _viscosity_catalog(viscosity))
+    _databases[key] = ((properties, viscosity), database)
+    return database
+
+
+def get_oil(identifier, viscosity_model=None):
+    """oil by any identifier
+
+    >>> print(get_oil('S2M32').description)
+    Shell Tellus S2 M 32
+    """
+    return oil_database().oil(identifier, viscosity_model)
+
+
 
 class Oil:
+    """hydraulic oil, a view of a row of the L{OilDatabase}
+
+    @param identifier: any identifier of the oil in the database, default: the oil of the class
+    @param viscosity_model: see L{ViscosityCurve}, default: the model of the data file
+    """
 
-    def __init__(self):
-        self.description = 'general hydraulic oil'
-        self.bulkmodulus = Q.Stress(1.0e9, 'Pa')
-        self.density = Q.Density(890., 'kg/m^3')
-        self.heat_capacity_specific = Q.HeatCapacitySpecific(1.67, 'kJ/(kg.K)')
+    _database_id = 'oil'
+
+    def __init__(self, identifier=None, viscosity_model=None):
+        database = oil_database()
+        self.database_id = database.identify(identifier if identifier is not None else self._database_id)
+        self.description = database.catalog.column('name')[database.catalog.position(self.database_id)]
+        for key, (quantity, _) in PROPERTIES.items():
+            setattr(self, key, quantity(database.value(self.database_id, key), quantity._isoUnit))  # pylint: disable=protected-access
+        points = database.viscosity_points(self.database_id)
+        self.viscosityKinematic_tab = [[Q.TemperatureAbsolute(float(t), 'K'), Q.ViscosityKinematic(float(v), 'm^2/sec')] for t, v in zip(*points)] if points is not None else []
+        self.viscosity = database.viscosity_curve(self.database_id, viscosity_model)
 
 
     def _repr_html_(self):
         html = """<font face="courier">
-{name}        
+{name}
 <table border="1">
 <tr>
 <td>description</td>
@@ -41,50 +248,40 @@ class Oil:
 
     def __str__(self):
         return """{name}
-description:       {s.description}    
-density:           {s.density}  
+description:       {s.description}
+density:           {s.density}
 bulk modulus:      {s.bulkmodulus}
 """.format(name=self.__class__.__module__+'.'+self.__class__.__name__,
            s=self)
 
     __repr__ = __str__
 
+    def viscosityKinematic(self, temperatur):
+        """kinematic viscosity
 
+        @param temperatur: TemperatureAbsolute (also with an array as value), UVal or array in K
+        """
+        if self.viscosity is None:
+            raise ETTcatalog.CatalogError('oil "{}" has no viscosity data'.format(self.database_id))
+        nu = self.viscosity(ETQ.TemperatureAbsolute.iso_array(temperatur))
+        return ETQ.ViscosityKinematic(nu if np.ndim(nu) else float(nu), 'm^2/sec')
 
-class Oil_ShellTellusS2M46(Oil):
-
-    def __init__(self):
-        super(Oil_ShellTellusS2M46, self).__init__()
-        self.description = "Shell Tellus S2 M 46"
-        self.density = Q.Density(879., 'kg/m^3') # at 15degC from Technical Data Sheet 2015
-
-        self.viscosityKinematic_tab = [[Q.TemperatureAbsolute(  0.,'degC'), Q.ViscosityKinematic(580., 'cSt')],
-                                       [Q.TemperatureAbsolute( 40.,'degC'), Q.ViscosityKinematic(46., 'cSt')],
-                                       [Q.TemperatureAbsolute(100.,'degC'), Q.ViscosityKinematic(6.7, 'cSt')]]
-
-    def viscosityKinematic(self, temperatur):
 
-        temp = []
-        visc = []
-        for t, v in  self.viscosityKinematic_tab:
-            temp.append(t.get_value())
-            visc.append(v.get_value())
+    def viscosityDynamic(self, temperatur):
+        """dynamic viscosity, see L{viscosityKinematic}"""
+        return ETQ.ViscosityDynamic(self.viscosityKinematic(temperatur).get_value() * self.density.get_value(), 'Pa*sec')
 
-        x = temp
-        y = visc
-        log = functions.log
-        k0 = (x[0]*x[1]*(x[0] - x[1])*log(y[2]) - x[0]*x[2]*(x[0] - x[2])*log(y[1]) + x[1]*x[2]*(x[1] - x[2])*log(y[0]))/(x[0]**2*x[1] - x[0]**2*x[2] - x[0]*x[1]**2 + x[0]*x[2]**2 + x[1]**2*x[2] - x[1]*x[2]**2)
-        k1 = (-(x[0]**2 - x[1]**2)*log(y[2]) + (x[0]**2 - x[2]**2)*log(y[1]) - (x[1]**2 - x[2]**2)*log(y[0]))/(x[0]**2*x[1] - x[0]**2*x[2] - x[0]*x[1]**2 + x[0]*x[2]**2 + x[1]**2*x[2] - x[1]*x[2]**2)
-        k2 = ((x[0] - x[1])*log(y[2]) - (x[0] - x[2])*log(y[1]) + (x[1] - x[2])*log(y[0]))/(x[0]**2*x[1] - x[0]**2*x[2] - x[0]*x[1]**2 + x[0]*x[2]**2 + x[1]**2*x[2] - x[1]*x[2]**2)
 
-        return  ETQ.ViscosityKinematic(functions.exp(k0 + k1 *  temperatur.get_value() +  k2 * temperatur.get_value()**2), 'm^2/sec')
 
+class Oil_ShellTellusS2M46(Oil):
 
-    def viscosityDynamic(self, temperatur):
-        return ETQ.ViscosityDynamic(self.viscosityKinematic(temperatur) * self.density)
+    _database_id = 'ShellTellusS2M46'
 
 
-if __name__ == '__main__':
-    pass
+################################################################################
+# test
+################################################################################
+def _setup_doctest():
+    ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
 
 #eof
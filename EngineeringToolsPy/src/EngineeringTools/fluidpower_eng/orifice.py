@@ -19,16 +19,16 @@ class OrificeTurbulent:
 
     def __init__(self, A=None, pressure_drop=None, p1=None, p2=None, flow=None, fluid=None, Cq=None):
         self.A = None
-        if Cq:
+        if Cq is not None:
             self.Cq = Cq
         else:
             self.Cq = Q.Scalar(0.67)
-        if fluid:
+        if fluid is not None:
             self.fluid = fluid
         else:
             self.fluid = Oil()
 
-        if A:
+        if A is not None:
             self.A = A
         elif (pressure_drop is not None and flow is not None and A is None and p1 is None and p2 is None):
             self.A = Q.Area(flow.uval / self.Cq.uval  / functions.sqrt(2./self.fluid.density.uval * abs(pressure_drop.uval)))
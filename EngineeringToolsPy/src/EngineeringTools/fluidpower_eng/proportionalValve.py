@@ -9,15 +9,40 @@ __license__ = "BSD 3-clause"
 import numpy as np
 from .. import quantities as Q
 from .. import quantities as ETQ
+from ..uval import UVal
+from ..firstorder import nominal
 from EngineeringTools.tools import functions
 from .oil import Oil
 #from .orifice import OrificeTurbulent
 
+
+def _value(x):
+    """value of a Scalar (or number, array)"""
+    return x.get_value() if isinstance(x, ETQ.Quantity) else x
+
+
 def signTrue(x):
-    return 1. if x >= 0 else -1.
+    """sign with signTrue(0) = 1, element-wise for arrays"""
+    sign = np.where(nominal(_value(x)) >= 0, 1., -1.)
+    return float(sign) if np.ndim(sign) == 0 else sign
 
 def sg(x):
-    return x if x >= ETQ.Scalar(0.) else ETQ.Scalar(0.)
+    """max(x, 0) of a Scalar, element-wise for arrays"""
+    return ETQ.Scalar(np.maximum(_value(x), 0.))
+
+
+def _select(positive, gain_positive, gain_negative):
+    """gain for xV >= 0 or xV < 0 (callables returning UVal)
+
+    For arrays both branches are evaluated and selected element-wise, the
+    branch not taken may be invalid (sqrt of a negative pressure difference).
+    """
+    if np.ndim(positive) == 0:
+        return gain_positive() if positive else gain_negative()
+    with np.errstate(invalid='ignore'):
+        a, b = gain_positive(), gain_negative()
+    b.check_units(a.get_uval_units())
+    return UVal(np.where(positive, a.get_value(), b.get_value()), a.get_uval_units())
 
 
 
@@ -32,23 +57,53 @@ pressuredrop_tot_nominal:
 underlap1:  uv where critical lap
 
 """
-        self.flowrate_nominal = Q.Flowrate(flowrate_nominal)
-        self.pressuredrop_tot_nominal = Q.Pressure(pressuredrop_tot_nominal)
-        if underlap1:
-            self.underlap1 = Q.Scalar(underlap1)
-            if not (Q.Scalar(0.0, '1') <= self.underlap1 <= Q.Scalar(1.0, '1')):
-                raise Exception('underlap has to be <=1 and >=0')
-        else:
-            self.underlap1 = Q.Scalar(0.0, '1')
+        self._Cv1 = None
+        self.flowrate_nominal = flowrate_nominal
+        self.pressuredrop_tot_nominal = pressuredrop_tot_nominal
+        self.underlap1 = underlap1
 
         self.Cq = Q.Scalar(0.67)
         self.fluid = Oil()
 
+    @property
+    def flowrate_nominal(self):
+        return self._flowrate_nominal
+
+    @flowrate_nominal.setter
+    def flowrate_nominal(self, flowrate_nominal):
+        self._flowrate_nominal = Q.Flowrate(flowrate_nominal)
+        self._Cv1 = None
+
+    @property
+    def pressuredrop_tot_nominal(self):
+        return self._pressuredrop_tot_nominal
+
+    @pressuredrop_tot_nominal.setter
+    def pressuredrop_tot_nominal(self, pressuredrop_tot_nominal):
+        self._pressuredrop_tot_nominal = Q.Pressure(pressuredrop_tot_nominal)
+        self._Cv1 = None
+
+    @property
+    def underlap1(self):
+        return self._underlap1
+
+    @underlap1.setter
+    def underlap1(self, underlap1):
+        if underlap1:
+            underlap1 = Q.Scalar(underlap1)
+            if not (Q.Scalar(0.0, '1') <= underlap1 <= Q.Scalar(1.0, '1')):
+                raise Exception('underlap has to be <=1 and >=0')
+        else:
+            underlap1 = Q.Scalar(0.0, '1')
+        self._underlap1 = underlap1
+        self._Cv1 = None
 
     @property
     def Cv1(self):
-        """Cv for control signal -1..1"""
-        return self.flowrate_nominal / (functions.sqrt(self.pressuredrop_tot_nominal / 2)*(Q.Scalar(1.0, '1') + self.underlap1))
+        """Cv for control signal -1..1, cached until flowrate_nominal, pressuredrop_tot_nominal or underlap1 is set"""
+        if self._Cv1 is None:
+            self._Cv1 = self.flowrate_nominal / (functions.sqrt(self.pressuredrop_tot_nominal / 2)*(Q.Scalar(1.0, '1') + self.underlap1))
+        return self._Cv1
 
     def param_given_xvmax(self, xvmax):
         xvmax = Q.Distance(xvmax)
@@ -105,40 +160,40 @@ Fluid: {s.fluid}
         """Jelali page 106 eq 4.233
         TODO: whats about the ..0 ?
         """
-        return -signTrue(xV) * self.Cv1 * xV0  / (np.sqrt(2.) * functions.sqrt(pS - pT - pL0 * np.sign(xV)))
+        return -signTrue(xV) * self.Cv1 * xV0  / (np.sqrt(2.) * functions.sqrt(pS - pT - pL0 * np.sign(_value(xV))))
 
 
     def KQxA1__Jelali_4_225(self, xV , pS, pT, pA0, pB0):
         """Flow Gain
-        Jelali page 105 eq 4.225"""
-        if xV >= ETQ.Scalar(0.,'1'):
-            return self.Cv1 * functions.sqrt(pS - pA0)
-        else:
-            return self.Cv1 * functions.sqrt(pA0 - pT)
+        Jelali page 105 eq 4.225
+
+        xV and the pressures may be arrays of operating points
+
+        >>> valve = ProportionalValve(flowrate_nominal=ETQ.Flowrate(20, 'Liter/min'), pressuredrop_tot_nominal=ETQ.Pressure(70, 'bar'))
+        >>> K = valve.KQxA1__Jelali_4_225(np.array([-0.5, 0.5]), ETQ.Pressure(210., 'bar'), ETQ.Pressure(0., 'bar'), ETQ.Pressure(np.array([100., 100.]), 'bar'), None)
+        >>> print(np.round(ETQ.Flowrate(K).get_value('Liter/min'), 2).tolist())
+        [33.81, 35.46]
+        """
+        Cv1 = self.Cv1
+        return _select(_value(xV) >= 0., lambda: Cv1 * functions.sqrt(pS - pA0), lambda: Cv1 * functions.sqrt(pA0 - pT))
 
 
     def KQxB1__Jelali_4_226(self, xV , pS, pT, pA0, pB0):
         """Flow Gain
         Jelali page 105 eq 4.226"""
-        if xV >= ETQ.Scalar(0.,'1'):
-            return - self.Cv1 * functions.sqrt(pB0 - pT)
-        else:
-            return - self.Cv1 * functions.sqrt(pS - pB0)
+        Cv1 = self.Cv1
+        return _select(_value(xV) >= 0., lambda: - Cv1 * functions.sqrt(pB0 - pT), lambda: - Cv1 * functions.sqrt(pS - pB0))
 
 
     def KQpA1__Jelali_4_227(self, xV , xV0, pS, pT, pA0, pB0):
-        if xV >= ETQ.Scalar(0.,'1'):
-            return self.Cv1 * xV0 / (2.* functions.sqrt(pA0 - pT))
-        else:
-            return -self.Cv1 * xV0 / (2.* functions.sqrt(pS - pA0))
+        Cv1 = self.Cv1
+        return _select(_value(xV) >= 0., lambda: Cv1 * xV0 / (2.* functions.sqrt(pA0 - pT)), lambda: -Cv1 * xV0 / (2.* functions.sqrt(pS - pA0)))
 
 
 
     def KQpB1__Jelali_4_228(self, xV , xV0, pS, pT, pA0, pB0):
-        if xV >= ETQ.Scalar(0.,'1'):
-            return -self.Cv1 * xV0 / (2.* functions.sqrt(pB0 - pT))
-        else:
-            return self.Cv1 * xV0 / (2.* functions.sqrt(pS - pB0))
+        Cv1 = self.Cv1
+        return _select(_value(xV) >= 0., lambda: -Cv1 * xV0 / (2.* functions.sqrt(pB0 - pT)), lambda: Cv1 * xV0 / (2.* functions.sqrt(pS - pB0)))
 
 
     def flow(self, xVn, pA=None, pB=None, pL=None, pS=None, pT=None):
@@ -164,19 +219,24 @@ Fluid: {s.fluid}
           -3.64  Liter/min (Flowrate)
         >>> print(QB)
            3.64  Liter/min (Flowrate)
+
+        spool positions and pressures may be arrays (operating points), e.g. a characteristic map:
+
+        >>> QA, QB = valve.flow(np.linspace(-1., 1., 5), pA=ETQ.Pressure(np.array([[50.], [150.]]), 'bar'), pB=ETQ.Pressure(0., 'bar'), pS=ETQ.Pressure(210.,'bar'), pT=ETQ.Pressure(0.,'bar'))
+        >>> print(np.round(QA.get_value('Liter/min'), 2).tolist())
+        [[-23.9, -13.04, 1.71, 23.32, 42.76], [-41.4, -22.58, -1.38, 14.28, 26.19]]
         """
-        xVn = ETQ.Scalar(xVn)
-        xVn = functions.limitTo(xVn, ETQ.Scalar(-1.), ETQ.Scalar(1.))
-        if pL and (pA is None and pB is None):
+        xVn = np.minimum(np.maximum(ETQ.Scalar(xVn).get_value(), -1.), 1.)
+        if pL is not None and (pA is None and pB is None):
             pA = ETQ.Pressure((pS + pT)/2 + pL/2)
             pB = ETQ.Pressure((pS + pT)/2 - pL/2)
-            ETQ.logging.info("pA={} pB={}".format(pA, pB))
-        Q1 = ETQ.Flowrate(self.Cv1*sg( xVn + self.underlap1)*functions.sqrtSigned(pS-pA))
-        Q2 = ETQ.Flowrate(self.Cv1*sg(-xVn + self.underlap1)*functions.sqrtSigned(pA-pT))
-        Q3 = ETQ.Flowrate(self.Cv1*sg(-xVn + self.underlap1)*functions.sqrtSigned(pS-pB))
-        Q4 = ETQ.Flowrate(self.Cv1*sg( xVn + self.underlap1)*functions.sqrtSigned(pB-pT))
-        QA = Q1 - Q2
-        QB = Q3 - Q4
-        return QA, QB #, (Q1, Q2, Q3, Q4)
+            ETQ.logging.info("pA=%s pB=%s", pA, pB)
+        underlap1 = self.underlap1.get_value()
+        openingPA_BT = UVal(np.maximum( xVn + underlap1, 0.), {})    # P->A, B->T
+        openingPB_AT = UVal(np.maximum(-xVn + underlap1, 0.), {})    # P->B, A->T
+        Cv1 = self.Cv1
+        QA = ETQ.Flowrate(Cv1 * (openingPA_BT * functions.sqrtSigned(pS-pA) - openingPB_AT * functions.sqrtSigned(pA-pT)))
+        QB = ETQ.Flowrate(Cv1 * (openingPB_AT * functions.sqrtSigned(pS-pB) - openingPA_BT * functions.sqrtSigned(pB-pT)))
+        return QA, QB
 
 # eof
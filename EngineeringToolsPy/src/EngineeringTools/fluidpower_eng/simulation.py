@@ -0,0 +1,650 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-module-docstring,missing-function-docstring,missing-class-docstring,no-else-return,invalid-name,multiple-statements
+"""nonlinear time-domain simulation of a valve - cylinder - mass servo axis
+
+L{ServoAxis} combines a L{proportionalValve.ProportionalValve}, a
+L{cylinder.Cylinder}, its oil and a mass into a state-space model with the
+states piston position, velocity, chamber pressures and (optionally) spool
+position. All parameters are given as quantities and unit checked once when
+the axis is built; the integration runs on plain floats (or numpy arrays for
+a batch of variants).
+
+ - valve: turbulent flow over the four control edges (Jelali eq 4.2, 4.3),
+   with a laminar transition below dp_laminar to keep the model non-stiff
+ - chambers: pressure build-up dp/dt = E / V(x) * (Q -+ A v)
+ - mass: m a = pA AA - pB AB - d v - F_load
+ - end stops: inelastic impact; the crossing time is located by interpolation
+   within the step, the state is projected onto the stop (x = limit, v = 0) and
+   the piston stays there as long as the force pushes into the stop
+ - controller: P position controller with the spool signal limited to -1..1,
+   or an open loop spool signal
+
+Array valued parameters (same length N) make a batch of N variants, the
+states are then arrays of length N integrated together in one step loop.
+L{simulate_batch} splits large batches over a process pool and returns the
+step response KPIs (overshoot, settling time, peak pressure) per variant,
+evaluated while the output is streamed, the trajectories only if asked.
+
+Integrators: 'rk4' with a fixed step writes every n-th step to the output
+(output_dt has to be a multiple of dt). Its steps run in a Python loop, some
+10 us per step whether one or many variants are integrated: 10 s at 10 kHz
+take one to a few seconds. The stages of a step depend on each other, only the
+variants are vectorized; for long runs use 'dopri5' or batches of variants.
+'dopri5' controls the step by the local error and interpolates all output
+samples (cubic Hermite) in one pass at the end, so a fine output grid (10 kHz)
+costs little. Note a critically lapped valve without friction gives no
+damping, the closed loop is then unstable for any gain.
+
+# doctest
+# reset new format defaults for test
+>>> from EngineeringTools.quantities import qnt
+>>> qnt.FORMAT_DEFAULT['totalWidth'] = 14
+>>> qnt.FORMAT_DEFAULT['decimalPosition'] = 10
+>>> qnt.FORMAT_DEFAULT['thousands_sep'] = ' '
+
+position step of 100 mm, adaptive integration with 1 kHz output
+
+>>> from EngineeringTools.fluidpower_eng.cylinder import Cylinder
+>>> from EngineeringTools.fluidpower_eng.proportionalValve import ProportionalValve
+>>> valve = ProportionalValve(ETQ.Flowrate(40., 'Liter/min'), ETQ.Pressure(70., 'bar'))
+>>> cyl = Cylinder(D=ETQ.Distance(50., 'mm'), dA=ETQ.Distance(28., 'mm'), stroke_length=ETQ.Distance(400., 'mm'))
+>>> axis = ServoAxis(valve, cyl, mass=ETQ.Mass(200., 'kg'), pS=ETQ.Pressure(160., 'bar'), friction=5000.,
+...                  Kp=20., reference=ETQ.Distance(100., 'mm'), deadVolume=ETQ.Volume(100., 'cm3'))
+>>> res = simulate(axis, ETQ.Time(1., 's'), method='dopri5', output_dt=1e-3)
+>>> len(res), round(float(res.x[-1]) * 1000., 2)
+(1001, 100.0)
+>>> rk4 = simulate(axis, ETQ.Time(1., 's'), method='rk4', dt=1e-4, output_dt=1e-3)
+>>> print(float(abs(rk4.x - res.x).max()) < 1e-6)
+True
+
+open loop, full spool signal until the piston hits the end stop
+
+>>> axis = ServoAxis(valve, cyl, mass=ETQ.Mass(200., 'kg'), pS=ETQ.Pressure(160., 'bar'), friction=5000.,
+...                  command=1., deadVolume=ETQ.Volume(100., 'cm3'))
+>>> res = simulate(axis, 1., x0=ETQ.Distance(100., 'mm'), output_dt=1e-3)
+>>> [(round(t, 3), stop) for t, stop, _ in res.events]
+[(0.208, 'upper')]
+>>> x, pA = res.quantity('x').get_value('mm'), res.quantity('pA').get_value('bar')
+>>> print(x[-1], res.v[-1], round(float(pA[-1]), 1))
+200.0 0.0 160.0
+
+batch of three variants (mass, gain), only the KPIs are kept
+
+>>> axis = ServoAxis(valve, cyl, mass=ETQ.Mass(np.array([100., 200., 400.]), 'kg'), pS=ETQ.Pressure(160., 'bar'), friction=5000.,
+...                  Kp=np.array([20., 20., 40.]), reference=ETQ.Distance(100., 'mm'), deadVolume=ETQ.Volume(100., 'cm3'))
+>>> res = simulate_batch(axis, 1., method='dopri5', output_dt=1e-3, max_workers=0)
+>>> res.data, res.kpi['settling_time'].tolist(), res.kpi['overshoot'].round(4).tolist()
+({}, [0.417, 0.418, 0.28], [0.0, 0.0, 0.0012])
+>>> print(res.kpi_quantity('peak_pressure').get_value('bar').round(1).tolist())
+[142.5, 149.7, 154.9]
+"""
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+
+# run doctest, workaround relative import
+if __name__ == '__main__':
+    import sys
+    import doctest # pylint: disable=import-outside-toplevel
+    module_name = 'EngineeringTools.fluidpower_eng.simulation'  # pylint: disable=invalid-name
+    module = __import__(module_name, fromlist=['*'], level=0)  # pylint: disable=invalid-name
+    module._setup_doctest()                                    # pylint: disable=protected-access
+    print(doctest.testmod(module, optionflags=doctest.ELLIPSIS))
+    sys.exit()
+
+import os
+import copy
+import concurrent.futures
+from fractions import Fraction
+import numpy as np
+
+from .. import quantities as ETQ
+from ..uval import UVal
+
+__all__ = ['SimulationError', 'ServoAxis', 'simulate', 'simulate_batch', 'SimulationResult', 'STATES', 'KPIS']
+
+
+class SimulationError(Exception):
+    """Exception: simulation"""
+
+
+STATES = ('x', 'v', 'pA', 'pB', 'xV')
+KPIS = ('overshoot', 'settling_time', 'peak_pressure', 'x_end')
+_QUANTITIES = {'x':ETQ.Distance, 'v':ETQ.Velocity, 'pA':ETQ.Pressure, 'pB':ETQ.Pressure, 'xV':ETQ.Scalar}
+_KPI_QUANTITIES = {'overshoot':ETQ.Scalar, 'settling_time':ETQ.Time, 'peak_pressure':ETQ.Pressure, 'x_end':ETQ.Distance}
+
+
+def _iso(value, quantity):
+    """value of a quantity in iso units (float or array), unit checked"""
+    return quantity(value).get_value()
+
+
+def _iso_uval(value, units):
+    """UVal (unit checked) or number in iso units"""
+    if isinstance(value, ETQ.Quantity):
+        value = value.uval
+    if isinstance(value, UVal):
+        value.check_units(units)
+        return value.get_value()
+    return value
+
+
+def _signal(value, quantity):
+    """constant quantity or callable(t) -> value in iso units"""
+    if value is None:
+        return 0.
+    elif callable(value):
+        return value
+    return _iso(value, quantity)
+
+
+def _clip(x, low, high):
+    """x limited to low..high, for floats and arrays"""
+    x = np.minimum(np.maximum(x, low), high)
+    return float(x) if np.ndim(x) == 0 else x
+
+
+class ServoAxis:
+    """valve - cylinder - mass axis
+
+    The parameters may be array valued (same length N), the axis is then a
+    batch of N variants simulated together.
+
+    @param valve: ProportionalValve
+    @param cylinder: Cylinder, the stroke range gives the end stops, the oil gives the bulk modulus
+    @param mass: moved mass
+    @param pS, pT: supply and tank pressure
+    @param load: external force against the positive direction, Force or callable(t) -> force in N
+    @param friction: viscous friction coefficient, UVal in N s/m (kg/s) or number
+    @param Kp: position gain, UVal in 1/m or number: spool signal = Kp * (reference - x); None: open loop
+    @param reference: position, Distance or callable(t) -> position in m
+    @param command: open loop spool signal -1..1, number or callable(t), used if Kp is None
+    @param Tv: time constant of the spool (first order), None: ideal valve
+    @param deadVolume: volume of lines and dead volume, added to both chambers
+    @param dp_laminar: pressure drop of the laminar transition of the valve flow
+    """
+
+    def __init__(self, valve, cylinder, mass, pS, pT=None, load=None, friction=None, Kp=None, reference=None, command=None,
+                 Tv=None, deadVolume=None, dp_laminar=None):
+        self.valve = valve
+        self.cylinder = cylinder
+        p = {}
+        p['AA'] = _iso(cylinder.areaA, ETQ.Area)
+        p['AB'] = _iso(cylinder.areaB, ETQ.Area)
+        Vdead = _iso(deadVolume, ETQ.Volume) if deadVolume is not None else 0.
+        p['V0A'] = _iso(cylinder.volumeA_0, ETQ.Volume) + Vdead
+        p['V0B'] = _iso(cylinder.volumeB_0, ETQ.Volume) + Vdead
+        p['xmin'] = _iso(cylinder.position_lowerLimit, ETQ.Distance)
+        p['xmax'] = _iso(cylinder.position_upperLimit, ETQ.Distance)
+        p['E'] = _iso(cylinder.fluid.bulkmodulus, ETQ.Stress)
+        p['m'] = _iso(mass, ETQ.Mass)
+        p['pS'] = _iso(pS, ETQ.Pressure)
+        p['pT'] = _iso(pT, ETQ.Pressure) if pT is not None else 0.
+        p['d'] = _iso_uval(friction, {'kilogram':1, 'second':-1}) if friction is not None else 0.
+        Cv1 = valve.Cv1
+        Cv1.check_units({'meter':Fraction(7, 2), 'kilogram':Fraction(-1, 2)})   # m^3/s / sqrt(Pa)
+        p['Cv1'] = Cv1.get_value()
+        p['underlap1'] = valve.underlap1.get_value()
+        p['dp_laminar'] = _iso(dp_laminar, ETQ.Pressure) if dp_laminar is not None else 1e5
+        p['Kp'] = _iso_uval(Kp, {'meter':-1}) if Kp is not None else None
+        p['Tv'] = _iso(Tv, ETQ.Time) if Tv is not None else None
+        if np.any(p['V0A'] + p['AA'] * p['xmin'] <= 0.) or np.any(p['V0B'] - p['AB'] * p['xmax'] <= 0.):
+            raise SimulationError('chamber volume at the end stop is not positive, give a deadVolume')
+        sizes = {np.size(value) for value in p.values() if value is not None and np.ndim(value) > 0}
+        if len(sizes) > 1:
+            raise SimulationError('array valued parameters have different lengths: {}'.format(sorted(sizes)))
+        self.parameters = p
+        self.reference = _signal(reference, ETQ.Distance)
+        self.load = _signal(load, ETQ.Force)
+        self.command = command if command is not None else 0.
+        if p['Kp'] is not None and reference is None:
+            raise SimulationError('closed loop (Kp) needs a reference')
+
+    def __repr__(self):
+        return 'ServoAxis(mass={}, pS={})'.format(self.parameters['m'], self.parameters['pS'])
+
+    @property
+    def batch(self):
+        """True if the parameters are array valued (variants)"""
+        return any(np.ndim(value) > 0 for value in self.parameters.values() if value is not None)
+
+    @property
+    def size(self):
+        """number of variants, 1 for float parameters"""
+        return max((np.size(value) for value in self.parameters.values() if value is not None), default=1)
+
+    def subset(self, start, stop):
+        """axis with the variants start..stop-1"""
+        axis = copy.copy(self)
+        axis.parameters = {name:value[start:stop] if np.ndim(value) > 0 else value for name, value in self.parameters.items()}
+        return axis
+
+    def initial_state(self, x0=None, pA0=None, pB0=None):
+        """state list [x, v, pA, pB, xV], default: x = 0 (clipped to the stroke), pressures at force balance"""
+        p = self.parameters
+        shape = (self.size,) if self.batch else None
+        x = _iso(x0, ETQ.Distance) if x0 is not None else 0.
+        x = _clip(x, p['xmin'], p['xmax'])
+        if pA0 is None and pB0 is None:
+            # pA AA - pB AB = load with pA + pB = pS + pT
+            load = self.load(0.) if callable(self.load) else self.load
+            pA = (load + (p['pS'] + p['pT']) * p['AB']) / (p['AA'] + p['AB'])
+            pB = p['pS'] + p['pT'] - pA
+        else:
+            pA = _iso(pA0, ETQ.Pressure)
+            pB = _iso(pB0, ETQ.Pressure)
+        state = [x, 0., pA, pB, 0.]
+        if shape is not None:
+            state = [np.array(np.broadcast_to(value, shape), dtype=float) for value in state]
+        else:
+            state = [float(value) for value in state]
+        state[4] = self.spool_command(0., state)
+        return state
+
+    def controller(self):
+        """u(t, x) -> spool signal -1..1, for floats and arrays"""
+        Kp, reference, command = self.parameters['Kp'], self.reference, self.command
+        if Kp is None:
+            if callable(command):
+                return lambda t, x: _clip(command(t), -1., 1.)
+            command = _clip(command, -1., 1.)
+            return lambda t, x: command
+        elif callable(reference):
+            def u(t, x):
+                u = Kp * (reference(t) - x)
+                return 0.5 * (abs(u + 1.) - abs(u - 1.))
+        else:
+            def u(t, x):
+                u = Kp * (reference - x)
+                return 0.5 * (abs(u + 1.) - abs(u - 1.))
+        return u
+
+    def spool_command(self, t, state):
+        """spool signal -1..1 of the controller"""
+        return self.controller()(t, state[0])
+
+    def rhs(self):
+        """f(t, x, v, pA, pB, xV) -> derivatives of the states (tuple), for floats and arrays"""
+        p = self.parameters
+        AA, AB, V0A, V0B, E, m, d = p['AA'], p['AB'], p['V0A'], p['V0B'], p['E'], p['m'], p['d']
+        Cv1, lap, dpl, pS, pT = p['Cv1'], p['underlap1'], p['dp_laminar'], p['pS'], p['pT']
+        xmin, xmax, Tv = p['xmin'], p['xmax'], p['Tv']
+        load = self.load
+        load_callable = callable(load)
+        controller = self.controller()
+
+        def f(t, x, v, pA, pB, xV):
+            u = controller(t, x)
+            if Tv is None:
+                xV, dxV = u, 0.
+            else:
+                dxV = (u - xV) / Tv
+            o1 = xV + lap               # P->A, B->T
+            o1 = 0.5 * (o1 + abs(o1))
+            o2 = lap - xV               # P->B, A->T
+            o2 = 0.5 * (o2 + abs(o2))
+            # turbulent orifice sign(dp) sqrt(|dp|), linear below dp_laminar
+            dp = pS - pA; QA = o1 * dp * (abs(dp) + dpl) ** -0.5
+            dp = pA - pT; QA = Cv1 * (QA - o2 * dp * (abs(dp) + dpl) ** -0.5)
+            dp = pS - pB; QB = o2 * dp * (abs(dp) + dpl) ** -0.5
+            dp = pB - pT; QB = Cv1 * (QB - o1 * dp * (abs(dp) + dpl) ** -0.5)
+            F = pA * AA - pB * AB - d * v - (load(t) if load_callable else load)
+            free = 1. - (((x <= xmin) & (F < 0.)) | ((x >= xmax) & (F > 0.)))
+            dx = v * free
+            return dx, F / m * free, E / (V0A + AA * x) * (QA - AA * dx), E / (V0B - AB * x) * (QB + AB * dx), dxV
+        return f
+
+
+class SimulationResult:
+    """output of L{simulate}: time t and the states (iso units) as arrays, shape (n,) or (n, N) for N variants
+
+    x, v, pA, pB: piston position, velocity, chamber pressures; xV: spool position (or signal), u: controller signal
+    events: list of (time, 'lower' or 'upper', variant index or None) of the end stop hits
+    kpi: dict of the step response KPIs (float or array per variant) or None, see L{simulate}
+    """
+
+    def __init__(self, t, data, events, steps, kpi=None):
+        self.t = t
+        self.data = data
+        self.events = events
+        self.steps = steps
+        self.kpi = kpi
+        for name, values in data.items():
+            setattr(self, name, values)
+
+    def __len__(self):
+        return len(self.t)
+
+    def __repr__(self):
+        return 'SimulationResult({} samples, {} steps, {} end stop events)'.format(len(self), self.steps, len(self.events))
+
+    def quantity(self, name):
+        """output as quantity, e.g. quantity('x') -> Distance"""
+        if name == 't':
+            return ETQ.Time(self.t, 's')
+        cls = _QUANTITIES.get(name, ETQ.Scalar)
+        return cls(self.data[name], cls._isoUnit)  # pylint: disable=protected-access
+
+    def kpi_quantity(self, name):
+        """KPI as quantity: overshoot Scalar (fraction of the step), settling_time Time, peak_pressure Pressure, x_end Distance"""
+        cls = _KPI_QUANTITIES[name]
+        return cls(self.kpi[name], cls._isoUnit)  # pylint: disable=protected-access
+
+
+class _KPI:
+    """step response KPIs accumulated over the output samples
+
+    The target is the reference at the end, the step is target - x(0).
+    overshoot: largest position beyond the target as fraction of the step
+    settling_time: last time outside the band target +- tolerance * |step| (0 if always inside, nan if outside at the end)
+    peak_pressure: largest chamber pressure
+    """
+
+    def __init__(self, axis, x0, t_end, tolerance):
+        if axis.parameters['Kp'] is not None:
+            self.target = axis.reference(t_end) if callable(axis.reference) else axis.reference
+        else:
+            self.target = np.nan
+        self.step = self.target - x0
+        self.band = tolerance * abs(self.step)
+        self.peak = np.full(np.shape(x0), -np.inf)
+        self.beyond = np.full(np.shape(x0), -np.inf)
+        self.outside = np.full(np.shape(x0), -np.inf)
+        self.x = x0
+        self.t = 0.
+
+    def update(self, t, x, pA, pB):
+        """samples at the times t (shape (m,)), the states have the shape (m,) or (m, N)"""
+        self.peak = np.maximum(self.peak, np.maximum(pA, pB).max(axis=0))
+        self.beyond = np.maximum(self.beyond, ((x - self.target) * np.sign(self.step)).max(axis=0))
+        t = t.reshape((-1,) + (1,) * (np.ndim(x) - 1))
+        self.outside = np.maximum(self.outside, np.where(abs(x - self.target) > self.band, t, -np.inf).max(axis=0))
+        self.x, self.t = x[-1], t[-1]
+
+    def result(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            overshoot = np.where(self.step != 0., np.maximum(self.beyond, 0.) / abs(self.step), np.nan)
+        settling_time = np.where(self.outside >= self.t, np.nan, np.maximum(self.outside, 0.))
+        diverged = ~np.isfinite(self.peak) | ~np.isfinite(self.x)
+        kpi = {'overshoot':overshoot, 'settling_time':settling_time, 'peak_pressure':self.peak, 'x_end':self.x}
+        kpi = {name:np.where(diverged, np.nan, value) for name, value in kpi.items()}
+        return {name:float(value) if np.ndim(value) == 0 else value for name, value in kpi.items()}
+
+
+class _Output:
+    """streaming output of the states into one preallocated array, shape (n, 5) or (n, 5, N), and/or into the KPIs"""
+
+    def __init__(self, t_out, state, keep=True, kpi=None):
+        self.t = t_out
+        self.i = 0
+        self.shape = np.shape(state[0])
+        self.block = np.empty((len(t_out), len(STATES)) + self.shape) if keep else None
+        self.kpi = kpi
+
+    def done(self):
+        return self.i >= len(self.t)
+
+    def write(self, state):
+        if self.kpi is None:
+            self.block[self.i] = state
+            self.i += 1
+        else:
+            self._store(np.array([np.broadcast_to(value, self.shape) for value in state])[np.newaxis])
+
+    def _store(self, rows):
+        """rows: states at the next output times, shape (m, 5) or (m, 5, N)"""
+        i, j = self.i, self.i + len(rows)
+        if self.block is not None:
+            self.block[i:j] = rows
+        if self.kpi is not None:
+            self.kpi.update(self.t[i:j], rows[:, 0], rows[:, 2], rows[:, 3])
+        self.i = j
+
+    def interpolate(self, ts, ys, fs, final=False):
+        """cubic Hermite interpolation of the accepted steps (times ts, states ys, derivatives fs) to the output times up to ts[-1] (all if final)"""
+        if self.shape:              # derivatives may be scalar (0.) for variants
+            ys = [[np.broadcast_to(value, self.shape) for value in y] for y in ys]
+            fs = [[np.broadcast_to(value, self.shape) for value in f] for f in fs]
+        T, Y, F = np.array(ts), np.array(ys), np.array(fs)
+        j = len(self.t) if final else int(np.searchsorted(self.t, T[-1], side='right'))
+        if j <= self.i:
+            return
+        if len(T) < 2:
+            self._store(np.repeat(Y[:1], j - self.i, axis=0))
+            return
+        t = self.t[self.i:j]
+        k = np.clip(np.searchsorted(T, t, side='right') - 1, 0, len(T) - 2)
+        h = (T[k + 1] - T[k]).reshape((-1,) + (1,) * (Y.ndim - 1))
+        theta = (t.reshape(h.shape) - T[k].reshape(h.shape)) / h
+        t2 = theta * theta
+        t3 = t2 * theta
+        self._store((2. * t3 - 3. * t2 + 1.) * Y[k] + (t3 - 2. * t2 + theta) * h * F[k] + (3. * t2 - 2. * t3) * Y[k + 1] + (t3 - t2) * h * F[k + 1])
+
+    def finite(self):
+        """variants without overflow or NaN"""
+        if self.block is not None:
+            return np.all(np.isfinite(self.block[:self.i]), axis=(0, 1))
+        return np.isfinite(self.kpi.peak) & np.isfinite(self.kpi.x)
+
+    def result(self, axis, events, steps):
+        t = self.t[:self.i]
+        data = {}
+        if self.block is not None:
+            data = {name:self.block[:self.i, k] for k, name in enumerate(STATES)}
+            controller = axis.controller()
+            if callable(axis.reference) or callable(axis.command):
+                u = np.array([controller(ti, xi) for ti, xi in zip(t, data['x'])])
+            else:
+                u = controller(t.reshape((-1,) + (1,) * (data['x'].ndim - 1)), data['x'])
+            data['u'] = np.array(np.broadcast_to(u, data['x'].shape), dtype=float)
+            if axis.parameters['Tv'] is None:
+                data['xV'] = data['u']
+        return SimulationResult(t, data, events, steps, self.kpi.result() if self.kpi is not None else None)
+
+
+def _stop_events(axis, t, h, x_old, y, events, any_):
+    """project the state list y onto the end stops, record the events; True if a stop was hit"""
+    p = axis.parameters
+    x = y[0]
+    below, above = x < p['xmin'], x > p['xmax']
+    if not any_(below | above):
+        return False
+    for hit, limit, name in ((below, p['xmin'], 'lower'), (above, p['xmax'], 'upper')):
+        if any_(hit):
+            t_event = t + h * (limit - x_old) / np.where(x == x_old, 1., x - x_old)
+            if np.ndim(hit) == 0:
+                events.append((float(t_event), name, None))
+            else:
+                events.extend((float(t_event[i]), name, int(i)) for i in np.flatnonzero(hit))
+    free = 1. - (below | above)
+    y[0] = _clip(x, p['xmin'], p['xmax'])
+    y[1] = y[1] * free
+    return True
+
+
+def _rk4(f, axis, y, t_end, dt, every, output, any_):
+    """fixed step Runge-Kutta 4 writing every n-th step, the states are unrolled for speed"""
+    p = axis.parameters
+    xmin, xmax = p['xmin'], p['xmax']
+    events = []
+    n = int(round(t_end / dt))
+    write = output.write
+    x, v, pA, pB, xV = y
+    write((x, v, pA, pB, xV))
+    t, h2, h6 = 0., dt / 2., dt / 6.
+    for step in range(1, n + 1):
+        x1, v1, pA1, pB1, xV1 = f(t, x, v, pA, pB, xV)
+        x2, v2, pA2, pB2, xV2 = f(t + h2, x + h2 * x1, v + h2 * v1, pA + h2 * pA1, pB + h2 * pB1, xV + h2 * xV1)
+        x3, v3, pA3, pB3, xV3 = f(t + h2, x + h2 * x2, v + h2 * v2, pA + h2 * pA2, pB + h2 * pB2, xV + h2 * xV2)
+        x4, v4, pA4, pB4, xV4 = f(t + dt, x + dt * x3, v + dt * v3, pA + dt * pA3, pB + dt * pB3, xV + dt * xV3)
+        x_old = x
+        x = x + h6 * (x1 + 2. * (x2 + x3) + x4)
+        v = v + h6 * (v1 + 2. * (v2 + v3) + v4)
+        pA = pA + h6 * (pA1 + 2. * (pA2 + pA3) + pA4)
+        pB = pB + h6 * (pB1 + 2. * (pB2 + pB3) + pB4)
+        xV = xV + h6 * (xV1 + 2. * (xV2 + xV3) + xV4)
+        if any_((x < xmin) | (x > xmax)):
+            y = [x, v]
+            _stop_events(axis, t, dt, x_old, y, events, any_)
+            x, v = y
+        t = step * dt
+        if step % every == 0 and output.i < len(output.t):
+            write((x, v, pA, pB, xV))
+    return events, n
+
+
+# Dormand-Prince 5(4), Hairer, Norsett, Wanner: Solving Ordinary Differential Equations I, table 5.2
+_A21 = 1./5.
+_A31, _A32 = 3./40., 9./40.
+_A41, _A42, _A43 = 44./45., -56./15., 32./9.
+_A51, _A52, _A53, _A54 = 19372./6561., -25360./2187., 64448./6561., -212./729.
+_A61, _A62, _A63, _A64, _A65 = 9017./3168., -355./33., 46732./5247., 49./176., -5103./18656.
+_A71, _A73, _A74, _A75, _A76 = 35./384., 500./1113., 125./192., -2187./6784., 11./84.
+_E1, _E3, _E4, _E5, _E6, _E7 = 71./57600., -71./16695., 71./1920., -17253./339200., 22./525., -1./40.
+
+
+def _dopri5(f, axis, y, t_end, dt, output, any_, rtol, max_step):
+    """adaptive Dormand-Prince 5(4) with cubic Hermite dense output"""
+    p = axis.parameters
+    # absolute tolerance from the size of the states: stroke, 1 m/s, supply pressure, spool signal 1
+    atol = [float(rtol * s) for s in (np.max(p['xmax'] - p['xmin']), 1., np.max(p['pS']), np.max(p['pS']), 1.)]
+    if np.ndim(y[0]) == 0:
+        norm, maximum = abs, max
+    else:
+        norm, maximum = (lambda e: np.nanmax(abs(e))), np.maximum      # diverged variants (NaN) do not stop the others
+    events = []
+    t, h, steps = 0., dt, 0
+    y = tuple(y)
+    k1 = f(t, *y)
+    ts, ys, fs = [t], [y], [k1]
+    while t < t_end * (1. - 1e-12):
+        h = min(h, max_step, t_end - t)
+        k2 = f(t + h / 5., *[a + h * _A21 * b1 for a, b1 in zip(y, k1)])
+        k3 = f(t + h * 3. / 10., *[a + h * (_A31 * b1 + _A32 * b2) for a, b1, b2 in zip(y, k1, k2)])
+        k4 = f(t + h * 4. / 5., *[a + h * (_A41 * b1 + _A42 * b2 + _A43 * b3) for a, b1, b2, b3 in zip(y, k1, k2, k3)])
+        k5 = f(t + h * 8. / 9., *[a + h * (_A51 * b1 + _A52 * b2 + _A53 * b3 + _A54 * b4) for a, b1, b2, b3, b4 in zip(y, k1, k2, k3, k4)])
+        k6 = f(t + h, *[a + h * (_A61 * b1 + _A62 * b2 + _A63 * b3 + _A64 * b4 + _A65 * b5) for a, b1, b2, b3, b4, b5 in zip(y, k1, k2, k3, k4, k5)])
+        y_new = [a + h * (_A71 * b1 + _A73 * b3 + _A74 * b4 + _A75 * b5 + _A76 * b6) for a, b1, b3, b4, b5, b6 in zip(y, k1, k3, k4, k5, k6)]
+        k7 = f(t + h, *y_new)                               # FSAL: k1 of the next step
+        steps += 1
+        error = float(max(norm(h * (_E1 * b1 + _E3 * b3 + _E4 * b4 + _E5 * b5 + _E6 * b6 + _E7 * b7) / (s + rtol * maximum(abs(a), abs(c))))
+                    for a, c, s, b1, b3, b4, b5, b6, b7 in zip(y, y_new, atol, k1, k3, k4, k5, k6, k7)))
+        if not error <= 1.:                                 # also NaN
+            h *= max(0.2, 0.9 * error ** -0.2) if error == error else 0.2
+            if h < 1e-12 * t_end:
+                raise SimulationError('step size too small at t = {} s'.format(t))
+            continue
+        t_new = t + h
+        if _stop_events(axis, t, h, y[0], y_new, events, any_):
+            k7 = f(t_new, *y_new)
+        t, y, k1 = t_new, tuple(y_new), k7
+        ts.append(t)
+        ys.append(y)
+        fs.append(k1)
+        if len(ts) > 256:
+            output.interpolate(ts, ys, fs)
+            ts, ys, fs = ts[-1:], ys[-1:], fs[-1:]
+        h *= min(5., 0.9 * max(error, 1e-10) ** -0.2)
+    output.interpolate(ts, ys, fs, final=True)
+    return events, steps
+
+
+def simulate(axis, t_end, dt=1e-4, method='rk4', output_dt=None, x0=None, pA0=None, pB0=None, rtol=1e-6, max_step=None,
+             trajectories=True, kpi=False, tolerance=0.02):
+    """simulate the axis from t = 0 to t_end
+
+    @param t_end: Time or float in s
+    @param dt: step of 'rk4' in s, initial step of 'dopri5'
+    @param method: 'rk4' fixed step Runge-Kutta 4, 'dopri5' adaptive Dormand-Prince 5(4)
+    @param output_dt: sample time of the output in s, default dt; for 'rk4' an integer multiple of dt
+    @param x0, pA0, pB0: initial state, see L{ServoAxis.initial_state}
+    @param rtol: relative tolerance of 'dopri5'
+    @param max_step: largest step of 'dopri5' in s
+    @param trajectories: keep the states at the output times
+    @param kpi: evaluate the step response KPIs at the output times, see L{SimulationResult.kpi_quantity}
+    @param tolerance: band of the settling time as fraction of the step
+    @return: L{SimulationResult}; variants which diverge get NaN, the simulation fails only if all diverge
+    """
+    if method not in ('rk4', 'dopri5'):
+        raise SimulationError('unknown method: {}'.format(method))
+    if not (trajectories or kpi):
+        raise SimulationError('nothing to return, give trajectories or kpi')
+    t_end = _iso(t_end, ETQ.Time) if isinstance(t_end, ETQ.Quantity) else float(t_end)
+    output_dt = dt if output_dt is None else output_dt
+    y = axis.initial_state(x0, pA0, pB0)
+    any_ = bool if np.ndim(y[0]) == 0 else np.any
+    if method == 'rk4':
+        # the output times are the times of the steps written
+        every = int(round(output_dt / dt))
+        if every < 1 or abs(output_dt / dt - every) > 1e-9 * every:
+            raise SimulationError('rk4: output_dt = {:g} s has to be an integer multiple of dt = {:g} s'.format(output_dt, dt))
+        t_out = dt * every * np.arange(int(round(t_end / dt)) // every + 1)
+    else:
+        t_out = np.linspace(0., t_end, int(round(t_end / output_dt)) + 1)
+    output = _Output(t_out, y, keep=trajectories, kpi=_KPI(axis, y[0], t_end, tolerance) if kpi else None)
+    f = axis.rhs()
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        if method == 'rk4':
+            events, steps = _rk4(f, axis, y, t_end, dt, every, output, any_)
+        else:
+            events, steps = _dopri5(f, axis, y, t_end, dt, output, any_, rtol, max_step if max_step is not None else t_end)
+    if not np.any(output.finite()):
+        raise SimulationError('simulation diverged, reduce dt (rk4) or rtol (dopri5)')
+    return output.result(axis, events, steps)
+
+
+def _simulate_chunk(axis, t_end, options):
+    return simulate(axis, t_end, **options)
+
+
+def _concatenate(results, offsets):
+    """one result of the chunks of variants"""
+    first = results[0]
+    data = {name:np.concatenate([np.reshape(result.data[name], (len(first.t), -1)) for result in results], axis=1) for name in first.data}
+    kpi = {name:np.concatenate([np.atleast_1d(result.kpi[name]) for result in results]) for name in KPIS}
+    events = sorted((t, stop, (i or 0) + offset) for result, offset in zip(results, offsets) for t, stop, i in result.events)
+    return SimulationResult(first.t, data, events, sum(result.steps for result in results), kpi)
+
+
+def simulate_batch(axis, t_end, trajectories=False, chunksize=None, max_workers=None, **options):
+    """simulate the variants of an axis with array valued parameters, with the KPIs of each variant
+
+    The N variants are integrated together, the states are arrays of length
+    N. Large batches are split into chunks of variants which are distributed
+    over a process pool (see L{tools.sweep.run_sweep}); callable reference,
+    command and load have to be picklable (defined at module level) then.
+    Note the step size of 'dopri5' is set by the most demanding variant of a
+    chunk.
+
+    @param trajectories: keep the states, shape (n, N)
+    @param chunksize: number of variants per task, default: N / number of workers
+    @param max_workers: number of worker processes, None: number of CPUs, 0: run in this process
+    @param options: see L{simulate}
+    @return: L{SimulationResult} with kpi arrays of length N, event variant indices refer to the whole batch
+    """
+    n = axis.size
+    if chunksize is None:
+        workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        chunksize = -(-n // max(workers, 1))
+    if chunksize < 1:
+        raise SimulationError('chunksize has to be >= 1')
+    options = dict(options, trajectories=trajectories, kpi=True)
+    chunks = [(start, min(start + chunksize, n)) for start in range(0, n, chunksize)]
+    axes = [axis.subset(start, stop) if axis.batch else axis for start, stop in chunks]
+    if max_workers == 0 or len(chunks) == 1:
+        results = [_simulate_chunk(sub, t_end, options) for sub in axes]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_simulate_chunk, axes, [t_end] * len(axes), [options] * len(axes)))
+    return _concatenate(results, [start for start, _ in chunks])
+
+
+################################################################################
+# test
+################################################################################
+def _setup_doctest():
+    ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+# eof
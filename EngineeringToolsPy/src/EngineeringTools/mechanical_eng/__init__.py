@@ -9,5 +9,6 @@ __license__ = "BSD 3-clause"
 
 from . import buckling
 from . import beamsection
+from . import sectionlibrary
 
 # eof
\ No newline at end of file
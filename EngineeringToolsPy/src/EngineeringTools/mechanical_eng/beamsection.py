@@ -29,6 +29,8 @@ if __name__ == '__main__':
     print(doctest.testmod(module, optionflags=doctest.ELLIPSIS))
     sys.exit()
 
+import numpy as np
+
 from .. import quantities as ETQ
 from EngineeringTools.tools import functions
 
@@ -97,7 +99,7 @@ class BeamSection:  #IGNORE:R0903
       ---------
         - Resistance
         - SectionModulus m^3
-        - Wp  = Jz/r
+        - Wp  = Jz/rmax, rmax .. largest distance of the section from the centroid
         - tau = Mz/Wp
 
 
@@ -148,7 +150,7 @@ class BeamSection_Rectangle(BeamSection):
         >>> print(s.Wby)
          772     cm^3 (SectionModulus)
         >>> print(s.Wp)
-         621     cm^3 (SectionModulus)
+        1240     cm^3 (SectionModulus)
 
     @note: this assume an ideal rectangle, the values of an rectangle beam are a little bit less than this values!
 
@@ -221,11 +223,22 @@ class BeamSection_Rectangle(BeamSection):
     Zey = property(fget=Zey)
 
     def Zez(self):
-        """??? Zez .. polar elastic section modulus about axis z; Wp .. TrosionsWiderstandsmoment um die Achse z"""
-        return ETQ.SectionModulus(self.Jz.uval / ((self.Width.uval**2 + self.Hight.uval**2 ))**(1, 2))
+        """Zez .. polar elastic section modulus Jz / rmax, rmax .. distance of the corners from the centroid; Wp .. TrosionsWiderstandsmoment um die Achse z"""
+        return ETQ.SectionModulus(self.Jz.uval / (0.5*((self.Width.uval**2 + self.Hight.uval**2 ))**(1, 2)))
     Wp = property(fget=Zez)
     Zez = property(fget=Zez)
 
+    def _iso_properties(self):
+        """A, centroid, Ix, Iy, Ixy about the centroid and bounds in ISO units, centroid at the origin"""
+        W, H = self.Width.get_value(), self.Hight.get_value()
+        return {'A':self.A.get_value(), 'xc':0., 'yc':0., 'Ix':self.Ix.get_value(), 'Iy':self.Iy.get_value(), 'Ixy':0.,
+                'xmin':-W/2., 'xmax':W/2., 'ymin':-H/2., 'ymax':H/2.}
+
+    def _rmax(self, x, y):
+        """largest distance of the section from the point x, y"""
+        W, H = self.Width.get_value(), self.Hight.get_value()
+        return np.hypot(abs(x) + W/2., abs(y) + H/2.)
+
 
 class BeamSection_Pipe(BeamSection):
     """cross-section of a Pipe
@@ -304,6 +317,254 @@ class BeamSection_Pipe(BeamSection):
     Wp  = property(fget=Zez)
     Zez = property(fget=Zez)
 
+    def _iso_properties(self):
+        """A, centroid, Ix, Iy, Ixy about the centroid and bounds in ISO units, centroid at the origin"""
+        R = self.Diameter.get_value() / 2.
+        I = self.Ix.get_value()
+        return {'A':self.A.get_value(), 'xc':0., 'yc':0., 'Ix':I, 'Iy':I, 'Ixy':0.,
+                'xmin':-R, 'xmax':R, 'ymin':-R, 'ymax':R}
+
+    def _rmax(self, x, y):
+        """largest distance of the section from the point x, y"""
+        return np.hypot(x, y) + self.Diameter.get_value() / 2.
+
+
+
+################################################################################
+# polygon sections
+################################################################################
+def pad_polygons(polygons):
+    """stack polygons with different numbers of vertices to an array (n, m, 2)
+
+    Shorter polygons are padded by repeating their last vertex, which adds edges
+    of zero length and does not change any section property.
+
+    >>> pad_polygons([[(0, 0), (1, 0), (0, 1)], [(0, 0), (1, 0), (1, 1), (0, 1)]])[0]
+    array([[0., 0.],
+           [1., 0.],
+           [0., 1.],
+           [0., 1.]])
+    """
+    polygons = [np.asarray(p, dtype=float).reshape(-1, 2) for p in polygons]
+    m = max(len(p) for p in polygons)
+    res = np.empty((len(polygons), m, 2))
+    for i, p in enumerate(polygons):
+        res[i, :len(p)] = p
+        res[i, len(p):] = p[-1]
+    return res
+
+
+def _loop_integrals(loops):
+    """area, first and second moments of closed polygons (..., m, 2) about the origin (Green's theorem), signed by the orientation"""
+    x, y = loops[..., 0], loops[..., 1]
+    x1, y1 = np.roll(x, -1, axis=-1), np.roll(y, -1, axis=-1)
+    a = x*y1 - x1*y
+    A = a.sum(axis=-1) / 2.
+    Sy = ((x + x1) * a).sum(axis=-1) / 6.
+    Sx = ((y + y1) * a).sum(axis=-1) / 6.
+    Ixx = ((y*y + y*y1 + y1*y1) * a).sum(axis=-1) / 12.
+    Iyy = ((x*x + x*x1 + x1*x1) * a).sum(axis=-1) / 12.
+    Ixy = ((x*y1 + 2.*x*y + 2.*x1*y1 + x1*y) * a).sum(axis=-1) / 24.
+    return np.stack([A, Sy, Sx, Ixx, Iyy, Ixy], axis=-1)
+
+
+def polygon_properties_arrays(outlines, holes=None):
+    """section properties of many polygon sections at once
+
+    The orientation of outlines and holes does not matter.
+
+    @param outlines: array (n, m, 2) of the outline vertices in ISO units, see L{pad_polygons}
+    @param holes: None or array (n, h, k, 2) of the hole vertices, unused holes are a repeated point
+    @return: dict of arrays (n,) in ISO units: A, xc, yc (centroid), Ix, Iy, Ixy (about the centroid),
+             Imin, Imax (principal), Jz, Zex, Zey, Zez and the bounds xmin, xmax, ymin, ymax
+
+    >>> square = [(0., 0.), (0.1, 0.), (0.1, 0.1), (0., 0.1)]
+    >>> hole = [(0.025, 0.025), (0.025, 0.075), (0.075, 0.075), (0.075, 0.025)]
+    >>> res = polygon_properties_arrays(pad_polygons([square, square[:3]]), holes=pad_polygons([hole, [(0., 0.)]])[:, None])
+    >>> res['A']
+    array([0.0075, 0.005 ])
+    >>> res['xc']
+    array([0.05      , 0.06666667])
+    >>> res['Ix'] * 1e8  # cm^4
+    array([781.25      , 277.77777778])
+    """
+    outlines = np.asarray(outlines, dtype=float)
+    ref = outlines.mean(axis=-2, keepdims=True)  # integrate about a point inside, better numerical conditioning
+    props = _loop_integrals(outlines - ref)
+    props *= np.sign(props[..., :1])
+    if holes is not None:
+        holes = np.asarray(holes, dtype=float)
+        propsHoles = _loop_integrals(holes - ref[:, None])
+        props -= (propsHoles * np.sign(propsHoles[..., :1])).sum(axis=-2)
+    A, Sy, Sx, Ixx, Iyy, Ixy = np.moveaxis(props, -1, 0)
+    dx, dy = Sy / A, Sx / A
+    xc, yc = ref[:, 0, 0] + dx, ref[:, 0, 1] + dy
+    Ix = Ixx - A * dy**2
+    Iy = Iyy - A * dx**2
+    Ixy = Ixy - A * dx * dy
+    x, y = outlines[..., 0], outlines[..., 1]
+    res = {'A':A, 'xc':xc, 'yc':yc, 'Ix':Ix, 'Iy':Iy, 'Ixy':Ixy,
+           'xmin':x.min(axis=-1), 'xmax':x.max(axis=-1), 'ymin':y.min(axis=-1), 'ymax':y.max(axis=-1)}
+    res['rmax'] = np.hypot(x - xc[:, None], y - yc[:, None]).max(axis=-1)
+    _derived_properties(res)
+    return res
+
+
+def _derived_properties(p):
+    """principal moments, polar moment and section moduli from A, centroid, Ix, Iy, Ixy, bounds and rmax"""
+    mean = (p['Ix'] + p['Iy']) / 2.
+    diff = np.hypot((p['Ix'] - p['Iy']) / 2., p['Ixy'])
+    p['Imin'] = mean - diff
+    p['Imax'] = mean + diff
+    p['Jz'] = p['Ix'] + p['Iy']
+    p['Zex'] = p['Ix'] / np.maximum(p['ymax'] - p['yc'], p['yc'] - p['ymin'])
+    p['Zey'] = p['Iy'] / np.maximum(p['xmax'] - p['xc'], p['xc'] - p['xmin'])
+    p['Zez'] = p['Jz'] / p['rmax']
+    return p
+
+
+class _BeamSection_Cached(BeamSection):
+    """section with all properties computed once (self._props, ISO units); the section is immutable"""
+
+    _props = None
+
+    def _iso_properties(self):
+        return {key:self._props[key] for key in ('A', 'xc', 'yc', 'Ix', 'Iy', 'Ixy', 'xmin', 'xmax', 'ymin', 'ymax')}
+
+    def _quantity(self, quantity, key):
+        return quantity(self._props[key], quantity._isoUnit)  # pylint: disable=protected-access
+
+    A   = property(fget=lambda self: self._quantity(ETQ.Area, 'A'), doc="area of section")
+    xc  = property(fget=lambda self: self._quantity(ETQ.Distance, 'xc'), doc="centroid x")
+    yc  = property(fget=lambda self: self._quantity(ETQ.Distance, 'yc'), doc="centroid y")
+    Ix  = property(fget=lambda self: self._quantity(ETQ.MomentOfAreaSecond, 'Ix'), doc="moment of inertia of an area about the centroidal x axis")
+    Iy  = property(fget=lambda self: self._quantity(ETQ.MomentOfAreaSecond, 'Iy'), doc="moment of inertia of an area about the centroidal y axis")
+    Ixy = property(fget=lambda self: self._quantity(ETQ.MomentOfAreaSecond, 'Ixy'), doc="product of inertia about the centroidal axes")
+    Imin = property(fget=lambda self: self._quantity(ETQ.MomentOfAreaSecond, 'Imin'), doc="smallest principal moment of inertia of an area")
+    Imax = property(fget=lambda self: self._quantity(ETQ.MomentOfAreaSecond, 'Imax'), doc="largest principal moment of inertia of an area")
+    Jz  = property(fget=lambda self: self._quantity(ETQ.MomentOfAreaSecond, 'Jz'), doc="polar moment of inertia of an area: J_z, I_p = Ix + Iy")
+    Zex = Wbx = property(fget=lambda self: self._quantity(ETQ.SectionModulus, 'Zex'), doc="Zex .. elastic section modulus about axis x")
+    Zey = Wby = property(fget=lambda self: self._quantity(ETQ.SectionModulus, 'Zey'), doc="Zey .. elastic section modulus about axis y")
+    Zez = Wp = property(fget=lambda self: self._quantity(ETQ.SectionModulus, 'Zez'), doc="Zez .. polar section modulus Jz / rmax")
+
+    def _rmax(self, x, y):
+        raise NotImplementedError()
+
+
+class BeamSection_Polygon(_BeamSection_Cached):
+    """Beam Cross-Section of a polygon outline with polygon holes
+
+    see: L{BeamSection}, L{polygon_properties_arrays}
+
+        >>> ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+        >>> s = BeamSection_Polygon([(0, 0), (200, 0), (200, 300), (0, 300)], holes=[[(12.5, 12.5), (187.5, 12.5), (187.5, 287.5), (12.5, 287.5)]])
+        >>> print(s)
+        BeamSection_Polygon(4 vertices, 1 holes, A=11900     mm^2 (Area))
+        >>> print(s.Ix)
+        14700     cm^4 (MomentOfAreaSecond)
+        >>> print(s.yc)
+         150.000 mm (Distance)
+
+    @param outline: vertices (m, 2) in unit
+    @param holes: list of vertices (k, 2) in unit
+    @param unit: unit of the coordinates
+    """
+
+    def __init__(self, outline, holes=(), unit='mm'):
+        self.outline = ETQ.Distance.iso_array(outline, unit).reshape(-1, 2)
+        self.outline.setflags(write=False)
+        self.holes = tuple(ETQ.Distance.iso_array(hole, unit).reshape(-1, 2) for hole in holes)
+        for hole in self.holes:
+            hole.setflags(write=False)
+        holesArray = pad_polygons(self.holes)[None] if self.holes else None
+        props = polygon_properties_arrays(self.outline[None], holes=holesArray)
+        self._props = {key:float(value[0]) for key, value in props.items()}
+
+    def __str__(self):
+        return f"BeamSection_Polygon({len(self.outline)} vertices, {len(self.holes)} holes, A={self.A})"
+
+    def _rmax(self, x, y):
+        return float(np.hypot(self.outline[:, 0] - x, self.outline[:, 1] - y).max())
+
+
+class BeamSection_Composite(_BeamSection_Cached):
+    """Beam Cross-Section welded or bolted together from other sections (parallel axis theorem)
+
+    see: L{BeamSection}
+
+        >>> ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+        >>> web = BeamSection_Rectangle(ETQ.Distance(10., 'mm'), ETQ.Distance(200., 'mm'))
+        >>> flange = BeamSection_Rectangle(ETQ.Distance(100., 'mm'), ETQ.Distance(10., 'mm'))
+        >>> s = BeamSection_Composite([web, (flange, (0., 105.)), (flange, (0., -105.))])
+        >>> print(s)
+        BeamSection_Composite(3 parts, A=4000     mm^2 (Area))
+        >>> print(s.Ix)
+        2870     cm^4 (MomentOfAreaSecond)
+        >>> print(beamsection_I(ETQ.Distance(220., 'mm'), ETQ.Distance(100., 'mm'), ETQ.Distance(10., 'mm'), ETQ.Distance(10., 'mm')).Ix)
+        2870     cm^4 (MomentOfAreaSecond)
+
+    @param parts: list of sections or (section, (dx, dy)) with the offset of the section in unit
+    @param unit: unit of the offsets
+    """
+
+    def __init__(self, parts, unit='mm'):
+        self.parts = []
+        for part in parts:
+            if isinstance(part, BeamSection):
+                section, offset = part, (0., 0.)
+            else:
+                section, offset = part
+            self.parts.append((section, tuple(ETQ.Distance.iso_array(offset, unit).reshape(2))))
+        self.parts = tuple(self.parts)
+        props = [section._iso_properties() for section, _ in self.parts]  # pylint: disable=protected-access
+        dx = np.array([offset[0] for _, offset in self.parts])
+        dy = np.array([offset[1] for _, offset in self.parts])
+        col = {key:np.array([p[key] for p in props]) for key in props[0]}
+        A = col['A'].sum()
+        x, y = col['xc'] + dx, col['yc'] + dy
+        xc, yc = (col['A'] * x).sum() / A, (col['A'] * y).sum() / A
+        p = {'A':A, 'xc':xc, 'yc':yc,
+             'Ix':(col['Ix'] + col['A'] * (y - yc)**2).sum(),
+             'Iy':(col['Iy'] + col['A'] * (x - xc)**2).sum(),
+             'Ixy':(col['Ixy'] + col['A'] * (x - xc) * (y - yc)).sum(),
+             'xmin':(col['xmin'] + dx).min(), 'xmax':(col['xmax'] + dx).max(),
+             'ymin':(col['ymin'] + dy).min(), 'ymax':(col['ymax'] + dy).max()}
+        p['rmax'] = self._rmax(xc, yc)
+        self._props = {key:float(value) for key, value in _derived_properties(p).items()}
+
+    def __str__(self):
+        return f"BeamSection_Composite({len(self.parts)} parts, A={self.A})"
+
+    def _rmax(self, x, y):
+        return max(section._rmax(x - dx, y - dy) for section, (dx, dy) in self.parts)  # pylint: disable=protected-access
+
+
+def beamsection_I(H, B, tw, tf):
+    """I-beam (without root radii) as L{BeamSection_Polygon}, centroid at the origin
+
+    >>> s = beamsection_I(ETQ.Distance(200., 'mm'), ETQ.Distance(100., 'mm'), ETQ.Distance(5.6, 'mm'), ETQ.Distance(8.5, 'mm'))
+    >>> print(s.Ix)
+    1850     cm^4 (MomentOfAreaSecond)
+    """
+    H, B, tw, tf = (ETQ.Distance(v).get_value() for v in (H, B, tw, tf))
+    h, b, w = H/2., B/2., tw/2.
+    outline = [(-b, -h), (b, -h), (b, -h+tf), (w, -h+tf), (w, h-tf), (b, h-tf), (b, h), (-b, h),
+               (-b, h-tf), (-w, h-tf), (-w, -h+tf), (-b, -h+tf)]
+    return BeamSection_Polygon(outline, unit='m')
+
+
+def beamsection_channel(H, B, tw, tf):
+    """channel (U-section, without root radii) as L{BeamSection_Polygon}, back of the web on the y axis
+
+    >>> s = beamsection_channel(ETQ.Distance(100., 'mm'), ETQ.Distance(50., 'mm'), ETQ.Distance(6., 'mm'), ETQ.Distance(8.5, 'mm'))
+    >>> print(s.xc)
+      16.872 mm (Distance)
+    """
+    H, B, tw, tf = (ETQ.Distance(v).get_value() for v in (H, B, tw, tf))
+    h = H/2.
+    outline = [(0., -h), (B, -h), (B, -h+tf), (tw, -h+tf), (tw, h-tf), (B, h-tf), (B, h), (0., h)]
+    return BeamSection_Polygon(outline, unit='m')
+
 
 
 ################################################################################
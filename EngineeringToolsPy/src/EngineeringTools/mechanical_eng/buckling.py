@@ -25,16 +25,18 @@ if __name__ == '__main__':
     print(doctest.testmod(module, optionflags=doctest.ELLIPSIS))
     sys.exit()
 
+import os
 import logging
 import numpy as np
 
 from .. import quantities as ETQ
 from ..tools import geo_circle as ETTGC
+from ..tools import catalog as ETTcatalog
 from EngineeringTools.tools import functions as ETTT
 from . import material as M
 from . import beamsection as ETMbeamsection
 
-__all__ = ['buckling_euler', 'Buckling']
+__all__ = ['buckling_euler', 'Buckling', 'buckling_arrays', 'buckling_arrays_pipe', 'tube_catalog', 'size_columns']
 
 
 class Buckling:
@@ -135,6 +137,8 @@ forcePermitted:         {self.forcePermitted}\
 
     @property
     def momentOfArea2nd_effective(self):
+        if hasattr(self.beamSection, 'Imin'):  # principal axes of unsymmetric sections
+            return self.beamSection.Imin
         return min([self.beamSection.Ix, self.beamSection.Iy])
 
     @property
@@ -268,19 +272,17 @@ forcePermitted:         {self.forcePermitted}\
 def buckling_euler(length, supportcase, momentOfArea2nd, youngs_modulus=None):
     """
     https://en.wikipedia.org/wiki/Buckling
-    """
-    youngs_modulus = ETQ.Stress(210e3, 'N/mm^2')
-
-    endconditioncases = {'both ends pinned':1.0,
-                'both ends fixed':0.5,
-                'one end fixed, one pinned':0.699,
-                'one end fixed, one free':2.0}
 
+    >>> print(buckling_euler(ETQ.Distance(1., 'm'), 'one end fixed, one pinned', ETQ.MomentOfAreaSecond(7854., 'mm^4')))
+            33.3   kN (Force)
+    >>> print(buckling_euler(ETQ.Distance(1., 'm'), 'one end fixed, one pinned', ETQ.MomentOfAreaSecond(7854., 'mm^4'), youngs_modulus=ETQ.Stress(70e3, 'N/mm^2')))
+            11.1   kN (Force)
+    """
+    if youngs_modulus is None:
+        youngs_modulus = ETQ.Stress(210e3, 'N/mm^2')
 
     if isinstance(supportcase, str):
-        K = endconditioncases[supportcase]
-    elif isinstance(supportcase, float):
-        K = supportcase
+        K = Buckling.endconditioncases[supportcase]
     else:
         K = supportcase
 
@@ -294,6 +296,213 @@ def buckling_euler(length, supportcase, momentOfArea2nd, youngs_modulus=None):
     return F
 
 
+################################################################################
+# vectorized
+################################################################################
+def _effectiveLengthFactor_array(endcondition):
+    """effective length factor for a name, a factor or an array of names or factors"""
+    endcondition = np.asarray(endcondition)
+    if endcondition.dtype.kind not in 'US':
+        return ETQ.Scalar.iso_array(endcondition)
+    names, inverse = np.unique(endcondition, return_inverse=True)
+    try:
+        factors = np.array([Buckling.endconditioncases[name] for name in names])
+    except KeyError as err:
+        raise Exception('End condition "{}" is not known. Available are: {}'.format(err.args[0], ', '.join(Buckling.endconditioncases.keys()))) from None
+    return factors[inverse].reshape(endcondition.shape)
+
+
+def buckling_arrays(length, momentOfArea2nd, area, material, endcondition='both ends pinned', safetyFactor=6.):
+    """buckling of many designs at once, see L{Buckling}
+
+    All parameters except material are broadcast against each other, e.g. a
+    sweep length x section x end condition is done with arrays of the shapes
+    (n, 1, 1), (1, m, 1) and (1, 1, k). Quantities and UVals are checked once,
+    plain numbers and arrays are in ISO units.
+
+    @param length: beam length
+    @param momentOfArea2nd: smallest moment of area of the section
+    @param area: area of the section
+    @param material: L{M.Material}
+    @param endcondition: name of the end condition (see L{Buckling.endconditioncases}) or effective length factor
+    @param safetyFactor: safety factor against buckling
+    @return: dict of numpy arrays in ISO units: slendernessRatio, euler (True if the Euler case applies),
+             bucklingForce and forcePermitted (NaN where the Euler case does not apply, the non-elastic case is not implemented)
+
+    >>> res = buckling_arrays(ETQ.Distance.iso_array([0.5, 1., 2.], 'm'), ETQ.MomentOfAreaSecond(7854., 'mm^4'), ETQ.Area(314.2, 'mm^2'),
+    ...                       M.Steel_S355JR(), endcondition='one end fixed, one pinned')
+    >>> res['slendernessRatio'].round(1)
+    array([ 69.9, 139.8, 279.6])
+    >>> res['euler']
+    array([False,  True,  True])
+    >>> (res['forcePermitted'] / 1e3).round(2)
+    array([ nan, 5.55, 1.39])
+    """
+    L = ETQ.Distance.iso_array(length)
+    I = ETQ.MomentOfAreaSecond.iso_array(momentOfArea2nd)
+    A = ETQ.Area.iso_array(area)
+    K = _effectiveLengthFactor_array(endcondition)
+    safetyFactor = ETQ.Scalar.iso_array(safetyFactor)
+    E = material.youngs_modulus.get_value()
+    limitEuler = np.pi * np.sqrt(E / material.Rp().get_value())
+
+    lengthEffective = K * L
+    slendernessRatio = lengthEffective / np.sqrt(I / A)
+    euler = slendernessRatio >= limitEuler
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bucklingForce = np.where(euler, np.pi**2 * E * I / lengthEffective**2, np.nan)
+    return {'slendernessRatio': slendernessRatio,
+            'euler': euler,
+            'bucklingForce': bucklingForce,
+            'forcePermitted': bucklingForce / safetyFactor}
+
+
+def buckling_arrays_pipe(length, D, material, d=None, thickness=None, endcondition='both ends pinned', safetyFactor=6.):
+    """buckling of many pipes or round bars at once, see L{buckling_arrays}
+
+    @param D: outer diameter
+    @param d: inner diameter, or
+    @param thickness: wall thickness, none of both for a round bar
+    @return: L{buckling_arrays} plus area and momentOfArea2nd
+
+    >>> res = buckling_arrays_pipe(ETQ.Distance(1., 'm'), ETQ.Distance.iso_array([[20.], [30.]], 'mm'), M.Steel_S355JR(),
+    ...                            thickness=ETQ.Distance.iso_array([2., 4.], 'mm'), endcondition='one end fixed, one pinned')
+    >>> (res['forcePermitted'] / 1e3).round(2)
+    array([[3.28, 4.83],
+           [ nan,  nan]])
+    >>> res['euler']
+    array([[ True,  True],
+           [False, False]])
+    """
+    D = ETQ.Distance.iso_array(D)
+    if d is not None:
+        d = ETQ.Distance.iso_array(d)
+    elif thickness is not None:
+        d = D - 2. * ETQ.Distance.iso_array(thickness)
+    else:
+        d = np.zeros_like(D)
+    if np.any(d >= D) or np.any(d < 0.):
+        raise ETTT.EngineeringTools_tools_Error('d >= D or d < 0')
+    A = (D**2 - d**2) * np.pi / 4.
+    I = (D**4 - d**4) * np.pi / 64.
+    res = buckling_arrays(length, I, A, material, endcondition=endcondition, safetyFactor=safetyFactor)
+    res['area'] = A
+    res['momentOfArea2nd'] = I
+    return res
+
+
+################################################################################
+# sizing
+################################################################################
+TUBE_CATALOG_FILENAME = os.path.join(os.path.dirname(__file__), 'tubes.txt')
+_tube_catalogs = {}
+
+
+def tube_catalog(filename=TUBE_CATALOG_FILENAME):
+    """catalog of tubes and round bars (columns D, t) with the section columns d, A and Imin in ISO units
+
+    >>> cat = tube_catalog()
+    >>> print(cat.quantity('Tube 48.3x4.0', 'Imin'))
+            13.8   cm^4 (MomentOfAreaSecond)
+    """
+    base = ETTcatalog.load_catalog(filename, units={'D':(ETQ.Distance, 'mm'), 't':(ETQ.Distance, 'mm')}, skiprows=1)
+    entry = _tube_catalogs.get(filename)
+    if entry is not None and entry[0] is base:
+        return entry[1]
+    else:
+        D = base.column('D')
+        d = D - 2. * base.column('t')
+        columns = dict(base.columns)
+        columns['d'] = d
+        columns['A'] = (D**2 - d**2) * np.pi / 4.
+        columns['Imin'] = (D**4 - d**4) * np.pi / 64.
+        units = dict(base.units, d=(ETQ.Distance, 'mm'), A=(ETQ.Area, 'mm^2'), Imin=(ETQ.MomentOfAreaSecond, 'cm^4'))
+        catalog = ETTcatalog.Catalog(base.names, columns, units=units, index_name=base.index_name, source=base.source)
+        _tube_catalogs[filename] = (base, catalog)
+        return catalog
+
+
+def size_columns(force, length, material, endcondition='both ends pinned', safetyFactor=6., catalog=None,
+                 criterion='mass', cost=None, slendernessRatio_max=None):
+    """lightest or cheapest section of a catalog carrying the force without buckling, for many load cases at once
+
+    Only sections in the Euler range (and below slendernessRatio_max) are feasible.
+    force, length and endcondition are broadcast against each other, the result
+    has their common shape.
+
+    @param force: required axial force
+    @param length: beam length
+    @param material: L{M.Material}
+    @param endcondition: name of the end condition (see L{Buckling.endconditioncases}) or effective length factor
+    @param safetyFactor: safety factor against buckling
+    @param catalog: L{ETTcatalog.Catalog} with the columns A and Imin in ISO units (e.g. L{sectionlibrary.section_library}), default L{tube_catalog}
+    @param criterion: 'mass' or 'cost'
+    @param cost: cost per length of each section of the catalog (criterion='cost')
+    @param slendernessRatio_max: upper limit of the slenderness ratio
+    @return: dict of numpy arrays: row (row of the catalog, -1 if no section is feasible),
+             name (None if no section is feasible), forcePermitted, slendernessRatio and mass (ISO units, NaN if no section is feasible)
+
+    >>> res = size_columns(ETQ.Force.iso_array([5., 20., 100., 1e5], 'kN'), ETQ.Distance(2., 'm'), M.Steel_S355JR(),
+    ...                    endcondition='one end fixed, one pinned')
+    >>> res['name']
+    array(['Tube 42.4x1.6', 'Tube 48.3x3.2', 'Bar 60', None], dtype=object)
+    >>> (res['forcePermitted'] / 1e3).round(1)
+    array([  7.6,  20.5, 112.4,   nan])
+    """
+    if catalog is None:
+        catalog = tube_catalog()
+    force = ETQ.Force.iso_array(force)
+    L = ETQ.Distance.iso_array(length)
+    K = _effectiveLengthFactor_array(endcondition)
+    safetyFactor = float(ETQ.Scalar.iso_array(safetyFactor))
+    force, L, K = np.broadcast_arrays(force, L, K)
+    A = catalog.column('A')
+    I = catalog.column('Imin')
+    rg = np.sqrt(I / A)
+    E = material.youngs_modulus.get_value()
+    limitEuler = np.pi * np.sqrt(E / material.Rp().get_value())
+    if criterion == 'mass':
+        weight = A
+    elif criterion == 'cost':
+        if cost is None:
+            raise ETTT.EngineeringTools_tools_Error('criterion "cost" needs the cost of the sections')
+        weight = np.asarray(cost, dtype=float)
+        if weight.shape != A.shape:
+            raise ETTT.EngineeringTools_tools_Error('cost must have one value per section of the catalog: {} != {}'.format(weight.shape, A.shape))
+    else:
+        raise ETTT.EngineeringTools_tools_Error('criterion "{}" is not known. Available are: mass, cost'.format(criterion))
+    order = np.argsort(weight, kind='stable')
+    rg = rg[order]
+    EI = (np.pi**2 * E / safetyFactor) * I[order]
+
+    row = np.full(force.shape, -1, dtype=int)
+    # one search per distinct effective length, all load cases of that length at once
+    lengthEffective = (K * L).ravel()
+    lengthsUnique, inverse = np.unique(lengthEffective, return_inverse=True)
+    rowFlat = row.reshape(-1)
+    forceFlat = force.ravel()
+    for i, Le in enumerate(lengthsUnique):
+        slendernessRatio = Le / rg
+        feasible = slendernessRatio >= limitEuler
+        if slendernessRatio_max is not None:
+            feasible &= slendernessRatio <= slendernessRatio_max
+        forcePermitted = np.where(feasible, EI / Le**2, -np.inf)
+        best = np.maximum.accumulate(forcePermitted)  # strongest feasible section up to this weight
+        cases = np.nonzero(inverse == i)[0]
+        pos = np.searchsorted(best, forceFlat[cases], side='left')
+        found = pos < len(best)
+        rowFlat[cases[found]] = order[pos[found]]
+
+    found = row >= 0
+    rowSafe = np.where(found, row, 0)
+    lengthEffective = K * L
+    slendernessRatio = np.where(found, lengthEffective / np.sqrt(I[rowSafe] / A[rowSafe]), np.nan)
+    forcePermitted = np.where(found, np.pi**2 * E * I[rowSafe] / lengthEffective**2 / safetyFactor, np.nan)
+    mass = np.where(found, A[rowSafe] * L * material.density.get_value(), np.nan)
+    name = np.where(found, catalog.names[rowSafe], None)
+    return {'row': row, 'name': name, 'forcePermitted': forcePermitted, 'slendernessRatio': slendernessRatio, 'mass': mass}
+
+
 def _setup_doctest():
     ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
 
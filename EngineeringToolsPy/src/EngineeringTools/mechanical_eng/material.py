@@ -1,5 +1,19 @@
 #!/usr/bin/env python3
 # pylint: disable-msg=line-too-long,
+"""materials
+
+The material data is in the data files materials.txt (scalar properties at room
+temperature), materials_thickness.txt (thickness dependent strength) and
+materials_temperature.txt (temperature dependent properties), loaded once into a
+L{MaterialDatabase}. The classes are views of a row of the database.
+
+# doctest
+# reset new format defaults for test
+>>> from EngineeringTools.quantities import qnt
+>>> qnt.FORMAT_DEFAULT['totalWidth'] = 14
+>>> qnt.FORMAT_DEFAULT['decimalPosition'] = 10
+>>> qnt.FORMAT_DEFAULT['thousands_sep'] = ' '
+"""
 
 __author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
 __email__   = "marthoch@users.noreply.github.com"
@@ -16,16 +30,224 @@ if __name__ == '__main__':
     sys.exit()
 
 
+import os
+import numpy as np
+
 from .. import quantities as ETQ
+from ..tools import catalog as ETTcatalog
+
+__all__ = ['Material', 'Steel', 'Steel_S355JR', 'Steel_34CrNiMo6', 'CastIron', 'ChilledDuctileIron_CDI580',
+           'MaterialDatabase', 'PropertyCurve', 'material_database', 'get_material']
+
+MATERIALS_FILENAME = os.path.join(os.path.dirname(__file__), 'materials.txt')
+MATERIALS_THICKNESS_FILENAME = os.path.join(os.path.dirname(__file__), 'materials_thickness.txt')
+MATERIALS_TEMPERATURE_FILENAME = os.path.join(os.path.dirname(__file__), 'materials_temperature.txt')
+
+# attribute of Material: (Quantity, unit in the data file)
+PROPERTIES = {'density':(ETQ.Density, 'kg/m3'),
+              'youngs_modulus':(ETQ.Stress, 'N/mm2'),
+              'shear_modulus':(ETQ.Stress, 'N/mm2'),
+              'thermal_expansion_coefficient_linear':(ETQ.ThermalExpansionCoefficientLinear, '1/K'),
+              'heat_capacity_specific':(ETQ.HeatCapacitySpecific, 'kJ/(kg.K)'),
+              'thermal_conductivity':(ETQ.ThermalConductivity, 'W/(m.K)'),
+              'ultimate_tensile_strength':(ETQ.Stress, 'N/mm2'),
+              'yield_strength':(ETQ.Stress, 'N/mm2')}
+THICKNESS_PROPERTIES = {'Rp':ETQ.Stress, 'Rm':ETQ.Stress}
+
+
+class PropertyCurve:
+    """property over absolute temperature, linear between the points, NaN outside
+
+    >>> curve = PropertyCurve(ETQ.TemperatureAbsolute.iso_array([20., 200.], 'degC'), [210e9, 189e9], ETQ.Stress)
+    >>> curve(ETQ.TemperatureAbsolute.iso_array([20., 110., 300.], 'degC')) / 1e9
+    array([210. , 199.5,   nan])
+
+    @param T: temperatures in K
+    @param values: values in ISO units
+    @param quantity: Quantity class of the values
+    """
+
+    def __init__(self, T, values, quantity):
+        T = np.asarray(T, dtype=float)
+        order = np.argsort(T, kind='stable')
+        self.T = np.ascontiguousarray(T[order])
+        self.values = np.ascontiguousarray(np.asarray(values, dtype=float)[order])
+        if len(self.T) < 2 or np.any(np.diff(self.T) <= 0.):
+            raise ETTcatalog.CatalogError('a property curve needs at least two distinct temperatures')
+        self.T.setflags(write=False)
+        self.values.setflags(write=False)
+        self.quantity = quantity
+
+    def __repr__(self):
+        return 'PropertyCurve({}, {} points, {:g} K .. {:g} K)'.format(self.quantity.__name__, len(self.T), self.T[0], self.T[-1])
+
+    def __call__(self, T):
+        """values in ISO units at the temperatures T in K (array)"""
+        return np.interp(T, self.T, self.values, left=np.nan, right=np.nan)
+
+
+class MaterialDatabase:
+    """materials indexed by all their identifiers (id, name, material numbers, old names ...)
+
+    Thickness dependent properties (Rp, Rm) are sorted breakpoint arrays: a value
+    applies up to and including its t_max.
+
+    >>> db = material_database()
+    >>> db.identify('St52-3')
+    'S355JR'
+    >>> db.thickness_property('1.0045', 'Rp', ETQ.Distance.iso_array([10., 16., 50., 90., 300.], 'mm')) / 1e6
+    array([355., 355., 335., 315.,  nan])
+
+    @param properties: L{ETTcatalog.Catalog} of scalar properties, one row per material
+    @param thickness: L{ETTcatalog.Catalog} of thickness dependent properties (columns property, t_max, value)
+    @param temperature: None or L{ETTcatalog.Catalog} of temperature dependent properties (columns property, T in K, value in ISO units),
+                        indexed by curve set; a material uses the set of its column curves, default: the set of its id
+    """
+
+    def __init__(self, properties, thickness, temperature=None):
+        self.catalog = properties
+        self._index = {}
+        for row, name in enumerate(properties.names):
+            for identifier in [name, properties.column('name')[row]] + self._identifiers(row):
+                self._index.setdefault(identifier, name)
+                self._index.setdefault(identifier.lower(), name)
+        self._thickness = {}
+        t_max, values = thickness.column('t_max'), thickness.column('value')
+        keys = np.array(['{}\t{}'.format(name, key) for name, key in zip(thickness.names, thickness.column('property'))])
+        for key in np.unique(keys):
+            rows = np.nonzero(keys == key)[0]
+            rows = rows[np.argsort(t_max[rows], kind='stable')]
+            table = (t_max[rows].copy(), values[rows].copy())
+            for array in table:
+                array.setflags(write=False)
+            self._thickness[tuple(key.split('\t'))] = table
+        self._curves = {}
+        if temperature is not None:
+            T, values = temperature.column('T'), temperature.column('value')
+            for name, key in set(zip(temperature.names, temperature.column('property'))):
+                rows = np.nonzero((temperature.names == name) & (temperature.column('property') == key))[0]
+                self._curves.setdefault(name, {})[key] = PropertyCurve(T[rows], values[rows], PROPERTIES[key][0])
+
+    def __len__(self):
+        return len(self.catalog)
+
+    def identify(self, identifier):
+        """id of a material by any of its identifiers"""
+        name = self._index.get(identifier)
+        if name is None:
+            name = self._index.get(str(identifier).lower())
+        if name is None:
+            raise ETTcatalog.CatalogError('material "{}" is not in the database'.format(identifier))
+        return name
+
+    def _identifiers(self, row):
+        return [item.strip() for item in self.catalog.column('identifiers')[row].split(',') if item.strip()]
+
+    def identifiers(self, identifier):
+        """list of the identifiers of a material as in the data file"""
+        return self._identifiers(self.catalog.position(self.identify(identifier)))
+
+    def value(self, identifier, key):
+        """scalar property in ISO units, NaN if not available"""
+        return self.catalog.value(self.identify(identifier), key)
+
+    def thickness_table(self, identifier, key):
+        """(t_max, values) in ISO units or None"""
+        return self._thickness.get((self.identify(identifier), key))
+
+    def thickness_property(self, identifier, key, thickness):
+        """thickness dependent property for many thicknesses at once
+
+        @param thickness: Distance, UVal or array in ISO units
+        @return: array in ISO units, NaN outside the range of the table
+        """
+        table = self.thickness_table(identifier, key)
+        if table is None:
+            raise ETTcatalog.CatalogError('material "{}" has no thickness dependent "{}"'.format(identifier, key))
+        t_max, values = table
+        thickness = ETQ.Distance.iso_array(thickness)
+        i = np.searchsorted(t_max, thickness, side='left')
+        return np.where((i < len(t_max)) & (thickness > 0.), values[np.minimum(i, len(t_max) - 1)], np.nan)
+
+    def curves(self, identifier):
+        """dict {property: L{PropertyCurve}} of a material"""
+        name = self.identify(identifier)
+        curve_set = self.catalog.column('curves')[self.catalog.position(name)] if 'curves' in self.catalog.columns else ''
+        return dict(self._curves.get(curve_set.strip() or name, {}))
+
+    def material(self, identifier):
+        """material as instance of its class in this module"""
+        name = self.identify(identifier)
+        cls = globals()[self.catalog.column('class')[self.catalog.position(name)]]
+        return cls(name)
+
+
+_databases = {}
+
+
+def _temperature_catalog(catalog):
+    """temperature catalog (T in degC, values in the units of PROPERTIES) converted to ISO units"""
+    keys = catalog.column('property')
+    values = np.array(catalog.column('value'), dtype=float)
+    for key in np.unique(keys):
+        if key not in PROPERTIES:
+            raise ETTcatalog.CatalogError('temperature dependent property "{}" is not known. Use: {}'.format(key, ', '.join(PROPERTIES)))
+        quantity, unit = PROPERTIES[key]
+        values[keys == key] = quantity.iso_array(values[keys == key], unit)
+    columns = {'property':keys, 'T':ETQ.TemperatureAbsolute.iso_array(catalog.column('T'), 'degC'), 'value':values}
+    return ETTcatalog.Catalog(catalog.names, columns, index_name=catalog.index_name, source=catalog.source)
+
+
+def material_database(filename=MATERIALS_FILENAME, filename_thickness=MATERIALS_THICKNESS_FILENAME, filename_temperature=MATERIALS_TEMPERATURE_FILENAME):
+    """the material database, loaded once per process and file version"""
+    properties = ETTcatalog.load_catalog(filename, units=PROPERTIES, skiprows=1)
+    thickness = ETTcatalog.load_catalog(filename_thickness, units={'t_max':(ETQ.Distance, 'mm'), 'value':(ETQ.Stress, 'N/mm2')}, skiprows=2)
+    temperature = ETTcatalog.load_catalog(filename_temperature, skiprows=3) if filename_temperature else None
+    key = (filename, filename_thickness, filename_temperature)
+    entry = _databases.get(key)
+    if entry is not None and entry[0] == (properties, thickness, temperature):
+        return entry[1]
+    database = MaterialDatabase(properties, thickness, _temperature_catalog(temperature) if temperature is not None else None)
+    _databases[key] = ((properties, thickness, temperature), database)
+    return database
+
+
+def get_material(identifier):
+    """material by any identifier
+
+    >>> print(get_material('1.0045').name)
+    Steel: S355JR
+    """
+    return material_database().material(identifier)
+
 
 
 class Material:
+    """material, a view of a row of the L{MaterialDatabase}
 
-    def __init__(self):
+    @param identifier: any identifier of the material in the database, default: the material of the class
+    """
+
+    _database_id = None
+
+    def __init__(self, identifier=None):
         self.name = 'material'
         self.identifiers = []
         self.density = None
         self.youngs_modulus = None
+        self.database_id = None
+        self.curves = {}
+        identifier = identifier if identifier is not None else self._database_id
+        if identifier is not None:
+            database = material_database()
+            self.database_id = database.identify(identifier)
+            self.name = database.catalog.column('name')[database.catalog.position(self.database_id)]
+            self.identifiers = database.identifiers(self.database_id)
+            for key, (quantity, _) in PROPERTIES.items():
+                value = database.value(self.database_id, key)
+                if not np.isnan(value):
+                    setattr(self, key, quantity(value, quantity._isoUnit))  # pylint: disable=protected-access
+            self.curves = database.curves(self.database_id)
 
 
     def _repr_html_(self):
@@ -63,22 +285,113 @@ youngs modulus: {self.youngs_modulus}
 
     #__repr__ = __str__
 
+    def property_iso(self, key, T, unit=None):
+        """property at many temperatures at once as array in ISO units
+
+        Properties without a curve are constant: the room temperature value is
+        broadcast to the shape of T (a read only view, nothing is computed).
+
+        @param key: name of the property, e.g. 'youngs_modulus'
+        @param T: TemperatureAbsolute, UVal or array in unit (default K)
+        @return: array in ISO units, NaN outside the range of the curve
+        """
+        T = ETQ.TemperatureAbsolute.iso_array(T, unit)
+        curve = self.curves.get(key)
+        if curve is not None:
+            return curve(T)
+        value = getattr(self, key, None)
+        if value is None:
+            raise ETTcatalog.CatalogError('material "{}" has no property "{}"'.format(self.name, key))
+        return np.broadcast_to(value.get_value(), T.shape)
+
+    def property(self, key, T=None, unit=None):
+        """property at temperature(s) T
+
+        >>> m = Steel_S355JR()
+        >>> E = m.property('youngs_modulus', [20., 150., 400.], unit='degC')
+        >>> E.get_value() / 1e9
+        array([210. , 199.5, 147. ])
+        >>> m.property('density', ETQ.TemperatureAbsolute.iso_array([20., 400.], 'degC')).get_value()
+        array([7800., 7800.])
+        >>> print(m.property('youngs_modulus'))
+           210 000     N/mm^2 (Stress)
+        >>> type(E).__name__
+        'Stress'
+
+        @param T: None for the room temperature value (Quantity, from the curve at 20 degC if there is no constant value),
+                  or TemperatureAbsolute, UVal or array in unit (default K)
+        @return: Quantity of the property, with an array as value if T is given, see L{property_iso}
+        """
+        if T is None:
+            value = getattr(self, key, None)
+            if value is None and key in self.curves:
+                curve = self.curves[key]
+                return curve.quantity(float(curve(ETQ.TemperatureAbsolute(20., 'degC').get_value())), curve.quantity._isoUnit)  # pylint: disable=protected-access
+            if value is None:
+                raise ETTcatalog.CatalogError('material "{}" has no property "{}"'.format(self.name, key))
+            return value
+        values = self.property_iso(key, T, unit=unit)
+        quantity = self.curves[key].quantity if key in self.curves else getattr(self, key).__class__
+        return quantity(values, quantity._isoUnit)  # pylint: disable=protected-access
+
+    def thickness_property(self, key, thicknessNominal):
+        """thickness dependent property (Rp, Rm) for many thicknesses at once, array in ISO units (NaN outside the table)"""
+        if self.database_id is None:
+            raise ETTcatalog.CatalogError('material "{}" is not in the database'.format(self.name))
+        return material_database().thickness_property(self.database_id, key, thicknessNominal)
+
+    def _thickness_quantity(self, key, thicknessNominal):
+        table = material_database().thickness_table(self.database_id, key) if self.database_id is not None else None
+        if table is None:
+            return None
+        if thicknessNominal is None:
+            value = table[1][0]
+        else:
+            value = float(self.thickness_property(key, ETQ.Distance(thicknessNominal)))
+            if np.isnan(value):
+                raise ETTcatalog.CatalogError('{}: thickness {} is out of the range of {}'.format(self.name, thicknessNominal, key))
+        return THICKNESS_PROPERTIES[key](float(value), THICKNESS_PROPERTIES[key]._isoUnit)  # pylint: disable=protected-access
+
+    def Rp(self, thicknessNominal=None):
+        """minimum yield strength for the nominal thickness, for the smallest thicknesses if thicknessNominal is None"""
+        Rp = self._thickness_quantity('Rp', thicknessNominal)
+        if Rp is not None:
+            return Rp
+        elif getattr(self, 'Rp_list', None):
+            return self.Rp_list[0]
+        elif getattr(self, 'yield_strength', None) is not None:
+            return self.yield_strength
+        raise ETTcatalog.CatalogError('material "{}" has no yield strength'.format(self.name))
+
+    def Rm(self, thicknessNominal=None):
+        """minimum tensile strength for the nominal thickness, for the smallest thicknesses if thicknessNominal is None"""
+        Rm = self._thickness_quantity('Rm', thicknessNominal)
+        if Rm is not None:
+            return Rm
+        elif getattr(self, 'ultimate_tensile_strength', None) is not None:
+            return self.ultimate_tensile_strength
+        raise ETTcatalog.CatalogError('material "{}" has no tensile strength'.format(self.name))
+
 
 
 class Steel(Material):
+    """steel
 
-    def __init__(self):
-        super(Steel, self).__init__()
-        self.name = 'steel'
-        self.density = ETQ.Density(7800., 'kg/m3')
-        self.youngs_modulus = ETQ.Stress(210e3, 'N/mm2')
-        self.shear_modulus =  ETQ.Stress( 80e3, 'N/mm2')
-        self.Rp_list = []
-        self.thermal_expansion_coefficient_linear = ETQ.ThermalExpansionCoefficientLinear(12e-6, '1/K')
+    >>> m = Steel_S355JR()
+    >>> print(m.Rp())
+           355     N/mm^2 (Stress)
+    >>> print(m.Rp(ETQ.Distance(90., 'mm')))
+           315     N/mm^2 (Stress)
+    >>> print(Steel('S235JR').Rm(ETQ.Distance(120., 'mm')))
+           350     N/mm^2 (Stress)
+    """
 
-    def Rp(self, thicknessNominal=None):
-        # TODO: implement search in list
-        return self.Rp_list[0]
+    _database_id = 'steel'
+
+    def __init__(self, identifier=None):
+        super(Steel, self).__init__(identifier)
+        table = material_database().thickness_table(self.database_id, 'Rp')
+        self.Rp_list = [ETQ.Stress(float(value), 'Pa') for value in table[1]] if table else []
 
 
 
@@ -87,63 +400,25 @@ class Steel_S355JR(Steel):
     http://www.steelnumber.com/en/steel_composition_eu.php?name_id=8
     '''
 
-    def __init__(self):
-        """ """
-        super(Steel_S355JR, self).__init__()
-        self.name = 'Steel: S355JR'
-        self.identifiers.append('S355JR')
-        self.identifiers.append('1.0045')
-        self.identifiers.append('St52-3')
-        self.identifiers.append('Sweden SS 2132-01')
-        self.Rp_list = [ETQ.Stress(355., 'N/mm2'),
-                        ETQ.Stress(345., 'N/mm2'),
-                        ETQ.Stress(335., 'N/mm2'),
-                        ETQ.Stress(325., 'N/mm2'),
-                        ETQ.Stress(295., 'N/mm2'),
-                        ETQ.Stress(285., 'N/mm2'),
-                        ETQ.Stress(275., 'N/mm2')]
+    _database_id = 'S355JR'
 
 
 class Steel_34CrNiMo6(Steel):
 
-    def __init__(self):
-        super(Steel_34CrNiMo6, self).__init__()
-        self.name = 'Steel: 34CrNiMo6'
-        self.identifiers.append('34CrNiMo6')
-        self.identifiers.append('1.6582')
-        self.identifiers.append('Sweden SS 2541')
-        self.Rp_list = [ETQ.Stress(1000., 'N/mm2'),
-                       ]
+    _database_id = '34CrNiMo6'
+
 
 class CastIron(Material):
     """https://www.meuselwitz-guss.de/fileadmin/daten/Dateien/pdf/werkstoffe/Werkstoffkenndaten_Lammellengraphit.pdf"""
 
-    def __init__(self):
-        """ """
-        super(CastIron, self).__init__()
-        self.name = 'CastIron: EN - GJL'
-        self.density = ETQ.Density(7200., 'kg/m3')
-        self.youngs_modulus = ETQ.Stress(110e3, 'N/mm2')
-        self.thermal_expansion_coefficient_linear = ETQ.ThermalExpansionCoefficientLinear(12e-6, '1/K')
-        self.heat_capacity_specific = ETQ.HeatCapacitySpecific(0.46, 'kJ/(kg.K)')
+    _database_id = 'EN-GJL'
+
 
 class ChilledDuctileIron_CDI580(CastIron):
     """Chilled Ductile Iron
     https://www.hwk1365.de/en/cdi/"""
 
-    def __init__(self):
-        """ """
-        super(ChilledDuctileIron_CDI580, self).__init__()
-        self.name = 'Chilled Ductile Iron: Cast_CDI580'
-        self.identifiers.append('CDI 580')
-        self.density = ETQ.Density(7200., 'kg/m3')
-        self.youngs_modulus = ETQ.Stress(175000, 'N/mm2')
-        self.thermal_expansion_coefficient_linear = ETQ.ThermalExpansionCoefficientLinear(12.5e-6, '1/K')
-        #self.heatCapacitySpecific = ETQ.HeatCapacitySpecific(, '')
-        self.ultimate_tensile_strength = ETQ.Stress(700, 'N/mm2')
-        self.yield_strength = ETQ.Stress(440, 'N/mm2')
-        self.thermal_conductivity = ETQ.ThermalConductivity(35, 'W/(m.K)')
-        #self.poissons_ratio     # FIXME
+    _database_id = 'CDI580'
 
 
 ################################################################################
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-module-docstring,missing-function-docstring,missing-class-docstring,no-else-return,invalid-name
+"""library of standard beam sections with precomputed properties
+
+All geometric properties of all sections are computed once, vectorized, into
+columns in ISO units. Queries like "all RHS with Wbx >= 50 cm^3 and A <= 15 cm^2,
+lightest first" are array operations; a L{beamsection.BeamSection} object is
+only built for the rows asked for.
+
+# doctest
+# reset new format defaults for test
+>>> from EngineeringTools.quantities import qnt
+>>> qnt.FORMAT_DEFAULT['totalWidth'] = 14
+>>> qnt.FORMAT_DEFAULT['decimalPosition'] = 10
+>>> qnt.FORMAT_DEFAULT['thousands_sep'] = ' '
+
+>>> lib = section_library()
+>>> rows = lib.filter(kind='RHS', Wbx_min=ETQ.SectionModulus(50., 'cm^3'), A_max=ETQ.Area(15., 'cm^2'), sort='A')
+>>> lib.names[rows]
+array(['RHS 160x80x2.5', 'RHS 160x80x3', 'RHS 150x100x3'], dtype=object)
+>>> print(lib.quantity(rows[0], 'Wbx'))
+        50.4   cm^3 (SectionModulus)
+>>> print(lib.section(rows[0]))
+BeamSection_Rectangle(Width=        80.000 mm (Distance), Hight=       160.000 mm (Distance), width=        75.000 mm (Distance), hight=       155.000 mm (Distance))
+>>> lib.section(rows[0]) is lib.section('RHS 160x80x2.5')
+True
+
+sizing of columns from the library, see L{buckling.size_columns}
+
+>>> from EngineeringTools.mechanical_eng import buckling, material
+>>> res = buckling.size_columns(ETQ.Force.iso_array([20., 50.], 'kN'), ETQ.Distance(3., 'm'), material.Steel_S355JR(), catalog=lib)
+>>> res['name']
+array(['RHS 80x80x2.5', 'RHS 160x80x2.5'], dtype=object)
+"""
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+
+# run doctest, workaround relative import
+if __name__ == '__main__':
+    import sys
+    import doctest # pylint: disable=import-outside-toplevel
+    module_name = 'EngineeringTools.mechanical_eng.sectionlibrary'  # pylint: disable=invalid-name
+    module = __import__(module_name, fromlist=['*'], level=0)  # pylint: disable=invalid-name
+    module._setup_doctest()                                    # pylint: disable=protected-access
+    print(doctest.testmod(module, optionflags=doctest.ELLIPSIS))
+    sys.exit()
+
+import os
+import numpy as np
+
+from .. import quantities as ETQ
+from ..tools import catalog as ETTcatalog
+from . import beamsection as ETMbeamsection
+
+__all__ = ['SectionLibrary', 'section_library']
+
+SECTIONS_FILENAME = os.path.join(os.path.dirname(__file__), 'sections.txt')
+
+
+class SectionLibrary(ETTcatalog.Catalog):
+    """standard sections (kinds: pipe, RHS, flat) with all properties as columns in ISO units
+
+    Columns: kind, DN, D, H, B, t (dimensions, NaN if not applicable), d (inner diameter),
+    A, Ix, Iy, Imin, Jz, Zex, Zey, Zez (aliases Wbx, Wby, Wp)
+
+    x is the horizontal axis, H and D are measured in y.
+    Rectangular hollow sections are calculated without corner radii.
+    """
+
+    aliases = {'Wbx':'Zex', 'Wby':'Zey', 'Wp':'Zez', 'Wx':'Zex', 'Wy':'Zey'}
+
+    def __init__(self, names, columns, units=None, indexed=(), index_name='name', source=None):
+        super().__init__(names, columns, units=units, indexed=indexed, index_name=index_name, source=source)
+        self._sections = {}
+
+    def column(self, key):
+        return super().column(self.aliases.get(key, key))
+
+    def to_iso(self, key, value):
+        return super().to_iso(self.aliases.get(key, key), value)
+
+    def _factor(self, key):
+        return super()._factor(self.aliases.get(key, key))
+
+    def quantity(self, name_or_row, key):
+        return super().quantity(name_or_row, self.aliases.get(key, key))
+
+    def filter(self, kind=None, sort=None, **limits):
+        """row numbers of the sections within the limits
+
+        @param kind: 'pipe', 'RHS', 'flat' or a list of them
+        @param sort: column or list of columns to sort by, default: row number
+        @param limits: <column>_min=value or <column>_max=value, Quantities or numbers in the unit of the column
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if kind is not None:
+            mask &= np.isin(self.column('kind'), [kind] if isinstance(kind, str) else list(kind))
+        for key, value in limits.items():
+            name, _, limit = key.rpartition('_')
+            if limit == 'min':
+                mask &= self.column(name) >= self.to_iso(name, value)
+            elif limit == 'max':
+                mask &= self.column(name) <= self.to_iso(name, value)
+            else:
+                raise ETTcatalog.CatalogError('limit "{}" is not known, use <column>_min or <column>_max'.format(key))
+        rows = np.nonzero(mask)[0]
+        if sort is not None:
+            rows = self.sort_rows(rows, [sort] if isinstance(sort, str) else list(sort))
+        return rows
+
+    def section(self, name_or_row):
+        """section as L{beamsection.BeamSection}, built on first request"""
+        row = name_or_row if isinstance(name_or_row, (int, np.integer)) else self.position(name_or_row)
+        section = self._sections.get(row)
+        if section is None:
+            kind = self.column('kind')[row]
+            dim = {key:ETQ.Distance(float(self.column(key)[row]), 'm') for key in ('D', 'H', 'B', 't')}
+            if kind == 'pipe':
+                section = ETMbeamsection.BeamSection_Pipe(dim['D'], thickness=dim['t'])
+            elif kind == 'RHS':
+                section = ETMbeamsection.BeamSection_Rectangle(dim['B'], dim['H'], thickness=dim['t'])
+            elif kind == 'flat':
+                section = ETMbeamsection.BeamSection_Rectangle(dim['B'], dim['t'])
+            else:
+                raise ETTcatalog.CatalogError('kind "{}" is not known'.format(kind))
+            self._sections[row] = section
+        return section
+
+
+def _section_columns(base):
+    """section properties of all rows of the base catalog, vectorized"""
+    kind = base.column('kind')
+    D, H, B, t = (base.column(key) for key in ('D', 'H', 'B', 't'))
+    pipe, rhs, flat = kind == 'pipe', kind == 'RHS', kind == 'flat'
+    # outer and inner rectangle, flats are a solid rectangle B x t
+    W = np.where(flat, B, np.where(rhs, B, np.nan))
+    Hr = np.where(flat, t, np.where(rhs, H, np.nan))
+    w = np.where(rhs, B - 2.*t, 0.)
+    h = np.where(rhs, H - 2.*t, 0.)
+    d = np.where(pipe, D - 2.*t, np.nan)
+    A = np.where(pipe, (D**2 - d**2) * np.pi / 4., W*Hr - w*h)
+    Ix = np.where(pipe, (D**4 - d**4) * np.pi / 64., (W*Hr**3 - w*h**3) / 12.)
+    Iy = np.where(pipe, Ix, (W**3*Hr - w**3*h) / 12.)
+    Jz = Ix + Iy
+    Zex = np.where(pipe, Ix / (D / 2.), Ix / (Hr / 2.))
+    Zey = np.where(pipe, Zex, Iy / (W / 2.))
+    Zez = np.where(pipe, Jz / (D / 2.), Jz / (np.hypot(W, Hr) / 2.))  # Jz / rmax as BeamSection_Rectangle.Zez
+    columns = dict(base.columns)
+    columns.update({'d':d, 'A':A, 'Ix':Ix, 'Iy':Iy, 'Imin':np.minimum(Ix, Iy), 'Jz':Jz, 'Zex':Zex, 'Zey':Zey, 'Zez':Zez})
+    return columns
+
+
+_libraries = {}
+
+
+def section_library(filename=SECTIONS_FILENAME):
+    """the library of standard sections, built once per process and file version"""
+    units = {key:(ETQ.Distance, 'mm') for key in ('D', 'H', 'B', 't')}
+    base = ETTcatalog.load_catalog(filename, units=units, skiprows=1)
+    entry = _libraries.get(filename)
+    if entry is not None and entry[0] is base:
+        return entry[1]
+    units.update({'d':(ETQ.Distance, 'mm'), 'A':(ETQ.Area, 'mm^2'), 'Ix':(ETQ.MomentOfAreaSecond, 'cm^4'),
+                  'Iy':(ETQ.MomentOfAreaSecond, 'cm^4'), 'Imin':(ETQ.MomentOfAreaSecond, 'cm^4'), 'Jz':(ETQ.MomentOfAreaSecond, 'cm^4'),
+                  'Zex':(ETQ.SectionModulus, 'cm^3'), 'Zey':(ETQ.SectionModulus, 'cm^3'), 'Zez':(ETQ.SectionModulus, 'cm^3')})
+    library = SectionLibrary(base.names, _section_columns(base), units=units, index_name=base.index_name, source=base.source)
+    _libraries[filename] = (base, library)
+    return library
+
+
+################################################################################
+# test
+################################################################################
+def _setup_doctest():
+    ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+# eof
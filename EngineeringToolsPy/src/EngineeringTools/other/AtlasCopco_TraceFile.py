@@ -9,17 +9,97 @@ __author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
 __email__   = "marthoch@users.noreply.github.com"
 __license__ = "BSD 3-clause"
 
+import io
 import logging
 import datetime
 import scipy as sp
 import scipy.signal as spsig
 import scipy.io
 import numpy as np
-import matplotlib.pyplot as plt
+try:
+    import matplotlib.pyplot as plt
+except ImportError:  # only needed for plotting
+    pass
 import pandas as pd
 import re
 
 
+SECTIONS = ('Torque Measurement Points', 'Angle Measurement Points', 'Trace Points', 'StepResult')
+
+
+def _find_title(text, title, start=0):
+    """start and end of the first line from start holding only title (str.find, much faster than a multiline regex)
+
+    @return: (start, end) of the title line or None
+    """
+    pos = text.find(title, start)
+    while pos >= 0:
+        end = text.find('\n', pos)
+        end = len(text) if end < 0 else end + 1
+        if (pos == 0 or text[pos - 1] == '\n') and not text[pos + len(title):end].strip():
+            return pos, end
+        pos = text.find(title, pos + 1)
+    return None
+
+
+def split_sections(text):
+    """split the text of a trace file into its sections, one pass
+
+    The head holds the tables 'Task' and 'Trace Conversion' (title, header,
+    values each), then the sections of SECTIONS follow in this order, each as
+    a title line followed by a csv table.
+
+    @return: dict section name -> csv text (header and rows)
+    """
+    offsets = {}
+    start = 0
+    for name in SECTIONS:
+        offset = _find_title(text, name, start)
+        if offset is None:
+            break
+        offsets[name] = offset
+        start = offset[1]
+    missing = [name for name in SECTIONS if name not in offsets]
+    if missing:
+        raise ValueError('not a ToolsTalk2 trace file, missing: {}'.format(', '.join(missing)))
+    sections = {}
+    head = [line for line in text[:offsets[SECTIONS[0]][0]].splitlines() if line.strip()]
+    sections['Task'] = '\n'.join(head[1:3])
+    sections['Trace Conversion'] = '\n'.join(head[4:6])
+    ends = [offsets[name][0] for name in SECTIONS[1:]] + [len(text)]
+    for name, end in zip(SECTIONS, ends):
+        sections[name] = text[offsets[name][1]:end].lstrip('\r\n')
+    return sections
+
+
+def _read_section(text, **kwargs):
+    """csv table of a section (C engine)"""
+    return pd.read_csv(io.StringIO(text), **kwargs)
+
+
+def trace_points(raw, angleConversionFactor, torqueConversionFactor, traceTimePerSample):
+    """trace points in deg, Nm and s from the raw trace points ('Angle Min', 'Angle Max', 'Torque Min', 'Torque Max')"""
+    angleMin = raw['Angle Min'].to_numpy() * angleConversionFactor
+    angleMax = raw['Angle Max'].to_numpy() * angleConversionFactor
+    angleMedian = (angleMin + angleMax) / 2
+    torqueMin = raw['Torque Min'].to_numpy() * torqueConversionFactor
+    torqueMax = raw['Torque Max'].to_numpy() * torqueConversionFactor
+    rot = angleMedian / 360
+    speed = np.empty_like(rot)
+    speed[:1] = np.nan
+    speed[1:] = np.diff(rot) / traceTimePerSample
+    df = pd.DataFrame({'Angle Min in deg': angleMin,
+                       'Angle Max in deg': angleMax,
+                       'Angle Median in deg': angleMedian,
+                       'Angle Median in rot': rot,
+                       'Torque Min in Nm': torqueMin,
+                       'Torque Max in Nm': torqueMax,
+                       'Torque Median in Nm': (torqueMin + torqueMax) / 2,
+                       'Angular Speed in rot/s': spsig.medfilt(speed)},
+                      index=pd.Index(np.arange(len(raw)) * traceTimePerSample, name='Time in s'))
+    return df
+
+
 class ToolsTrace():
 
     def __init__(self, filename, direction=None, traceName=None):
@@ -33,58 +113,34 @@ class ToolsTrace():
 
     def _read_file(self):
         logging.info('reading file "{}"'.format(self.filename))
-        filepos = {}
-        with open(self.filename, 'rt', encoding="ascii", newline='\r\n') as f:
-            txt = f.readlines()
-            txt = [t.rstrip() for t in txt]
-            filepos['Torque Measurement Points'] = txt.index('Torque Measurement Points') + 1
-            filepos['Angle Measurement Points'] = txt.index('Angle Measurement Points') + 1
-            filepos['Trace Points'] = txt.index('Trace Points') + 1
-            filepos['StepResult'] = txt.index('StepResult') + 1
-            filepos['Angle Measurement Points: length'] = filepos['Trace Points'] - filepos['Angle Measurement Points'] - 3
-            filepos['Torque Measurement Points: length'] = filepos['Angle Measurement Points'] - filepos['Torque Measurement Points'] - 3
-            filepos['Trace Points: length'] = filepos['StepResult'] - filepos['Trace Points'] - 3
-            filepos['StepResult: length'] =  len(txt) - filepos['StepResult'] - 1 +1
-            #filepos['len'] =  len(txt)
-        logging.debug(filepos)
-        #self.filepos = filepos
-
-        self.df_Task = pd.read_csv(self.filename, header=1, nrows=1)
-        self.df_TraceConversion = pd.read_csv(self.filename, header=4, nrows=1)
-
-        self.df_TorqueMeasurementPoints = pd.read_csv(self.filename, header=filepos['Torque Measurement Points'], nrows=filepos['Torque Measurement Points: length'], engine='python', encoding="ascii", skip_blank_lines=False)
+        with open(self.filename, 'rb') as f:
+            sections = split_sections(f.read().decode('ascii'))
+        logging.debug({name:len(text) for name, text in sections.items()})
+
+        self.df_Task = _read_section(sections['Task'])
+        self.df_TraceConversion = _read_section(sections['Trace Conversion'])
+
+        self.df_TorqueMeasurementPoints = _read_section(sections['Torque Measurement Points'])
         self.df_TorqueMeasurementPoints.set_index('Name', inplace=True)
 
-        self.df_AngleMeasurementPoints = pd.read_csv(self.filename, header=filepos['Angle Measurement Points'], nrows=filepos['Angle Measurement Points: length'], engine='python', encoding="ascii", skip_blank_lines=False)
+        self.df_AngleMeasurementPoints = _read_section(sections['Angle Measurement Points'])
         self.df_AngleMeasurementPoints.set_index('Name', inplace=True)
 
-        if filepos['StepResult: length'] > 0:
-            self.df_StepResult = pd.read_csv(self.filename, header=filepos['StepResult'], nrows=filepos['StepResult: length'], engine='python', encoding="ascii", skip_blank_lines=False)
+        if sections['StepResult'].strip():
+            self.df_StepResult = _read_section(sections['StepResult'])
             self.df_StepResult.rename(str.strip, axis='columns', inplace=True)
             self.df_StepResult.set_index('StepNumber', inplace=True)
         else:
             self.df_StepResult = None
 
-        self.df_TracePointsRaw = pd.read_csv(self.filename, header=filepos['Trace Points'], nrows=filepos['Trace Points: length'], engine='python', encoding="ascii", skip_blank_lines=False)
+        # round_trip: the same floats as the python engine
+        self.df_TracePointsRaw = _read_section(sections['Trace Points'], float_precision='round_trip')
         self.raw_AngleConversionFactor = self.df_TraceConversion['Angle Conversion Factor'][0]
         self.raw_TorqueConversionFactor = self.df_TraceConversion['Torque Conversion Factor'][0]
         if self.direction == 'CCW':
             self.raw_TorqueConversionFactor *= -1.
         self.raw_TraceTimePerSample = self.df_TraceConversion['Trace Time per Sample'][0]
-        self.df_TracePoints = pd.DataFrame()
-        self.df_TracePoints['Angle Min in deg'] = self.df_TracePointsRaw['Angle Min'] * self.raw_AngleConversionFactor 
-        self.df_TracePoints['Angle Max in deg'] = self.df_TracePointsRaw['Angle Max'] * self.raw_AngleConversionFactor
-        self.df_TracePoints['Angle Median in deg'] = (self.df_TracePoints['Angle Min in deg'] + self.df_TracePoints['Angle Max in deg']) / 2
-        self.df_TracePoints['Angle Median in rot'] = self.df_TracePoints['Angle Median in deg'] / 360
-        self.df_TracePoints['Torque Min in Nm'] = self.df_TracePointsRaw['Torque Min'] * self.raw_TorqueConversionFactor
-        self.df_TracePoints['Torque Max in Nm'] = self.df_TracePointsRaw['Torque Max'] * self.raw_TorqueConversionFactor
-        self.df_TracePoints['Torque Median in Nm'] = (self.df_TracePoints['Torque Min in Nm'] + self.df_TracePoints['Torque Max in Nm']) / 2
-        self.df_TracePoints['Time in s'] = self.df_TracePoints.index * self.raw_TraceTimePerSample
-        self.df_TracePoints.set_index('Time in s', inplace=True)
-
-        s = self.df_TracePoints['Angle Median in rot'].diff(1) / self.raw_TraceTimePerSample
-        s = spsig.medfilt(s)
-        self.df_TracePoints['Angular Speed in rot/s'] = s
+        self.df_TracePoints = trace_points(self.df_TracePointsRaw, self.raw_AngleConversionFactor, self.raw_TorqueConversionFactor, self.raw_TraceTimePerSample)
 
     @property
     def VirtualStationName(self):
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-module-docstring,missing-function-docstring,missing-class-docstring,no-else-return,invalid-name
+"""
+Store for many Trace files (.csv) from Atlas Copco ToolsTalk2
+
+L{TraceStore.ingest} scans a directory tree for trace files, parses them with
+L{ToolsTrace} in a process pool and appends them to the store in batches. The
+store is a directory:
+
+    manifest.json                          format, storage, batch counter
+    index/batch-000001.<ext>               one row per file: path, size, mtime, task metadata
+    steps/batch-000001.<ext>               step results of all traces of the batch
+    points/<TaskName>/<date>/batch-000001.<ext>   trace points, partitioned by task and day
+
+Each trace gets a trace_id, the tables are joined by it. Storage is parquet if
+pyarrow or fastparquet is available, else HDF5 if PyTables is available, else
+pickle; a store keeps the storage it was created with.
+
+A file is parsed again only if its size or modification time changed, the
+newest entry of a path replaces the older ones. Files which can not be parsed
+are recorded with the error and skipped until they change.
+
+Queries work on the index only: L{TraceStore.select} filters the metadata,
+L{TraceStore.trace_points} and L{TraceStore.step_results} read only the
+partitions and batches of the selected traces, e.g. all NOK traces of a task
+in the last week:
+
+    store = TraceStore('/data/traces.store')
+    store.ingest('/data/line1')
+    nok = store.select(TaskName='Task X', ResultOk=False, start=pd.Timestamp.now() - pd.Timedelta(days=7))
+    points = store.trace_points(nok)
+
+Batches are written by one process at a time; reading while ingesting is
+safe, the index of a batch is written after its data.
+"""
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import os
+import re
+import json
+import time
+import fnmatch
+import logging
+import importlib.util
+import urllib.parse
+import concurrent.futures
+import numpy as np
+import pandas as pd
+
+from .AtlasCopco_TraceFile import ToolsTrace
+
+__all__ = ['TraceStoreError', 'TraceStore']
+
+log = logging.getLogger('EngineeringTools.other.AtlasCopco_TraceStore')
+
+MANIFEST_FILENAME = 'manifest.json'
+STORE_FORMAT = 1
+TRACES_PER_BATCH = 1000000   # trace_id = batch * TRACES_PER_BATCH + number in batch
+_EXTENSIONS = {'parquet':'parquet', 'hdf5':'h5', 'pickle':'pkl'}
+_RE_BATCH = re.compile(r'^batch-([0-9]+)\.')
+INDEX_COLUMNS = ('trace_id', 'path', 'size', 'mtime_ns', 'VirtualStationName', 'TaskName', 'DateTime', 'ResultOk', 'Status', 'samples', 'error', 'partition', 'batch')
+
+
+class TraceStoreError(Exception):
+    """Exception: trace store"""
+
+
+def _available(storage):
+    if storage == 'parquet':
+        return bool(importlib.util.find_spec('pyarrow') or importlib.util.find_spec('fastparquet'))
+    elif storage == 'hdf5':
+        return bool(importlib.util.find_spec('tables'))
+    return storage == 'pickle'
+
+
+def _storage():
+    """parquet if pyarrow or fastparquet is available, HDF5 if PyTables is available, else pickle"""
+    return next(storage for storage in _EXTENSIONS if _available(storage))
+
+
+def _write_frame(frame, filename, storage):
+    """write atomically"""
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    tmp = '{}.{}.tmp'.format(filename, os.getpid())
+    if storage == 'parquet':
+        frame.to_parquet(tmp, index=False)
+    elif storage == 'hdf5':
+        frame.to_hdf(tmp, key='data', mode='w')
+    else:
+        frame.to_pickle(tmp)
+    os.replace(tmp, filename)
+
+
+def _read_frame(filename, storage, columns=None):
+    if storage == 'parquet':
+        return pd.read_parquet(filename, columns=columns)
+    frame = pd.read_hdf(filename, key='data') if storage == 'hdf5' else pd.read_pickle(filename)
+    return frame if columns is None else frame[columns]
+
+
+def _as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'ok', 'yes')
+    return bool(value)
+
+
+def _partition(taskName, dateTime):
+    """directory of the trace points relative to the store: points/<TaskName>/<date>"""
+    day = dateTime.strftime('%Y-%m-%d') if not pd.isna(dateTime) else 'unknown'
+    return '/'.join(('points', urllib.parse.quote(str(taskName), safe=' ') or '_', day))
+
+
+def _parse_trace(path, direction):
+    """parse one file (in a worker process), returns (metadata, trace points, step results)"""
+    try:
+        trace = ToolsTrace(path, direction=direction)
+        dateTime = trace.DateTime
+        meta = {'VirtualStationName':str(trace.VirtualStationName),
+                'TaskName':str(trace.TaskName),
+                'DateTime':pd.Timestamp(dateTime) if not isinstance(dateTime, str) else pd.NaT,
+                'ResultOk':_as_bool(trace.ResultOk),
+                'Status':str(trace.Status),
+                'samples':len(trace.TracePoints),
+                'error':''}
+        steps = trace.df_StepResult.reset_index() if trace.df_StepResult is not None else None
+        return meta, trace.TracePoints.reset_index(), steps
+    except Exception as e:  # pylint: disable=broad-except
+        meta = {'VirtualStationName':'', 'TaskName':'', 'DateTime':pd.NaT, 'ResultOk':False, 'Status':'',
+                'samples':0, 'error':'{}: {}'.format(type(e).__name__, e)}
+        return meta, None, None
+
+
+class TraceStore():
+    """columnar store of Atlas Copco trace files, see module documentation
+
+    @param directory: directory of the store, created if missing
+    @param storage: 'parquet', 'hdf5' or 'pickle' for a new store, default: the best available
+    """
+
+    def __init__(self, directory, storage=None):
+        self.directory = directory
+        filename = os.path.join(directory, MANIFEST_FILENAME)
+        if os.path.exists(filename):
+            manifest = self._read_manifest()
+            if manifest.get('format') != STORE_FORMAT:
+                raise TraceStoreError('"{}" is not a trace store of format {}'.format(directory, STORE_FORMAT))
+            if storage is not None and storage != manifest['storage']:
+                raise TraceStoreError('trace store "{}" uses storage {}'.format(directory, manifest['storage']))
+        else:
+            storage = storage if storage is not None else _storage()
+            if storage not in _EXTENSIONS or not _available(storage):
+                raise TraceStoreError('storage "{}" is not available, use one of: {}'.format(storage, ', '.join(s for s in _EXTENSIONS if _available(s))))
+            os.makedirs(directory, exist_ok=True)
+            self._write_manifest({'format':STORE_FORMAT, 'storage':storage, 'batches':0})
+        self.storage = self._read_manifest()['storage']
+        if not _available(self.storage):
+            raise TraceStoreError('trace store "{}" uses storage {}, which is not available'.format(directory, self.storage))
+        self._index = None
+
+    def __repr__(self):
+        return "TraceStore('{}', {} traces)".format(self.directory, len(self.select(errors=True)))
+
+    def _read_manifest(self):
+        with open(os.path.join(self.directory, MANIFEST_FILENAME), encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest):
+        filename = os.path.join(self.directory, MANIFEST_FILENAME)
+        tmp = '{}.{}.tmp'.format(filename, os.getpid())
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, filename)
+
+    def _new_batch(self):
+        """reserve a batch number; it is never used again, even if the batch is not finished"""
+        manifest = self._read_manifest()
+        manifest['batches'] += 1
+        self._write_manifest(manifest)
+        return manifest['batches']
+
+    def _filename(self, folder, batch):
+        return os.path.join(self.directory, *folder.split('/'), 'batch-{:06d}.{}'.format(batch, _EXTENSIONS[self.storage]))
+
+    def index(self):
+        """all entries of the index, including older entries of files which changed"""
+        if self._index is None:
+            folder = os.path.join(self.directory, 'index')
+            names = sorted(name for name in os.listdir(folder) if _RE_BATCH.match(name)) if os.path.isdir(folder) else []
+            frames = [_read_frame(os.path.join(folder, name), self.storage) for name in names]
+            if frames:
+                self._index = pd.concat(frames, ignore_index=True)
+            else:
+                self._index = pd.DataFrame(columns=list(INDEX_COLUMNS))
+        return self._index
+
+    def _latest(self):
+        index = self.index()
+        return index[~index.duplicated('path', keep='last')] if len(index) else index
+
+    def select(self, TaskName=None, VirtualStationName=None, ResultOk=None, Status=None, start=None, end=None, errors=False):
+        """metadata of the traces (newest entry of each file) matching all given conditions
+
+        @param TaskName, VirtualStationName, Status: value or list of values
+        @param ResultOk: True or False
+        @param start, end: DateTime in [start, end), anything pd.Timestamp accepts
+        @param errors: include files which could not be parsed
+        @return: DataFrame indexed by trace_id
+        """
+        index = self._latest()
+        mask = np.ones(len(index), dtype=bool)
+        if not errors:
+            mask &= (index['error'] == '').to_numpy()
+        for column, value in (('TaskName', TaskName), ('VirtualStationName', VirtualStationName), ('Status', Status)):
+            if value is not None:
+                values = [value] if isinstance(value, str) else list(value)
+                mask &= index[column].isin(values).to_numpy()
+        if ResultOk is not None:
+            mask &= (index['ResultOk'] == bool(ResultOk)).to_numpy()
+        if start is not None:
+            mask &= (index['DateTime'] >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            mask &= (index['DateTime'] < pd.Timestamp(end)).to_numpy()
+        return index[mask].set_index('trace_id')
+
+    def _read_selected(self, selection, files, columns):
+        frames = []
+        trace_ids = selection.index.to_numpy()
+        for filename in files:
+            if not os.path.exists(filename):
+                continue
+            frame = _read_frame(filename, self.storage, columns=columns)
+            frames.append(frame[frame['trace_id'].isin(trace_ids)])
+        if not frames:
+            return None
+        return pd.concat(frames, ignore_index=True)
+
+    def trace_points(self, selection, columns=None):
+        """trace points of the selected traces
+
+        @param selection: DataFrame from L{select} (index trace_id)
+        @param columns: columns of the trace points, default: all
+        @return: DataFrame with columns trace_id, 'Time in s' and the columns of L{ToolsTrace.TracePoints}
+        """
+        if columns is not None:
+            columns = ['trace_id', 'Time in s'] + [c for c in columns if c not in ('trace_id', 'Time in s')]
+        selection = selection[selection['samples'] > 0]
+        files = sorted({self._filename(partition, batch) for partition, batch in zip(selection['partition'], selection['batch'])})
+        return self._read_selected(selection, files, columns)
+
+    def trace(self, trace_id):
+        """trace points of one trace, indexed by time like L{ToolsTrace.TracePoints}"""
+        selection = self.select(errors=True)
+        points = self.trace_points(selection.loc[[trace_id]])
+        if points is None:
+            raise TraceStoreError('no trace points for trace_id {}'.format(trace_id))
+        return points.drop(columns='trace_id').set_index('Time in s')
+
+    def step_results(self, selection):
+        """step results of the selected traces, None if there are none"""
+        files = [self._filename('steps', batch) for batch in sorted(set(selection['batch']))]
+        return self._read_selected(selection, files, None)
+
+    def _scan(self, directory, pattern):
+        """(path, size, mtime_ns) of all files matching pattern below directory"""
+        found = []
+        for root, dirs, names in os.walk(directory):
+            dirs.sort()
+            for name in sorted(fnmatch.filter(names, pattern)):
+                path = os.path.abspath(os.path.join(root, name))
+                stat = os.stat(path)
+                found.append((path, stat.st_size, stat.st_mtime_ns))
+        return found
+
+    def _write_batch(self, batch, files, results):
+        """write points and steps, then the index of the batch"""
+        rows = []
+        partitions = {}
+        steps = []
+        for k, ((path, size, mtime_ns), (meta, points, stepResults)) in enumerate(zip(files, results)):
+            trace_id = batch * TRACES_PER_BATCH + k
+            partition = _partition(meta['TaskName'], meta['DateTime']) if points is not None else ''
+            rows.append({'trace_id':trace_id, 'path':path, 'size':size, 'mtime_ns':mtime_ns, **meta, 'partition':partition, 'batch':batch})
+            if points is not None:
+                points.insert(0, 'trace_id', np.int64(trace_id))
+                partitions.setdefault(partition, []).append(points)
+            if stepResults is not None:
+                stepResults.insert(0, 'trace_id', np.int64(trace_id))
+                steps.append(stepResults)
+        for partition, frames in partitions.items():
+            _write_frame(pd.concat(frames, ignore_index=True), self._filename(partition, batch), self.storage)
+        if steps:
+            frame = pd.concat(steps, ignore_index=True)
+            for column in frame.columns[frame.dtypes == object]:
+                frame[column] = frame[column].where(frame[column].isna(), frame[column].astype(str))
+            _write_frame(frame, self._filename('steps', batch), self.storage)
+        index = pd.DataFrame(rows)
+        index['DateTime'] = pd.to_datetime(index['DateTime'])
+        _write_frame(index, self._filename('index', batch), self.storage)
+
+    def ingest(self, directory, pattern='*.csv', direction=None, batchsize=100, max_workers=None, progress=None):
+        """parse new and changed trace files below directory and append them to the store
+
+        @param pattern: file name pattern (fnmatch)
+        @param direction: passed to L{ToolsTrace}
+        @param batchsize: files per batch; the trace points of a batch are held in memory
+        @param max_workers: number of worker processes, None: number of CPUs, 0: run in this process
+        @param progress: callable(files done, files to do), called after each batch
+        @return: dict with the number of files scanned, skipped (unchanged), ingested and failed
+        """
+        if batchsize < 1 or batchsize > TRACES_PER_BATCH:
+            raise TraceStoreError('batchsize has to be in 1 .. {}'.format(TRACES_PER_BATCH))
+        t0 = time.monotonic()
+        found = self._scan(directory, pattern)
+        latest = self._latest()
+        known = set(zip(latest['path'], latest['size'], latest['mtime_ns']))
+        todo = [f for f in found if f not in known]
+        report = {'scanned':len(found), 'skipped':len(found) - len(todo), 'ingested':0, 'failed':0}
+        log.info('ingest: %d files found, %d new or changed', len(found), len(todo))
+        batches = [todo[start:start + batchsize] for start in range(0, len(todo), batchsize)]
+
+        def collect(files, results):
+            self._write_batch(self._new_batch(), files, results)
+            self._index = None
+            failed = sum(meta['error'] != '' for meta, _, _ in results)
+            report['ingested'] += len(files) - failed
+            report['failed'] += failed
+            done = report['ingested'] + report['failed']
+            log.info('ingest: %d/%d files done (%.1f s)', done, len(todo), time.monotonic() - t0)
+            if progress is not None:
+                progress(done, len(todo))
+
+        if max_workers == 0:
+            for files in batches:
+                collect(files, [_parse_trace(path, direction) for path, _, _ in files])
+        elif batches:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+                workers = getattr(executor, '_max_workers', os.cpu_count() or 1)
+                for files in batches:
+                    paths = [path for path, _, _ in files]
+                    collect(files, list(executor.map(_parse_trace, paths, [direction] * len(paths), chunksize=max(1, len(paths) // (4 * workers)))))
+        if report['failed']:
+            log.warning('ingest: %d of %d files failed', report['failed'], len(todo))
+        return report
+
+# eof
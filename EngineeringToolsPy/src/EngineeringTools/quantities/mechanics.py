@@ -32,6 +32,7 @@ import scipy.constants
 import numpy as _np
 from .quantitiesbase import Quantity, QuantityFloat, QuantityFloatOffset, QuantityInt, QuantityDecimal, QuantityBoolean, QuantityString, ParaDInF_quantity_Error, ParaDInF_quantity_ErrorQuantitiesDoNotMatch
 from ..uval import UVal, EngineeringTools_uval_Error
+from ..firstorder import FirstOrder
 
 ################################################################################
 #  classes quantities
@@ -430,7 +431,12 @@ class Scalar(QuantityFloat):
 
     def convert2iso(self, value, unit, typecast=False):
         """Quantity.convert2iso(value, unit) ... convert value from unit to iso-unit"""
-        value = float(value)
+        if isinstance(value, FirstOrder) or _np.ndim(value) > 0:
+            value = value if isinstance(value, FirstOrder) else _np.asarray(value, dtype=float)
+            if unit in ('Np', 'Neper'):
+                return _np.exp(value)
+        else:
+            value = float(value)
         if unit in ('dB',):
             return 10.0**(value/10.0)
         elif unit in ('Np', 'Neper'):
@@ -440,7 +446,9 @@ class Scalar(QuantityFloat):
 
     def convert2unit(self, value, unit):
         """Quantity.convert2unit(value, unit) ... convert value from iso-unit to unit"""
-        assert isinstance(value, float), 'value must be a float: %s' % value
+        assert isinstance(value, (float, _np.ndarray, FirstOrder)), 'value must be a float: %s' % value
+        if not isinstance(value, float) and unit in ('dB', 'Np', 'Neper'):
+            return 10.0 * _np.log10(value) if unit == 'dB' else _np.log(value)
         if unit in ('dB',):
             return 10.0 * math.log10(value)
         elif unit in ('Np', 'Neper'):
@@ -82,6 +82,7 @@ if __name__ == '__main__':
 
 
 from ..uval import UVal
+from ..firstorder import FirstOrder, nominal
 from .. import qnt
 from .. import quantities as ETQ
 
@@ -138,6 +139,18 @@ def generateQuantity(quantity, value, unit=None, displayUnit=None, typecast=Fals
     return eval(quantity + '(value=value, unit=unit, displayUnit=displayUnit, typecast=typecast)')
 
 
+def _as_float(value, typecast):
+    """value as float, float array or FirstOrder number (values with derivatives)"""
+    if isinstance(value, FirstOrder):
+        return value
+    if np.ndim(value) > 0:
+        return np.asarray(value, dtype=float)
+    if typecast:
+        return float(value)
+    assert isinstance(value, float), 'value must be a float'
+    return value
+
+
 def _float_equal(fn1, fn2, epsilon=1e-8):
     """
     >>> print(_float_equal(0.1, 0.1))
@@ -179,6 +192,8 @@ class Quantity:
     _uval_units = {}         # dict of units; see class UVal
     _str_quantization = None # {'method':'1r', 'precision':3}
 
+    __array_ufunc__ = None   # ndarray <op> Quantity: numpy shall use the reflected operator of Quantity
+
     @classmethod
     def set_displayUnitSystem(cls, displayUnitSystem):
         """set the displayUnitSystem for all quantities
@@ -269,11 +284,19 @@ class Quantity:
         if unit is None:
             unit = self._displayUnit
         value = self.convert2unit(self._value, unit)
-        if self._str_quantization is None:
-            return '{} {} ({})'.format(qnt.quant(value, rettype='string', **DEFAULT_STR_QUANTIZATION), unit, self.__class__.__name__)
-        else:
-            return '{} {} ({})'.format(qnt.quant(value, rettype='string', **self._str_quantization),
-                                       unit, self.__class__.__name__)
+        return '{} {} ({})'.format(self._str_value(value), unit, self.__class__.__name__)
+
+
+    def _str_value(self, value):
+        """value quantized as string, arrays element wise"""
+        quantization = DEFAULT_STR_QUANTIZATION if self._str_quantization is None else self._str_quantization
+        if isinstance(value, FirstOrder):
+            return value.format(self._str_value)
+        if np.ndim(value) > 0:
+            def fmt(v):
+                return qnt.quant(v, rettype='string', **quantization).strip() if np.isfinite(v) else str(v)
+            return np.array2string(np.asarray(value), formatter={'float_kind':fmt})
+        return qnt.quant(value, rettype='string', **quantization)
 
     def get_str(self, unit=None, **vargsd):
         """Quantity.get_str()
@@ -306,10 +329,7 @@ class Quantity:
         if unit is None:
             unit = self._displayUnit
         value = self.convert2unit(self._value, unit)
-        if self._str_quantization is None:
-            ret = qnt.quant(value, rettype='string', **DEFAULT_STR_QUANTIZATION)
-        else:
-            ret = qnt.quant(value, rettype='string', **self._str_quantization)
+        ret = self._str_value(value)
         if not vargsd.get('alignment', True):
             ret = ret.strip() #IGNORE:E1103
         if vargsd.get('withUnit', True):
@@ -385,7 +405,7 @@ class Quantity:
         """
         if isinstance(obj, self.__class__):
             ret = self.__class__(self)
-            ret._value += obj._value
+            ret._value = ret._value + obj._value
         elif isinstance(obj, numbers.Real) and np.isnan(obj): # FIXIT: is that really working, shall ignore nan, e.g. for sum in pandas
             ret = self.__class__(self)
             self.log.info('ignoring add nan')
@@ -427,7 +447,7 @@ class Quantity:
         """
         if isinstance(obj, self.__class__):
             ret = self.__class__(self)
-            ret._value -= obj._value
+            ret._value = ret._value - obj._value
             return ret
         elif isinstance(obj, UVal):
             return self.uval - obj
@@ -459,9 +479,9 @@ class Quantity:
             2000.000 mm (Distance)
 
         """
-        if isinstance(obj, (int, float, numbers.Number)):
+        if isinstance(obj, (int, float, numbers.Number, np.ndarray)):
             ret = type(self)(self)
-            ret._value *= obj
+            ret._value = ret._value * obj
             return ret
         elif isinstance(obj, UVal):
             return UVal(self.uval) * UVal(obj)
@@ -533,9 +553,9 @@ class Quantity:
              500.000 mm (Distance)
 
         """
-        if isinstance(obj, (int, float, numbers.Number)):
+        if isinstance(obj, (int, float, numbers.Number, np.ndarray)):
             ret = type(self)(self)
-            ret._value /= obj
+            ret._value = ret._value / obj
             return ret
         elif isinstance(obj, UVal):
             return self.uval / UVal(obj)
@@ -557,7 +577,7 @@ class Quantity:
             0.5000 {m^-1}
 
         """
-        if isinstance(obj, (int, float, numbers.Number)):
+        if isinstance(obj, (int, float, numbers.Number, np.ndarray)):
             return obj / self.uval
         elif isinstance(obj, UVal):
             return UVal(obj) / self.uval
@@ -695,6 +715,47 @@ class Quantity:
     list_units = get_units  # TODO: shall that stay?
 
 
+    @classmethod
+    def iso_array(cls, value, unit=None):
+        """Quantity.iso_array(value, unit=iso)
+
+        value as numpy float array in the iso-unit, for vectorized calculations
+
+        The quantity is checked once for the whole array. value may be a
+        Quantity of this class, an UVal (also with an array as value) or an
+        array like in `unit`.
+
+            >>> ETQ.Distance.iso_array([1., 2.5], 'mm')
+            array([0.001 , 0.0025])
+            >>> ETQ.Distance.iso_array(ETQ.Distance(3., 'mm'))
+            array(0.003)
+            >>> ETQ.Distance.iso_array(ETQ.Force(3., 'N'))
+            Traceback (most recent call last):
+            ...
+            EngineeringTools.quantities.quantitiesbase.ParaDInF_quantity_ErrorQuantitiesDoNotMatch: Distance != Force
+
+        """
+        if isinstance(value, Quantity):
+            if not isinstance(value, cls):
+                raise ParaDInF_quantity_ErrorQuantitiesDoNotMatch('%s != %s' % (cls.__name__, value.get_quantity_name()))
+            return np.asarray(value.get_value(), dtype=float)
+        elif isinstance(value, UVal):
+            if unit is not None:
+                raise ParaDInF_quantity_Error('when passing UVal, unit must be None')
+            value.check_units(cls._uval_units)
+            return np.asarray(value.get_value(), dtype=float)
+        else:
+            if unit is None:
+                unit = cls._isoUnit
+            if unit not in cls._units:
+                raise ParaDInF_quantity_ErrorUnitNotFound('unit "{:s}" is not available in {}. Use: {}'.format(str(unit), cls, ', '.join(cls._units.keys())))
+            return cls._array2iso(np.asarray(value, dtype=float), unit)
+
+    @classmethod
+    def _array2iso(cls, value, unit):
+        return value * cls._units[unit]
+
+
 
     def get_unitsPreferred(self):
         """Quantity.get_unitsPreferred()
@@ -759,7 +820,12 @@ class Quantity:
         if displayUnit is None:
             displayUnit = '__AUTO__'
         if displayUnit == '__AUTO__':
-            if self._value == 0.0:
+            value = nominal(self._value)
+            if np.ndim(value) > 0:   # choose by the largest magnitude
+                finite = np.abs(np.asarray(value, dtype=float))
+                finite = finite[np.isfinite(finite)]
+                value = finite.max() if finite.size else 0.0
+            if value == 0.0:
                 t = self._displayUnitSystemList.get(Quantity._displayUnitSystem, None)
                 if t:
                     displayUnit = t.get('displayUnit', None)
@@ -768,7 +834,7 @@ class Quantity:
             else:
                 vL = []
                 for unit in self._unitsPreferred:
-                    v = abs(self.convert2unit(self._value, unit))
+                    v = abs(self.convert2unit(value, unit))
                     if (v >= 0.05) and (v < 10000.0):
                         vL.append((abs(np.log10(v/100.0)-1), unit))
                 vL.sort()
@@ -927,10 +993,7 @@ class QuantityDecimal(QuantityNumeric):
         convert value from unit to iso-unit
 
         """
-        if  typecast:
-            value = float(value)
-        else:
-            assert isinstance(value, float), 'value must be a float'
+        value = _as_float(value, typecast)
         try:
             return value * self._units[unit]
         except KeyError as reason:
@@ -944,7 +1007,7 @@ class QuantityDecimal(QuantityNumeric):
         convert value from iso-unit to unit
 
         """
-        assert isinstance(value, float), 'value must be a float'
+        assert isinstance(value, (float, np.ndarray, FirstOrder)), 'value must be a float'
         try:
             return value / self._units[unit]
         except KeyError as reason:
@@ -1002,11 +1065,21 @@ class QuantityFloat(QuantityNumeric):
     """
 
     def convert2iso(self, value, unit, typecast=False):
-        """Quantity.convert2iso(value, unit) ... convert value from unit to iso-unit"""
-        if  typecast:
-            value = float(value)
-        else:
-            assert isinstance(value, float), 'value must be a float'
+        """Quantity.convert2iso(value, unit) ... convert value from unit to iso-unit
+
+        value may be a float or an array of floats
+
+            >>> from EngineeringTools.quantities.mechanics import *
+            >>> F = Force(np.array([1., 20.]), 'kN')
+            >>> F.get_value()
+            array([ 1000., 20000.])
+            >>> print(F)
+            [1.00 20.0] kN (Force)
+            >>> print(F * np.array([2., 3.]))
+            [2.00 60.0] kN (Force)
+
+        """
+        value = _as_float(value, typecast)
         try:
             return value * self._units[unit]
         except KeyError as reason:
@@ -1016,7 +1089,7 @@ class QuantityFloat(QuantityNumeric):
 
     def convert2unit(self, value, unit):
         """Quantity.convert2unit(value, unit) ... convert value from iso-unit to unit"""
-        assert isinstance(value, float), 'value must be a float'
+        assert isinstance(value, (float, np.ndarray, FirstOrder)), 'value must be a float'
         try:
             return value / self._units[unit]
         except KeyError as reason:
@@ -1108,20 +1181,21 @@ class QuantityFloatOffset(QuantityFloat):
 
     def convert2iso(self, value, unit, typecast=False):
         """Quantity.convert2iso(value, unit) ... convert value from unit to iso-unit"""
-        if  typecast:
-            value = float(value)
-        else:
-            assert isinstance(value, float), 'value must be a float'
+        value = _as_float(value, typecast)
         try:
             return value * self._units[unit][0] + self._units[unit][1]
         except KeyError as reason:
             self.log.error('KeyError unit: %s; %s', self.get_quantity_name(), reason)
             raise reason
 
+    @classmethod
+    def _array2iso(cls, value, unit):
+        return value * cls._units[unit][0] + cls._units[unit][1]
+
 
     def convert2unit(self, value, unit):
         """Quantity.convert2unit(value, unit) ... convert value from iso-unit to unit"""
-        assert isinstance(value, float), 'value must be a float'
+        assert isinstance(value, (float, np.ndarray, FirstOrder)), 'value must be a float'
         try:
             return value / self._units[unit][0] - self._units[unit][1]
         except KeyError as reason:
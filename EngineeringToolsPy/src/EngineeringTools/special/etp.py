@@ -8,25 +8,52 @@ import os
 #import numpy as _np
 from numpy import r_
 #import scipy as _sp
+import numpy as np
 import scipy.stats as spstats
-import pandas as pd
 
 from .. import quantities as ETQ
+from ..tools import catalog as ETTcatalog
+
+
+class _CatalogFrame:
+    """class attribute: catalog as pandas.DataFrame, loaded on first access"""
+
+    def __get__(self, obj, cls):
+        return cls.catalog().to_frame()
 
 
 class ETP_OCTOPUS_O:
     filename = os.path.join(os.path.dirname(__file__), r'ETP_OCTOPUS_O.txt')
+    units = {'d':(ETQ.Distance, 'mm'), 'D':(ETQ.Distance, 'mm'), 'L':(ETQ.Distance, 'mm'), 'b':(ETQ.Distance, 'mm'),
+             'F1':(ETQ.Force, 'kN'), 'F2':(ETQ.Force, 'kN'), 'm':(ETQ.Mass, 'kg'), 'oilClearance':(ETQ.Distance, 'mm')}
+    database = _CatalogFrame()
+
+    skiprows = 3
+
+    @classmethod
+    def catalog(cls):
+        """the product catalog, parsed once per process and file version"""
+        return ETTcatalog.load_catalog(cls.filename, units=cls.units, skiprows=cls.skiprows, indexed=('d', 'D'))
+
+    @classmethod
+    def compile_catalog(cls):
+        """compile the text catalog into the binary format preferred by catalog()"""
+        return ETTcatalog.compile_catalog(cls.filename, units=cls.units, skiprows=cls.skiprows)
 
 
     def __init__(self, name=None, d=None):
 
-        database = pd.read_csv(self.filename, skiprows=3, sep=r'\s*;\s*', index_col=0, engine='python')
+        catalog = self.catalog()
         if name:
-            dataset = database.loc[name]
+            row = catalog.position(name)
         elif d:
-            dataset = database[database['d'] == d].iloc[0]
+            rows = catalog.equal('d', d)
+            if len(rows) == 0:
+                raise Exception('no product with d={}'.format(d))
+            row = rows[0]
         else:
             raise Exception()
+        dataset = catalog.to_frame([row]).iloc[0]
         self.dataset = dataset
         self.name   = dataset.name
         self.length = ETQ.Distance(dataset['L'], 'mm')
@@ -77,8 +104,7 @@ p0:             {me.p0}
 
     @classmethod
     def list_all(cls):
-        database = pd.read_csv(cls.filename, skiprows=3, sep=r'\s*;\s*', index_col=0, engine='python')
-        return database
+        return cls.catalog().to_frame()
 
     def clamp_force(self, pressure):
         pressure = ETQ.Pressure(pressure)
@@ -95,43 +121,94 @@ class ETPHydrHubShaftConnection:
     https://etp.se/sites/default/files_two/ETP-EXPRESS-PRODUCT-SHEET.pdf
     """
     filename = os.path.join(os.path.dirname(__file__), r'ETPHydrHubShaftConnection.txt')
+    units = {'d':(ETQ.Distance, 'mm'), 'D':(ETQ.Distance, 'mm'), 'D1':(ETQ.Distance, 'mm'), 'D2':(ETQ.Distance, 'mm'),
+             'L':(ETQ.Distance, 'mm'), 'L1':(ETQ.Distance, 'mm'), 'T':(ETQ.Torque, 'N.m'), 'FA':(ETQ.Force, 'kN'),
+             'FR':(ETQ.Force, 'kN'), 'R':(ETQ.Distance, 'mm'), 'N':(ETQ.Distance, 'mm'), 'Tt':(ETQ.Torque, 'N.m'),
+             'J':(ETQ.MomentOfInertiaOfMass, 'kg.m^2', 1e-3), 'm':(ETQ.Mass, 'kg')}
+    database = _CatalogFrame()
+
+    skiprows = 1
+
+    @classmethod
+    def catalog(cls):
+        """the product catalog, parsed once per process and file version"""
+        return ETTcatalog.load_catalog(cls.filename, units=cls.units, skiprows=cls.skiprows, indexed=('d', 'D', 'T'))
+
+    @classmethod
+    def compile_catalog(cls):
+        """compile the text catalog into the binary format preferred by catalog()"""
+        return ETTcatalog.compile_catalog(cls.filename, units=cls.units, skiprows=cls.skiprows)
 
     @classmethod
     def read_database(cls):
         """read the database from the file """
-        cls.database = pd.read_csv(cls.filename, skiprows=1, sep=r'\s*;\s*', index_col=0, engine='python')
+        return cls.catalog().to_frame()
 
     @classmethod
-    def search(cls, kind=None, d=None, D=None, minT=None):
-        datasets = cls.database
-        if kind:
-            datasets = datasets[datasets['kind'] == kind]
-        if d:
-            if isinstance(d, ETQ.Distance):
-                d = d.get_value('mm')
-            datasets = datasets[datasets['d'] == d]
-        if D:
-            if isinstance(D, ETQ.Distance):
-                D = D.get_value('mm')
-            datasets = datasets[datasets['D'] == D]
+    def _search_rows(cls, kind=None, d=None, D=None, minT=None):
+        """row numbers of the catalog fitting the parameters, in ascending order of T"""
+        catalog = cls.catalog()
         if minT:
-            if isinstance(minT, ETQ.Torque):
-                minT = minT.get_value('N.m')
-            datasets = datasets[datasets['T'] >= minT]
-        return datasets.sort_values( ['d', 'D','L1','m'])
+            rows = catalog.at_least('T', minT)
+        else:
+            rows = catalog.at_least('T', -float('inf'))
+        mask = np.zeros(len(catalog), dtype=bool)
+        mask[rows] = True
+        for key, value in (('d', d), ('D', D)):
+            if value:
+                selected = np.zeros(len(catalog), dtype=bool)
+                selected[catalog.equal(key, value)] = True
+                mask &= selected
+        if kind:
+            mask &= catalog.column('kind') == kind
+        return rows[mask[rows]]
+
+    @classmethod
+    def search(cls, kind=None, d=None, D=None, minT=None):
+        """products fitting the parameters
+
+        d, D: ETQ.Distance or value in mm; minT: ETQ.Torque or value in N.m
+
+        >>> ETPHydrHubShaftConnection.search(d=ETQ.Distance(40., 'mm')).index.tolist()
+        ['ETP-EXPRESS 40', 'ETP-EXPRESS R-40', 'ETP-TECHNO 40', 'ETP-POWER 40']
+        >>> ETPHydrHubShaftConnection.search(kind='ETP-EXPRESS', minT=ETQ.Torque(5000., 'N.m'))[['d', 'T']]
+                             d        T
+        name...
+        ETP-EXPRESS 70    70.0   5600.0
+        ETP-EXPRESS 80    80.0   8700.0
+        ETP-EXPRESS 90    90.0  12000.0
+        ETP-EXPRESS 100  100.0  17000.0
+        """
+        catalog = cls.catalog()
+        rows = catalog.sort_rows(cls._search_rows(kind=kind, d=d, D=D, minT=minT), ['d', 'D', 'L1', 'm'])
+        return catalog.to_frame(rows)
+
+    @classmethod
+    def smallest(cls, minT, kind=None, d=None, D=None):
+        """product with the smallest torque which still transmits minT
+
+        >>> print(ETPHydrHubShaftConnection.smallest(ETQ.Torque(1000., 'N.m'), kind='ETP-EXPRESS').name_str)
+        ETP-EXPRESS 40
+        """
+        rows = cls._search_rows(kind=kind, d=d, D=D, minT=minT)
+        if len(rows) == 0:
+            raise Exception('no product fits the parameters')
+        return cls(name=cls.catalog().names[rows[0]])
 
 
     def __init__(self, name=None, kind=None, d=None, D=None, minT=None):
 
+        catalog = self.catalog()
         if name:
-            dataset = self.database.loc[name]
+            row = catalog.position(name)
         else:
-            datasets = self.search(kind=kind, d=d, D=D, minT=minT)
-            if len(datasets) == 1:
-                dataset = datasets.iloc[0]
+            rows = self._search_rows(kind=kind, d=d, D=D, minT=minT)
+            if len(rows) == 1:
+                row = rows[0]
             else:
-                print(datasets)
+                print(catalog.to_frame(catalog.sort_rows(rows, ['d', 'D', 'L1', 'm'])))
                 raise Exception('More or less than one products fit the parameters, use search method')
+        dataset = catalog.to_frame([row]).iloc[0]
         self.dataset = dataset
         self.name_str   = dataset.name
         self.name       = ETQ.String(dataset.name)
@@ -178,9 +255,15 @@ torque:         {me.torque}
     def list_all(cls):
         """Return a list of all Hub-Shaft Connections
         """
-        return cls.database.copy()
+        return cls.database
+
+
+def compile_catalogs():
+    """compile all catalogs of this module, run this as build step of a deployment"""
+    return [cls.compile_catalog() for cls in (ETP_OCTOPUS_O, ETPHydrHubShaftConnection)]
 
 
-ETPHydrHubShaftConnection.read_database()
+def _setup_doctest():
+    ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
 
 #eof
\ No newline at end of file
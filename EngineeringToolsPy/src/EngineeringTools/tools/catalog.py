@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-module-docstring,missing-function-docstring,missing-class-docstring,no-else-return,invalid-name,multiple-statements
+"""product catalogs as typed columnar arrays
+
+A catalog file (semicolon separated text, as delivered by the manufacturers) is
+parsed once and kept in an in-process cache, one entry per file and set of load
+parameters (units, skiprows, index_col, indexed). The cache entry is invalidated
+when the modification time or the size of the file changes.
+
+`compile_catalog` writes a binary copy of a catalog next to the text file: a
+structured numpy array (`<name>.catalog.npy`, numeric columns already in ISO
+units) and a small JSON header (`<name>.catalog.json`) with the units and the
+version of the source text. `load_catalog` prefers the compiled file when it is
+up to date with the text and opens it memory mapped, so worker processes share
+the data through the page cache instead of parsing the text each.
+
+Numeric columns are stored as float arrays in ISO units, text columns as object
+arrays. Columns listed in `indexed` get a sorted index, so lookups like
+"d == 20 mm" or "T >= 500 N.m" are binary searches instead of DataFrame filters.
+
+# doctest
+# reset new format defaults for test
+>>> from EngineeringTools.quantities import qnt
+>>> qnt.FORMAT_DEFAULT['totalWidth'] = 14
+>>> qnt.FORMAT_DEFAULT['decimalPosition'] = 10
+>>> qnt.FORMAT_DEFAULT['thousands_sep'] = ' '
+
+>>> import os, tempfile
+>>> filename = os.path.join(tempfile.mkdtemp(), 'catalog.txt')
+>>> with open(filename, 'w', encoding='utf-8') as f:
+...     _ = f.write('name; d; T\\nA-10; 10; 50\\nA-20; 20; 200\\nA-30; 30; 450\\n')
+>>> cat = load_catalog(filename, units={'d':(ETQ.Distance, 'mm'), 'T':(ETQ.Torque, 'N.m')}, indexed=('d', 'T'))
+>>> len(cat)
+3
+>>> cat.column('d')
+array([0.01, 0.02, 0.03])
+>>> cat.names[cat.equal('d', ETQ.Distance(20., 'mm'))]
+array(['A-20'], dtype=object)
+>>> cat.names[cat.at_least('T', ETQ.Torque(100., 'N.m'))]
+array(['A-20', 'A-30'], dtype=object)
+>>> load_catalog(filename, units={'d':(ETQ.Distance, 'mm'), 'T':(ETQ.Torque, 'N.m')}, indexed=('d', 'T')) is cat
+True
+>>> print(cat.quantity('A-30', 'T'))
+       450     N.m (Torque)
+
+>>> compiled = compile_catalog(filename, units={'d':(ETQ.Distance, 'mm'), 'T':(ETQ.Torque, 'N.m')})
+>>> os.path.basename(compiled)
+'catalog.catalog.npy'
+>>> clear_cache()
+>>> cat = load_catalog(filename, units={'d':(ETQ.Distance, 'mm'), 'T':(ETQ.Torque, 'N.m')}, indexed=('d', 'T'))
+>>> cat.source == compiled
+True
+>>> cat.column('d')
+array([0.01, 0.02, 0.03])
+>>> cat.names[cat.at_least('T', ETQ.Torque(100., 'N.m'))]
+array(['A-20', 'A-30'], dtype=object)
+"""
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+# run doctest, workaround relative import
+if __name__ == '__main__':
+    import sys
+    import doctest # pylint: disable=import-outside-toplevel
+    module_name = 'EngineeringTools.tools.catalog'             # pylint: disable=invalid-name
+    module = __import__(module_name, fromlist=['*'], level=0)  # pylint: disable=invalid-name
+    module._setup_doctest()                                    # pylint: disable=protected-access
+    print(doctest.testmod(module, optionflags=doctest.ELLIPSIS))
+    sys.exit()
+
+import os
+import json
+import hashlib
+import logging
+import threading
+import numpy as np
+import pandas as pd
+
+from .. import quantities as ETQ
+
+__all__ = ['CatalogError', 'Catalog', 'load_catalog', 'compile_catalog', 'clear_cache']
+
+
+class CatalogError(Exception):
+    """Exception: catalog"""
+
+
+class Catalog:
+    """product catalog stored column wise in ISO units
+
+    @param names: product names (index of the catalog)
+    @param columns: dict {column name: np.ndarray}, numeric columns in ISO units
+    @param units: dict {column name: (Quantity class, unit in the source[, scale])}
+    @param indexed: names of numeric columns to build a sorted index for
+    @param source: file the catalog was loaded from
+    """
+
+    def __init__(self, names, columns, units=None, indexed=(), index_name='name', source=None):
+        self.names = np.asarray(names, dtype=object)
+        self.index_name = index_name
+        self.source = source
+        self.columns = {}
+        for key, values in columns.items():
+            values = np.asarray(values)
+            if len(values) != len(self.names):
+                raise CatalogError('column "{}" has {} rows, expected {}'.format(key, len(values), len(self.names)))
+            values.setflags(write=False)
+            self.columns[key] = values
+        self.units = dict(units) if units else {}
+        self._position = {name: i for i, name in enumerate(self.names)}
+        self._index = {}
+        self._frame = None
+        for key in indexed:
+            self._build_index(key)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return 'Catalog({} products, columns: {})'.format(len(self), ', '.join(self.columns))
+
+    def _build_index(self, key):
+        values = self.column(key)
+        if values.dtype.kind != 'f':
+            raise CatalogError('only numeric columns can be indexed: "{}"'.format(key))
+        order = np.argsort(values, kind='stable')
+        self._index[key] = (order, values[order])
+        return self._index[key]
+
+    def column(self, key):
+        """column as array, numeric columns in ISO units"""
+        try:
+            return self.columns[key]
+        except KeyError:
+            raise CatalogError('column "{}" is not available. Use: {}'.format(key, ', '.join(self.columns))) from None
+
+    def position(self, name):
+        """row number of a product"""
+        try:
+            return self._position[name]
+        except KeyError:
+            raise CatalogError('product "{}" is not in the catalog'.format(name)) from None
+
+    def to_iso(self, key, value):
+        """convert a search value to the ISO unit of a column
+
+        Quantities and UVals are converted by their own unit, plain numbers are
+        interpreted in the unit of the source file.
+        """
+        if isinstance(value, ETQ.Quantity):
+            quantity = self.units.get(key, (None,))[0]
+            if quantity is not None:
+                quantity(value)  # check quantity
+            return value.get_value()
+        elif isinstance(value, ETQ.UVal):
+            quantity = self.units.get(key, (None,))[0]
+            if quantity is not None:
+                value.check_units(quantity._uval_units)  # pylint: disable=protected-access
+            return value.get_value()
+        else:
+            return np.asarray(value, dtype=float) * self._factor(key)
+
+    def _factor(self, key):
+        unit = self.units.get(key)
+        if unit is None:
+            return 1.0
+        quantity, unitname = unit[0], unit[1]
+        scale = unit[2] if len(unit) > 2 else 1.0
+        return quantity._units[unitname] * scale  # pylint: disable=protected-access
+
+    def _sorted(self, key):
+        index = self._index.get(key)
+        if index is None:
+            index = self._build_index(key)
+        return index
+
+    def equal(self, key, value, rtol=1e-9):
+        """row numbers with column == value (within a relative tolerance), sorted by row number"""
+        order, values = self._sorted(key)
+        value = self.to_iso(key, value)
+        tol = rtol * abs(value)
+        lo = np.searchsorted(values, value - tol, side='left')
+        hi = np.searchsorted(values, value + tol, side='right')
+        return np.sort(order[lo:hi])
+
+    def at_least(self, key, value):
+        """row numbers with column >= value, in ascending order of the column"""
+        order, values = self._sorted(key)
+        lo = np.searchsorted(values, self.to_iso(key, value), side='left')
+        return order[lo:]
+
+    def at_most(self, key, value):
+        """row numbers with column <= value, in ascending order of the column"""
+        order, values = self._sorted(key)
+        hi = np.searchsorted(values, self.to_iso(key, value), side='right')
+        return order[:hi]
+
+    def sort_rows(self, rows, keys):
+        """sort row numbers by columns (first key is the primary key)"""
+        rows = np.asarray(rows, dtype=int)
+        if len(rows) == 0:
+            return rows
+        return rows[np.lexsort([self.column(k)[rows] for k in reversed(keys)])]
+
+    def value(self, name_or_row, key):
+        """value of one product in ISO units"""
+        row = name_or_row if isinstance(name_or_row, (int, np.integer)) else self.position(name_or_row)
+        value = self.column(key)[row]
+        return float(value) if isinstance(value, np.floating) else value
+
+    def quantity(self, name_or_row, key):
+        """value of one product as Quantity"""
+        unit = self.units.get(key)
+        if unit is None:
+            raise CatalogError('column "{}" has no quantity'.format(key))
+        return unit[0](self.value(name_or_row, key), unit[0]._isoUnit)  # pylint: disable=protected-access
+
+    def to_frame(self, rows=None):
+        """catalog as pandas.DataFrame in the units of the source file"""
+        if self._frame is None:
+            data = {}
+            for key, values in self.columns.items():
+                data[key] = values / self._factor(key) if values.dtype.kind == 'f' else values
+            self._frame = pd.DataFrame(data, index=pd.Index(self.names, name=self.index_name))
+        if rows is None:
+            return self._frame.copy()
+        return self._frame.iloc[np.asarray(rows, dtype=int)].copy()
+
+
+################################################################################
+# loading and cache
+################################################################################
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _stamp(filename):
+    stat = os.stat(filename)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _parse_text(filename, units, skiprows, index_col, indexed):
+    """parse a semicolon separated catalog file (decimal point or decimal comma)"""
+    logging.debug('parsing catalog "%s"', filename)
+    df = pd.read_csv(filename, skiprows=skiprows, sep=';', skipinitialspace=True, encoding='utf-8', dtype=str)
+    df.rename(columns=str.strip, inplace=True)
+    index_name = df.columns[index_col]
+    names = df[index_name].str.strip().to_numpy(dtype=object)
+    columns = {}
+    for key in df.columns:
+        if key == index_name:
+            continue
+        text = df[key].str.strip()
+        try:
+            values = pd.to_numeric(text.str.replace(',', '.', regex=False)).to_numpy(dtype=float)  # some data sheets use a decimal comma
+        except (ValueError, TypeError):
+            if key in units:
+                raise CatalogError('column "{}" of "{}" is not numeric'.format(key, filename)) from None
+            columns[key] = text.fillna('').to_numpy(dtype=object)
+            continue
+        unit = units.get(key)
+        if unit is not None:
+            scale = unit[2] if len(unit) > 2 else 1.0
+            values = values * (unit[0]._units[unit[1]] * scale)  # pylint: disable=protected-access
+        columns[key] = values
+    return Catalog(names, columns, units=units, indexed=indexed, index_name=index_name, source=filename)
+
+
+################################################################################
+# compiled catalogs
+################################################################################
+_COMPILED_FORMAT = 1
+
+
+def _compiled_filenames(filename):
+    base = os.path.splitext(filename)[0]
+    return base + '.catalog.npy', base + '.catalog.json'
+
+
+def _sha256(filename):
+    with open(filename, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _units_header(units):
+    return {key: [unit[0].__name__, unit[1], unit[2] if len(unit) > 2 else 1.0] for key, unit in sorted(units.items())}
+
+
+def _cache_key(filename, units, skiprows, index_col, indexed):
+    """a catalog is cached per file and load parameters"""
+    units = tuple((key, unit[0], unit[1], unit[2] if len(unit) > 2 else 1.0) for key, unit in sorted(units.items()))
+    return (filename, units, skiprows, index_col, tuple(indexed))
+
+
+def _replace_atomic(filename, write):
+    """write to a temporary file and rename it, readers never see a partial file"""
+    tmpname = '{}.{}.tmp'.format(filename, os.getpid())
+    try:
+        write(tmpname)
+        os.replace(tmpname, filename)
+    finally:
+        if os.path.exists(tmpname):
+            os.remove(tmpname)
+
+
+def compile_catalog(filename, units=None, skiprows=0, index_col=0):
+    """compile a text catalog into the binary format preferred by load_catalog
+
+    The parameters are the ones of load_catalog. The compiled file is only used
+    by load_catalog for the same units, skiprows and index_col.
+
+    @return: filename of the compiled catalog
+    """
+    filename = os.path.abspath(filename)
+    units = units or {}
+    stamp = _stamp(filename)
+    catalog = _parse_text(filename, units, skiprows, index_col, ())
+    fields = [(catalog.index_name, np.asarray(catalog.names, dtype=str).dtype)]
+    for key, values in catalog.columns.items():
+        fields.append((key, np.dtype(float) if values.dtype.kind == 'f' else np.asarray(values, dtype=str).dtype))
+    data = np.zeros(len(catalog), dtype=[(key, dtype if dtype.itemsize else np.dtype('U1')) for key, dtype in fields])
+    data[catalog.index_name] = catalog.names
+    for key, values in catalog.columns.items():
+        data[key] = values
+    header = {'format': _COMPILED_FORMAT,
+              'source': os.path.basename(filename),
+              'stamp': list(stamp),
+              'sha256': _sha256(filename),
+              'index_name': catalog.index_name,
+              'skiprows': skiprows,
+              'index_col': index_col,
+              'text_columns': [key for key, values in catalog.columns.items() if values.dtype.kind != 'f'],
+              'units': _units_header(units)}
+    npyname, jsonname = _compiled_filenames(filename)
+    def write_data(name):
+        with open(name, 'wb') as f:
+            np.save(f, data, allow_pickle=False)
+    def write_header(name):
+        with open(name, 'w', encoding='utf-8') as f:
+            json.dump(header, f, indent=1)
+    _replace_atomic(npyname, write_data)
+    _replace_atomic(jsonname, write_header)
+    logging.info('compiled catalog "%s" -> "%s"', filename, npyname)
+    return npyname
+
+
+def _load_compiled(filename, units, skiprows, index_col, stamp, indexed):
+    """compiled catalog if it is up to date with the text file, otherwise None"""
+    npyname, jsonname = _compiled_filenames(filename)
+    if not os.path.exists(jsonname):
+        return None
+    try:
+        with open(jsonname, encoding='utf-8') as f:
+            header = json.load(f)
+        if header.get('format') != _COMPILED_FORMAT or header.get('units') != _units_header(units):
+            return None
+        if header.get('skiprows') != skiprows or header.get('index_col') != index_col:
+            return None
+        # a copied file gets a new modification time, then the content decides
+        if header['stamp'] != list(stamp) and (header['stamp'][1] != stamp[1] or header['sha256'] != _sha256(filename)):
+            logging.debug('compiled catalog "%s" is out of date', npyname)
+            return None
+        data = np.load(npyname, mmap_mode='r', allow_pickle=False)
+        index_name = header['index_name']
+        text_columns = set(header['text_columns'])
+        columns = {}
+        for key in data.dtype.names:
+            if key == index_name:
+                continue
+            columns[key] = data[key].astype(object) if key in text_columns else data[key]
+        return Catalog(data[index_name].astype(object), columns, units=units, indexed=indexed, index_name=index_name, source=npyname)
+    except (OSError, ValueError, KeyError) as err:
+        logging.warning('compiled catalog "%s" not usable: %s', npyname, err)
+        return None
+
+
+def load_catalog(filename, units=None, skiprows=0, index_col=0, indexed=(), compiled=True):
+    """load a catalog file, parsed only once per process, file version and set of parameters
+
+    @param filename: semicolon separated text file, first non-skipped row is the header
+    @param units: dict {column: (Quantity class, unit[, scale])}, numeric columns without unit are kept as they are
+    @param skiprows: lines to skip before the header
+    @param index_col: column holding the product names
+    @param indexed: columns to build a sorted index for
+    @param compiled: use the compiled catalog (see compile_catalog) if it is up to date
+    """
+    filename = os.path.abspath(filename)
+    units = units or {}
+    stamp = _stamp(filename)
+    key = _cache_key(filename, units, skiprows, index_col, indexed)
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+    catalog = _load_compiled(filename, units, skiprows, index_col, stamp, tuple(indexed)) if compiled else None
+    if catalog is None:
+        catalog = _parse_text(filename, units, skiprows, index_col, tuple(indexed))
+    with _cache_lock:
+        _cache[key] = (stamp, catalog)
+    return catalog
+
+
+def clear_cache():
+    """drop all cached catalogs"""
+    with _cache_lock:
+        _cache.clear()
+
+
+################################################################################
+# test
+################################################################################
+def _setup_doctest():
+    ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+#eof
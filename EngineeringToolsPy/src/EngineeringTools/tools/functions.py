@@ -32,6 +32,7 @@ if __name__ == '__main__':
 from fractions import Fraction
 import numpy as _np
 from .. import quantities as ETQ
+from ..firstorder import FirstOrder
 
 ################################################################################
 #  exceptions
@@ -72,7 +73,7 @@ def sin(angle):
     EngineeringTools.tools.functions.EngineeringTools_tools_Error_units: wrong type : <class 'EngineeringTools.quantities.mechanics.Distance'>
 
     """
-    if isinstance(angle, float):
+    if isinstance(angle, (float, _np.ndarray, FirstOrder)):
         return _np.sin(angle)
     elif isinstance(angle, ETQ.UVal):
         angle.check_units({})
@@ -104,7 +105,7 @@ def arcsin(scalar):
     EngineeringTools.tools.functions.EngineeringTools_tools_Error_units: wrong type : <class 'EngineeringTools.quantities.mechanics.Distance'>
 
     """
-    if isinstance(scalar, float):
+    if isinstance(scalar, (float, _np.ndarray, FirstOrder)):
         return _np.arcsin(scalar)
     elif isinstance(scalar, ETQ.UVal):
         scalar.check_units({})
@@ -138,7 +139,7 @@ def cos(angle):
     EngineeringTools.tools.functions.EngineeringTools_tools_Error_units: wrong type : <class 'EngineeringTools.quantities.mechanics.Distance'>
 
     """
-    if isinstance(angle, float):
+    if isinstance(angle, (float, _np.ndarray, FirstOrder)):
         return _np.cos(angle)
     elif isinstance(angle, ETQ.UVal):
         angle.check_units({})
@@ -170,7 +171,7 @@ def arccos(scalar):
     EngineeringTools.tools.functions.EngineeringTools_tools_Error_units: wrong type : <class 'EngineeringTools.quantities.mechanics.Distance'>
 
     """
-    if isinstance(scalar, float):
+    if isinstance(scalar, (float, _np.ndarray, FirstOrder)):
         return _np.arccos(scalar)
     elif isinstance(scalar, ETQ.UVal):
         scalar.check_units({})
@@ -204,7 +205,7 @@ def tan(angle):
     EngineeringTools.tools.functions.EngineeringTools_tools_Error_units: wrong type : <class 'EngineeringTools.quantities.mechanics.Distance'>
 
     """
-    if isinstance(angle, float):
+    if isinstance(angle, (float, _np.ndarray, FirstOrder)):
         return _np.tan(angle)
     elif isinstance(angle, ETQ.UVal):
         angle.check_units({})
@@ -234,7 +235,7 @@ def atan(scalar):
     EngineeringTools.tools.functions.EngineeringTools_tools_Error_units: wrong type : <class 'EngineeringTools.quantities.mechanics.Distance'>
 
     """
-    if isinstance(scalar, float):
+    if isinstance(scalar, (float, _np.ndarray, FirstOrder)):
         return _np.arctan(scalar)
     elif isinstance(scalar, ETQ.UVal):
         scalar.check_units({})
@@ -260,7 +261,7 @@ def atan2(y, x):
     30.0...
 
     """
-    if isinstance(y, float) and isinstance(x, float):
+    if isinstance(y, (float, _np.ndarray, FirstOrder)) and isinstance(x, (float, _np.ndarray, FirstOrder)):
         return _np.arctan2(y, x)
     elif isinstance(y, ETQ.UVal) and isinstance(x, ETQ.UVal):
         y.check_units(x)
@@ -284,7 +285,7 @@ def sqrt(uvalue):
     """
     if isinstance(uvalue, ETQ.UVal):
         return pow(uvalue, (1, 2))
-    elif  isinstance(uvalue, (float, int)):
+    elif  isinstance(uvalue, (float, int, _np.ndarray, FirstOrder)):
         return uvalue**(1.0/2.0)
     elif isinstance(uvalue, ETQ.Quantity):
         return pow(uvalue.uval, (1, 2))
@@ -312,7 +313,7 @@ def log10(scalar):
     """
     if isinstance(scalar, int):
         scalar = float(scalar)
-    if isinstance(scalar, float):
+    if isinstance(scalar, (float, _np.ndarray, FirstOrder)):
         return _np.log10(scalar)
     elif isinstance(scalar, ETQ.UVal):
         scalar.check_units({})
@@ -326,7 +327,7 @@ def log(scalar):
     """
     if isinstance(scalar, int):
         scalar = float(scalar)
-    if isinstance(scalar, float):
+    if isinstance(scalar, (float, _np.ndarray, FirstOrder)):
         return _np.log(scalar)
     elif isinstance(scalar, ETQ.UVal):
         scalar.check_units({})
@@ -340,7 +341,7 @@ def exp(scalar):
     """
     if isinstance(scalar, int):
         scalar = float(scalar)
-    if isinstance(scalar, float):
+    if isinstance(scalar, (float, _np.ndarray, FirstOrder)):
         return _np.exp(scalar)
     elif isinstance(scalar, ETQ.UVal):
         scalar.check_units({})
@@ -360,7 +361,7 @@ def power(value, exp):
     if isinstance(exp, int):
         exp = float(exp)
 
-    if isinstance(value, (float, int)) and isinstance(exp, float):
+    if isinstance(value, (float, int, _np.ndarray, FirstOrder)) and isinstance(exp, float):
         return _np.power(value, exp)
     elif isinstance(value, ETQ.UVal) and isinstance(exp, float):
         units = {k:v*exp for k,v in value._units.items()}
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-module-docstring,missing-function-docstring,missing-class-docstring,no-else-return,invalid-name
+"""frequency and step response of linear time invariant systems
+
+A L{TransferFunction} is given by the coefficients of the numerator and
+denominator polynomials in s (highest power first). Every coefficient may be
+an array over operating points, e.g. the gains of a
+L{fluidpower_eng.hydraulicServoSystem.GainTable}: all operating points are
+evaluated at once, the results have the shape (frequencies or times,) +
+operating points.
+ - L{TransferFunction.freqresp}, L{TransferFunction.bode}: G(j omega) by the Horner scheme in complex numpy arithmetic
+ - L{TransferFunction.step}: exact discretization (zero order hold) of the controllable canonical form, one matrix exponential per operating point
+
+# doctest
+# reset new format defaults for test
+>>> from EngineeringTools.quantities import qnt
+>>> qnt.FORMAT_DEFAULT['totalWidth'] = 14
+>>> qnt.FORMAT_DEFAULT['decimalPosition'] = 10
+>>> qnt.FORMAT_DEFAULT['thousands_sep'] = ' '
+
+second order system at the natural frequency for several damping ratios
+
+>>> G = second_order(1., ETQ.Frequency(10., 'Hz'), np.array([0.1, 0.5, 1.]))
+>>> G.shape
+(3,)
+>>> mag, phase = G.bode(ETQ.Frequency(np.array([1., 10.]), 'Hz'))
+>>> print(np.round(mag, 2).tolist())
+[[0.09, 0.04, -0.09], [13.98, 0.0, -6.02]]
+>>> print(np.round(phase[1], 1).tolist())
+[-90.0, -90.0, -90.0]
+
+overshoot of the step response
+
+>>> t = np.linspace(0., 0.2, 2001)
+>>> y = G.step(t)
+>>> print(np.round(np.maximum(y.max(axis=0) - 1., 0.), 3).tolist())
+[0.729, 0.163, 0.0]
+"""
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+
+# run doctest, workaround relative import
+if __name__ == '__main__':
+    import sys
+    import doctest # pylint: disable=import-outside-toplevel
+    module_name = 'EngineeringTools.tools.lti'                 # pylint: disable=invalid-name
+    module = __import__(module_name, fromlist=['*'], level=0)  # pylint: disable=invalid-name
+    module._setup_doctest()                                    # pylint: disable=protected-access
+    print(doctest.testmod(module, optionflags=doctest.ELLIPSIS))
+    sys.exit()
+
+import numpy as np
+import scipy.linalg
+
+from .. import quantities as ETQ
+from ..uval import UVal
+
+__all__ = ['LTIError', 'TransferFunction', 'second_order', 'angular_frequency']
+
+
+class LTIError(Exception):
+    """Exception: linear time invariant systems"""
+
+
+def _value(x):
+    """number or array of x in iso units"""
+    if isinstance(x, ETQ.Quantity):
+        return x.get_value()
+    elif isinstance(x, UVal):
+        return x.get_value()
+    return x
+
+
+def angular_frequency(omega):
+    """angular frequencies in rad/s as array
+
+    @param omega: ETQ.Frequency (in Hz, multiplied by 2 pi), ETQ.VelocityAngular, UVal 1/s or floats in rad/s
+    """
+    if isinstance(omega, ETQ.Frequency):
+        return 2. * np.pi * np.asarray(omega.get_value(), dtype=float)
+    return np.asarray(_value(omega), dtype=float)
+
+
+class TransferFunction:
+    """transfer function G(s) = num(s) / den(s)
+
+    @param num, den: sequences of coefficients, highest power first; each
+        coefficient is a float, quantity, UVal (iso value is used) or an array
+        over operating points, all arrays broadcast to a common shape
+
+    >>> G = TransferFunction([2.], [1., 1.])
+    >>> print(G.freqresp(np.array([0., 1.])).round(3).tolist())
+    [(2+0j), (1-1j)]
+    """
+
+    def __init__(self, num, den):
+        num = [np.asarray(_value(c), dtype=float) for c in num]
+        den = [np.asarray(_value(c), dtype=float) for c in den]
+        if not num or not den:
+            raise LTIError('numerator and denominator need at least one coefficient')
+        shape = np.broadcast_shapes(*(c.shape for c in num + den))
+        self.num = np.stack([np.broadcast_to(c, shape) for c in num])
+        self.den = np.stack([np.broadcast_to(c, shape) for c in den])
+        if np.any(self.den[0] == 0.):
+            raise LTIError('leading coefficient of the denominator is zero')
+
+    @property
+    def shape(self):
+        """shape of the operating points"""
+        return self.num.shape[1:]
+
+    @property
+    def order(self):
+        """degree of the denominator"""
+        return len(self.den) - 1
+
+    def __repr__(self):
+        return 'TransferFunction(order={}, shape={})'.format(self.order, self.shape)
+
+    def __mul__(self, other):
+        """series connection"""
+        if not isinstance(other, TransferFunction):
+            other = TransferFunction([other], [1.])
+        return TransferFunction(_polymul(self.num, other.num), _polymul(self.den, other.den))
+
+    __rmul__ = __mul__
+
+    def evaluate(self, s):
+        """G(s) for complex s
+
+        @return: complex array of the shape s.shape + operating points
+        """
+        s = np.asarray(s, dtype=complex)
+        s = s.reshape(s.shape + (1,) * len(self.shape))
+        return _horner(self.num, s) / _horner(self.den, s)
+
+    def freqresp(self, omega):
+        """frequency response G(j omega)
+
+        @param omega: see L{angular_frequency}
+        @return: complex array (frequencies,) + operating points
+        """
+        return self.evaluate(1j * np.atleast_1d(angular_frequency(omega)))
+
+    def bode(self, omega):
+        """magnitude in dB and phase in degree (unwrapped along the frequencies)
+
+        @param omega: see L{angular_frequency}
+        @return: (magnitude, phase), arrays (frequencies,) + operating points
+        """
+        G = self.freqresp(omega)
+        with np.errstate(divide='ignore'):
+            magnitude = 20. * np.log10(np.abs(G))
+        return magnitude, np.degrees(np.unwrap(np.angle(G), axis=0))
+
+    def poles(self):
+        """roots of the denominator, complex array operating points + (order,)"""
+        if self.order == 0:
+            return np.zeros(self.shape + (0,), dtype=complex)
+        A, _, _, _ = self._statespace()
+        return np.linalg.eigvals(A).reshape(self.shape + (self.order,))
+
+    def _statespace(self):
+        """controllable canonical form, operating points flattened: A (M, n, n), B (n,), C (M, n), D (M,)"""
+        n = self.order
+        den = self.den.reshape(n + 1, -1)
+        num = self.num.reshape(len(self.num), -1)
+        if len(num) > n + 1:
+            raise LTIError('transfer function is not proper: degree of the numerator {} > {}'.format(len(num) - 1, n))
+        num = np.concatenate([np.zeros((n + 1 - len(num), num.shape[1])), num]) / den[0]
+        den = den / den[0]
+        M = den.shape[1]
+        A = np.zeros((M, n, n))
+        B = np.zeros(n)
+        if n:
+            A[:, 0, :] = -den[1:].T
+            A[:, np.arange(1, n), np.arange(n - 1)] = 1.
+            B[0] = 1.
+        D = num[0]
+        C = (num[1:] - den[1:] * D).T
+        return A, B, C, D
+
+    def step(self, t):
+        """unit step response y(t), zero initial state
+
+        @param t: equally spaced times starting at 0 (array or ETQ.Time)
+        @return: array (times,) + operating points
+        """
+        t = np.atleast_1d(np.asarray(_value(t), dtype=float))
+        A, B, C, D = self._statespace()
+        n, M = self.order, len(D)
+        y = np.empty((len(t), M))
+        if n == 0 or len(t) < 2:
+            y[:] = D
+            return y.reshape((len(t),) + self.shape)
+        dt = t[1] - t[0]
+        if dt <= 0. or not np.allclose(np.diff(t), dt, rtol=1e-9, atol=0.):
+            raise LTIError('times must be equally spaced and ascending')
+        augmented = np.zeros((M, n + 1, n + 1))
+        augmented[:, :n, :n] = A * dt
+        augmented[:, :n, n] = B * dt
+        E = scipy.linalg.expm(augmented)
+        Ad, Bd = E[:, :n, :n], E[:, :n, n]
+        x = np.zeros((M, n))
+        for k in range(len(t)):
+            y[k] = np.einsum('mi,mi->m', C, x) + D
+            x = np.einsum('mij,mj->mi', Ad, x) + Bd
+        return y.reshape((len(t),) + self.shape)
+
+
+def _horner(coefficients, s):
+    result = np.broadcast_to(coefficients[0], s.shape[:1] + coefficients.shape[1:]).astype(complex)
+    for c in coefficients[1:]:
+        result = result * s + c
+    return result
+
+
+def _polymul(a, b):
+    """product of polynomials with coefficients along axis 0"""
+    shape = np.broadcast_shapes(a.shape[1:], b.shape[1:])
+    result = np.zeros((len(a) + len(b) - 1,) + shape)
+    for i, c in enumerate(a):
+        result[i:i + len(b)] += c * b
+    return list(result)
+
+
+def second_order(gain, omega, damping):
+    """G(s) = gain omega**2 / (s**2 + 2 damping omega s + omega**2)
+
+    @param omega: natural frequency, see L{angular_frequency}
+    """
+    omega = angular_frequency(omega)
+    gain = np.asarray(_value(gain), dtype=float)
+    damping = np.asarray(_value(damping), dtype=float)
+    return TransferFunction([gain * omega**2], [1., 2. * damping * omega, omega**2])
+
+
+################################################################################
+# test
+################################################################################
+def _setup_doctest():
+    ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+# eof
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-module-docstring,missing-function-docstring,missing-class-docstring,no-else-return,invalid-name
+"""Monte-Carlo tolerance analysis
+
+The uncertain inputs are described by distributions (L{Normal}, L{Uniform},
+L{Triangular}). All samples of an input are drawn at once into one array
+valued quantity, the model, written with the usual quantities and UVal
+formulas, is evaluated once for all samples. The result gives percentiles,
+failure probabilities and a sensitivity ranking (Spearman rank correlation).
+
+# doctest
+# reset new format defaults for test
+>>> from EngineeringTools.quantities import qnt
+>>> qnt.FORMAT_DEFAULT['totalWidth'] = 14
+>>> qnt.FORMAT_DEFAULT['decimalPosition'] = 10
+>>> qnt.FORMAT_DEFAULT['thousands_sep'] = ' '
+
+safety against buckling of a round bar, scatter of Young's modulus, diameter and load
+
+>>> from EngineeringTools.mechanical_eng import buckling
+>>> def safety(E, D, load):
+...     I = np.pi / 64. * D**4
+...     return buckling.buckling_euler(ETQ.Distance(1., 'm'), 'both ends pinned', I, youngs_modulus=E) / load
+>>> inputs = {'E':Normal(ETQ.Stress(210e3, 'N/mm^2'), ETQ.Stress(5e3, 'N/mm^2')),
+...           'D':Uniform(ETQ.Distance(19.9, 'mm'), ETQ.Distance(20.1, 'mm')),
+...           'load':Normal(ETQ.Force(10., 'kN'), ETQ.Force(1.5, 'kN'))}
+>>> res = monte_carlo(safety, inputs, n=100000, seed=1)
+>>> print(res.percentile('out', 50))
+1.6... {}
+>>> round(res.failure_probability('out', 1.2), 4)
+0.0102
+>>> [name for name, rho in res.sensitivity('out')]
+['load', 'E', 'D']
+"""
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+
+# run doctest, workaround relative import
+if __name__ == '__main__':
+    import sys
+    import doctest # pylint: disable=import-outside-toplevel
+    module_name = 'EngineeringTools.tools.montecarlo'          # pylint: disable=invalid-name
+    module = __import__(module_name, fromlist=['*'], level=0)  # pylint: disable=invalid-name
+    module._setup_doctest()                                    # pylint: disable=protected-access
+    print(doctest.testmod(module, optionflags=doctest.ELLIPSIS))
+    sys.exit()
+
+import numpy as np
+
+from .. import quantities as ETQ
+from ..uval import UVal
+
+__all__ = ['MonteCarloError', 'Normal', 'Uniform', 'Triangular', 'monte_carlo', 'MonteCarloResult']
+
+
+class MonteCarloError(Exception):
+    """Exception: Monte-Carlo analysis"""
+
+
+def _iso(value, quantity):
+    """value in iso units, quantity: class of the distribution (None for plain numbers)"""
+    if quantity is None:
+        return float(value)
+    return float(quantity.iso_array(value))
+
+
+class Distribution:
+    """distribution of an uncertain input
+
+    The parameters are quantities of one class (or plain numbers), samples are
+    returned as an array valued quantity of this class.
+    """
+
+    def __init__(self, reference):
+        self.quantity = type(reference) if isinstance(reference, ETQ.Quantity) else None
+        self.displayUnit = reference.get_displayUnit() if isinstance(reference, ETQ.Quantity) else None
+
+    def _sample_iso(self, rng, n):
+        raise NotImplementedError
+
+    def sample(self, rng, n):
+        """n samples as array valued quantity"""
+        return self.wrap(self._sample_iso(rng, n))
+
+    def wrap(self, values):
+        if self.quantity is None:
+            return values
+        return self.quantity(values, self.quantity._isoUnit, displayUnit=self.displayUnit)  # pylint: disable=protected-access
+
+
+class Normal(Distribution):
+    """normal distribution with mean and standard deviation (a tolerance +-t is roughly std = t/3)"""
+
+    def __init__(self, mean, std):
+        super().__init__(mean)
+        self.mean = _iso(mean, self.quantity)
+        self.std = _iso(std, self.quantity)
+
+    def _sample_iso(self, rng, n):
+        return rng.normal(self.mean, self.std, n)
+
+
+class Uniform(Distribution):
+    """uniform distribution between low and high, e.g. a tolerance field"""
+
+    def __init__(self, low, high):
+        super().__init__(low)
+        self.low = _iso(low, self.quantity)
+        self.high = _iso(high, self.quantity)
+        if self.high < self.low:
+            raise MonteCarloError('high < low')
+
+    def _sample_iso(self, rng, n):
+        return rng.uniform(self.low, self.high, n)
+
+
+class Triangular(Distribution):
+    """triangular distribution between low and high with the most likely value mode"""
+
+    def __init__(self, low, mode, high):
+        super().__init__(mode)
+        self.low = _iso(low, self.quantity)
+        self.mode = _iso(mode, self.quantity)
+        self.high = _iso(high, self.quantity)
+        if not self.low <= self.mode <= self.high:
+            raise MonteCarloError('low <= mode <= high is required')
+
+    def _sample_iso(self, rng, n):
+        return rng.triangular(self.low, self.mode, self.high, n)
+
+
+def _unwrap(value):
+    """model output as (iso array, kind) with kind: Quantity class, UVal units or None"""
+    if isinstance(value, ETQ.Quantity):
+        return np.asarray(value.get_value(), dtype=float), (type(value), value.get_displayUnit())
+    elif isinstance(value, UVal):
+        return np.asarray(value.get_value(), dtype=float), value.get_uval_units()
+    return np.asarray(value, dtype=float), None
+
+
+def monte_carlo(model, inputs, n=100000, seed=None, chunksize=None):
+    """evaluate model for n samples of the inputs in one vectorized pass
+
+    @param model: callable(**inputs) -> output or dict {name: output}; an output is a quantity, an UVal or a number,
+                  the inputs are array valued quantities
+    @param inputs: dict {name: Distribution or fixed value}
+    @param n: number of samples
+    @param seed: seed for numpy SeedSequence, the same seed gives the same result
+    @param chunksize: evaluate in chunks of this many samples to limit the memory, the result does not depend on it
+    @return: L{MonteCarloResult}, a single output is named 'out'
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed))
+    distributions = {name:value for name, value in inputs.items() if isinstance(value, Distribution)}
+    samples = {name:distribution._sample_iso(rng, n) for name, distribution in distributions.items()}  # pylint: disable=protected-access
+    chunksize = n if chunksize is None else chunksize
+    outputs, kinds = {}, {}
+    for start in range(0, n, chunksize):
+        stop = min(start + chunksize, n)
+        kwargs = dict(inputs)
+        kwargs.update({name:distributions[name].wrap(values[start:stop]) for name, values in samples.items()})
+        result = model(**kwargs)
+        if not isinstance(result, dict):
+            result = {'out':result}
+        for name, value in result.items():
+            values, kind = _unwrap(value)
+            outputs.setdefault(name, np.empty(n))[start:stop] = np.broadcast_to(values, (stop - start,))
+            kinds[name] = kind
+    return MonteCarloResult(samples, outputs, kinds)
+
+
+class MonteCarloResult:
+    """samples of the inputs and outputs of a Monte-Carlo analysis, in iso units"""
+
+    def __init__(self, inputs, outputs, kinds):
+        self.inputs = inputs
+        self.outputs = outputs
+        self._kinds = kinds
+
+    def __len__(self):
+        return len(next(iter(self.outputs.values())))
+
+    def __repr__(self):
+        return 'MonteCarloResult({} samples, inputs: {}, outputs: {})'.format(len(self), ', '.join(self.inputs), ', '.join(self.outputs))
+
+    def _wrap(self, name, value):
+        kind = self._kinds[name]
+        if kind is None:
+            return value
+        elif isinstance(kind, tuple):
+            quantity, displayUnit = kind
+            return quantity(value, quantity._isoUnit, displayUnit=displayUnit)  # pylint: disable=protected-access
+        return UVal(value, kind)
+
+    def _limit_iso(self, name, limit):
+        kind = self._kinds[name]
+        if isinstance(limit, ETQ.Quantity) and isinstance(kind, tuple):
+            return kind[0].iso_array(limit)
+        if isinstance(limit, (ETQ.Quantity, UVal)):
+            limit = limit.uval if isinstance(limit, ETQ.Quantity) else limit
+            limit.check_units(kind if isinstance(kind, dict) else {})
+            return limit.get_value()
+        if isinstance(kind, dict):
+            UVal(limit, {}).check_units(kind)
+        return limit
+
+    def values(self, name):
+        """all samples of an output as quantity (or UVal)"""
+        return self._wrap(name, self.outputs[name])
+
+    def mean(self, name):
+        return self._wrap(name, float(np.nanmean(self.outputs[name])))
+
+    def std(self, name):
+        return self._wrap(name, float(np.nanstd(self.outputs[name])))
+
+    def percentile(self, name, q):
+        """percentile(s) q (0...100) of an output, invalid (NaN) samples are ignored"""
+        return self._wrap(name, np.nanpercentile(self.outputs[name], q))
+
+    def failure_probability(self, name, limit, below=True):
+        """fraction of the samples with output below (or above) limit; invalid (NaN) samples count as failed
+
+        The standard error of the estimate is sqrt(p*(1-p)/n).
+        """
+        values = self.outputs[name]
+        limit = self._limit_iso(name, limit)
+        with np.errstate(invalid='ignore'):
+            ok = values >= limit if below else values <= limit
+        return 1. - float(np.count_nonzero(ok)) / len(values)
+
+    def sensitivity(self, name):
+        """Spearman rank correlation of each input with the output, sorted by magnitude
+
+        @return: list of (input name, rank correlation)
+        """
+        valid = np.isfinite(self.outputs[name])
+        out = _ranks(self.outputs[name][valid])
+        rho = [(key, float(np.corrcoef(_ranks(values[valid]), out)[0, 1])) for key, values in self.inputs.items()]
+        return sorted(rho, key=lambda item: -abs(item[1]))
+
+
+def _ranks(values):
+    ranks = np.empty(len(values))
+    ranks[np.argsort(values, kind='stable')] = np.arange(len(values))
+    return ranks
+
+
+################################################################################
+# test
+################################################################################
+def _setup_doctest():
+    ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+# eof
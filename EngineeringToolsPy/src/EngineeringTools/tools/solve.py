@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-module-docstring,missing-function-docstring,missing-class-docstring,no-else-return,invalid-name
+"""unit aware root finding for design problems
+
+L{solve} varies one input of a calculation between bounds (quantities in any
+unit) until the output equals a target quantity. Arrays of targets (or
+bounds) are solved at once: all cases iterate in lock-step, every iteration is
+one call of the calculation with array valued quantities. Methods:
+ - 'brent': bracketing with inverse quadratic interpolation, secant and bisection (Brent)
+ - 'newton': Newton steps with exact derivatives (L{autodiff}), safeguarded by bisection within the bracket (rtsafe)
+L{solve_input} does the same for an input of a calculator class, e.g. the
+diameter of a L{mechanical_eng.buckling.Buckling}.
+
+# doctest
+# reset new format defaults for test
+>>> from EngineeringTools.quantities import qnt
+>>> qnt.FORMAT_DEFAULT['totalWidth'] = 14
+>>> qnt.FORMAT_DEFAULT['decimalPosition'] = 10
+>>> qnt.FORMAT_DEFAULT['thousands_sep'] = ' '
+
+orifice area for several flows at a pressure drop of 35 bar
+
+>>> from EngineeringTools.fluidpower_eng.orifice import OrificeTurbulent
+>>> flow = lambda A: OrificeTurbulent(A=A).flow(pressure_drop=ETQ.Pressure(35., 'bar'))
+>>> sol = solve(flow, ETQ.Flowrate(np.array([10., 20., 40.]), 'Liter/min'), ETQ.Area(0.1, 'mm^2'), ETQ.Area(100., 'mm^2'))
+>>> print(np.round(sol.x.get_value('mm^2'), 3).tolist(), sol.converged.all())
+[2.805, 5.61, 11.22] True
+
+diameter of a round bar against buckling, the Buckling calculator works on single values only
+
+>>> from EngineeringTools.mechanical_eng import buckling as ETMbuckling
+>>> from EngineeringTools.mechanical_eng import beamsection as ETMbeamsection
+>>> from EngineeringTools.mechanical_eng import material as ETMmaterial
+>>> def bar(D):
+...     calc = ETMbuckling.Buckling()
+...     calc.material = ETMmaterial.Steel_S355JR()
+...     calc.endcondition = 'one end fixed, one pinned'
+...     calc.length = ETQ.Distance(2., 'm')
+...     calc.beamSection = ETMbeamsection.BeamSection_Pipe(D=D)
+...     return calc
+>>> sol = solve_input(bar, 'D', ETQ.Distance(10., 'mm'), ETQ.Distance(60., 'mm'), 'forcePermitted', ETQ.Force(np.array([10., 25.]), 'kN'), vectorized=False)
+>>> print(np.round(sol.x.get_value('mm'), 3).tolist())
+[32.766, 41.201]
+"""
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+
+# run doctest, workaround relative import
+if __name__ == '__main__':
+    import sys
+    import doctest # pylint: disable=import-outside-toplevel
+    module_name = 'EngineeringTools.tools.solve'               # pylint: disable=invalid-name
+    module = __import__(module_name, fromlist=['*'], level=0)  # pylint: disable=invalid-name
+    module._setup_doctest()                                    # pylint: disable=protected-access
+    print(doctest.testmod(module, optionflags=doctest.ELLIPSIS))
+    sys.exit()
+
+import numpy as np
+
+from .. import quantities as ETQ
+from ..uval import UVal
+from .. import autodiff
+
+__all__ = ['SolveError', 'Solution', 'solve', 'solve_input']
+
+_EPS = np.finfo(float).eps
+
+
+class SolveError(Exception):
+    """Exception: root finding"""
+
+
+class Solution:
+    """result of L{solve}
+
+    x: solution, quantity (or UVal, number) of the class of the bounds, NaN where not converged
+    residual: output - target in iso units
+    converged: boolean array
+    iterations: number of iterations (calls of the calculation)
+    """
+
+    def __init__(self, x, residual, converged, iterations):
+        self.x = x
+        self.residual = residual
+        self.converged = converged
+        self.iterations = iterations
+
+    def __repr__(self):
+        return 'Solution({} of {} converged in {} iterations)'.format(int(np.count_nonzero(self.converged)), np.size(self.converged), self.iterations)
+
+
+def _input_kind(low, high):
+    """(low, high) in iso units and wrap(values) giving the input kind"""
+    if isinstance(low, ETQ.Quantity):
+        cls = type(low)
+        if type(high) is not cls:
+            raise ETQ.ParaDInF_quantity_ErrorQuantitiesDoNotMatch('bounds: {} :: {}'.format(cls.__name__, type(high).__name__))
+        displayUnit = low.get_displayUnit()
+        return low.get_value(), high.get_value(), lambda values: cls(values, cls._isoUnit, displayUnit=displayUnit)  # pylint: disable=protected-access
+    elif isinstance(low, UVal):
+        high.check_units(low.get_uval_units())
+        units = low.get_uval_units()
+        return low.get_value(), high.get_value(), lambda values: UVal(values, units)
+    return low, high, lambda values: values
+
+
+def _output_iso(value, target):
+    """output of the calculation in iso units, units checked against the target"""
+    if isinstance(target, ETQ.Quantity):
+        if isinstance(value, ETQ.Quantity):
+            if type(value) is not type(target):
+                raise ETQ.ParaDInF_quantity_ErrorQuantitiesDoNotMatch('output: {} :: target: {}'.format(type(value).__name__, type(target).__name__))
+            return value.get_value()
+        target = target.uval
+    if isinstance(target, UVal):
+        value = value.uval if isinstance(value, ETQ.Quantity) else value
+        if not isinstance(value, UVal):
+            raise SolveError('output has no units, target: {}'.format(target))
+        value.check_units(target.get_uval_units())
+        return value.get_value()
+    if isinstance(value, (ETQ.Quantity, UVal)):
+        (value.uval if isinstance(value, ETQ.Quantity) else value).check_units({})
+        return value.get_value()
+    return value
+
+
+def _evaluate(function, wrap, x, target, vectorized, derivative=False):
+    """residual (output - target) in iso units for all cases, optionally with the derivative"""
+    target_iso = _output_iso(target, target)
+
+    def call(xi):
+        xq = wrap(xi)
+        if derivative:
+            xq = autodiff.variable(xq, 'x')
+        y = function(xq)
+        if derivative:
+            return _output_iso(autodiff.primal(y), target), float(autodiff.derivative(y, xq).get_value()) if np.ndim(xi) == 0 else autodiff.derivative(y, xq).get_value()
+        return _output_iso(y, target), None
+
+    if vectorized:
+        y, dy = call(x)
+        y = np.broadcast_to(np.asarray(y, dtype=float), x.shape)
+        dy = None if dy is None else np.broadcast_to(np.asarray(dy, dtype=float), x.shape)
+    else:
+        results = [call(float(xi)) for xi in x.ravel()]
+        y = np.array([float(r[0]) for r in results]).reshape(x.shape)
+        dy = np.array([float(r[1]) for r in results]).reshape(x.shape) if derivative else None
+    return y - target_iso, dy
+
+
+def solve(function, target, low, high, method='brent', xtol=None, rtol=1e-10, maxiter=100, vectorized=True, strict=True):
+    """solve function(x) = target for x in [low, high]
+
+    @param function: callable(x) -> quantity, UVal or number; x is a quantity of the class of low, array valued if vectorized
+    @param target: quantity, UVal or number (float or array)
+    @param low, high: bounds (same quantity class, any unit; float or array), function(low) - target and function(high) - target must have opposite signs
+    @param method: 'brent' or 'newton'
+    @param xtol: absolute tolerance of x in iso units, default: rtol * (high - low)
+    @param rtol: tolerance of x relative to the width of the bracket |high - low| (not to the root), used if xtol is None
+    @param vectorized: if False, function is called for each case with a single value
+    @param strict: raise L{SolveError} if a case is not bracketed or does not converge, else it is NaN in the solution
+    @return: L{Solution}, x has the broadcast shape of target, low and high
+    """
+    if method not in ('brent', 'newton'):
+        raise SolveError('unknown method: {}'.format(method))
+    low_iso, high_iso, wrap = _input_kind(low, high)
+    target_iso = _output_iso(target, target)
+    shape = np.broadcast(np.asarray(target_iso), np.asarray(low_iso), np.asarray(high_iso)).shape
+    a = np.array(np.broadcast_to(np.asarray(low_iso, dtype=float), shape))
+    b = np.array(np.broadcast_to(np.asarray(high_iso, dtype=float), shape))
+    targets = target if not shape or np.shape(target_iso) == shape else _broadcast(target, shape)
+    xtol = rtol * np.abs(b - a) if xtol is None else np.broadcast_to(xtol, shape)
+
+    fa, _ = _evaluate(function, wrap, a, targets, vectorized)
+    fb, _ = _evaluate(function, wrap, b, targets, vectorized)
+    bracketed = np.sign(fa) * np.sign(fb) <= 0.
+    if strict and not bracketed.all():
+        raise SolveError('{} of {} cases are not bracketed by [low, high]'.format(int(np.count_nonzero(~bracketed)), bracketed.size))
+    if method == 'brent':
+        x, fx, converged, iterations = _brent(function, wrap, targets, vectorized, a, b, fa, fb, xtol, maxiter, bracketed)
+    else:
+        x, fx, converged, iterations = _newton(function, wrap, targets, vectorized, a, b, fa, fb, xtol, maxiter, bracketed)
+    if strict and not converged.all():
+        raise SolveError('{} of {} cases did not converge in {} iterations'.format(int(np.count_nonzero(~converged)), converged.size, iterations))
+    x = np.where(converged, x, np.nan)
+    if not shape:
+        x, fx, converged = float(x), float(fx), bool(converged)
+    return Solution(wrap(x), fx, converged, iterations)
+
+
+def _broadcast(target, shape):
+    """target with the values broadcast to shape"""
+    if isinstance(target, ETQ.Quantity):
+        cls = type(target)
+        return cls(np.broadcast_to(target.get_value(), shape).astype(float), cls._isoUnit, displayUnit=target.get_displayUnit())  # pylint: disable=protected-access
+    elif isinstance(target, UVal):
+        return UVal(np.broadcast_to(target.get_value(), shape).astype(float), target.get_uval_units())
+    return np.broadcast_to(target, shape).astype(float)
+
+
+def _brent(function, wrap, target, vectorized, a, b, fa, fb, xtol, maxiter, active):
+    """Brent's method, all cases in lock-step (Numerical Recipes zbrent with arrays)"""
+    c, fc = a.copy(), fa.copy()
+    d = b - a
+    e = d.copy()
+    done = ~active | (fb == 0.)
+    iterations = 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        while True:
+            # keep the root between b and c
+            swap = np.sign(fb) == np.sign(fc)
+            c, fc = np.where(swap, a, c), np.where(swap, fa, fc)
+            d, e = np.where(swap, b - a, d), np.where(swap, b - a, e)
+            # b is the best estimate
+            better = np.abs(fc) < np.abs(fb)
+            a, fa = np.where(better, b, a), np.where(better, fb, fa)
+            b, fb = np.where(better, c, b), np.where(better, fc, fb)
+            c, fc = np.where(better, a, c), np.where(better, fa, fc)
+            tol1 = 2. * _EPS * np.abs(b) + 0.5 * xtol
+            xm = 0.5 * (c - b)
+            done = done | (np.abs(xm) <= tol1) | (fb == 0.)
+            if done.all() or iterations >= maxiter:
+                break
+            # interpolation (secant or inverse quadratic), else bisection
+            s = fb / fa
+            secant = a == c
+            q1, r = fa / fc, fb / fc
+            p = np.where(secant, 2. * xm * s, s * (2. * xm * q1 * (q1 - r) - (b - a) * (r - 1.)))
+            q = np.where(secant, 1. - s, (q1 - 1.) * (r - 1.) * (s - 1.))
+            q = np.where(p > 0., -q, q)
+            p = np.abs(p)
+            interpolate = (np.abs(e) >= tol1) & (np.abs(fa) > np.abs(fb)) & (2. * p < np.minimum(3. * xm * q - np.abs(tol1 * q), np.abs(e * q)))
+            e = np.where(interpolate, d, xm)
+            d = np.where(interpolate, p / q, xm)
+            a, fa = np.where(done, a, b), np.where(done, fa, fb)
+            step = np.where(np.abs(d) > tol1, d, np.where(xm >= 0., tol1, -tol1))
+            b = np.where(done, b, b + step)
+            fnew, _ = _evaluate(function, wrap, b, target, vectorized)
+            fb = np.where(done, fb, fnew)
+            iterations += 1
+    return b, fb, done & active, iterations
+
+
+def _newton(function, wrap, target, vectorized, a, b, fa, fb, xtol, maxiter, active):
+    """Newton's method with exact derivatives, safeguarded by bisection (Numerical Recipes rtsafe with arrays)
+
+    A case bisects its bracket [lo, hi] if the Newton step leaves it or if the
+    step is not at least half of the step before (slow progress or oscillation).
+    """
+    lo, hi = np.where(fa <= 0., a, b), np.where(fa <= 0., b, a)    # f(lo) <= 0 <= f(hi)
+    x = np.where(np.abs(fa) < np.abs(fb), a, b)
+    dxold = np.abs(b - a)
+    dx = dxold.copy()
+    done = ~active
+    iterations = 0
+    fx = np.where(np.abs(fa) < np.abs(fb), fa, fb)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        while iterations < maxiter:
+            fx, dfx = _evaluate(function, wrap, x, target, vectorized, derivative=True)
+            iterations += 1
+            lo, hi = np.where(fx <= 0., x, lo), np.where(fx <= 0., hi, x)
+            xn = x - fx / dfx
+            bisect = ~np.isfinite(xn) | ((xn - lo) * (xn - hi) > 0.) | (np.abs(2. * fx) > np.abs(dxold * dfx))
+            xn = np.where(bisect, 0.5 * (lo + hi), xn)
+            dxold, dx = dx, np.where(done, dx, xn - x)
+            converged = (fx == 0.) | (np.abs(xn - x) <= xtol + 2. * _EPS * np.abs(x))
+            x = np.where(done, x, xn)
+            done = done | converged
+            if done.all():
+                break
+    return x, fx, done & active, iterations
+
+
+def solve_input(factory, name, low, high, output, target, fixed=None, **options):
+    """vary the input name of factory(name=x, **fixed) so that its output equals target
+
+    @param factory: callable(**inputs) -> calculator
+    @param output: attribute or method name of the calculator, or callable(calculator)
+    @param fixed: dict of the other inputs
+    @param options: see L{solve}
+    """
+    fixed = dict(fixed or {})
+
+    def function(x):
+        calc = factory(**dict(fixed, **{name:x}))
+        value = output(calc) if callable(output) else getattr(calc, output)
+        return value() if callable(value) else value
+    return solve(function, target, low, high, **options)
+
+
+################################################################################
+# test
+################################################################################
+def _setup_doctest():
+    ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+# eof
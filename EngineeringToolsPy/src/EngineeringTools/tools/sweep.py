@@ -0,0 +1,640 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-module-docstring,missing-function-docstring,missing-class-docstring,no-else-return,invalid-name
+"""parameter studies over calculator objects
+
+A L{Design} holds the points of a parameter study, each parameter as an array in
+a given unit (or as plain values, e.g. an end condition). Designs are built with
+L{full_factorial}, L{latin_hypercube} or L{random_uniform} and combined with
+L{Design.cross}.
+
+L{run_sweep} builds a calculator for each point with a factory, reads the
+requested outputs and collects everything in a DataFrame with unit annotated
+columns ("D in mm", "forcePermitted in kN"). The points are split into chunks
+which are distributed over a process pool. An exception raised for one point is
+recorded in the column "error" of that point, a chunk which fails as a whole
+(e.g. a crashed worker) marks all its points; the other points are not affected.
+
+Seeding is deterministic: samplers take a seed, and a factory with a parameter
+`rng` gets a numpy Generator of its own for each point, derived from the seed of
+the sweep and the number of the point, so results do not depend on the chunk
+size or the number of workers.
+
+L{run_sharded} is the resumable variant for long studies: the design is split
+into shards, each finished shard is written to a directory together with a
+manifest of the sweep. A rerun skips the finished shards; several processes or
+machines sharing the directory work on the same sweep, each shard is claimed
+by creating a lock file exclusively. A sharded sweep needs an explicit seed, so
+that all processes write the same manifest and draw the same random numbers.
+L{merge_shards} collects the shards into one DataFrame.
+
+The factory and getter functions are sent to the worker processes, they have
+to be picklable (defined at module level). Use max_workers=0 to run in the
+calling process.
+
+# doctest
+# reset new format defaults for test
+>>> from EngineeringTools.quantities import qnt
+>>> qnt.FORMAT_DEFAULT['totalWidth'] = 14
+>>> qnt.FORMAT_DEFAULT['decimalPosition'] = 10
+>>> qnt.FORMAT_DEFAULT['thousands_sep'] = ' '
+
+>>> from EngineeringTools.mechanical_eng import buckling, beamsection, material
+>>> def factory(D, length, endcondition):
+...     calc = buckling.Buckling()
+...     calc.material = material.Steel_S355JR()
+...     calc.beamSection = beamsection.BeamSection_Pipe(D=D)
+...     calc.endcondition = endcondition
+...     calc.length = length
+...     return calc
+>>> design = full_factorial({'D':(ETQ.Distance, 'mm', [20., 30.]), 'length':(ETQ.Distance, 'm', [0.5, 1.])})
+>>> design = design.cross(full_factorial({'endcondition':(None, None, ['both ends pinned'])}))
+>>> len(design)
+4
+>>> res = run_sweep(factory, design, {'forcePermitted':'kN', 'slendernessRatio':None}, max_workers=0)
+>>> list(res.columns)
+['D in mm', 'length in m', 'endcondition', 'forcePermitted in kN', 'slendernessRatio', 'error']
+>>> res[['D in mm', 'length in m', 'forcePermitted in kN']].round(2).values.tolist()
+[[20.0, 0.5, 10.85], [20.0, 1.0, 2.71], [30.0, 0.5, nan], [30.0, 1.0, 13.73]]
+>>> res.loc[2, 'error']
+'NotImplementedError: non-elastic case is not implemented'
+
+>>> lhs = latin_hypercube({'D':(ETQ.Distance, 'mm', 20., 40.), 'length':(ETQ.Distance, 'm', 1., 2.)}, 5, seed=1)
+>>> sorted(np.floor((lhs.values['D'] - 20.) / 4.).tolist())
+[0.0, 1.0, 2.0, 3.0, 4.0]
+>>> lhs.frame().columns.tolist()
+['D in mm', 'length in m']
+
+>>> import tempfile
+>>> directory = tempfile.mkdtemp()
+>>> res = run_sharded(factory, design, {'forcePermitted':'kN'}, directory, shardsize=3, max_workers=0, seed=1)
+>>> sorted(os.listdir(directory))
+['manifest.json', 'shard-00000.p...', 'shard-00001.p...']
+>>> res['forcePermitted in kN'].round(2).tolist()
+[10.85, 2.71, nan, 13.73]
+>>> run_sharded(factory, design, {'forcePermitted':'kN'}, directory, shardsize=4, max_workers=0, seed=1)
+Traceback (most recent call last):
+...
+EngineeringTools.tools.sweep.SweepError: directory "..." holds a different sweep (design, outputs, seed or shard size differ)
+"""
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+
+# run doctest, workaround relative import
+if __name__ == '__main__':
+    import sys
+    import doctest # pylint: disable=import-outside-toplevel
+    module_name = 'EngineeringTools.tools.sweep'               # pylint: disable=invalid-name
+    module = __import__(module_name, fromlist=['*'], level=0)  # pylint: disable=invalid-name
+    module._setup_doctest()                                    # pylint: disable=protected-access
+    print(doctest.testmod(module, optionflags=doctest.ELLIPSIS))
+    sys.exit()
+
+import os
+import json
+import time
+import socket
+import hashlib
+import inspect
+import logging
+import itertools
+import concurrent.futures
+import numpy as np
+import pandas as pd
+
+from .. import quantities as ETQ
+
+__all__ = ['SweepError', 'Design', 'full_factorial', 'latin_hypercube', 'random_uniform', 'run_sweep', 'run_sharded', 'merge_shards']
+
+log = logging.getLogger('EngineeringTools.tools.sweep')
+
+
+class SweepError(Exception):
+    """Exception: parameter study"""
+
+
+def column_name(name, unit):
+    """column name annotated with the unit, e.g. "D in mm" """
+    return name if unit is None else '{} in {}'.format(name, unit)
+
+
+def _seed_sequence(seed):
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+class Design:
+    """points of a parameter study
+
+    @param parameters: dict {name: (Quantity class, unit)}, (None, None) for plain values
+    @param values: dict {name: array}, one value per point, in the unit of the parameter
+    """
+
+    def __init__(self, parameters, values):
+        self.parameters = dict(parameters)
+        self.values = {}
+        size = None
+        for name in self.parameters:
+            quantity, _ = self.parameters[name]
+            value = np.asarray(values[name], dtype=float if quantity is not None else object)
+            if value.ndim != 1 or (size is not None and len(value) != size):
+                raise SweepError('parameter "{}" has {} values, expected {}'.format(name, value.size, size))
+            size = len(value)
+            self.values[name] = value
+        self._size = 0 if size is None else size
+
+    def __len__(self):
+        return self._size
+
+    def __repr__(self):
+        return 'Design({} points, parameters: {})'.format(len(self), ', '.join(self.parameters))
+
+    def cross(self, other):
+        """full factorial combination of the points of two designs"""
+        common = set(self.parameters) & set(other.parameters)
+        if common:
+            raise SweepError('parameters in both designs: {}'.format(', '.join(sorted(common))))
+        i, j = np.meshgrid(np.arange(len(self)), np.arange(len(other)), indexing='ij')
+        values = {name:value[i.ravel()] for name, value in self.values.items()}
+        values.update({name:value[j.ravel()] for name, value in other.values.items()})
+        return Design({**self.parameters, **other.parameters}, values)
+
+    def subset(self, start, stop):
+        """design of the points start:stop"""
+        return Design(self.parameters, {name:value[start:stop] for name, value in self.values.items()})
+
+    def fingerprint(self):
+        """sha256 of parameters and values, identifies the design of a sharded sweep"""
+        h = hashlib.sha256()
+        for name, (quantity, unit) in self.parameters.items():
+            h.update(repr((name, None if quantity is None else quantity.__name__, unit)).encode('utf-8'))
+            value = self.values[name]
+            h.update(value.tobytes() if quantity is not None else repr(value.tolist()).encode('utf-8'))
+        return h.hexdigest()
+
+    def point(self, i):
+        """keyword arguments for the factory: Quantities or plain values of point i"""
+        kwargs = {}
+        for name, (quantity, unit) in self.parameters.items():
+            value = self.values[name][i]
+            kwargs[name] = value if quantity is None else quantity(float(value), unit)
+        return kwargs
+
+    def frame(self):
+        """the points as DataFrame with unit annotated columns"""
+        return pd.DataFrame({column_name(name, unit):self.values[name] for name, (_, unit) in self.parameters.items()})
+
+
+def full_factorial(levels):
+    """all combinations of the levels
+
+    @param levels: dict {name: (Quantity class, unit, values)}, (None, None, values) for plain values
+    """
+    names = list(levels)
+    points = list(itertools.product(*(range(len(levels[name][2])) for name in names)))
+    values = {}
+    for k, name in enumerate(names):
+        level = np.asarray(levels[name][2], dtype=float if levels[name][0] is not None else object)
+        values[name] = level[[p[k] for p in points]] if points else level[:0]
+    return Design({name:levels[name][:2] for name in names}, values)
+
+
+def _check_ranges(ranges):
+    for name, spec in ranges.items():
+        if spec[0] is None or spec[3] < spec[2]:
+            raise SweepError('range of "{}" has to be a quantity with low <= high'.format(name))
+
+
+def latin_hypercube(ranges, n, seed=None):
+    """Latin hypercube sample: each range is split in n strata, each stratum gets exactly one point
+
+    @param ranges: dict {name: (Quantity class, unit, low, high)}
+    @param n: number of points
+    @param seed: seed for numpy SeedSequence, the same seed gives the same points
+    """
+    _check_ranges(ranges)
+    rng = np.random.default_rng(_seed_sequence(seed))
+    values = {}
+    for name, (_, _, low, high) in ranges.items():
+        u = (rng.permutation(n) + rng.random(n)) / n
+        values[name] = low + (high - low) * u
+    return Design({name:spec[:2] for name, spec in ranges.items()}, values)
+
+
+def random_uniform(ranges, n, seed=None):
+    """uniformly distributed random sample
+
+    @param ranges: dict {name: (Quantity class, unit, low, high)}
+    @param n: number of points
+    @param seed: seed for numpy SeedSequence, the same seed gives the same points
+    """
+    _check_ranges(ranges)
+    rng = np.random.default_rng(_seed_sequence(seed))
+    values = {name:rng.uniform(low, high, n) for name, (_, _, low, high) in ranges.items()}
+    return Design({name:spec[:2] for name, spec in ranges.items()}, values)
+
+
+def _output_specs(outputs):
+    """normalize outputs to a list of (column, getter, unit)"""
+    specs = []
+    for name, spec in outputs.items():
+        getter, unit = spec if isinstance(spec, tuple) else (name, spec)
+        specs.append((name, getter, unit))
+    return specs
+
+
+def _get_output(calc, getter, unit):
+    if callable(getter):
+        value = getter(calc)
+    else:
+        value = calc
+        for attr in getter.split('.'):
+            value = getattr(value, attr)
+        if callable(value):
+            value = value()
+    if isinstance(value, ETQ.Quantity):
+        return value.get_value(unit)
+    return float(value)
+
+
+def _run_chunk(factory, design, offset, specs, entropy, pass_rng):
+    """evaluate all points of a part of a design starting at point offset, returns (outputs, errors)"""
+    results = np.full((len(design), len(specs)), np.nan)
+    errors = [None] * len(design)
+    for k in range(len(design)):
+        try:
+            kwargs = design.point(k)
+            if pass_rng:
+                kwargs['rng'] = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(offset + k,)))
+            calc = factory(**kwargs)
+            for m, (_, getter, unit) in enumerate(specs):
+                results[k, m] = _get_output(calc, getter, unit)
+        except Exception as e:  # pylint: disable=broad-except
+            errors[k] = '{}: {}'.format(type(e).__name__, e)
+    return results, errors
+
+
+def _result_frame(design, specs, results, errors, offset=0):
+    frame = design.frame()
+    for m, (name, _, unit) in enumerate(specs):
+        frame[column_name(name, unit)] = results[:, m]
+    frame['error'] = pd.Series(errors, dtype=object)
+    frame.index = pd.RangeIndex(offset, offset + len(design))
+    return frame
+
+
+def _accepts_rng(factory):
+    try:
+        return 'rng' in inspect.signature(factory).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def run_sweep(factory, design, outputs, chunksize=64, max_workers=None, seed=None, progress=None):
+    """evaluate a calculator for all points of a design
+
+    @param factory: callable(**point) -> calculator, gets the parameters of the design as keyword arguments
+    @param design: L{Design}
+    @param outputs: dict {column: unit} reads attribute column of the calculator (a method is called without arguments),
+                    or {column: (getter, unit)} with getter an attribute path "a.b" or callable(calculator);
+                    unit None for plain numbers
+    @param chunksize: number of points per task
+    @param max_workers: number of worker processes, None: number of CPUs, 0: run in this process
+    @param seed: seed of the sweep, see module documentation
+    @param progress: callable(points done, points total), called after each chunk
+    @return: DataFrame, one row per point: parameters, outputs, error (None if ok)
+    """
+    if chunksize < 1:
+        raise SweepError('chunksize has to be >= 1')
+    specs = _output_specs(outputs)
+    n = len(design)
+    entropy = _seed_sequence(seed).entropy
+    pass_rng = _accepts_rng(factory)
+    chunks = [(start, min(start + chunksize, n)) for start in range(0, n, chunksize)]
+    results = np.full((n, len(specs)), np.nan)
+    errors = np.full(n, None, dtype=object)
+    done = 0
+    t0 = time.monotonic()
+
+    def collect(start, stop, chunk_results, chunk_errors):
+        nonlocal done
+        results[start:stop] = chunk_results
+        errors[start:stop] = chunk_errors
+        done += stop - start
+        log.info('sweep: %d/%d points done (%.1f s)', done, n, time.monotonic() - t0)
+        if progress is not None:
+            progress(done, n)
+
+    if max_workers == 0:
+        for start, stop in chunks:
+            collect(start, stop, *_run_chunk(factory, design.subset(start, stop), start, specs, entropy, pass_rng))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_run_chunk, factory, design.subset(start, stop), start, specs, entropy, pass_rng):(start, stop) for start, stop in chunks}
+            for future in concurrent.futures.as_completed(futures):
+                start, stop = futures[future]
+                try:
+                    chunk_results, chunk_errors = future.result()
+                except Exception as e:  # pylint: disable=broad-except
+                    log.error('sweep: chunk %d:%d failed: %r', start, stop, e)
+                    chunk_results = np.nan
+                    chunk_errors = ['chunk failed: {}: {}'.format(type(e).__name__, e)] * (stop - start)
+                collect(start, stop, chunk_results, chunk_errors)
+
+    failed = sum(error is not None for error in errors)
+    if failed:
+        log.warning('sweep: %d of %d points failed', failed, n)
+    return _result_frame(design, specs, results, errors)
+
+
+################################################################################
+# sharded sweeps
+################################################################################
+MANIFEST_FILENAME = 'manifest.json'
+
+
+def _shard_storage():
+    """parquet if pyarrow is available, pickle otherwise"""
+    try:
+        import pyarrow  # pylint: disable=import-outside-toplevel,unused-import
+        return 'parquet'
+    except ImportError:
+        return 'pickle'
+
+
+def _shard_filename(directory, shard, storage):
+    return os.path.join(directory, 'shard-{:05d}.{}'.format(shard, 'parquet' if storage == 'parquet' else 'pkl'))
+
+
+def read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST_FILENAME), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _sweep_identity(manifest):
+    """the entries of the manifest which identify the sweep, all but the storage format"""
+    return {key:value for key, value in manifest.items() if key != 'storage'}
+
+
+def _create_exclusive(filename, tmp):
+    """create filename with the content of tmp, FileExistsError if it exists
+
+    A hard link is atomic. Where hard links are not supported (e.g. some SMB
+    shares) the file is created exclusively and written, readers may then see
+    it empty or partial for a moment.
+    """
+    try:
+        os.link(tmp, filename)
+        return
+    except FileExistsError:
+        raise
+    except (OSError, NotImplementedError) as e:
+        log.debug('sweep: no hard link for %s (%r), creating it exclusively', filename, e)
+    fd = os.open(filename, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    with os.fdopen(fd, 'wb') as f, open(tmp, 'rb') as source:
+        f.write(source.read())
+
+
+def _read_manifest_written(directory, timeout=10.):
+    """read the manifest, waiting for a process which is still writing it"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return read_manifest(directory)
+        except ValueError:
+            if time.monotonic() > deadline:
+                raise SweepError('manifest of "{}" is not readable'.format(directory)) from None
+            time.sleep(0.05)
+
+
+def _write_manifest(directory, manifest):
+    """create the manifest or check that the existing one describes the same sweep
+
+    The storage format is not part of the sweep: the first process chooses it,
+    the others use the one in the manifest.
+    """
+    filename = os.path.join(directory, MANIFEST_FILENAME)
+    tmp = '{}.{}.{}.tmp'.format(filename, socket.gethostname(), os.getpid())
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    try:
+        _create_exclusive(filename, tmp)   # fails if another process was first
+    except FileExistsError:
+        existing = _read_manifest_written(directory)
+        if _sweep_identity(existing) != _sweep_identity(manifest):
+            raise SweepError('directory "{}" holds a different sweep (design, outputs, seed or shard size differ)'.format(directory)) from None
+    finally:
+        os.remove(tmp)
+
+
+def _process_running(pid):
+    """True if a process with this pid runs on this host (or if that can not be told)
+
+    os.kill(pid, 0) would terminate the process on Windows, there the process is
+    opened and its exit code queried.
+    """
+    if os.name == 'nt':
+        import ctypes  # pylint: disable=import-outside-toplevel
+        kernel32 = ctypes.windll.kernel32
+        PROCESS_QUERY_LIMITED_INFORMATION, STILL_ACTIVE, ERROR_INVALID_PARAMETER = 0x1000, 259, 87
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return kernel32.GetLastError() != ERROR_INVALID_PARAMETER   # no such process, else e.g. access denied
+        try:
+            code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+                return True
+            return code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:     # e.g. PermissionError: running as another user
+        return True
+    return True
+
+
+def _owner_dead(lockfile):
+    """True if the lock file was written by a process of this host which is not running anymore"""
+    try:
+        with open(lockfile, encoding='utf-8') as f:
+            host, pid = f.read().rsplit(':', 1)
+        pid = int(pid)
+    except (OSError, ValueError):
+        return False    # vanished, or still being written
+    if host != socket.gethostname() or pid == os.getpid():
+        return False
+    return not _process_running(pid)
+
+
+def _acquire(lockfile, stale_after):
+    """create the lock file exclusively
+
+    The lock is broken if its owner (host:pid in the file) is a dead process of
+    this host, or if it is older than stale_after seconds (owner on another host).
+    """
+    for _ in range(2):
+        try:
+            fd = os.open(lockfile, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                age = time.time() - os.path.getmtime(lockfile)
+            except FileNotFoundError:
+                continue
+            if _owner_dead(lockfile):
+                log.warning('sweep: breaking lock %s of a dead process', lockfile)
+            elif stale_after is None or age < stale_after:
+                return False
+            else:
+                log.warning('sweep: breaking stale lock %s (%.0f s old)', lockfile, age)
+            try:
+                os.remove(lockfile)
+            except FileNotFoundError:
+                pass
+            continue
+        with os.fdopen(fd, 'w') as f:
+            f.write('{}:{}'.format(socket.gethostname(), os.getpid()))
+        return True
+    return False
+
+
+def _release(lockfile):
+    try:
+        os.remove(lockfile)
+    except FileNotFoundError:
+        pass
+
+
+def _run_shard(factory, design, offset, specs, entropy, pass_rng, filename, storage):
+    """evaluate a shard and write it atomically, returns the number of failed points"""
+    results, errors = _run_chunk(factory, design, offset, specs, entropy, pass_rng)
+    frame = _result_frame(design, specs, results, errors, offset)
+    tmp = '{}.{}.{}.tmp'.format(filename, socket.gethostname(), os.getpid())
+    try:
+        if storage == 'parquet':
+            frame.to_parquet(tmp)
+        else:
+            frame.to_pickle(tmp)
+        os.replace(tmp, filename)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return sum(error is not None for error in errors)
+
+
+def run_sharded(factory, design, outputs, directory, shardsize=256, max_workers=None, seed=None, stale_after=24*3600.):
+    """resumable sweep, see L{run_sweep}; the design is split into shards which are written to directory
+
+    A manifest in the directory records the sweep. Shards already written are
+    skipped, so a sweep which died is continued by running it again. Each shard
+    is claimed with a lock file (exclusive create), several processes or
+    machines sharing the directory can work on the same sweep concurrently.
+    Locks of dead processes on this host are broken at once, locks of other
+    hosts after stale_after; a shard computed twice is written twice, atomically.
+
+    @param directory: directory of the sweep, created if missing
+    @param shardsize: number of points per shard file
+    @param seed: seed of the sweep, required: the same for all processes and reruns
+    @param stale_after: seconds after which a lock of another host is considered to belong to a dead process, None: never
+    @return: merged DataFrame if all shards are done, else None (other processes still working)
+    """
+    if shardsize < 1:
+        raise SweepError('shardsize has to be >= 1')
+    if seed is None:
+        raise SweepError('a sharded sweep needs an explicit seed')
+    os.makedirs(directory, exist_ok=True)
+    specs = _output_specs(outputs)
+    n = len(design)
+    entropy = _seed_sequence(seed).entropy
+    pass_rng = _accepts_rng(factory)
+    manifest = {'format':1, 'points':n, 'shardsize':shardsize, 'shards':-(-n // shardsize), 'design':design.fingerprint(),
+                'columns':[column_name(name, unit) for name, _, unit in specs], 'seed':str(entropy), 'storage':_shard_storage()}
+    _write_manifest(directory, manifest)
+    storage = read_manifest(directory)['storage']
+    if storage == 'parquet' and _shard_storage() != 'parquet':
+        raise SweepError('sweep in "{}" is stored as parquet, pyarrow is not available'.format(directory))
+
+    def todo():
+        for shard in range(manifest['shards']):
+            filename = _shard_filename(directory, shard, storage)
+            if os.path.exists(filename) or not _acquire(filename + '.lock', stale_after):
+                continue
+            if os.path.exists(filename):    # finished between the check and the lock
+                _release(filename + '.lock')
+                continue
+            start = shard * shardsize
+            stop = min(start + shardsize, n)
+            yield shard, (factory, design.subset(start, stop), start, specs, entropy, pass_rng, filename, storage)
+
+    def finish(shard, future):
+        try:
+            failed = future.result()
+            log.info('sweep: shard %d/%d done, %d points failed', shard + 1, manifest['shards'], failed)
+        except Exception as e:  # pylint: disable=broad-except
+            log.error('sweep: shard %d failed: %r', shard, e)
+        finally:
+            _release(_shard_filename(directory, shard, storage) + '.lock')
+
+    if max_workers == 0:
+        for shard, args in todo():
+            future = concurrent.futures.Future()
+            try:
+                future.set_result(_run_shard(*args))
+            except Exception as e:  # pylint: disable=broad-except
+                future.set_exception(e)
+            finish(shard, future)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # claim shards only when a worker gets free, other processes take the rest
+            limit = 2 * getattr(executor, '_max_workers', os.cpu_count() or 1)
+            running = {}
+            for shard, args in todo():
+                running[executor.submit(_run_shard, *args)] = shard
+                while len(running) >= limit:
+                    finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in finished:
+                        finish(running.pop(future), future)
+            for future in concurrent.futures.as_completed(running):
+                finish(running[future], future)
+
+    try:
+        return merge_shards(directory)
+    except SweepError as e:
+        log.info('sweep: %s', e)
+        return None
+
+
+def merge_shards(directory, partial=False):
+    """merge the shards of a sweep into one DataFrame, the index is the number of the point
+
+    @param partial: merge the finished shards only instead of raising SweepError if shards are missing
+    """
+    manifest = read_manifest(directory)
+    frames = []
+    missing = 0
+    for shard in range(manifest['shards']):
+        filename = _shard_filename(directory, shard, manifest['storage'])
+        if not os.path.exists(filename):
+            missing += 1
+            continue
+        frames.append(pd.read_parquet(filename) if manifest['storage'] == 'parquet' else pd.read_pickle(filename))
+    if missing and not partial:
+        raise SweepError('{} of {} shards are not done'.format(missing, manifest['shards']))
+    if not frames:
+        return None
+    return pd.concat(frames)
+
+
+################################################################################
+# test
+################################################################################
+def _setup_doctest():
+    ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+# eof
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# pylint: disable=line-too-long,no-else-return,missing-function-docstring,missing-class-docstring,empty-docstring,invalid-name
+"""linear (first order) propagation of uncertainties
+
+An L{Uncertain} number is a value with the sensitivities to independent
+uncertainty sources of unit standard deviation. It is used as the value of an
+UVal or a quantity, the usual formulas propagate the uncertainty by the chain
+rule (GUM, first order) in the same pass as the value; the units are checked
+by UVal as before. A complete tolerance budget costs about one evaluation with
+derivatives instead of thousands of Monte-Carlo samples (L{tools.montecarlo}).
+
+An array value with an uncertainty stands for several operating points of
+the same part: the elements share the uncertainty sources, i.e. they are fully
+correlated. Correlated inputs are created by L{correlated}.
+
+# doctest
+# reset new format defaults for test
+>>> from EngineeringTools.quantities import qnt
+>>> qnt.FORMAT_DEFAULT['totalWidth'] = 14
+>>> qnt.FORMAT_DEFAULT['decimalPosition'] = 10
+>>> qnt.FORMAT_DEFAULT['thousands_sep'] = ' '
+
+tolerance budget of the force of a cylinder
+
+>>> from EngineeringTools.fluidpower_eng.cylinder import Cylinder
+>>> cyl = Cylinder(D=uncertain(ETQ.Distance(50., 'mm'), ETQ.Distance(0.05, 'mm'), 'D'),
+...                dA=uncertain(ETQ.Distance(30., 'mm'), ETQ.Distance(0.05, 'mm'), 'dA'),
+...                stroke_length=ETQ.Distance(200., 'mm'))
+>>> F = cyl.force(pA=uncertain(ETQ.Pressure(200., 'bar'), ETQ.Pressure(2., 'bar'), 'pA'), pB=ETQ.Pressure(0., 'bar'))
+>>> print(F)
+        25.1 ± 0.267 kN (Force)
+>>> print(std(F).get_value('kN') == F.get_value().std / 1000.)
+True
+>>> for name, contribution, share in budget(F):
+...     print('{:3s} {:.4f} {:.3f}'.format(name, contribution.get_value('kN'), share))
+pA  0.2513 0.883
+D   0.0785 0.086
+dA  0.0471 0.031
+"""
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+# run doctest, workaround relative import
+if __name__ == '__main__':
+    import sys
+    import doctest        # pylint: disable=import-outside-toplevel
+    module_name = 'EngineeringTools.uncertainty'               # pylint: disable=invalid-name
+    module = __import__(module_name, fromlist=['*'], level=0)  # pylint: disable=invalid-name
+    module._setup_doctest()                                    # pylint: disable=protected-access
+    print(doctest.testmod(module, optionflags=doctest.ELLIPSIS))
+    sys.exit()
+
+import numpy as np
+
+from . import quantities as ETQ
+from .uval import UVal
+from .firstorder import FirstOrder, EngineeringTools_firstorder_Error, nominal
+
+__all__ = ['EngineeringTools_uncertainty_Error', 'Uncertain', 'uncertain', 'correlated', 'nominal_value', 'std', 'budget', 'correlation']
+
+
+class EngineeringTools_uncertainty_Error(EngineeringTools_firstorder_Error):
+    """Exception: uncertainty"""
+
+
+class Source:
+    """independent uncertainty source of unit standard deviation, compared by identity"""
+
+    __slots__ = ('name',)
+
+    def __init__(self, name=None):
+        self.name = name
+
+    def __repr__(self):
+        return 'Source({!r})'.format(self.name)
+
+
+class Uncertain(FirstOrder):
+    """value with standard uncertainty
+
+    @param value: float or numpy array
+    @param std: standard uncertainty (float or array), a tolerance +-t of a uniform distribution is std = t/sqrt(3)
+    @param name: name of the source in the budget
+
+    >>> x = Uncertain(2., 0.1, 'x')
+    >>> y = Uncertain(3., 0.2, 'y')
+    >>> print(x * y)
+    6.0 ± 0.5
+    >>> print(x - x)
+    0.0 ± 0.0
+    """
+
+    __slots__ = ()
+
+    def __init__(self, value, std=0., name=None):
+        if np.any(np.asarray(std) < 0.):
+            raise EngineeringTools_uncertainty_Error('std must not be negative')
+        super().__init__(value, {Source(name):std})
+
+    @property
+    def std(self):
+        """combined standard uncertainty"""
+        return np.sqrt(sum(d**2 for d in self.derivatives.values())) if self.derivatives else 0. * self.value
+
+    def format(self, fmt):
+        return '{} ± {}'.format(fmt(self.value).rstrip(), fmt(self.std).strip())
+
+    def contributions(self):
+        """standard uncertainty contributed by each source name, sources with the same name are combined
+
+        @return: dict {name: contribution}
+        """
+        variances = {}
+        for source, d in self.derivatives.items():
+            variances[source.name] = variances.get(source.name, 0.) + d**2
+        return {name:np.sqrt(variance) for name, variance in variances.items()}
+
+
+def _split(x):
+    """(value, wrap) where wrap(value) gives the same kind as x: quantity, UVal or number"""
+    if isinstance(x, ETQ.Quantity):
+        cls, displayUnit = type(x), x.get_displayUnit()
+        return x.get_value(), lambda value: cls(value, cls._isoUnit, displayUnit=displayUnit)  # pylint: disable=protected-access
+    elif isinstance(x, UVal):
+        units = x.get_uval_units()
+        return x.get_value(), lambda value: UVal(value, units)
+    return x, lambda value: value
+
+
+def _std_iso(x, std_):
+    """standard uncertainty std_ of x as number in iso units"""
+    if isinstance(std_, ETQ.Quantity):
+        if type(std_) is not type(x):
+            raise ETQ.ParaDInF_quantity_ErrorQuantitiesDoNotMatch('std must be a {}: {}'.format(type(x).__name__, type(std_).__name__))
+        return std_.get_value()
+    elif isinstance(std_, UVal):
+        std_.check_units(x.get_uval_units() if isinstance(x, UVal) else x.uval.get_uval_units())
+        return std_.get_value()
+    return std_
+
+
+def uncertain(x, std_, name=None):
+    """x with standard uncertainty std_
+
+    @param x: quantity, UVal or number; the display unit is kept
+    @param std_: quantity of the same class, UVal or number in iso units; for quantities with offset (temperature) in the iso unit (K)
+    @param name: name of the source in the budget
+    """
+    value, wrap = _split(x)
+    return wrap(Uncertain(value, _std_iso(x, std_), name))
+
+
+def correlated(xs, stds, correlation_matrix, names=None):
+    """correlated uncertain values
+
+    The values are built from independent sources by the Cholesky factor of
+    the correlation matrix, the budget lists the sources by the given names.
+
+    @param xs: list of quantities, UVals or numbers
+    @param stds: list of the standard uncertainties, see L{uncertain}
+    @param correlation_matrix: symmetric, positive definite, ones on the diagonal
+    @return: list of uncertain values
+    """
+    n = len(xs)
+    names = list(names) if names is not None else [None] * n
+    R = np.asarray(correlation_matrix, dtype=float)
+    if R.shape != (n, n) or len(stds) != n or len(names) != n:
+        raise EngineeringTools_uncertainty_Error('size of values, stds, names and correlation matrix do not match')
+    if not np.allclose(R, R.T) or not np.allclose(np.diag(R), 1.):
+        raise EngineeringTools_uncertainty_Error('correlation matrix must be symmetric with ones on the diagonal')
+    try:
+        L = np.linalg.cholesky(R)
+    except np.linalg.LinAlgError:
+        raise EngineeringTools_uncertainty_Error('correlation matrix is not positive definite') from None
+    sources = [Source(name) for name in names]
+    result = []
+    for i, (x, std_) in enumerate(zip(xs, stds)):
+        value, wrap = _split(x)
+        s = _std_iso(x, std_)
+        result.append(wrap(Uncertain._make(value, {sources[j]:s * L[i, j] for j in range(i + 1) if L[i, j] != 0.})))  # pylint: disable=protected-access
+    return result
+
+
+def _uncertain_value(x):
+    value, wrap = _split(x)
+    if isinstance(value, FirstOrder) and not isinstance(value, Uncertain):
+        raise EngineeringTools_uncertainty_Error('not an uncertain value: {}'.format(type(value).__name__))
+    return value, wrap
+
+
+def nominal_value(x):
+    """x without uncertainty, same kind as x"""
+    value, wrap = _uncertain_value(x)
+    return wrap(nominal(value))
+
+
+def std(x):
+    """combined standard uncertainty of x, same kind as x (zero for exact values)"""
+    value, wrap = _uncertain_value(x)
+    return wrap(value.std if isinstance(value, Uncertain) else 0. * value)
+
+
+def budget(x):
+    """tolerance budget of x, sorted by the contribution (largest first)
+
+    @return: list of (name, contribution as standard uncertainty of the same kind as x, share of the variance);
+             for array values contribution and share are arrays
+    """
+    value, wrap = _uncertain_value(x)
+    if not isinstance(value, Uncertain):
+        return []
+    contributions = value.contributions()
+    variance = value.std**2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        items = [(name, wrap(c), np.where(variance > 0., c**2 / variance, 0.)) for name, c in contributions.items()]
+    items = [(name, c, float(share) if np.ndim(share) == 0 else share) for name, c, share in items]
+    return sorted(items, key=lambda item: -np.max(item[2]))
+
+
+def correlation(x, y):
+    """correlation coefficient of two uncertain values (by their common sources)"""
+    vx, _ = _uncertain_value(x)
+    vy, _ = _uncertain_value(y)
+    if not (isinstance(vx, Uncertain) and isinstance(vy, Uncertain)):
+        return 0.
+    covariance = sum(d * vy.derivatives[source] for source, d in vx.derivatives.items() if source in vy.derivatives)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return covariance / (vx.std * vy.std)
+
+
+################################################################################
+# test
+################################################################################
+def _setup_doctest():
+    ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+# eof
@@ -2,6 +2,15 @@
 # pylint: disable=line-too-long,no-else-return,missing-function-docstring,missing-class-docstring,empty-docstring
 """do calculation with check of units
 
+The value may be a numpy array, units are then checked once for all elements.
+
+    >>> import numpy as np
+    >>> L = UVal(np.array([1., 2., 4.]), {'meter':1})
+    >>> T = UVal(2., {'second':1})
+    >>> print(L / T)
+    [0.5000 1.000 2.000] {m s^-1}
+    >>> print(np.array([1., 2., 3.]) * L)
+    [1.000 4.000 12.00] {m}
 """
 from builtins import isinstance
 __author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
@@ -22,7 +31,10 @@ if __name__ == '__main__':
 # $Source$
 
 from fractions import Fraction
+import numbers
+import numpy as np
 from . import qnt
+from .firstorder import FirstOrder
 from .quantities import quantitiesbase as base
 
 
@@ -57,6 +69,8 @@ class UVal:
 
     #__slots__ = ('si_base_units', '_si_base_units_list', '_value', '_units')
 
+    __array_ufunc__ = None   # ndarray <op> UVal: numpy shall use the reflected operator of UVal
+
     si_base_units = {'meter':'m', 'kilogram':'kg', 'second':'s',
                      'ampere':'A', 'kelvin':'K', 'mole':'mol', 'candela':'cd'}
     _si_base_units_list = ['kilogram', 'meter', 'second',
@@ -84,7 +98,7 @@ class UVal:
 
 
         @param value: in iso units
-        @type  value: float, int, ...
+        @type  value: float, int, numpy array ...
 
         @param units:
         @type  units: dict {baseunit:exp, ...}
@@ -125,7 +139,23 @@ class UVal:
             unitstr = unitstr[:-1] + '}'
         else:
             unitstr = unitstr + '}'
-        return '{:#.4g} {}'.format(qnt.quant(self._value, method='1r', precision=4), unitstr)
+        return '{} {}'.format(self._str_value(self._value), unitstr)
+
+
+    @classmethod
+    def _str_value(cls, value):
+        if isinstance(value, FirstOrder):
+            return value.format(cls._str_value)
+        if np.ndim(value) > 0:
+            return np.array2string(np.asarray(value), formatter={'float_kind':cls._format_value})
+        return cls._format_value(value)
+
+
+    @staticmethod
+    def _format_value(value):
+        if not np.isfinite(value):
+            return str(value)
+        return '{:#.4g}'.format(qnt.quant(value, method='1r', precision=4))
 
 
     def _repr_units(self, units=None):
@@ -161,7 +191,7 @@ class UVal:
 
         """
         val = UVal(self)
-        val._value *= -1
+        val._value = -val._value
         return val
 
 
@@ -186,9 +216,11 @@ class UVal:
         2.000 {}
 
         """
-        if isinstance(obj, float):
+        if isinstance(obj, (float, np.ndarray)):
             self.check_units({})
             obj = UVal(obj, {})
+        elif isinstance(obj, base.Quantity):
+            obj = obj.uval
         if not isinstance(obj, UVal):
             raise EngineeringTools_uval_Error('wrong type: %s + %s' % (self, obj))
         self.check_units(obj._units)
@@ -202,7 +234,7 @@ class UVal:
     def __sub__(self, obj):
         if isinstance(obj, UVal):
             pass
-        elif isinstance(obj, float):
+        elif isinstance(obj, (float, np.ndarray)):
             obj = UVal(obj, {})
         elif isinstance(obj, base.Quantity):
             obj = obj.uval
@@ -235,14 +267,14 @@ class UVal:
             for unitname in obj._units:
                 newunits[unitname] = newunits.get(unitname, Fraction(0)) + obj._units[unitname]
             return UVal(self._value * obj._value, newunits)
-        elif isinstance(obj, (float, int, )):
+        elif isinstance(obj, (numbers.Real, np.ndarray)):
             return UVal(self._value * obj, self._units)
         else:
             raise EngineeringTools_uval_Error('wrong type: %s * %s' % (self, obj))
 
 
     def __rmul__(self, obj):
-        if isinstance(obj, (float, int, )):
+        if isinstance(obj, (numbers.Real, np.ndarray)):
             return UVal(self._value * obj, self._units)
         else:
             raise EngineeringTools_uval_Error('wrong type: %s * %s' % (self, obj))
@@ -259,9 +291,9 @@ class UVal:
             newunits = dict(self._units)
             for unitname in obj._units:
                 newunits[unitname] = newunits.get(unitname, Fraction(0)) - obj._units[unitname]
-            return UVal(self._value / float(obj._value), newunits)
-        elif isinstance(obj, (float, int)):
-            return UVal(self._value / float(obj), self._units)
+            return UVal(self._value / obj._value, newunits)
+        elif isinstance(obj, (numbers.Real, np.ndarray)):
+            return UVal(self._value / obj, self._units)
         elif isinstance(obj, base.Quantity):
             return self / obj.uval
         else:
@@ -272,11 +304,11 @@ class UVal:
 
 
     def __rdiv__(self, obj):
-        if isinstance(obj, (float, int)):
+        if isinstance(obj, (numbers.Real, np.ndarray)):
             newunits = dict(self._units)
             for unitname in newunits:
                 newunits[unitname] *= -1
-            return UVal(float(obj) / self._value , newunits)
+            return UVal(obj / self._value, newunits)
         else:
             raise EngineeringTools_uval_Error('wrong type: %s / %s' % (obj, self))
 
@@ -419,7 +451,7 @@ class UVal:
 
 
     def get_value(self):
-        """returns the value as float, int, ...   """
+        """returns the value as float, int, numpy array ...   """
         return self._value
 
 
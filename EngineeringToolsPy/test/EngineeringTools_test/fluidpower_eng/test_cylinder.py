@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import unittest
+import importlib.util
+import os
+import sys
+import time
+import numpy as np
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+
+import EngineeringTools.quantities as ETQ
+from EngineeringTools.fluidpower_eng.cylinder import Cylinder
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+        self.cyl = Cylinder(D=ETQ.Distance(63., 'mm'), dA=ETQ.Distance(36., 'mm'), stroke_length=ETQ.Distance(500., 'mm'))
+
+    def test_map_equals_single_points(self):
+        masses = ETQ.Mass(np.array([200., 800.]), 'kg')
+        position = ETQ.Distance(np.linspace(-240., 240., 7), 'mm')
+        _, f = self.cyl.naturalFrequency_map(masses, position)
+        self.assertEqual(f.get_value().shape, (2, 7))
+        for i, m in enumerate(masses.get_value()):
+            for j, x in enumerate(position.get_value()):
+                single = self.cyl.naturalFrequency(ETQ.Distance(x, 'm'), ETQ.Mass(m, 'kg'))
+                self.assertAlmostEqual(f.get_value()[i, j], single.get_value())
+
+    def test_arrays(self):
+        position = ETQ.Distance(np.array([-100., 0., 100.]), 'mm')
+        np.testing.assert_allclose(self.cyl.volume_A(position).get_value(),
+                                   self.cyl.volumeA_0.get_value() + self.cyl.areaA.get_value() * position.get_value())
+        np.testing.assert_allclose(self.cyl.capacitanceB(position).get_value(), self.cyl.volume_B(position).get_value() / self.cyl.fluid.bulkmodulus.get_value())
+        with self.assertRaises(Exception):
+            self.cyl.validPosition(ETQ.Distance(np.array([0., 300.]), 'mm'))
+
+    def test_minimum(self):
+        masses = ETQ.Mass(np.linspace(100., 1000., 100), 'kg')
+        t0 = time.perf_counter()
+        position, f = self.cyl.naturalFrequency_minimum(masses, n=10000)
+        self.assertLess(time.perf_counter() - t0, 5.)
+        self.assertEqual(f.get_value().shape, (100,))
+        # the position of the minimum does not depend on the mass, f ~ 1/sqrt(m)
+        np.testing.assert_allclose(position.get_value(), position.get_value()[0])
+        np.testing.assert_allclose(f.get_value() * np.sqrt(masses.get_value()), f.get_value()[0] * np.sqrt(100.))
+        single = self.cyl.naturalFrequency(ETQ.Distance(position.get_value()[0], 'm'), ETQ.Mass(100., 'kg'))
+        self.assertAlmostEqual(f.get_value()[0], single.get_value())
+        _, fmap = self.cyl.naturalFrequency_map(masses, n=10000)
+        self.assertTrue(np.all(fmap.get_value() >= f.get_value()[:, np.newaxis]))
+
+    @unittest.skipUnless(importlib.util.find_spec('matplotlib'), 'matplotlib is not installed')
+    def test_plot(self):
+        import matplotlib  # pylint: disable=import-outside-toplevel
+        matplotlib.use('Agg')
+        ax = self.cyl.naturalFrequency_plot(ETQ.Mass(np.array([400., 800.]), 'kg'), n=100)
+        self.assertEqual(len(ax.lines), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
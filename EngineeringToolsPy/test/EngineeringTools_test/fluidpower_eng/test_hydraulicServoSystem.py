@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import unittest
+import os
+import sys
+import itertools
+import numpy as np
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+
+import EngineeringTools.quantities as ETQ
+from EngineeringTools.fluidpower_eng.cylinder import Cylinder
+from EngineeringTools.fluidpower_eng.proportionalValve import ProportionalValve
+from EngineeringTools.fluidpower_eng.hydraulicServoSystem import HydraulicServoSystem__Jelali_4_, GainTable
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+        self.cylinder = Cylinder(D=ETQ.Distance(50., 'mm'), dA=ETQ.Distance(28., 'mm'), stroke_length=ETQ.Distance(400., 'mm'))
+        self.system = HydraulicServoSystem__Jelali_4_(ProportionalValve(ETQ.Flowrate(40., 'Liter/min'), ETQ.Pressure(70., 'bar')), self.cylinder)
+        self.mass = ETQ.Mass(200., 'kg')
+        self.xP, self.xV = np.array([-0.1, 0., 0.15]), np.array([-1., -0.2, 0.4])
+        self.pS, self.load = np.array([100e5, 210e5]), np.array([-5e3, 8e3])
+        self.pT = ETQ.Pressure(2., 'bar')
+        self.table = self.system.gain_table(ETQ.Distance(self.xP, 'm'), self.xV, ETQ.Pressure(self.pS, 'Pa'), ETQ.Force(self.load, 'N'), self.mass, pT=self.pT)
+
+    def test_table_equals_single_points(self):
+        self.assertEqual(self.table.shape, (3, 3, 2, 2))
+        system, m, pT = self.system, self.mass, self.pT
+        for idx in itertools.product(*(range(n) for n in self.table.shape)):
+            i, j, k, _ = idx
+            xP, xV, pS = ETQ.Distance(self.xP[i], 'm'), ETQ.Scalar(self.xV[j]), ETQ.Pressure(self.pS[k], 'Pa')
+            pA0, pB0 = ETQ.Pressure(self.table.values['pA0'][idx], 'Pa'), ETQ.Pressure(self.table.values['pB0'][idx], 'Pa')
+            expected = {'KQ':system.KQ__Jelali_4_240(xP, xV, pS, pT, pA0, pB0), 'Ch':system.Ch__Jelali_4_241(xP),
+                        'Th':system.Th__Jelali_4_242(xP, xV, xV, pS, pT, pA0, pB0), 'omegah':system.omegah__Jelali_4_247(xP, m).uval,
+                        'Dh':system.Dh__Jelali_4_248(xP, xV, pS, pT, pA0, pB0, m)}
+            for name, value in expected.items():
+                value.check_units(self.table.uval(name).get_uval_units())
+                self.assertAlmostEqual(self.table.values[name][idx] / value.get_value(), 1., places=12)
+
+    def test_operating_pressures(self):
+        pA0, pB0 = self.table.values['pA0'], self.table.values['pB0']
+        AA, AB = self.cylinder.areaA.get_value(), self.cylinder.areaB.get_value()
+        np.testing.assert_allclose(pA0 * AA - pB0 * AB, np.broadcast_to(self.load, self.table.shape), atol=1e-6)
+        # steady flow: QB / QA = -AB / AA
+        pS, pT, a = self.pS[np.newaxis, :, np.newaxis], self.pT.get_value(), AB / AA
+        np.testing.assert_allclose(np.sqrt(pB0[0, 2] - pT), a * np.sqrt(pS[0] - pA0[0, 2]))
+        np.testing.assert_allclose(np.sqrt(pS[0] - pB0[0, 0]), a * np.sqrt(pA0[0, 0] - pT))
+
+    def test_interpolation(self):
+        for idx in ((0, 0, 0, 0), (2, 1, 1, 0), (1, 2, 0, 1)):
+            point = [self.table.axes[axis][i] for axis, i in zip(GainTable.AXES, idx)]
+            self.assertAlmostEqual(self.table('omegah', *point) / self.table.values['omegah'][idx], 1.)
+        values = self.table('KQ', xP=ETQ.Distance(np.array([-50., 50.]), 'mm'), xV=0.4, pS=150e5, load=0.)
+        self.assertEqual(values.shape, (2,))
+        with self.assertRaises(ValueError):
+            self.table('KQ', xP=0., xV=0.4, pS=300e5, load=0.)      # outside of the grid
+
+    def test_transfer_functions(self):
+        xP, xV, pS = ETQ.Distance(0.15, 'm'), ETQ.Scalar(0.4), ETQ.Pressure(210e5, 'Pa')
+        idx = (2, 2, 1, 1)
+        pA0, pB0 = ETQ.Pressure(self.table.values['pA0'][idx], 'Pa'), ETQ.Pressure(self.table.values['pB0'][idx], 'Pa')
+        w = np.logspace(0., 4., 100)
+        G = self.system.G_xV_vV(xP, xV, pS, self.pT, pA0, pB0, self.mass)
+        omegah, Dh = self.table.values['omegah'][idx], self.table.values['Dh'][idx]
+        np.testing.assert_allclose(G.freqresp(w), 1. / ((1j * w)**2 + 2. * Dh * omegah * 1j * w + omegah**2), rtol=1e-10)
+        KQ = self.table.values['KQ'][idx]
+        self.assertAlmostEqual(self.system.G_KQ(xP, xV, pS, self.pT, pA0, pB0).freqresp(1.)[0].real / KQ, 1.)
+        Ga = self.system.G_a_xV(xP, xV, pS, self.pT, pA0, pB0, self.mass)
+        np.testing.assert_allclose(Ga.freqresp(w), self.cylinder.areaA.get_value() / 200. * KQ / (1j * w), rtol=1e-10)
+        # all operating points of the table at once
+        Gt = self.system.G_xV_vV(None, None, None, None, None, None, None, Dh=self.table.values['Dh'], omegah=self.table.values['omegah'])
+        response = Gt.freqresp(w)
+        self.assertEqual(response.shape, (100,) + self.table.shape)
+        np.testing.assert_allclose(response[(slice(None),) + idx], G.freqresp(w), rtol=1e-10)
+
+    def test_damping(self):
+        Dh = self.table.values['Dh']
+        self.assertEqual(self.table.uval('Dh').get_uval_units(), {})
+        self.assertTrue(np.all(Dh > 0.))
+        self.assertTrue(np.all(Dh < 10.))
+        G = self.system.G_xV_vV(None, None, None, None, None, None, None, Dh=Dh, omegah=self.table.values['omegah'])
+        self.assertTrue(np.all(G.poles().real < 0.))
+        xP, xV, pS = ETQ.Distance(0., 'm'), ETQ.Scalar(0.5), ETQ.Pressure(160e5, 'Pa')
+        pA0, pB0 = (ETQ.Pressure(p, 'Pa') for p in self.system.operatingPressures(0.5, 160e5, 0., 0.))
+        Dh = self.system.Dh__Jelali_4_248(xP, xV, pS, ETQ.Pressure(0., 'Pa'), pA0, pB0, self.mass)
+        Dh.check_units({})
+        self.assertGreater(Dh.get_value(), 0.)
+        self.assertTrue(np.all(self.system.G_xV_vV(xP, xV, pS, ETQ.Pressure(0., 'Pa'), pA0, pB0, self.mass).poles().real < 0.))
+        with self.assertRaises(ValueError):
+            self.system.G_xV_vV(None, None, None, None, None, None, None, Dh=-0.1, omegah=200.)
+        with self.assertRaises(ValueError):
+            self.system.G_xV_vV(None, None, None, None, None, None, None, Dh=ETQ.Time(1., 's').uval, omegah=200.)
+
+    def test_axes_checked(self):
+        with self.assertRaises(ValueError):
+            self.system.gain_table(ETQ.Distance(np.array([0.1, 0.]), 'm'), self.xV, ETQ.Pressure(self.pS, 'Pa'), ETQ.Force(self.load, 'N'), self.mass)
+        with self.assertRaises(Exception):
+            self.system.gain_table(ETQ.Distance(np.array([0., 0.3]), 'm'), self.xV, ETQ.Pressure(self.pS, 'Pa'), ETQ.Force(self.load, 'N'), self.mass)
+
+
+    def test_Th_sign(self):
+        # eq 4.242 with KQpA >= 0 >= KQpB: Th < 0, -inf at xV = 0
+        self.assertTrue(np.all(self.table.values['Th'] < 0.))
+        table = self.system.gain_table(ETQ.Distance(self.xP, 'm'), np.array([-0.5, 0., 0.5]), ETQ.Pressure(self.pS, 'Pa'), ETQ.Force(self.load, 'N'), self.mass, pT=self.pT)
+        self.assertTrue(np.all(table.values['Th'][:, 1] == -np.inf))
+        self.assertTrue(np.all(table.values['Dh'][:, 1] == 0.))
+
+    def test_load_not_held(self):
+        # 120 kN needs pA0 > pS = 210 bar
+        load = np.array([-5e3, 0., 120e3])
+        table = self.system.gain_table(ETQ.Distance(self.xP, 'm'), self.xV, ETQ.Pressure(self.pS, 'Pa'), ETQ.Force(load, 'N'), self.mass, pT=self.pT)
+        self.assertFalse(np.any(table.valid[..., 2]))
+        self.assertTrue(np.all(table.valid[..., :2]))
+        for name in ('KQ', 'Ch', 'Th', 'omegah', 'Dh'):
+            self.assertTrue(np.all(np.isnan(table.values[name][..., 2])), name)
+            self.assertFalse(np.any(np.isnan(table.values[name][..., :2])), name)
+        self.assertFalse(np.any(np.isnan(table.values['pA0'])))
+        # valid grid points and points between them are interpolated, their neighbours do not matter
+        xP, xV, pS = self.xP[1], self.xV[2], self.pS[1]
+        self.assertAlmostEqual(table('omegah', xP, xV, pS, 0.) / table.values['omegah'][1, 2, 1, 1], 1.)
+        self.assertTrue(np.isfinite(table('KQ', xP, xV, pS, -2e3)))
+        with self.assertRaises(ValueError):
+            table('omegah', xP, xV, pS, 10e3)
+        with self.assertRaises(ValueError):
+            table('KQ', xP, xV, pS, np.array([0., 120e3]))
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import unittest
+import os
+import sys
+import time
+import numpy as np
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+
+import EngineeringTools.quantities as ETQ
+from EngineeringTools.fluidpower_eng.oil import get_oil
+from EngineeringTools.fluidpower_eng.line import Line, LineError, simulate_line
+
+
+def line(length=2., diameter=10., **kwargs):
+    kwargs.setdefault('fluid', get_oil('S2M46'))
+    return Line(ETQ.Distance(length, 'm'), ETQ.Distance(diameter, 'mm'), **kwargs)
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+    def test_default_fluid(self):
+        li = Line(ETQ.Distance(2., 'm'), ETQ.Distance(10., 'mm'))
+        ref = line()
+        np.testing.assert_allclose(li.c, ref.c)
+        np.testing.assert_allclose(li.nu, ref.nu)
+        self.assertGreater(float(li.nu[0]), 0.)
+
+    def test_water_hammer(self):
+        # flow stopped at end L: Joukowsky pressure rise B Q0, period 4 L / c at end L
+        Q0 = 20e-3 / 60.
+        li = line(viscosity=ETQ.ViscosityKinematic(1e-3, 'mm^2/sec'), turbulent=False)
+        li.reset(p=100e5, Q=Q0)
+        res = simulate_line(li, 4. * li.dt * li.segments, p0=100e5, QL=0., reset=False)
+        n = li.segments
+        np.testing.assert_allclose(res.pL[1:2 * n + 1] - 100e5, li.B[0] * Q0, rtol=1e-3)
+        np.testing.assert_allclose(res.pL[2 * n + 1:4 * n + 1] - 100e5, -li.B[0] * Q0, rtol=1e-3)
+        self.assertAlmostEqual(4. * float(li.length[0]) / float(li.c[0]), 4. * n * li.dt, places=12)
+
+    def test_laminar_steady_state(self):
+        # also with interpolated characteristics (theta < 1)
+        for dt in (None, ETQ.Time(50., 'us'), ETQ.Time(25., 'us')):
+            li = line(length=5., diameter=6., turbulent=False, dt=dt)
+            res = simulate_line(li, ETQ.Time(3., 's'), p0=ETQ.Pressure(20., 'bar'), pL=0.)
+            Q = res.QL[-1]
+            self.assertAlmostEqual(Q / res.Q0[-1], 1., places=6)
+            self.assertAlmostEqual(20e5 / (li.resistance[0] * Q), 1., places=6)
+        self.assertLess(li.theta[0], 0.3)
+        self.assertIsInstance(res.quantity('QL'), ETQ.Flowrate)
+
+    def test_turbulent_steady_state(self):
+        for dt in (None, ETQ.Time(50., 'us')):
+            li = line(length=5., diameter=6., dt=dt, viscosity=ETQ.ViscosityKinematic(1., 'cSt'))
+            res = simulate_line(li, ETQ.Time(2., 's'), p0=ETQ.Pressure(20., 'bar'), pL=0.)
+            Q = res.QL[-1]
+            self.assertGreater(Q, li._Qcrit[0, 0])  # pylint: disable=protected-access
+            self.assertAlmostEqual(20e5 / (li.segments * li._kT[0, 0] * Q**1.75), 1., places=5)  # pylint: disable=protected-access
+
+    def test_batch_equals_single(self):
+        lengths = np.array([1., 2., 4.])
+        diameters = np.array([6., 10., 12.])
+        dt = min(line(L, d).dt for L, d in zip(lengths, diameters))
+        batch = line(lengths, diameters, dt=dt)
+        self.assertEqual(batch.size, 3)
+        pulse = lambda t: 50e5 * (t < 0.01)  # pylint: disable=unnecessary-lambda-assignment
+        res = simulate_line(batch, 0.2, p0=pulse, QL=0.)
+        self.assertEqual(res.pL.shape, (len(res), 3))
+        for k in range(3):
+            single = simulate_line(line(lengths[k], diameters[k], dt=dt), 0.2, p0=pulse, QL=0.)
+            self.assertEqual(single.pL.shape, (len(res),))
+            np.testing.assert_allclose(res.pL[:, k], single.pL, rtol=1e-12, atol=1e-6)
+
+    def test_interpolation_stable(self):
+        li = line(dt=ETQ.Time(50., 'us'))
+        self.assertTrue(np.all(li.theta < 1.))
+        res = simulate_line(li, 1., p0=ETQ.Pressure(100., 'bar'), QL=0.)
+        self.assertTrue(np.all(np.isfinite(res.pL)))
+        self.assertLess(res.pL.max(), 2. * 100e5)
+        self.assertAlmostEqual(res.pL[-1] / 100e5, 1., places=2)
+
+    def test_two_port(self):
+        # volume at end L coupled through characteristics(): fills up to the supply pressure
+        V, E = 0.2e-3, 1.0e9
+        li = line()
+        pV = 0.
+        for _ in range(20000):
+            _, Cp, B = li.characteristics()
+            # implicit Euler of the volume pV' = E / V QL together with pV = Cp - B QL
+            QL = (Cp[0] - pV) / (B[0] + E / V * li.dt)
+            pV = Cp[0] - B[0] * QL
+            li.advance(p0=100e5, QL=QL)
+            self.assertAlmostEqual(li.p[0, -1], pV, delta=1e-6)
+        self.assertAlmostEqual(pV / 100e5, 1., places=3)
+        self.assertLess(abs(li.Q[0, -1]), 1e-6)
+
+    def test_errors(self):
+        with self.assertRaises(LineError):
+            line(dt=ETQ.Time(1., 'ms'))
+        with self.assertRaises(LineError):
+            line(segments=0)
+        with self.assertRaises(LineError):
+            line(length=-1.)
+        li = line()
+        with self.assertRaises(LineError):
+            li.advance(p0=1e5, Q0=0., QL=0.)
+        with self.assertRaises(LineError):
+            simulate_line(li, 0.1, p0=1e5)
+
+    def test_timing(self):
+        li = line(segments=20)
+        start = time.perf_counter()
+        res = simulate_line(li, 1e5 * li.dt, p0=ETQ.Pressure(100., 'bar'), QL=0.)
+        elapsed = time.perf_counter() - start
+        self.assertEqual(len(res), 100001)
+        self.assertLess(elapsed, 60.)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
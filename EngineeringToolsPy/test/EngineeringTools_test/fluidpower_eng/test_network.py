@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import unittest
+import os
+import sys
+import time
+from unittest import mock
+import numpy as np
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+
+import EngineeringTools.quantities as ETQ
+from EngineeringTools.fluidpower_eng.orifice import OrificeTurbulent
+from EngineeringTools.fluidpower_eng.proportionalValve import ProportionalValve
+from EngineeringTools.fluidpower_eng.cylinder import Cylinder
+from EngineeringTools.fluidpower_eng import network as ETFnetwork
+from EngineeringTools.fluidpower_eng.network import Network, NetworkError
+
+
+def orifice(mm2):
+    return OrificeTurbulent(A=ETQ.Area(mm2, 'mm^2'))
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+        self.valve = ProportionalValve(ETQ.Flowrate(40., 'Liter/min'), ETQ.Pressure(70., 'bar'), underlap1=0.05)
+        self.cylinder = Cylinder(D=ETQ.Distance(50., 'mm'), dA=ETQ.Distance(28., 'mm'), stroke_length=ETQ.Distance(400., 'mm'))
+
+    def test_orifices_against_single_element(self):
+        net = Network()
+        net.add_node('S', pressure=ETQ.Pressure(np.array([50., 100., 200.]), 'bar'))
+        for name in ('1', '2', 'T'):
+            net.add_node(name, pressure=ETQ.Pressure(0., 'bar') if name == 'T' else None)
+        net.add_orifice('S', '1', orifice(3.))
+        net.add_orifice('1', '2', orifice(1.5))
+        net.add_orifice('1', '2', orifice(1.5), name='parallel')
+        net.add_orifice('2', 'T', orifice(2.))
+        sol = net.solve(dp_laminar=ETQ.Pressure(1e-6, 'Pa'))
+        self.assertTrue(sol.converged.all())
+        # the same flow through all elements, as given by OrificeTurbulent
+        Q = sol.flow('S-1')
+        for p1, p2, element, flow in (('S', '1', orifice(3.), Q), ('1', '2', orifice(3.), Q), ('2', 'T', orifice(2.), Q)):
+            expected = element.flow(p1=sol.pressure(p1), p2=sol.pressure(p2))
+            np.testing.assert_allclose(expected.get_value(), flow.get_value(), rtol=1e-8)
+        np.testing.assert_allclose(sol.flow('parallel').get_value(), Q.get_value() / 2., rtol=1e-9)
+
+    def test_valve_against_valve_flow(self):
+        xV = np.linspace(-1., 1., 9)
+        net = Network()
+        net.add_node('S', pressure=ETQ.Pressure(210., 'bar'))
+        net.add_node('T', pressure=ETQ.Pressure(2., 'bar'))
+        net.add_node('A'); net.add_node('B')
+        net.add_valve('v', 'S', 'T', 'A', 'B', self.valve, xV)
+        net.add_cylinder('c', 'A', 'B', self.cylinder, load=ETQ.Force(np.linspace(-20., 20., 9), 'kN'))
+        sol = net.solve(dp_laminar=ETQ.Pressure(1e-3, 'Pa'))
+        self.assertTrue(sol.converged.all())
+        QA, QB = self.valve.flow(xV, pA=sol.pressure('A'), pB=sol.pressure('B'), pS=ETQ.Pressure(210., 'bar'), pT=ETQ.Pressure(2., 'bar'))
+        v = sol.velocity('c').get_value()
+        AA, AB = self.cylinder.areaA.get_value(), self.cylinder.areaB.get_value()
+        np.testing.assert_allclose(QA.get_value(), AA * v, rtol=1e-6, atol=1e-12)
+        np.testing.assert_allclose(QB.get_value(), -AB * v, rtol=1e-6, atol=1e-12)
+        np.testing.assert_allclose(sol.pressure('A').get_value() * AA - sol.pressure('B').get_value() * AB, np.linspace(-20e3, 20e3, 9), atol=1e-6)
+
+    def test_fixed_velocity_and_pump(self):
+        # pump with relief orifice feeds a cylinder at fixed speed
+        net = Network()
+        net.add_node('P', flow=ETQ.Flowrate(30., 'Liter/min'))
+        net.add_node('T', pressure=ETQ.Pressure(0., 'bar'))
+        net.add_node('A')
+        net.add_orifice('P', 'T', orifice(1.))
+        net.add_orifice('P', 'A', orifice(5.))
+        net.add_cylinder('c', 'A', 'T', self.cylinder, velocity=ETQ.Velocity(np.array([0., 0.1, 0.2]), 'm/s'))
+        sol = net.solve()
+        self.assertTrue(sol.converged.all())
+        QA = self.cylinder.areaA.get_value() * np.array([0., 0.1, 0.2])
+        np.testing.assert_allclose(sol.flow('P-T').get_value() + QA, 30e-3 / 60., rtol=1e-9)
+        np.testing.assert_allclose(sol.flow('P-A').get_value(), QA, atol=1e-12)
+
+    def test_batch_equals_single(self):
+        pS = np.array([80., 160., 240.])
+        xV = np.array([-0.6, 0.2, 0.9])
+
+        def build(pS, xV):
+            net = Network()
+            net.add_node('S', pressure=ETQ.Pressure(pS, 'bar'))
+            net.add_node('T', pressure=ETQ.Pressure(0., 'bar'))
+            net.add_node('P'); net.add_node('A'); net.add_node('B')
+            net.add_orifice('S', 'P', orifice(20.))
+            net.add_valve('v', 'P', 'T', 'A', 'B', self.valve, xV)
+            net.add_cylinder('c', 'A', 'B', self.cylinder, load=ETQ.Force(3., 'kN'))
+            return net.solve()
+        batch = build(pS, xV)
+        for k in range(3):
+            single = build(pS[k], xV[k])
+            self.assertIsInstance(single.pressure('A').get_value(), float)
+            self.assertAlmostEqual(batch.velocity('c').get_value()[k] / single.velocity('c').get_value(), 1., places=9)
+            self.assertAlmostEqual(batch.pressure('P').get_value()[k] / single.pressure('P').get_value(), 1., places=9)
+
+    def _axis(self, xV, valve):
+        net = Network()
+        net.add_node('S', pressure=ETQ.Pressure(210., 'bar'))
+        net.add_node('T', pressure=ETQ.Pressure(0., 'bar'))
+        net.add_node('A'); net.add_node('B')
+        net.add_valve('v', 'S', 'T', 'A', 'B', valve, xV)
+        net.add_cylinder('c', 'A', 'B', self.cylinder, load=ETQ.Force(5., 'kN'))
+        return net
+
+    def test_closed_case_masked(self):
+        # zero lap: the case with xV = 0 has no solution, the others are solved
+        valve = ProportionalValve(ETQ.Flowrate(40., 'Liter/min'))
+        sol = self._axis(np.array([0.5, 0., -0.3]), valve).solve()
+        self.assertEqual(sol.converged.tolist(), [True, False, True])
+        self.assertTrue(np.isnan(sol.pressure('A').get_value()[1]))
+        self.assertTrue(np.isnan(sol.velocity('c').get_value()[1]))
+        self.assertTrue(np.isnan(sol.flow('v:PA').get_value()[1]))
+        for k, xV in ((0, 0.5), (2, -0.3)):
+            single = self._axis(xV, valve).solve()
+            self.assertAlmostEqual(sol.velocity('c').get_value()[k] / single.velocity('c').get_value(), 1., places=9)
+            self.assertAlmostEqual(sol.pressure('B').get_value()[k] / single.pressure('B').get_value(), 1., places=9)
+        with self.assertRaises(NetworkError):
+            self._axis(np.array([0., 0.]), valve).solve()
+
+    def test_line_search_rejects_step(self):
+        # case 1 gets a residual which grows for any step: the step is rejected, case 0 converges
+        residual = ETFnetwork._Solver.residual  # pylint: disable=protected-access
+        start = {}
+
+        def patched(solver, x, laminar=False):
+            F, g = residual(solver, x, laminar)
+            if laminar:
+                return F, g
+            start.setdefault('x', x.copy())
+            if np.any(x[:, 1] != start['x'][:, 1]):
+                F[:, 1] += np.sign(F[:, 1]) * 1e3 * solver.q_ref
+            return F, g
+        net = self._axis(np.array([0.5, 0.5]), self.valve)
+        with mock.patch.object(ETFnetwork._Solver, 'residual', patched):  # pylint: disable=protected-access
+            sol = net.solve()
+        self.assertEqual(sol.converged.tolist(), [True, False])
+        self.assertLess(sol.iterations, 50)
+        reference = self._axis(0.5, self.valve).solve()
+        self.assertAlmostEqual(sol.velocity('c').get_value()[0] / reference.velocity('c').get_value(), 1., places=9)
+
+    def test_chain_default_options(self):
+        # chain of 500 nodes, each with a bleed to tank: converges from the laminarized start
+        n = 500
+        net = Network()
+        net.add_node('S', pressure=ETQ.Pressure(100., 'bar'))
+        net.add_node('T', pressure=ETQ.Pressure(0., 'bar'))
+        previous = 'S'
+        for k in range(n):
+            net.add_node(k)
+            net.add_orifice(previous, k, orifice(1.))
+            net.add_orifice(k, 'T', orifice(0.1))
+            previous = k
+        sol = net.solve()
+        self.assertTrue(sol.converged.all())
+        self.assertLess(sol.iterations, 20)
+        self.assertTrue(np.all(np.diff(sol.P[2:, 0]) <= 0.))
+        q = sol.q[:, 0]
+        np.testing.assert_allclose(q[0::2][:-1] - q[0::2][1:] - q[1::2][:-1], 0., atol=1e-9 * np.max(np.abs(q)))
+
+    def test_large_network(self):
+        # resistor ladder: 300 free nodes, each with an orifice to tank, 200 supply pressures
+        n, N = 300, 200
+        net = Network()
+        net.add_node('S', pressure=ETQ.Pressure(np.linspace(10., 300., N), 'bar'))
+        net.add_node('T', pressure=ETQ.Pressure(0., 'bar'))
+        previous = 'S'
+        for k in range(n):
+            net.add_node(k)
+            net.add_orifice(previous, k, orifice(10.))
+            net.add_orifice(k, 'T', orifice(0.05))
+            previous = k
+        start = time.perf_counter()
+        sol = net.solve()
+        elapsed = time.perf_counter() - start
+        self.assertTrue(sol.converged.all())
+        self.assertEqual(sol.P.shape, (n + 2, N))
+        # flow balance at every node
+        q = sol.q
+        inflow = q[0::2]
+        np.testing.assert_allclose(inflow[:-1] - inflow[1:] - q[1::2][:-1], 0., atol=1e-9 * np.max(np.abs(q)))
+        self.assertTrue(np.all(np.diff(sol.P[2:], axis=0) < 0.))
+        self.assertLess(elapsed, 30.)
+
+    def test_errors(self):
+        net = Network()
+        net.add_node('S', pressure=ETQ.Pressure(100., 'bar'))
+        with self.assertRaises(NetworkError):
+            net.add_node('S')
+        with self.assertRaises(NetworkError):
+            net.add_node('X', pressure=ETQ.Pressure(1., 'bar'), flow=ETQ.Flowrate(1., 'Liter/min'))
+        with self.assertRaises(NetworkError):
+            net.add_orifice('S', 'unknown', orifice(1.))
+        with self.assertRaises(Exception):
+            net.add_node('Y', pressure=ETQ.Force(1., 'N'))
+        net.add_node('A'); net.add_node('B')
+        with self.assertRaises(NetworkError):
+            net.add_cylinder('c', 'A', 'B', self.cylinder)
+        # closed valve: A and B are not connected
+        net.add_node('T', pressure=ETQ.Pressure(0., 'bar'))
+        net.add_valve('v', 'S', 'T', 'A', 'B', ProportionalValve(ETQ.Flowrate(40., 'Liter/min')), 0.)
+        net.add_orifice('S', 'T', orifice(1.))
+        with self.assertRaises(NetworkError):
+            net.solve()
+        net2 = Network()
+        net2.add_node('S', pressure=ETQ.Pressure(np.array([1., 2.]), 'bar'))
+        net2.add_node('T', pressure=ETQ.Pressure(np.array([0., 0., 0.]), 'bar'))
+        net2.add_orifice('S', 'T', orifice(1.))
+        with self.assertRaises(NetworkError):
+            net2.solve()
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
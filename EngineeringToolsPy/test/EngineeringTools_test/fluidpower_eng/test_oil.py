@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import unittest
+import os
+import sys
+import numpy as np
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+
+import EngineeringTools.quantities as ETQ
+from EngineeringTools.tools.catalog import CatalogError
+from EngineeringTools.fluidpower_eng.oil import Oil, Oil_ShellTellusS2M46, ViscosityCurve, get_oil, oil_database
+
+
+def viscosity_closed_form(x, y, T):
+    """three point fit of ln(nu) = k0 + k1 T + k2 T**2 as closed form (the former implementation)"""
+    log = np.log
+    den = x[0]**2*x[1] - x[0]**2*x[2] - x[0]*x[1]**2 + x[0]*x[2]**2 + x[1]**2*x[2] - x[1]*x[2]**2
+    k0 = (x[0]*x[1]*(x[0] - x[1])*log(y[2]) - x[0]*x[2]*(x[0] - x[2])*log(y[1]) + x[1]*x[2]*(x[1] - x[2])*log(y[0])) / den
+    k1 = (-(x[0]**2 - x[1]**2)*log(y[2]) + (x[0]**2 - x[2]**2)*log(y[1]) - (x[1]**2 - x[2]**2)*log(y[0])) / den
+    k2 = ((x[0] - x[1])*log(y[2]) - (x[0] - x[2])*log(y[1]) + (x[1] - x[2])*log(y[0])) / den
+    return np.exp(k0 + k1 * T + k2 * T**2)
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+        self.T = ETQ.TemperatureAbsolute.iso_array(np.linspace(-10., 110., 25), 'degC')
+
+    def test_log_quadratic_as_before(self):
+        oil = Oil_ShellTellusS2M46()
+        x = [t.get_value() for t, _ in oil.viscosityKinematic_tab]
+        y = [v.get_value() for _, v in oil.viscosityKinematic_tab]
+        np.testing.assert_allclose(oil.viscosityKinematic(self.T).get_value(), viscosity_closed_form(x, y, self.T), rtol=1e-10)
+        nu = oil.viscosityKinematic(ETQ.TemperatureAbsolute(50., 'degC'))
+        self.assertIsInstance(nu.get_value(), float)
+        self.assertAlmostEqual(nu.get_value() / viscosity_closed_form(x, y, 323.15), 1., places=12)
+
+    def test_dynamic_viscosity(self):
+        oil = get_oil('Tellus S2 M 32')
+        np.testing.assert_allclose(oil.viscosityDynamic(self.T).get_value(), oil.viscosityKinematic(self.T).get_value() * 875.)
+        self.assertIsInstance(oil.viscosityDynamic(ETQ.TemperatureAbsolute(40., 'degC')), ETQ.ViscosityDynamic)
+
+    def test_walther(self):
+        T = ETQ.TemperatureAbsolute.iso_array([20., 40., 60., 80., 100.], 'degC')
+        A, B = 9.0, 3.5
+        nu = (10.**(10.**(A - B * np.log10(T))) - 0.7) * 1e-6
+        curve = ViscosityCurve(T, nu, 'walther')
+        np.testing.assert_allclose(curve.coefficients, [-B, A])
+        np.testing.assert_allclose(curve(self.T), (10.**(10.**(A - B * np.log10(self.T))) - 0.7) * 1e-6, rtol=1e-10)
+        for name in ('ShellTellusS2M32', 'ShellTellusS2M46', 'ShellTellusS2M68'):
+            oil = get_oil(name, viscosity_model='walther')
+            T, nu = oil.viscosity.T, oil.viscosity.nu
+            np.testing.assert_allclose(oil.viscosity(T), nu, rtol=0.05)
+
+    def test_database(self):
+        db = oil_database()
+        self.assertIs(db, oil_database())
+        self.assertGreaterEqual(len(db), 4)
+        self.assertEqual(db.identify('s2m46'), 'ShellTellusS2M46')
+        self.assertIsInstance(get_oil('Shell Tellus S2 M 46'), Oil_ShellTellusS2M46)
+        self.assertIs(db.viscosity_curve('S2M46'), Oil_ShellTellusS2M46().viscosity)
+        with self.assertRaises(CatalogError):
+            get_oil('water')
+        with self.assertRaises(CatalogError):
+            get_oil('S2M46', viscosity_model='cubic')
+
+    def test_general_oil(self):
+        oil = Oil()
+        self.assertEqual(oil.bulkmodulus.get_value(), 1.0e9)
+        self.assertEqual(oil.density.get_value(), 890.)
+        self.assertEqual(oil.viscosityKinematic_tab, [])
+        with self.assertRaises(CatalogError):
+            oil.viscosityKinematic(ETQ.TemperatureAbsolute(40., 'degC'))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import unittest
+import os
+import sys
+import numpy as np
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+
+import EngineeringTools.quantities as ETQ
+from EngineeringTools.fluidpower_eng.proportionalValve import ProportionalValve
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+        self.valve = ProportionalValve(flowrate_nominal=ETQ.Flowrate(40, 'Liter/min'), pressuredrop_tot_nominal=ETQ.Pressure(70, 'bar'), underlap1=0.05)
+        self.pS, self.pT = ETQ.Pressure(210., 'bar'), ETQ.Pressure(5., 'bar')
+
+    def test_flow_map_equals_single_points(self):
+        xV = np.linspace(-1.2, 1.2, 13)
+        pL = np.linspace(-150., 150., 7)
+        QA, QB = self.valve.flow(xV[np.newaxis, :], pL=ETQ.Pressure(pL[:, np.newaxis], 'bar'), pS=self.pS, pT=self.pT)
+        self.assertEqual(QA.get_value().shape, (7, 13))
+        for i, p in enumerate(pL):
+            for j, x in enumerate(xV):
+                qa, qb = self.valve.flow(float(x), pL=ETQ.Pressure(float(p), 'bar'), pS=self.pS, pT=self.pT)
+                self.assertAlmostEqual(QA.get_value()[i, j], qa.get_value())
+                self.assertAlmostEqual(QB.get_value()[i, j], qb.get_value())
+        # spool position is limited to -1..1
+        np.testing.assert_allclose(QA.get_value()[:, 0], QA.get_value()[:, 1])
+
+    def test_gains(self):
+        xV = np.array([-0.5, 0., 0.5])
+        pA0, pB0 = ETQ.Pressure(np.array([80., 100., 120.]), 'bar'), ETQ.Pressure(np.array([90., 100., 110.]), 'bar')
+        for gain, args in ((self.valve.KQxA1__Jelali_4_225, (self.pS, self.pT, pA0, pB0)), (self.valve.KQxB1__Jelali_4_226, (self.pS, self.pT, pA0, pB0)),
+                           (self.valve.KQpA1__Jelali_4_227, (0.2, self.pS, self.pT, pA0, pB0)), (self.valve.KQpB1__Jelali_4_228, (0.2, self.pS, self.pT, pA0, pB0))):
+            K = gain(xV, *args)
+            for i, x in enumerate(xV):
+                single = gain(ETQ.Scalar(x), *[ETQ.Pressure(a.get_value()[i], 'Pa') if isinstance(a, ETQ.Pressure) and np.ndim(a.get_value()) else a for a in args])
+                self.assertAlmostEqual(K.get_value()[i], single.get_value())
+
+    def test_Cv1_cached(self):
+        Cv1 = self.valve.Cv1
+        self.assertIs(self.valve.Cv1, Cv1)
+        self.valve.flowrate_nominal = ETQ.Flowrate(80, 'Liter/min')
+        self.assertAlmostEqual(self.valve.Cv1.get_value(), 2. * Cv1.get_value())
+        self.valve.underlap1 = 0.
+        self.assertAlmostEqual(self.valve.Cv1.get_value(), 2. * 1.05 * Cv1.get_value())
+        with self.assertRaises(Exception):
+            self.valve.underlap1 = 2.
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import unittest
+import os
+import sys
+import numpy as np
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+
+import EngineeringTools.quantities as ETQ
+from EngineeringTools.uval import UVal
+from EngineeringTools.fluidpower_eng.cylinder import Cylinder
+from EngineeringTools.fluidpower_eng.proportionalValve import ProportionalValve
+from EngineeringTools.fluidpower_eng.simulation import ServoAxis, simulate, simulate_batch, SimulationError
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+        self.valve = ProportionalValve(ETQ.Flowrate(40., 'Liter/min'), ETQ.Pressure(70., 'bar'))
+        self.cylinder = Cylinder(D=ETQ.Distance(50., 'mm'), dA=ETQ.Distance(28., 'mm'), stroke_length=ETQ.Distance(400., 'mm'))
+        self.kwargs = dict(mass=ETQ.Mass(200., 'kg'), pS=ETQ.Pressure(160., 'bar'), friction=5000., deadVolume=ETQ.Volume(100., 'cm3'))
+
+    def axis(self, **kwargs):
+        return ServoAxis(self.valve, self.cylinder, **dict(self.kwargs, **kwargs))
+
+    def test_rk4_dopri5_agree(self):
+        axis = self.axis(Kp=20., reference=lambda t: 0.1 * (t >= 0.05), Tv=ETQ.Time(5., 'ms'))
+        rk4 = simulate(axis, 0.5, method='rk4', dt=1e-4, output_dt=1e-3)
+        dopri5 = simulate(axis, 0.5, method='dopri5', output_dt=1e-3)
+        self.assertEqual(len(rk4), len(dopri5))
+        self.assertLess(dopri5.steps, rk4.steps / 10)
+        np.testing.assert_allclose(rk4.x, dopri5.x, atol=2e-5)
+        np.testing.assert_allclose(rk4.pA, dopri5.pA, atol=0.5e5)
+        self.assertAlmostEqual(float(rk4.x[-1]), 0.1, delta=2e-3)
+
+    def test_rk4_output_grid(self):
+        axis = self.axis(Kp=20., reference=ETQ.Distance(100., 'mm'))
+        reference = simulate(axis, 0.5, method='dopri5', output_dt=1e-3, rtol=1e-9)
+        for output_dt in (2.5e-4, 5e-5):
+            with self.assertRaises(SimulationError):
+                simulate(axis, 0.5, method='rk4', dt=1e-4, output_dt=output_dt)
+        res = simulate(axis, 0.5, method='rk4', dt=1e-4, output_dt=3e-4)
+        np.testing.assert_allclose(res.t, 3e-4 * np.arange(len(res)))
+        self.assertAlmostEqual(float(res.t[-1]), 0.4998, places=12)
+        np.testing.assert_allclose(res.x[::10], np.interp(res.t[::10], reference.t, reference.x), atol=2e-4)
+        # t_end not a multiple of dt: the last sample is at the last step
+        res = simulate(axis, 0.5, method='rk4', dt=3e-4)
+        self.assertAlmostEqual(float(res.t[-1]), 1667 * 3e-4, places=12)
+        self.assertAlmostEqual(float(res.x[-1]), float(reference.x[-1]), delta=1e-4)
+
+    def test_end_stop(self):
+        for method in ('rk4', 'dopri5'):
+            res = simulate(self.axis(command=-1.), 1., method=method, x0=ETQ.Distance(-100., 'mm'), output_dt=1e-3)
+            self.assertEqual(len(res.events), 1)
+            t, stop, variant = res.events[0]
+            self.assertEqual((stop, variant), ('lower', None))
+            self.assertTrue(0.1 < t < 0.5)
+            self.assertGreaterEqual(float(res.x.min()), -0.2 - 1e-12)
+            self.assertEqual(float(res.x[-1]), -0.2)
+            self.assertEqual(float(res.v[-1]), 0.)
+
+    def test_variants(self):
+        masses = np.array([100., 200., 400.])
+        axis = self.axis(mass=ETQ.Mass(masses, 'kg'), Kp=20., reference=ETQ.Distance(100., 'mm'))
+        self.assertEqual(axis.size, 3)
+        batch = simulate(axis, 0.3, method='dopri5', output_dt=1e-3)
+        self.assertEqual(batch.x.shape, (301, 3))
+        for i, m in enumerate(masses):
+            single = simulate(self.axis(mass=ETQ.Mass(m, 'kg'), Kp=20., reference=ETQ.Distance(100., 'mm')), 0.3, method='dopri5', output_dt=1e-3)
+            np.testing.assert_allclose(batch.x[:, i], single.x, atol=1e-6)
+
+    def test_kpi(self):
+        res = simulate(self.axis(Kp=40., reference=ETQ.Distance(100., 'mm')), 1., method='dopri5', output_dt=1e-3, kpi=True)
+        self.assertAlmostEqual(res.kpi['overshoot'], max(float(res.x.max()) - 0.1, 0.) / 0.1)
+        self.assertGreater(res.kpi['overshoot'], 0.)
+        self.assertEqual(res.kpi['peak_pressure'], float(max(res.pA.max(), res.pB.max())))
+        outside = np.flatnonzero(np.abs(res.x - 0.1) > 0.002)
+        self.assertEqual(res.kpi['settling_time'], res.t[outside[-1]])
+        self.assertIsInstance(res.kpi_quantity('settling_time'), ETQ.Time)
+        # not settled at the end
+        res = simulate(self.axis(Kp=40., reference=ETQ.Distance(100., 'mm')), 0.1, method='dopri5', output_dt=1e-3, kpi=True, trajectories=False)
+        self.assertEqual(res.data, {})
+        self.assertTrue(np.isnan(res.kpi['settling_time']))
+
+    def test_batch_equals_single(self):
+        masses, gains = np.array([100., 200., 400., 300.]), np.array([10., 20., 40., 30.])
+        batch = simulate_batch(self.axis(mass=ETQ.Mass(masses, 'kg'), Kp=gains, reference=ETQ.Distance(100., 'mm')), 1., method='dopri5', output_dt=1e-3, max_workers=0)
+        self.assertEqual(batch.data, {})
+        for i, (m, Kp) in enumerate(zip(masses, gains)):
+            single = simulate(self.axis(mass=ETQ.Mass(m, 'kg'), Kp=Kp, reference=ETQ.Distance(100., 'mm')), 1., method='dopri5', output_dt=1e-3, kpi=True)
+            self.assertAlmostEqual(batch.kpi['peak_pressure'][i], single.kpi['peak_pressure'], delta=1e3)
+            self.assertAlmostEqual(batch.kpi['settling_time'][i], single.kpi['settling_time'], delta=2e-3)
+            self.assertAlmostEqual(batch.kpi['overshoot'][i], single.kpi['overshoot'], places=4)
+
+    def test_batch_process_pool(self):
+        axis = self.axis(mass=ETQ.Mass(np.array([100., 200., 400.]), 'kg'), command=1.)
+        options = dict(dt=1e-4, output_dt=1e-3, x0=ETQ.Distance(100., 'mm'), trajectories=True)
+        local = simulate_batch(axis, 0.3, max_workers=0, **options)
+        pool = simulate_batch(axis, 0.3, max_workers=2, chunksize=2, **options)
+        self.assertEqual(pool.x.shape, (301, 3))
+        np.testing.assert_array_equal(pool.x, local.x)
+        for name in local.kpi:
+            np.testing.assert_array_equal(pool.kpi[name], local.kpi[name])
+        self.assertEqual(sorted(i for _, _, i in pool.events), [0, 1, 2])
+        self.assertEqual(pool.events, local.events)
+        self.assertTrue(np.isnan(pool.kpi['overshoot']).all())    # open loop
+
+    def test_units_checked(self):
+        with self.assertRaises(Exception):
+            self.axis(mass=ETQ.Distance(1., 'm'))
+        with self.assertRaises(Exception):
+            self.axis(Kp=UVal(20., {'second':-1}), reference=ETQ.Distance(100., 'mm'))
+        with self.assertRaises(SimulationError):
+            self.axis(Kp=20.)
+        with self.assertRaises(SimulationError):
+            simulate(self.axis(command=0.), 0.1, method='euler')
+        with self.assertRaises(SimulationError):
+            self.axis(mass=ETQ.Mass(np.array([100., 200.]), 'kg'), Kp=np.array([10., 20., 30.]), reference=ETQ.Distance(100., 'mm'))
+
+    def test_output(self):
+        res = simulate(self.axis(Kp=20., reference=ETQ.Distance(100., 'mm')), ETQ.Time(0.2, 's'), method='dopri5', output_dt=1e-4)
+        self.assertEqual(len(res), 2001)
+        np.testing.assert_allclose(res.t[1] - res.t[0], 1e-4)
+        self.assertIsInstance(res.quantity('x'), ETQ.Distance)
+        self.assertIsInstance(res.quantity('pA'), ETQ.Pressure)
+        self.assertTrue(np.all(np.abs(res.u) <= 1.))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
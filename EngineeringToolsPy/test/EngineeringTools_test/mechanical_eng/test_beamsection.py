@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import os
+import sys
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+
+import unittest
+import numpy as np
+
+import EngineeringTools.quantities as ETQ
+import EngineeringTools.mechanical_eng.beamsection as ETMBS
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+    def assertProperties(self, section, reference, keys):
+        for key in keys:
+            self.assertAlmostEqual(getattr(section, key).get_value() / getattr(reference, key).get_value(), 1., places=10, msg=key)
+
+    def test_polygon_equals_rectangle(self):
+        rectangle = ETMBS.BeamSection_Rectangle(ETQ.Distance(200.0, 'mm'), ETQ.Distance(300.0, 'mm'), thickness=ETQ.Distance(12.5, 'mm'))
+        # clockwise outline, counterclockwise hole: the orientation does not matter
+        polygon = ETMBS.BeamSection_Polygon([(0, 300), (200, 300), (200, 0), (0, 0)], holes=[[(12.5, 12.5), (187.5, 12.5), (187.5, 287.5), (12.5, 287.5)]])
+        self.assertProperties(polygon, rectangle, ['A', 'Ix', 'Iy', 'Jz', 'Wbx', 'Wby', 'Wp'])
+        self.assertAlmostEqual(polygon.Ixy.get_value(), 0.)
+
+    def test_composite_of_rectangle(self):
+        rectangle = ETMBS.BeamSection_Rectangle(ETQ.Distance(200.0, 'mm'), ETQ.Distance(300.0, 'mm'))
+        composite = ETMBS.BeamSection_Composite([rectangle])
+        self.assertProperties(composite, rectangle, ['A', 'Ix', 'Iy', 'Jz', 'Wbx', 'Wby', 'Wp'])
+        self.assertAlmostEqual(rectangle.Wp.get_value(), 0.2*0.3*(0.2**2 + 0.3**2)/12. / (np.hypot(0.2, 0.3)/2.))
+
+    def test_polygon_pipe(self):
+        pipe = ETMBS.BeamSection_Pipe(ETQ.Distance(100., 'mm'), ETQ.Distance(80., 'mm'))
+        phi = np.linspace(0., 2.*np.pi, 20000, endpoint=False)
+        circle = np.stack([np.cos(phi), np.sin(phi)], axis=-1)
+        polygon = ETMBS.BeamSection_Polygon(50.*circle, holes=[40.*circle])
+        for key in ['A', 'Ix', 'Jz', 'Wp']:
+            self.assertAlmostEqual(getattr(polygon, key).get_value() / getattr(pipe, key).get_value(), 1., places=6, msg=key)
+
+    def test_principal_moments(self):
+        angle = 0.3
+        rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        flat = np.array([(0, 0), (200, 0), (200, 30), (0, 30)], dtype=float)
+        section = ETMBS.BeamSection_Polygon(flat @ rotation.T)
+        self.assertAlmostEqual(section.Imin.get_value(), 200.*30.**3/12.*1e-12)
+        self.assertAlmostEqual(section.Imax.get_value(), 30.*200.**3/12.*1e-12)
+
+    def test_composite_equals_polygon(self):
+        web = ETMBS.BeamSection_Rectangle(ETQ.Distance(10., 'mm'), ETQ.Distance(200., 'mm'))
+        flange = ETMBS.BeamSection_Rectangle(ETQ.Distance(100., 'mm'), ETQ.Distance(10., 'mm'))
+        composite = ETMBS.BeamSection_Composite([web, (flange, (0., 105.)), (flange, (0., -105.))])
+        polygon = ETMBS.beamsection_I(ETQ.Distance(220., 'mm'), ETQ.Distance(100., 'mm'), ETQ.Distance(10., 'mm'), ETQ.Distance(10., 'mm'))
+        self.assertProperties(composite, polygon, ['A', 'Ix', 'Iy', 'Jz', 'Wbx', 'Wby', 'Wp'])
+        # unsymmetric: T-section
+        composite = ETMBS.BeamSection_Composite([web, (flange, (0., 105.))])
+        self.assertGreater(composite.yc.get_value(), 0.)
+        polygon = ETMBS.BeamSection_Polygon([(-5, -100), (5, -100), (5, 100), (50, 100), (50, 110), (-50, 110), (-50, 100), (-5, 100)])
+        self.assertProperties(composite, polygon, ['A', 'yc', 'Ix', 'Iy', 'Wbx', 'Wby', 'Wp'])
+
+    def test_arrays(self):
+        polygons = [[(0, 0), (1, 0), (0, 1)], [(0, 0), (2, 0), (2, 1), (0, 1)], [(0, 0), (3, 0), (3, 3), (1, 4), (0, 3)]]
+        res = ETMBS.polygon_properties_arrays(ETMBS.pad_polygons(polygons))
+        for i, polygon in enumerate(polygons):
+            section = ETMBS.BeamSection_Polygon(polygon, unit='m')
+            for key in ['A', 'xc', 'yc', 'Ix', 'Iy', 'Ixy', 'Imin', 'Zex', 'Zez']:
+                self.assertAlmostEqual(res[key][i], getattr(section, key).get_value())
+
+    def test_immutable(self):
+        section = ETMBS.BeamSection_Polygon([(0, 0), (1, 0), (0, 1)])
+        with self.assertRaises(ValueError):
+            section.outline[0, 0] = 1.
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
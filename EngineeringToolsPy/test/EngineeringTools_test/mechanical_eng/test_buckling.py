@@ -11,9 +11,12 @@ ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dir
 sys.path.insert(0, ppath)
 
 import unittest
+import numpy as np
 
 import EngineeringTools.quantities as ETQ
 import EngineeringTools.mechanical_eng.buckling as ETMB
+import EngineeringTools.mechanical_eng.material as ETMM
+import EngineeringTools.mechanical_eng.beamsection as ETMBS
 
 class Test(unittest.TestCase):
 
@@ -36,6 +39,80 @@ class Test(unittest.TestCase):
 #         self.assertIsNot(buckling.momentOfArea2nd, I)
         
 
+    def test_arrays_equal_scalar(self):
+        lengths = np.array([1., 2., 3.])
+        diameters = np.array([0.02, 0.04])
+        thicknesses = np.array([0.002, 0.004])
+        endconditions = np.array(list(ETMB.Buckling.endconditioncases))
+        material = ETMM.Steel_S355JR()
+        res = ETMB.buckling_arrays_pipe(lengths[:, None, None, None], diameters[None, :, None, None], material,
+                                        thickness=thicknesses[None, None, :, None], endcondition=endconditions[None, None, None, :])
+        self.assertEqual(res['forcePermitted'].shape, (3, 2, 2, 4))
+        buckling = ETMB.Buckling()
+        buckling.material = material
+        for index in np.ndindex(res['euler'].shape):
+            i, j, k, m = index
+            buckling.length = ETQ.Distance(lengths[i], 'm')
+            buckling.beamSection = ETMBS.BeamSection_Pipe(ETQ.Distance(diameters[j], 'm'), thickness=ETQ.Distance(thicknesses[k], 'm'))
+            buckling.endcondition = str(endconditions[m])
+            self.assertAlmostEqual(res['slendernessRatio'][index], buckling.slendernessRatio.get_value())
+            if res['euler'][index]:
+                self.assertAlmostEqual(res['forcePermitted'][index], buckling.forcePermitted.get_value())
+            else:
+                self.assertTrue(np.isnan(res['bucklingForce'][index]))
+                with self.assertRaises(NotImplementedError):
+                    buckling.bucklingForce  # pylint: disable=pointless-statement
+
+    def test_arrays_units_checked(self):
+        with self.assertRaises(ETQ.ParaDInF_quantity_ErrorQuantitiesDoNotMatch):
+            ETMB.buckling_arrays_pipe(ETQ.Force(1., 'N'), 0.02, ETMM.Steel_S355JR())
+        with self.assertRaises(Exception):
+            ETMB.buckling_arrays_pipe(1., 0.02, ETMM.Steel_S355JR(), endcondition='free')
+
+    def test_buckling_euler_youngs_modulus(self):
+        I = ETQ.MomentOfAreaSecond(7854., 'mm^4')
+        L = ETQ.Distance(1., 'm')
+        F_steel = ETMB.buckling_euler(L, 'both ends pinned', I)
+        F_alu = ETMB.buckling_euler(L, 'both ends pinned', I, youngs_modulus=ETQ.Stress(70e3, 'N/mm^2'))
+        self.assertAlmostEqual(F_alu.get_value() / F_steel.get_value(), 1. / 3.)
+
+
+    def _size_brute_force(self, catalog, force, length, K, material, weight, slendernessRatio_max=None):
+        A = catalog.column('A')
+        I = catalog.column('Imin')
+        res = ETMB.buckling_arrays(length, I, A, material, endcondition=K)
+        feasible = res['euler'] & (res['forcePermitted'] >= force)
+        if slendernessRatio_max is not None:
+            feasible &= res['slendernessRatio'] <= slendernessRatio_max
+        if not feasible.any():
+            return -1
+        rows = np.nonzero(feasible)[0]
+        return rows[np.argmin(weight[rows])]
+
+    def test_size_columns(self):
+        catalog = ETMB.tube_catalog()
+        material = ETMM.Steel_S355JR()
+        rng = np.random.default_rng(1)
+        force = rng.uniform(1e3, 5e5, 200)
+        length = rng.choice([0.5, 1., 2., 4.], 200)
+        K = rng.choice(list(ETMB.Buckling.endconditioncases.values()), 200)
+        cost = rng.uniform(1., 10., len(catalog))
+        for criterion, weight, slendernessRatio_max in (('mass', catalog.column('A'), None), ('cost', cost, 150.)):
+            res = ETMB.size_columns(force, length, material, endcondition=K, catalog=catalog, criterion=criterion, cost=cost,
+                                    slendernessRatio_max=slendernessRatio_max)
+            for i in range(len(force)):
+                row = self._size_brute_force(catalog, force[i], length[i], K[i], material, weight, slendernessRatio_max)
+                if row < 0:
+                    self.assertEqual(res['row'][i], -1)
+                else:
+                    self.assertAlmostEqual(weight[res['row'][i]], weight[row])
+                    self.assertGreaterEqual(res['forcePermitted'][i], force[i])
+
+    def test_size_columns_criterion(self):
+        with self.assertRaises(ETMB.ETTT.EngineeringTools_tools_Error):
+            ETMB.size_columns(1e3, 1., ETMM.Steel_S355JR(), criterion='cost')
+        with self.assertRaises(ETMB.ETTT.EngineeringTools_tools_Error):
+            ETMB.size_columns(1e3, 1., ETMM.Steel_S355JR(), criterion='colour')
 
 
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ __email__   = "marthoch@users.noreply.github.com"
 __license__ = "BSD 3-clause"
 
 import unittest
+import numpy as np
 
 import os
 import sys
@@ -13,6 +14,7 @@ ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dir
 sys.path.insert(0, ppath)
 
 import EngineeringTools.quantities as ETQ
+import EngineeringTools.tools.catalog as ETTcatalog
 import EngineeringTools.mechanical_eng.material as ETMmat
 ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
 
@@ -33,6 +35,70 @@ class Test(unittest.TestCase):
 
     def test_Steel_S355JR_init(self):
         ms = ETMmat.Steel_S355JR()
+        self.assertEqual(ms.identifiers, ['S355JR', '1.0045', 'St52-3', 'Sweden SS 2132-01'])
+        self.assertEqual(ms.youngs_modulus, ETQ.Stress(210e3, 'N/mm2'))
+        self.assertEqual([Rp.get_value('N/mm2') for Rp in ms.Rp_list], [355., 345., 335., 325., 315., 295., 285., 275.])
+
+    def test_identify(self):
+        db = ETMmat.material_database()
+        for identifier in ['S355JR', '1.0045', 'St52-3', 'Steel: S355JR', 's355jr']:
+            self.assertEqual(db.identify(identifier), 'S355JR')
+        self.assertIsInstance(ETMmat.get_material('1.6582'), ETMmat.Steel_34CrNiMo6)
+        self.assertIsInstance(ETMmat.get_material('S235JR'), ETMmat.Steel)
+        self.assertEqual(ETMmat.get_material('S235JR').name, 'Steel: S235JR')
+        with self.assertRaises(ETTcatalog.CatalogError):
+            db.identify('unobtainium')
+
+    def test_Rp_thickness(self):
+        ms = ETMmat.Steel_S355JR()
+        thickness = np.array([1., 16., 16.5, 40., 63., 80., 100., 150., 200., 250.])
+        expected = [355., 355., 345., 345., 335., 325., 315., 295., 285., 275.]
+        np.testing.assert_array_equal(ms.thickness_property('Rp', ETQ.Distance.iso_array(thickness, 'mm')), np.array(expected) * 1e6)
+        for t, Rp in zip(thickness, expected):
+            self.assertAlmostEqual(ms.Rp(ETQ.Distance(t, 'mm')).get_value('N/mm2'), Rp)
+        self.assertEqual(ms.Rp().get_value('N/mm2'), 355.)
+        with self.assertRaises(ETTcatalog.CatalogError):
+            ms.Rp(ETQ.Distance(300., 'mm'))
+        self.assertTrue(np.isnan(ms.thickness_property('Rp', ETQ.Distance.iso_array([300.], 'mm'))[0]))
+
+    def test_Rp_without_table(self):
+        self.assertEqual(ETMmat.ChilledDuctileIron_CDI580().Rp(), ETQ.Stress(440., 'N/mm2'))
+        with self.assertRaises(ETTcatalog.CatalogError):
+            ETMmat.CastIron().Rp()
+
+    def test_property_curves(self):
+        ms = ETMmat.Steel_S355JR()
+        T = ETQ.TemperatureAbsolute.iso_array([20., 100., 250., 800., 900.], 'degC')
+        np.testing.assert_allclose(ms.property_iso('youngs_modulus', T), [210e9, 210e9, 178.5e9, 18.9e9, np.nan])
+        E = ms.property('youngs_modulus', T)
+        self.assertIsInstance(E, ETQ.Stress)
+        np.testing.assert_allclose(E.get_value(), ms.property_iso('youngs_modulus', T))
+        E = ms.property('youngs_modulus', ETQ.TemperatureAbsolute(20., 'degC'))
+        self.assertIsInstance(E, ETQ.Stress)
+        self.assertEqual(E.get_value(), 210e9)
+        self.assertIsInstance(ms.property('youngs_modulus'), ETQ.Stress)
+        self.assertIsInstance(ms.property('density', T), ETQ.Density)
+        self.assertAlmostEqual(ms.property('thermal_conductivity').get_value(), 54. - 3.33e-2*20., places=2)
+
+    def test_shared_curves(self):
+        # the carbon steels reference one curve set of materials_temperature.txt
+        db = ETMmat.material_database()
+        curves = db.curves('steel')
+        self.assertEqual(sorted(curves), ['heat_capacity_specific', 'thermal_conductivity', 'thermal_expansion_coefficient_linear', 'youngs_modulus'])
+        for identifier in ('S235JR', 'S355JR', 'S355J2'):
+            self.assertEqual(db.curves(identifier), curves)
+        self.assertEqual(db.curves('42CrMo4'), {})
+
+    def test_property_constant(self):
+        ms = ETMmat.Steel_S355JR()
+        T = np.full((3, 4), 500.)
+        density = ms.property_iso('density', T)
+        self.assertEqual(density.shape, (3, 4))
+        self.assertEqual(density.strides, (0, 0))
+        self.assertTrue(np.all(density == 7800.))
+        with self.assertRaises(ETTcatalog.CatalogError):
+            ETMmat.CastIron().property_iso('thermal_conductivity', T)
+
 
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
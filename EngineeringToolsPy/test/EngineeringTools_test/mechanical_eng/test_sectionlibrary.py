@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import os
+import sys
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+
+import unittest
+import numpy as np
+
+import EngineeringTools.quantities as ETQ
+import EngineeringTools.tools.catalog as ETTcatalog
+import EngineeringTools.mechanical_eng.sectionlibrary as ETMSL
+import EngineeringTools.mechanical_eng.beamsection as ETMBS
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+        self.lib = ETMSL.section_library()
+
+    def test_columns_equal_sections(self):
+        for row in range(len(self.lib)):
+            section = self.lib.section(row)
+            for key in ['A', 'Ix', 'Iy', 'Jz', 'Zex', 'Zey', 'Zez', 'Wp']:
+                self.assertAlmostEqual(self.lib.value(row, key) / getattr(section, key).get_value(), 1., places=10,
+                                       msg='{} {}'.format(self.lib.names[row], key))
+        self.assertEqual(set(self.lib.column('kind')), {'pipe', 'RHS', 'flat'})
+
+    def test_columns_equal_polygons(self):
+        # Zez = Jz / rmax as BeamSection_Polygon
+        for kind in ('RHS', 'flat'):
+            row = int(np.flatnonzero(self.lib.column('kind') == kind)[0])
+            B, H, t = (float(self.lib.column(key)[row]) for key in ('B', 'H', 't'))
+            if kind == 'flat':
+                polygon = ETMBS.BeamSection_Polygon([(0., 0.), (B, 0.), (B, t), (0., t)], unit='m')
+            else:
+                polygon = ETMBS.BeamSection_Polygon([(0., 0.), (B, 0.), (B, H), (0., H)], holes=[[(t, t), (B - t, t), (B - t, H - t), (t, H - t)]], unit='m')
+            for key in ['A', 'Jz', 'Zex', 'Zey', 'Zez']:
+                self.assertAlmostEqual(self.lib.value(row, key) / getattr(polygon, key).get_value(), 1., places=10, msg='{} {}'.format(kind, key))
+
+    def test_filter(self):
+        rows = self.lib.filter(kind=['pipe', 'flat'], Wbx_min=ETQ.SectionModulus(20., 'cm^3'), A_max=2000., sort=['A', 'Wbx'])
+        self.assertGreater(len(rows), 0)
+        self.assertTrue(np.all(np.isin(self.lib.column('kind')[rows], ['pipe', 'flat'])))
+        self.assertTrue(np.all(self.lib.column('Zex')[rows] >= 20e-6))
+        self.assertTrue(np.all(self.lib.column('A')[rows] <= 2000e-6 * (1. + 1e-12)))
+        self.assertTrue(np.all(np.diff(self.lib.column('A')[rows]) >= 0.))
+        with self.assertRaises(ETQ.ParaDInF_quantity_ErrorQuantitiesDoNotMatch):
+            self.lib.filter(A_min=ETQ.Distance(1., 'mm'))
+        with self.assertRaises(ETTcatalog.CatalogError):
+            self.lib.filter(A_above=1.)
+
+    def test_cached(self):
+        self.assertIs(ETMSL.section_library(), self.lib)
+        self.assertIs(self.lib.section(0), self.lib.section(self.lib.names[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import unittest
+import os
+import sys
+import io
+import tempfile
+from unittest import mock
+import numpy as np
+import pandas as pd
+import scipy.signal as spsig
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+
+from EngineeringTools.other.AtlasCopco_TraceFile import ToolsTrace, split_sections
+
+
+def write_trace(filename, samples=1000, stepResult=True, taskName='Task A', resultOk=True, dateTime='2020-01-30 13:00:00', seed=0):
+    """synthetic ToolsTalk2 trace file"""
+    rng = np.random.default_rng(seed)
+    angle = np.cumsum(rng.integers(0, 20, samples))
+    torque = np.round(4000. * np.sin(np.linspace(0., 3., samples))).astype(int)
+    lines = ['Task',
+             'VirtualStationName,TaskName,DateTime,ResultOk,Status',
+             'Station 1,{},{},{},{}'.format(taskName, dateTime, resultOk, 'OK' if resultOk else 'NOK'),
+             '',
+             'Trace Conversion',
+             'Angle Conversion Factor,Torque Conversion Factor,Trace Time per Sample',
+             '0.25,0.0012207,0.0005',
+             '',
+             'Torque Measurement Points',
+             'Name,Torque,Angle,Time',
+             'mp_1,1.5,0.0,0.1',
+             'tgt_final,12.0,0.0,0.0',
+             'lim_max,15.0,720.0,0.0',
+             '',
+             'Angle Measurement Points',
+             'Name,Torque,Angle,Time',
+             'mp_angle,0.0,360.0,0.2',
+             '',
+             'Trace Points',
+             'Angle Min,Angle Max,Torque Min,Torque Max']
+    lines += ['{},{},{},{}'.format(a, a + 3, t - 5, t + 5) for a, t in zip(angle, torque)]
+    lines += ['', 'StepResult']
+    if stepResult:
+        lines += ['StepNumber, StartTime, Result', '1, 0.0, OK', '2, 0.25, OK']
+    with open(filename, 'wb') as f:
+        f.write(('\r\n'.join(lines) + '\r\n').encode('ascii'))
+
+
+def trace_points_reference(filename, direction=None):
+    """former implementation: section search by readlines, python engine"""
+    with open(filename, 'rt', encoding="ascii", newline='\r\n') as f:
+        txt = [t.rstrip() for t in f.readlines()]
+    start = txt.index('Trace Points') + 1
+    length = txt.index('StepResult') + 1 - start - 3
+    conversion = pd.read_csv(filename, header=4, nrows=1)
+    raw = pd.read_csv(filename, header=start, nrows=length, engine='python', encoding="ascii", skip_blank_lines=False)
+    angleFactor = conversion['Angle Conversion Factor'][0]
+    torqueFactor = conversion['Torque Conversion Factor'][0]
+    if direction == 'CCW':
+        torqueFactor *= -1.
+    tps = conversion['Trace Time per Sample'][0]
+    df = pd.DataFrame()
+    df['Angle Min in deg'] = raw['Angle Min'] * angleFactor
+    df['Angle Max in deg'] = raw['Angle Max'] * angleFactor
+    df['Angle Median in deg'] = (df['Angle Min in deg'] + df['Angle Max in deg']) / 2
+    df['Angle Median in rot'] = df['Angle Median in deg'] / 360
+    df['Torque Min in Nm'] = raw['Torque Min'] * torqueFactor
+    df['Torque Max in Nm'] = raw['Torque Max'] * torqueFactor
+    df['Torque Median in Nm'] = (df['Torque Min in Nm'] + df['Torque Max in Nm']) / 2
+    df['Time in s'] = df.index * tps
+    df.set_index('Time in s', inplace=True)
+    df['Angular Speed in rot/s'] = spsig.medfilt(df['Angle Median in rot'].diff(1) / tps)
+    return df
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.filename = os.path.join(self.tmpdir.name, 'trace.csv')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_trace_points_as_before(self):
+        write_trace(self.filename, samples=2000)
+        for direction in (None, 'CW', 'CCW'):
+            trace = ToolsTrace(self.filename, direction=direction)
+            pd.testing.assert_frame_equal(trace.TracePoints, trace_points_reference(self.filename, direction), check_exact=True)
+
+    def test_tables(self):
+        write_trace(self.filename)
+        trace = ToolsTrace(self.filename)
+        self.assertEqual(trace.TaskName, 'Task A')
+        self.assertEqual(trace.Status, 'OK')
+        self.assertTrue(trace.ResultOk)
+        self.assertEqual(trace.DateTime.year, 2020)
+        self.assertEqual(list(trace.TorqueMeasurementPoints.index), ['mp_1', 'tgt_final', 'lim_max'])
+        self.assertEqual(trace.TorqueMeasurementPoints['Angle']['lim_max'], 720.)
+        self.assertEqual(list(trace.AngleMeasurementPoints.index), ['mp_angle'])
+        self.assertEqual(list(trace.df_StepResult.columns), ['StartTime', 'Result'])
+        self.assertEqual(list(trace.df_StepResult.index), [1, 2])
+        self.assertEqual(trace.raw_TraceTimePerSample, 0.0005)
+
+    def test_without_step_result(self):
+        write_trace(self.filename, stepResult=False)
+        self.assertIsNone(ToolsTrace(self.filename).df_StepResult)
+        with open(self.filename, 'rb') as f:
+            text = f.read().decode('ascii')
+        with self.assertRaises(ValueError):
+            split_sections(text.replace('Trace Points', 'Trace'))
+
+    def test_single_pass(self):
+        # one read of the file, all sections parsed from memory by the C engine (the former code re-read it six times with the python engine)
+        write_trace(self.filename, samples=50000)
+        with mock.patch('builtins.open', wraps=open) as opened, mock.patch.object(pd, 'read_csv', wraps=pd.read_csv) as read_csv:
+            trace = ToolsTrace(self.filename)
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual(read_csv.call_count, 6)
+        for call in read_csv.call_args_list:
+            self.assertIsInstance(call.args[0], io.StringIO)
+            self.assertIn(call.kwargs.get('engine', 'c'), ('c', None))
+        self.assertEqual(len(trace.TracePoints), 50000)
+        pd.testing.assert_frame_equal(trace.TracePoints, trace_points_reference(self.filename), check_exact=True)
+
+    def test_title_only_at_line_start(self):
+        write_trace(self.filename)
+        with open(self.filename, 'rb') as f:
+            text = f.read().decode('ascii')
+        sections = split_sections(text.replace('Station 1', 'Station Trace Points'))
+        self.assertTrue(sections['Trace Points'].startswith('Angle Min,Angle Max,Torque Min,Torque Max'))
+        self.assertIn('Station Trace Points', sections['Task'])
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
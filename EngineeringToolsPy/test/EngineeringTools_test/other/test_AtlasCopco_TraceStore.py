@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from EngineeringTools.other.AtlasCopco_TraceFile import ToolsTrace
+from EngineeringTools.other.AtlasCopco_TraceStore import TraceStore, TraceStoreError
+from EngineeringTools_test.other.test_AtlasCopco_TraceFile import write_trace
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.traces = os.path.join(self.tmpdir.name, 'traces')
+        self.store = os.path.join(self.tmpdir.name, 'store')
+        # 2 stations x 6 traces: tasks A/B, days 1..3, every third NOK
+        for k in range(12):
+            directory = os.path.join(self.traces, 'station{}'.format(k % 2), 'day{}'.format(k % 3 + 1))
+            os.makedirs(directory, exist_ok=True)
+            write_trace(os.path.join(directory, 'trace{:02d}.csv'.format(k)), samples=300 + k, taskName='Task {}'.format('AB'[k % 2]),
+                        resultOk=k % 3 != 0, dateTime='2020-02-{:02d} 10:{:02d}:00'.format(k % 3 + 1, k), seed=k)
+        with open(os.path.join(self.traces, 'station0', 'broken.csv'), 'w', encoding='ascii') as f:
+            f.write('not a trace file\r\n')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_ingest_and_query(self):
+        store = TraceStore(self.store)
+        report = store.ingest(self.traces, batchsize=5, max_workers=0)
+        self.assertEqual(report, {'scanned':13, 'skipped':0, 'ingested':12, 'failed':1})
+        self.assertEqual(len(store.select()), 12)
+        self.assertEqual(len(store.select(errors=True)), 13)
+        # NOK traces of task A on 2020-02-01
+        nok = store.select(TaskName='Task A', ResultOk=False, start='2020-02-01', end='2020-02-02')
+        self.assertEqual(sorted(os.path.basename(p) for p in nok['path']), ['trace00.csv', 'trace06.csv'])
+        nok = store.select(TaskName='Task A', ResultOk=False, start='2020-02-01', end='2020-02-01 10:05')
+        self.assertEqual(sorted(os.path.basename(p) for p in nok['path']), ['trace00.csv'])
+        nok = store.select(TaskName=['Task A', 'Task B'], ResultOk=False)
+        self.assertEqual(sorted(os.path.basename(p) for p in nok['path']), ['trace00.csv', 'trace03.csv', 'trace06.csv', 'trace09.csv'])
+        self.assertTrue((nok['Status'] == 'NOK').all())
+        points = store.trace_points(nok)
+        self.assertEqual(len(points), sum(300 + k for k in (0, 3, 6, 9)))
+        for trace_id, row in nok.iterrows():
+            expected = ToolsTrace(row['path']).TracePoints
+            pd.testing.assert_frame_equal(store.trace(trace_id), expected, check_exact=True)
+            np.testing.assert_array_equal(points.loc[points['trace_id'] == trace_id, 'Torque Median in Nm'], expected['Torque Median in Nm'])
+        torque = store.trace_points(nok, columns=['Torque Max in Nm'])
+        self.assertEqual(list(torque.columns), ['trace_id', 'Time in s', 'Torque Max in Nm'])
+        steps = store.step_results(nok)
+        self.assertEqual(len(steps), 8)
+        self.assertEqual(list(steps.columns[:2]), ['trace_id', 'StepNumber'])
+        broken = store.select(errors=True)
+        self.assertIn('ValueError', broken.loc[broken['samples'] == 0, 'error'].iloc[0])
+
+    def test_skip_unchanged(self):
+        TraceStore(self.store).ingest(self.traces, max_workers=0)
+        store = TraceStore(self.store)
+        self.assertEqual(store.ingest(self.traces, max_workers=0), {'scanned':13, 'skipped':13, 'ingested':0, 'failed':0})
+        filename = os.path.join(self.traces, 'station1', 'day2', 'trace01.csv')
+        write_trace(filename, samples=50, taskName='Task B', resultOk=False, dateTime='2020-02-02 10:01:00')
+        self.assertEqual(store.ingest(self.traces, max_workers=0), {'scanned':13, 'skipped':12, 'ingested':1, 'failed':0})
+        self.assertEqual(len(store.select()), 12)
+        changed = store.select(TaskName='Task B', ResultOk=False, start='2020-02-02', end='2020-02-03')
+        self.assertEqual(list(changed['samples']), [50])
+        self.assertEqual(len(store.trace_points(changed)), 50)
+
+    def test_process_pool(self):
+        store = TraceStore(os.path.join(self.tmpdir.name, 'pool'))
+        self.assertEqual(store.ingest(self.traces, batchsize=4, max_workers=2)['ingested'], 12)
+        reference = TraceStore(self.store)
+        reference.ingest(self.traces, max_workers=0)
+        a, b = store.select(), reference.select()
+        self.assertEqual(list(a['path']), list(b['path']))
+        pd.testing.assert_frame_equal(store.trace_points(a).drop(columns='trace_id'), reference.trace_points(b).drop(columns='trace_id'))
+
+    def test_errors(self):
+        TraceStore(self.store, storage='pickle')
+        with self.assertRaises(TraceStoreError):
+            TraceStore(self.store, storage='hdf5')
+        with self.assertRaises(TraceStoreError):
+            TraceStore(os.path.join(self.tmpdir.name, 'other'), storage='csv')
+        with self.assertRaises(TraceStoreError):
+            TraceStore(self.store).ingest(self.traces, batchsize=0)
+        self.assertEqual(len(TraceStore(self.store).select()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import unittest
+import os
+import sys
+import numpy as np
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+
+import EngineeringTools.quantities as ETQ
+import EngineeringTools.autodiff as ETAD
+import EngineeringTools.uncertainty as ETU
+from EngineeringTools.tools import functions as ETTF
+from EngineeringTools.fluidpower_eng.orifice import OrificeTurbulent
+from EngineeringTools.mechanical_eng import buckling as ETMbuckling
+
+
+def orifice_flow(A, pressure_drop):
+    return OrificeTurbulent(A=A, Cq=ETQ.Scalar(0.6)).flow(pressure_drop=pressure_drop)
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+    def test_orifice_gradient(self):
+        A, dp = ETQ.Area(2., 'mm^2'), ETQ.Pressure(50., 'bar')
+        flow, grad = ETAD.value_and_gradient(orifice_flow, {'A':A, 'pressure_drop':dp})
+        self.assertIsInstance(flow, ETQ.Flowrate)
+        self.assertEqual(flow, orifice_flow(A, dp))
+        self.assertAlmostEqual(grad['A'].get_value(), flow.get_value() / A.get_value())
+        self.assertAlmostEqual(grad['pressure_drop'].get_value(), 0.5 * flow.get_value() / dp.get_value())
+        grad['A'].check_units({'meter':1, 'second':-1})
+        self.assertEqual(ETQ.Velocity(grad['A']).get_value(), grad['A'].get_value())
+
+    def test_array_and_functions(self):
+        x = ETAD.variable(ETQ.Angle(np.array([0., 30., 60.]), 'deg'), 'x')
+        y = ETTF.sin(x) * ETTF.cos(x)
+        np.testing.assert_allclose(ETAD.derivative(y, x).get_value(), np.cos(2. * np.deg2rad([0., 30., 60.])))
+        np.testing.assert_allclose(ETAD.derivative(ETQ.Angle(2., 'rad'), x).get_value(), [0., 0., 0.])
+
+    def test_buckling(self):
+        D = ETAD.variable(ETQ.Distance(30., 'mm'), 'D')
+        I = np.pi / 64. * D**4
+        F = ETMbuckling.buckling_euler(ETQ.Distance(1., 'm'), 'both ends pinned', I, youngs_modulus=ETQ.Stress(210e3, 'N/mm^2'))
+        dFdD = ETAD.derivative(F, D, ETQ.SpringConstant)
+        self.assertAlmostEqual(dFdD.get_value() / (4. * ETAD.primal(F).get_value() / 0.03), 1.)
+
+    def test_errors(self):
+        D = ETAD.variable(ETQ.Distance(30., 'mm'), 'D')
+        with self.assertRaises(ETAD.EngineeringTools_autodiff_Error):
+            ETAD.variable(D)
+        with self.assertRaises(ETAD.EngineeringTools_autodiff_Error):
+            ETAD.derivative(D, ETQ.Distance(1., 'mm'))
+        with self.assertRaises(ETAD.EngineeringTools_firstorder_Error):
+            _ = D + ETU.uncertain(ETQ.Distance(1., 'mm'), ETQ.Distance(0.1, 'mm'))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
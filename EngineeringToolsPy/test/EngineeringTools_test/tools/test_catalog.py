@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+
+import EngineeringTools.quantities as ETQ
+import EngineeringTools.tools.catalog as ETTcatalog
+
+
+class Test(unittest.TestCase):
+
+    units = {'d':(ETQ.Distance, 'mm'), 'T':(ETQ.Torque, 'N.m')}
+
+    def setUp(self):
+        ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'catalog.txt')
+        self._write('name; d; T\nA-10; 10; 50\nA-20; 20; 200\n')
+
+    def tearDown(self):
+        ETTcatalog.clear_cache()
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, text):
+        with open(self.filename, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_cache(self):
+        cat1 = ETTcatalog.load_catalog(self.filename, units=self.units, indexed=('d', 'T'))
+        cat2 = ETTcatalog.load_catalog(self.filename, units=self.units, indexed=('d', 'T'))
+        self.assertIs(cat1, cat2)
+
+    def test_cache_per_parameters(self):
+        cat_mm = ETTcatalog.load_catalog(self.filename, units=self.units)
+        cat_cm = ETTcatalog.load_catalog(self.filename, units={'d':(ETQ.Distance, 'cm'), 'T':(ETQ.Torque, 'N.m')})
+        self.assertIsNot(cat_mm, cat_cm)
+        self.assertAlmostEqual(cat_mm.value('A-10', 'd'), 0.01)
+        self.assertAlmostEqual(cat_cm.value('A-10', 'd'), 0.1)
+        self.assertIs(ETTcatalog.load_catalog(self.filename, units=dict(self.units)), cat_mm)
+        self.assertIsNot(ETTcatalog.load_catalog(self.filename, units=self.units, indexed=('d',)), cat_mm)
+        by_d = ETTcatalog.load_catalog(self.filename, units={'T':(ETQ.Torque, 'N.m')}, index_col=1)
+        self.assertEqual(list(by_d.names), ['10', '20'])
+        skipped = ETTcatalog.load_catalog(self.filename, skiprows=1)
+        self.assertEqual(list(skipped.names), ['A-20'])
+
+    def test_compiled_other_parameters_not_used(self):
+        ETTcatalog.compile_catalog(self.filename, units=self.units)
+        cat = ETTcatalog.load_catalog(self.filename, units={'T':(ETQ.Torque, 'N.m')}, index_col=1)
+        self.assertEqual(cat.source, self.filename)
+        self.assertEqual(list(cat.names), ['10', '20'])
+
+    def test_cache_invalidated_by_change(self):
+        cat1 = ETTcatalog.load_catalog(self.filename, units=self.units, indexed=('d', 'T'))
+        self._write('name; d; T\nA-10; 10; 50\nA-20; 20; 200\nA-30; 30; 450\n')
+        cat2 = ETTcatalog.load_catalog(self.filename, units=self.units, indexed=('d', 'T'))
+        self.assertIsNot(cat1, cat2)
+        self.assertEqual(len(cat2), 3)
+
+    def test_decimal_comma(self):
+        self._write('name; d; T\nA-10; 10,5; 50\n')
+        cat = ETTcatalog.load_catalog(self.filename, units=self.units)
+        self.assertAlmostEqual(cat.value('A-10', 'd'), 0.0105)
+
+    def test_lookup(self):
+        cat = ETTcatalog.load_catalog(self.filename, units=self.units, indexed=('d', 'T'))
+        self.assertEqual(list(cat.equal('d', 20.)), [1])
+        self.assertEqual(list(cat.equal('d', ETQ.Distance(0.02, 'm'))), [1])
+        self.assertEqual(list(cat.at_least('T', ETQ.Torque(60., 'N.m'))), [1])
+        self.assertEqual(list(cat.at_most('T', 50.)), [0])
+        with self.assertRaises(ETQ.ParaDInF_quantity_ErrorQuantitiesDoNotMatch):
+            cat.equal('d', ETQ.Force(1., 'N'))
+        with self.assertRaises(ETTcatalog.CatalogError):
+            cat.position('B-10')
+
+    def test_compiled(self):
+        compiled = ETTcatalog.compile_catalog(self.filename, units=self.units)
+        cat = ETTcatalog.load_catalog(self.filename, units=self.units, indexed=('d', 'T'))
+        self.assertEqual(cat.source, compiled)
+        self.assertEqual(list(cat.names), ['A-10', 'A-20'])
+        self.assertEqual(list(cat.at_least('T', ETQ.Torque(60., 'N.m'))), [1])
+        self.assertFalse(cat.column('d').flags.writeable)
+
+    def test_compiled_other_units_not_used(self):
+        ETTcatalog.compile_catalog(self.filename, units=self.units)
+        cat = ETTcatalog.load_catalog(self.filename, units={'d':(ETQ.Distance, 'cm')})
+        self.assertEqual(cat.source, self.filename)
+        self.assertAlmostEqual(cat.value('A-10', 'd'), 0.1)
+
+    def test_compiled_out_of_date(self):
+        ETTcatalog.compile_catalog(self.filename, units=self.units)
+        self._write('name; d; T\nA-10; 10; 50\nA-20; 20; 200\nA-30; 30; 450\n')
+        cat = ETTcatalog.load_catalog(self.filename, units=self.units)
+        self.assertEqual(cat.source, self.filename)
+        self.assertEqual(len(cat), 3)
+
+    def test_compiled_copied(self):
+        ETTcatalog.compile_catalog(self.filename, units=self.units)
+        stat = os.stat(self.filename)
+        os.utime(self.filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        cat = ETTcatalog.load_catalog(self.filename, units=self.units)
+        self.assertTrue(cat.source.endswith('.catalog.npy'))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
@@ -8,11 +8,15 @@ __license__ = "BSD 3-clause"
 import unittest
 import os
 import sys
+import numpy as np
 ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
 sys.path.insert(0, ppath)
 
 import EngineeringTools.quantities as ETQ
 import EngineeringTools.tools.functions as ETF
+from EngineeringTools.autodiff import Dual
+from EngineeringTools.uncertainty import Uncertain
+from EngineeringTools.firstorder import FirstOrder
 
 
 class Test(unittest.TestCase):
@@ -37,6 +41,38 @@ class Test(unittest.TestCase):
         self.assertEqual(ETF.power(ETQ.Distance(2., 'm'), ETQ.Number(2)),      ETQ.Distance(2., 'm').uval*ETQ.Distance(2., 'm').uval)
         self.assertEqual(ETF.power(ETQ.Distance(2., 'm'), ETQ.Scalar(2.)),     ETQ.Distance(2., 'm').uval*ETQ.Distance(2., 'm').uval)
 
+    def test_firstorder_values(self):
+        # bare Dual numbers: value and derivative of each function
+        x = Dual(0.3, {'x':1.})
+        for function, f, df in ((ETF.sin, np.sin, np.cos), (ETF.cos, np.cos, lambda v: -np.sin(v)), (ETF.tan, np.tan, lambda v: 1. / np.cos(v)**2),
+                                (ETF.asin, np.arcsin, lambda v: 1. / np.sqrt(1. - v**2)), (ETF.acos, np.arccos, lambda v: -1. / np.sqrt(1. - v**2)),
+                                (ETF.atan, np.arctan, lambda v: 1. / (1. + v**2)), (ETF.sqrt, np.sqrt, lambda v: 0.5 / np.sqrt(v)),
+                                (ETF.exp, np.exp, np.exp), (ETF.log, np.log, lambda v: 1. / v), (ETF.log10, np.log10, lambda v: 1. / (v * np.log(10.))),
+                                (lambda v: ETF.power(v, 3.), lambda v: v**3, lambda v: 3. * v**2)):
+            y = function(x)
+            self.assertIsInstance(y, Dual)
+            self.assertAlmostEqual(y.value, f(0.3))
+            self.assertAlmostEqual(y.derivatives['x'], df(0.3))
+        y = ETF.atan2(x, 2.)
+        self.assertAlmostEqual(y.derivatives['x'], 2. / (0.3**2 + 4.))
+        # bare Uncertain values, array valued
+        u = Uncertain(np.array([1., 4.]), 0.1, 'u')
+        r = ETF.sqrt(u)
+        self.assertIsInstance(r, Uncertain)
+        np.testing.assert_allclose(r.value, [1., 2.])
+        np.testing.assert_allclose(r.std, 0.1 * 0.5 / np.array([1., 2.]))
+        np.testing.assert_allclose(ETF.exp(u).std, 0.1 * np.exp([1., 4.]))
+        with self.assertRaises(ETF.EngineeringTools_tools_Error_units):
+            ETF.sqrt('a')
+
+    def test_firstorder_array_exponent(self):
+        x = FirstOrder(2., {'x':1.})
+        y = x ** np.array([0., 1., 3.])
+        np.testing.assert_allclose(y.value, [1., 2., 8.])
+        np.testing.assert_allclose(y.derivatives['x'], [0., 1., 12.])
+        z = FirstOrder(np.array([0., 2.]), {'x':1.}) ** 0
+        np.testing.assert_allclose(z.derivatives['x'], [0., 0.])
+        self.assertEqual((x ** 2).derivatives['x'], 4.)
 
     def test_physical_constants(self):
         with self.assertRaises(KeyError):
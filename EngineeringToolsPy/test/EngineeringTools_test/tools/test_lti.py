@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import unittest
+import os
+import sys
+import time
+import numpy as np
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+
+import EngineeringTools.quantities as ETQ
+import EngineeringTools.tools.lti as ETTlti
+
+
+def step_second_order(t, omega, D):
+    """analytic unit step response of the underdamped second order system"""
+    omegad = omega * np.sqrt(1. - D**2)
+    return 1. - np.exp(-D * omega * t) * (np.cos(omegad * t) + D * omega / omegad * np.sin(omegad * t))
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+    def test_bode_second_order(self):
+        omega, D = 50., np.array([0.05, 0.3, 0.7])
+        G = ETTlti.second_order(2., omega, D)
+        w = np.logspace(0., 3., 200)
+        mag, phase = G.bode(w)
+        self.assertEqual(mag.shape, (200, 3))
+        W, DD = w[:, np.newaxis] / omega, D[np.newaxis, :]
+        expected = 2. / ((1. - W**2) + 2j * DD * W)
+        np.testing.assert_allclose(mag, 20. * np.log10(np.abs(expected)), atol=1e-10)
+        np.testing.assert_allclose(phase, np.degrees(np.unwrap(np.angle(expected), axis=0)), atol=1e-9)
+        self.assertTrue(np.all(phase[-1] < -170.) and np.all(phase >= -180.))
+
+    def test_frequency_units(self):
+        G = ETTlti.second_order(1., ETQ.VelocityAngular(2. * np.pi * 10., 'rad/sec'), 0.2)
+        np.testing.assert_allclose(G.freqresp(ETQ.Frequency(np.array([10.]), 'Hz')), G.freqresp(np.array([2. * np.pi * 10.])))
+        self.assertAlmostEqual(G.bode(2. * np.pi * 10.)[1][0], -90.)
+
+    def test_step_second_order(self):
+        omega, D = 80., np.array([0.1, 0.4, 0.9])
+        t = np.linspace(0., 0.3, 3001)
+        y = ETTlti.second_order(1., omega, D).step(t)
+        np.testing.assert_allclose(y, step_second_order(t[:, np.newaxis], omega, D[np.newaxis, :]), atol=1e-10)
+
+    def test_step_first_order_and_integrator(self):
+        t = np.linspace(0., 1., 101)
+        np.testing.assert_allclose(ETTlti.TransferFunction([3.], [0.1, 1.]).step(t), 3. * (1. - np.exp(-t / 0.1)), atol=1e-12)
+        np.testing.assert_allclose(ETTlti.TransferFunction([2.], [1., 0.]).step(t), 2. * t, atol=1e-12)
+        np.testing.assert_allclose(ETTlti.TransferFunction([4.], [2.]).step(t), 2.)
+        # proper with direct feedthrough: (s + 2) / (s + 1) = 1 + 1 / (s + 1)
+        np.testing.assert_allclose(ETTlti.TransferFunction([1., 2.], [1., 1.]).step(t), 2. - np.exp(-t), atol=1e-12)
+
+    def test_errors(self):
+        with self.assertRaises(ETTlti.LTIError):
+            ETTlti.TransferFunction([1.], [0., 1.])
+        with self.assertRaises(ETTlti.LTIError):
+            ETTlti.TransferFunction([1., 0., 0.], [1., 1.]).step(np.linspace(0., 1., 11))
+        with self.assertRaises(ETTlti.LTIError):
+            ETTlti.TransferFunction([1.], [1., 1.]).step(np.array([0., 0.1, 0.3]))
+
+    def test_series_and_poles(self):
+        G = ETTlti.TransferFunction([1.], [1., 1.]) * ETTlti.TransferFunction([2.], [1., np.array([2., 3.])])
+        self.assertEqual(G.shape, (2,))
+        np.testing.assert_allclose(G.den[:, 1], [1., 4., 3.])
+        np.testing.assert_allclose(np.sort(G.poles().real, axis=-1), [[-2., -1.], [-3., -1.]])
+        w = np.array([0.5, 5.])
+        np.testing.assert_allclose((3. * G).freqresp(w), 3. * G.freqresp(w))
+
+    def test_batch_equals_single(self):
+        rng = np.random.default_rng(1)
+        omega, D = rng.uniform(20., 200., 7), rng.uniform(0.05, 1.5, 7)
+        t, w = np.linspace(0., 0.2, 401), np.logspace(0., 3., 50)
+        G = ETTlti.second_order(1., omega, D)
+        y, F = G.step(t), G.freqresp(w)
+        for i in range(7):
+            Gi = ETTlti.second_order(1., omega[i], D[i])
+            np.testing.assert_allclose(y[:, i], Gi.step(t), atol=1e-12)
+            np.testing.assert_allclose(F[:, i], Gi.freqresp(w), rtol=1e-12)
+
+    def test_many_operating_points(self):
+        rng = np.random.default_rng(2)
+        omega, D = rng.uniform(20., 300., (10, 100)), rng.uniform(0.1, 0.6, (10, 100))
+        G = ETTlti.second_order(1., omega, D)
+        start = time.perf_counter()
+        mag, _ = G.bode(np.logspace(0., 4., 200))
+        y = G.step(np.linspace(0., 0.5, 1001))
+        elapsed = time.perf_counter() - start
+        self.assertEqual(mag.shape, (200, 10, 100))
+        self.assertEqual(y.shape, (1001, 10, 100))
+        np.testing.assert_allclose(mag.max(axis=0), -20. * np.log10(2. * D * np.sqrt(1. - D**2)), atol=0.5, rtol=0.)
+        self.assertLess(elapsed, 10.)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
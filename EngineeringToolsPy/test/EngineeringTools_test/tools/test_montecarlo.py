@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import unittest
+import os
+import sys
+import time
+import numpy as np
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+
+import EngineeringTools.quantities as ETQ
+import EngineeringTools.tools.montecarlo as ETTmc
+from EngineeringTools.tools import functions as ETTF
+from EngineeringTools.fluidpower_eng.orifice import OrificeTurbulent
+
+
+def orifice_flow(Cq, A, pressure_drop):
+    return OrificeTurbulent(A=A, Cq=Cq).flow(pressure_drop=pressure_drop)
+
+
+class TestArrayQuantities(unittest.TestCase):
+
+    def setUp(self):
+        ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+    def test_quantity(self):
+        L = ETQ.Distance(np.array([1., 2., 3.]), 'mm')
+        np.testing.assert_allclose(L.get_value('mm'), [1., 2., 3.])
+        L2 = L + L
+        np.testing.assert_allclose(L.get_value('mm'), [1., 2., 3.])   # operands are not changed
+        np.testing.assert_allclose(L2.get_value('mm'), [2., 4., 6.])
+        np.testing.assert_allclose((np.array([1., 2., 3.]) * L).get_value('mm'), [1., 4., 9.])
+        self.assertIn('mm (Distance)', str(L))
+        T = ETQ.TemperatureAbsolute(np.array([0., 100.]), 'degC')
+        np.testing.assert_allclose(T.get_value(), [273.15, 373.15])
+
+    def test_uval(self):
+        A = ETQ.Area(np.array([1., 4.]), 'mm^2').uval
+        D = ETTF.sqrt(A)
+        D.check_units(ETQ.Distance._uval_units)  # pylint: disable=protected-access
+        np.testing.assert_allclose(D.get_value(), [1e-3, 2e-3])
+        np.testing.assert_allclose((1. / D).get_value(), [1e3, 5e2])
+        self.assertEqual(str(ETQ.UVal(np.array([1., np.nan]), {'meter':1})), '[1.000 nan] {m}')
+
+    def test_orifice_array(self):
+        flow = orifice_flow(ETQ.Scalar(np.array([0.6, 0.7])), ETQ.Area(2., 'mm^2'), ETQ.Pressure(np.array([10., -10.]), 'bar'))
+        scalar = orifice_flow(ETQ.Scalar(0.6), ETQ.Area(2., 'mm^2'), ETQ.Pressure(10., 'bar'))
+        self.assertAlmostEqual(flow.get_value()[0], scalar.get_value())
+        self.assertLess(flow.get_value()[1], 0.)
+
+
+class TestMonteCarlo(unittest.TestCase):
+
+    def setUp(self):
+        ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+    def test_linear_model(self):
+        # F = p * A with p ~ N(100 bar, 5 bar): percentiles and failure probability known analytically
+        res = ETTmc.monte_carlo(lambda p, A: ETQ.Force(p * A), {'p':ETTmc.Normal(ETQ.Pressure(100., 'bar'), ETQ.Pressure(5., 'bar')),
+                                                              'A':ETQ.Area(10., 'cm^2')}, n=200000, seed=2)
+        self.assertIsInstance(res.mean('out'), ETQ.Force)
+        self.assertAlmostEqual(res.mean('out').get_value('kN'), 10., places=2)
+        self.assertAlmostEqual(res.std('out').get_value('kN'), 0.5, places=2)
+        self.assertAlmostEqual(res.percentile('out', 97.725).get_value('kN'), 11., places=1)
+        self.assertAlmostEqual(res.failure_probability('out', ETQ.Force(9., 'kN')), 0.02275, delta=0.002)
+        self.assertAlmostEqual(res.failure_probability('out', ETQ.Force(11., 'kN'), below=False), 0.02275, delta=0.002)
+        with self.assertRaises(ETQ.ParaDInF_quantity_ErrorQuantitiesDoNotMatch):
+            res.failure_probability('out', ETQ.Pressure(9., 'bar'))
+
+    def test_deterministic_and_chunked(self):
+        inputs = {'Cq':ETTmc.Uniform(ETQ.Scalar(0.6), ETQ.Scalar(0.7)), 'A':ETTmc.Triangular(ETQ.Area(1.9, 'mm^2'), ETQ.Area(2., 'mm^2'), ETQ.Area(2.1, 'mm^2')),
+                  'pressure_drop':ETTmc.Normal(ETQ.Pressure(50., 'bar'), ETQ.Pressure(2., 'bar'))}
+        a = ETTmc.monte_carlo(orifice_flow, inputs, n=10000, seed=5)
+        b = ETTmc.monte_carlo(orifice_flow, inputs, n=10000, seed=5, chunksize=999)
+        np.testing.assert_allclose(a.outputs['out'], b.outputs['out'])
+        ranking = [name for name, _ in a.sensitivity('out')]
+        self.assertEqual(ranking[0], 'Cq')
+
+    def test_million_samples(self):
+        inputs = {'Cq':ETTmc.Normal(ETQ.Scalar(0.67), 0.02), 'A':ETTmc.Uniform(ETQ.Area(1.9, 'mm^2'), ETQ.Area(2.1, 'mm^2')),
+                  'pressure_drop':ETTmc.Normal(ETQ.Pressure(50., 'bar'), ETQ.Pressure(2., 'bar'))}
+        t0 = time.perf_counter()
+        res = ETTmc.monte_carlo(orifice_flow, inputs, n=1000000, seed=1)
+        res.sensitivity('out')
+        self.assertLess(time.perf_counter() - t0, 10.)
+        self.assertEqual(len(res), 1000000)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import unittest
+import os
+import sys
+import numpy as np
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+
+import EngineeringTools.quantities as ETQ
+import EngineeringTools.tools.solve as ETTsolve
+from EngineeringTools.fluidpower_eng.orifice import OrificeTurbulent
+from EngineeringTools.mechanical_eng import buckling as ETMbuckling
+from EngineeringTools.mechanical_eng import beamsection as ETMbeamsection
+from EngineeringTools.mechanical_eng import material as ETMmat
+
+
+def flow(A):
+    return OrificeTurbulent(A=A).flow(pressure_drop=ETQ.Pressure(35., 'bar'))
+
+
+def buckling(D):
+    calc = ETMbuckling.Buckling()
+    calc.material = ETMmat.Steel_S355JR()
+    calc.endcondition = 'one end fixed, one pinned'
+    calc.length = ETQ.Distance(2., 'm')
+    calc.beamSection = ETMbeamsection.BeamSection_Pipe(D=D)
+    return calc
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+        self.targets = ETQ.Flowrate(np.linspace(1., 200., 1000), 'Liter/min')
+        self.exact = OrificeTurbulent(pressure_drop=ETQ.Pressure(35., 'bar'), flow=self.targets).A.get_value()
+
+    def test_brent_and_newton(self):
+        for method in ('brent', 'newton'):
+            sol = ETTsolve.solve(flow, self.targets, ETQ.Area(0.01, 'mm^2'), ETQ.Area(1., 'cm^2'), method=method)
+            self.assertIsInstance(sol.x, ETQ.Area)
+            np.testing.assert_allclose(sol.x.get_value(), self.exact, rtol=1e-8)
+            self.assertTrue(sol.converged.all())
+            self.assertLess(sol.iterations, 40)
+
+    def test_tolerance_relative_to_bracket(self):
+        low, high = ETQ.Area(0.01, 'mm^2'), ETQ.Area(1., 'cm^2')
+        xtol = 1e-3 * (high.get_value() - low.get_value())
+        for method in ('brent', 'newton'):
+            sol = ETTsolve.solve(flow, self.targets, low, high, method=method, rtol=1e-3)
+            self.assertTrue(np.all(np.abs(sol.x.get_value() - self.exact) <= xtol))
+            self.assertTrue(sol.converged.all())
+
+    def test_newton_slow_progress_bisects(self):
+        # Newton steps on x**20 shrink by 5 % only, the bracket is bisected instead
+        sol = ETTsolve.solve(lambda x: x**20, ETQ.Scalar(np.array([1e-3, 1., 5.])), ETQ.Scalar(0.01), ETQ.Scalar(4.), method='newton')
+        np.testing.assert_allclose(sol.x.get_value(), np.array([1e-3, 1., 5.])**(1. / 20.), rtol=1e-9)
+        self.assertLess(sol.iterations, 20)
+
+    def test_scalar_and_uval_target(self):
+        sol = ETTsolve.solve(flow, self.targets.uval * 1., ETQ.Area(0.01, 'mm^2'), ETQ.Area(1., 'cm^2'))
+        np.testing.assert_allclose(sol.x.get_value(), self.exact, rtol=1e-8)
+        sol = ETTsolve.solve(flow, ETQ.Flowrate(10., 'Liter/min'), ETQ.Area(0.01, 'mm^2'), ETQ.Area(1., 'cm^2'), method='newton')
+        self.assertIsInstance(sol.x.get_value(), float)
+        self.assertAlmostEqual(sol.x.get_value('mm^2'), 2.8049164549639114)
+        with self.assertRaises(ETQ.ParaDInF_quantity_ErrorQuantitiesDoNotMatch):
+            ETTsolve.solve(flow, ETQ.Force(10., 'N'), ETQ.Area(0.01, 'mm^2'), ETQ.Area(1., 'cm^2'))
+
+    def test_not_bracketed(self):
+        targets = ETQ.Flowrate(np.array([10., 1e5]), 'Liter/min')
+        with self.assertRaises(ETTsolve.SolveError):
+            ETTsolve.solve(flow, targets, ETQ.Area(0.01, 'mm^2'), ETQ.Area(1., 'cm^2'))
+        sol = ETTsolve.solve(flow, targets, ETQ.Area(0.01, 'mm^2'), ETQ.Area(1., 'cm^2'), strict=False)
+        self.assertEqual(sol.converged.tolist(), [True, False])
+        self.assertTrue(np.isnan(sol.x.get_value()[1]))
+
+    def test_calculator(self):
+        forces = ETQ.Force(np.array([10., 25.]), 'kN')
+        for method in ('brent', 'newton'):
+            sol = ETTsolve.solve_input(buckling, 'D', ETQ.Distance(10., 'mm'), ETQ.Distance(60., 'mm'), 'forcePermitted', forces, method=method, vectorized=False)
+            for D, F in zip(sol.x.get_value(), forces.get_value()):
+                calc = buckling(ETQ.Distance(20., 'mm'))
+                self.assertAlmostEqual(D, calc.sizeRoundBarForForce(ETQ.Force(F, 'N')).Diameter.get_value(), places=8)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
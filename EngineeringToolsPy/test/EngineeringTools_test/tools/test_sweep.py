@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import unittest
+import os
+import sys
+import time
+import shutil
+import socket
+import subprocess
+import tempfile
+from unittest import mock
+import numpy as np
+import pandas as pd
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+
+import EngineeringTools.quantities as ETQ
+import EngineeringTools.tools.sweep as ETTsweep
+from EngineeringTools.mechanical_eng import buckling as ETMbuckling
+from EngineeringTools.mechanical_eng import beamsection as ETMbeamsection
+from EngineeringTools.mechanical_eng import material as ETMmat
+
+
+def buckling_factory(D, length):
+    calc = ETMbuckling.Buckling()
+    calc.material = ETMmat.Steel_S355JR()
+    calc.beamSection = ETMbeamsection.BeamSection_Pipe(D=D)
+    calc.endcondition = 'both ends pinned'
+    calc.length = length
+    return calc
+
+
+class Noisy:
+    def __init__(self, x, rng):
+        self.x = x
+        self.noise = rng.normal()
+
+
+def noisy_factory(x, rng):
+    return Noisy(x, rng)
+
+
+CALLS = []
+
+
+def counting_factory(x):
+    CALLS.append(x)
+    return Noisy(x, np.random.default_rng(0))
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+        self.design = ETTsweep.latin_hypercube({'D':(ETQ.Distance, 'mm', 15., 40.), 'length':(ETQ.Distance, 'm', 0.5, 2.)}, 40, seed=3)
+
+    def test_samplers_deterministic(self):
+        a = ETTsweep.random_uniform({'x':(ETQ.Scalar, None, 0., 1.)}, 10, seed=7)
+        b = ETTsweep.random_uniform({'x':(ETQ.Scalar, None, 0., 1.)}, 10, seed=7)
+        np.testing.assert_array_equal(a.values['x'], b.values['x'])
+        lhs = ETTsweep.latin_hypercube({'x':(ETQ.Scalar, None, 0., 1.)}, 10, seed=7)
+        self.assertEqual(sorted(np.floor(lhs.values['x'] * 10).astype(int).tolist()), list(range(10)))
+
+    def test_full_factorial(self):
+        design = ETTsweep.full_factorial({'D':(ETQ.Distance, 'mm', [10., 20., 30.]), 'kind':(None, None, ['a', 'b'])})
+        self.assertEqual(len(design), 6)
+        self.assertEqual(design.point(1)['kind'], 'b')
+        self.assertEqual(design.point(1)['D'], ETQ.Distance(10., 'mm'))
+        with self.assertRaises(ETTsweep.SweepError):
+            design.cross(design)
+
+    def test_pool_equals_inline(self):
+        outputs = {'forcePermitted':'kN', 'slenderness':('slendernessRatio', None)}
+        inline = ETTsweep.run_sweep(buckling_factory, self.design, outputs, max_workers=0)
+        pooled = ETTsweep.run_sweep(buckling_factory, self.design, outputs, chunksize=7, max_workers=2)
+        self.assertEqual(list(pooled.columns), ['D in mm', 'length in m', 'forcePermitted in kN', 'slenderness', 'error'])
+        np.testing.assert_array_equal(inline['forcePermitted in kN'].values, pooled['forcePermitted in kN'].values)
+        self.assertEqual(list(inline['error']), list(pooled['error']))
+
+    def test_errors_captured(self):
+        res = ETTsweep.run_sweep(buckling_factory, self.design, {'forcePermitted':'kN'}, chunksize=5, max_workers=0)
+        failed = res['error'].notna()
+        self.assertTrue(failed.any() and not failed.all())
+        self.assertTrue(res.loc[failed, 'forcePermitted in kN'].isna().all())
+        self.assertTrue(res.loc[~failed, 'forcePermitted in kN'].notna().all())
+
+    def test_seed_independent_of_chunks(self):
+        design = ETTsweep.full_factorial({'x':(None, None, list(range(20)))})
+        progress = []
+        a = ETTsweep.run_sweep(noisy_factory, design, {'noise':None}, chunksize=3, max_workers=0, seed=11, progress=lambda done, total: progress.append(done))
+        b = ETTsweep.run_sweep(noisy_factory, design, {'noise':None}, chunksize=8, max_workers=2, seed=11)
+        c = ETTsweep.run_sweep(noisy_factory, design, {'noise':None}, max_workers=0, seed=12)
+        np.testing.assert_array_equal(a['noise'].values, b['noise'].values)
+        self.assertFalse(np.allclose(a['noise'].values, c['noise'].values))
+        self.assertEqual(progress[-1], 20)
+
+
+class TestSharded(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.design = ETTsweep.full_factorial({'x':(None, None, list(range(10)))})
+        del CALLS[:]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _shard(self, shard):
+        return ETTsweep._shard_filename(self.directory, shard, ETTsweep.read_manifest(self.directory)['storage'])  # pylint: disable=protected-access
+
+    def test_pool_equals_run_sweep(self):
+        design = ETTsweep.latin_hypercube({'D':(ETQ.Distance, 'mm', 15., 40.), 'length':(ETQ.Distance, 'm', 0.5, 2.)}, 30, seed=3)
+        sharded = ETTsweep.run_sharded(buckling_factory, design, {'forcePermitted':'kN'}, self.directory, shardsize=4, max_workers=2, seed=5)
+        direct = ETTsweep.run_sweep(buckling_factory, design, {'forcePermitted':'kN'}, max_workers=0)
+        self.assertEqual(list(sharded.index), list(range(30)))
+        np.testing.assert_array_equal(sharded['forcePermitted in kN'].values, direct['forcePermitted in kN'].values)
+        self.assertEqual(list(sharded['error']), list(direct['error']))
+
+    def test_resume(self):
+        ETTsweep.run_sharded(counting_factory, self.design, {'x':None}, self.directory, shardsize=3, max_workers=0, seed=5)
+        self.assertEqual(len(CALLS), 10)
+        os.remove(self._shard(1))
+        del CALLS[:]
+        res = ETTsweep.run_sharded(counting_factory, self.design, {'x':None}, self.directory, shardsize=3, max_workers=0, seed=5)
+        self.assertEqual(CALLS, [3, 4, 5])
+        self.assertEqual(res['x'].tolist(), list(range(10)))
+
+    def test_seed_kept_on_resume(self):
+        first = ETTsweep.run_sharded(noisy_factory, self.design, {'noise':None}, self.directory, shardsize=3, max_workers=0, seed=5)
+        again = ETTsweep.run_sharded(noisy_factory, self.design, {'noise':None}, self.directory, shardsize=3, max_workers=0, seed=5)
+        np.testing.assert_array_equal(first['noise'].values, again['noise'].values)
+        with self.assertRaises(ETTsweep.SweepError):
+            ETTsweep.run_sharded(noisy_factory, self.design, {'noise':None}, self.directory, shardsize=3, max_workers=0, seed=1)
+        with self.assertRaises(ETTsweep.SweepError):
+            ETTsweep.run_sharded(noisy_factory, self.design, {'noise':None}, self.directory, shardsize=3, max_workers=0, seed=None)
+
+    def test_storage_not_part_of_sweep(self):
+        ETTsweep.run_sharded(counting_factory, self.design, {'x':None}, self.directory, shardsize=3, max_workers=0, seed=5)
+        manifest = ETTsweep.read_manifest(self.directory)
+        manifest['storage'] = 'parquet' if manifest['storage'] == 'pickle' else 'pickle'
+        ETTsweep._write_manifest(self.directory, manifest)  # pylint: disable=protected-access
+        manifest['seed'] = '1'
+        with self.assertRaises(ETTsweep.SweepError):
+            ETTsweep._write_manifest(self.directory, manifest)  # pylint: disable=protected-access
+
+    def test_locked_shard_skipped(self):
+        res = ETTsweep.run_sharded(counting_factory, self.design, {'x':None}, self.directory, shardsize=3, max_workers=0, seed=5)
+        os.remove(self._shard(0))
+        lockfile = self._shard(0) + '.lock'
+        with open(lockfile, 'w', encoding='utf-8') as f:
+            f.write('other:1')
+        del CALLS[:]
+        res = ETTsweep.run_sharded(counting_factory, self.design, {'x':None}, self.directory, shardsize=3, max_workers=0, seed=5)
+        self.assertIsNone(res)
+        self.assertEqual(CALLS, [])
+        self.assertEqual(ETTsweep.merge_shards(self.directory, partial=True)['x'].tolist(), list(range(3, 10)))
+        with self.assertRaises(ETTsweep.SweepError):
+            ETTsweep.merge_shards(self.directory)
+        # a lock of a dead process is broken
+        os.utime(lockfile, (time.time() - 100., time.time() - 100.))
+        res = ETTsweep.run_sharded(counting_factory, self.design, {'x':None}, self.directory, shardsize=3, max_workers=0, seed=5, stale_after=10.)
+        self.assertEqual(res['x'].tolist(), list(range(10)))
+        self.assertFalse(os.path.exists(lockfile))
+
+    def test_lock_of_dead_process_broken(self):
+        ETTsweep.run_sharded(counting_factory, self.design, {'x':None}, self.directory, shardsize=3, max_workers=0, seed=5)
+        os.remove(self._shard(0))
+        lockfile = self._shard(0) + '.lock'
+        with subprocess.Popen([sys.executable, '-c', 'pass']) as process:
+            process.wait()
+        with open(lockfile, 'w', encoding='utf-8') as f:
+            f.write('{}:{}'.format(socket.gethostname(), process.pid))
+        # fresh lock of a crashed worker on this host, broken without waiting for stale_after
+        del CALLS[:]
+        res = ETTsweep.run_sharded(counting_factory, self.design, {'x':None}, self.directory, shardsize=3, max_workers=0, seed=5)
+        self.assertEqual(CALLS, [0, 1, 2])
+        self.assertEqual(res['x'].tolist(), list(range(10)))
+        # lock of a running process is kept
+        os.remove(self._shard(0))
+        with open(lockfile, 'w', encoding='utf-8') as f:
+            f.write('{}:{}'.format(socket.gethostname(), os.getppid()))
+        self.assertIsNone(ETTsweep.run_sharded(counting_factory, self.design, {'x':None}, self.directory, shardsize=3, max_workers=0, seed=5))
+        self.assertTrue(os.path.exists(lockfile))
+
+    def test_process_running(self):
+        self.assertTrue(ETTsweep._process_running(os.getpid()))  # pylint: disable=protected-access
+        with subprocess.Popen([sys.executable, '-c', 'pass']) as process:
+            process.wait()
+        self.assertFalse(ETTsweep._process_running(process.pid))  # pylint: disable=protected-access
+
+    def test_manifest_without_hard_links(self):
+        with mock.patch('os.link', side_effect=PermissionError('no hard links')):
+            ETTsweep.run_sharded(counting_factory, self.design, {'x':None}, self.directory, shardsize=3, max_workers=0, seed=5)
+            self.assertEqual(ETTsweep.read_manifest(self.directory)['points'], 10)
+            with self.assertRaises(ETTsweep.SweepError):
+                ETTsweep.run_sharded(counting_factory, self.design, {'x':None}, self.directory, shardsize=4, max_workers=0, seed=5)
+        self.assertEqual(sorted(f for f in os.listdir(self.directory) if f.endswith('.tmp')), [])
+
+    def test_failed_shard_leaves_no_tmp(self):
+        design = self.design.subset(0, 3)
+        filename = os.path.join(self.directory, 'shard-00000.pkl')
+        with mock.patch.object(pd.DataFrame, 'to_pickle', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                ETTsweep._run_shard(counting_factory, design, 0, [('x', 'x', None)], 0, False, filename, 'pickle')  # pylint: disable=protected-access
+        self.assertEqual(os.listdir(self.directory), [])
+        # a partially written file is removed as well
+        def partial(frame, path):  # pylint: disable=unused-argument
+            with open(path, 'wb') as f:
+                f.write(b'partial')
+            raise OSError('disk full')
+        with mock.patch.object(pd.DataFrame, 'to_pickle', partial):
+            with self.assertRaises(OSError):
+                ETTsweep._run_shard(counting_factory, design, 0, [('x', 'x', None)], 0, False, filename, 'pickle')  # pylint: disable=protected-access
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# pylint: disable-msg=line-too-long,missing-function-docstring,missing-class-docstring,empty-docstring
+
+__author__  = 'Martin Hochwallner <marthoch@users.noreply.github.com>'
+__email__   = "marthoch@users.noreply.github.com"
+__license__ = "BSD 3-clause"
+
+import unittest
+import os
+import sys
+import numpy as np
+ppath = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'src') # pylint: disable=invalid-name
+sys.path.insert(0, ppath)
+
+import EngineeringTools.quantities as ETQ
+import EngineeringTools.uncertainty as ETU
+import EngineeringTools.tools.montecarlo as ETTmc
+from EngineeringTools.uval import EngineeringTools_uval_Error
+from EngineeringTools.tools import functions as ETTF
+from EngineeringTools.fluidpower_eng.orifice import OrificeTurbulent
+
+
+def orifice_flow(Cq, A, pressure_drop):
+    return OrificeTurbulent(A=A, Cq=Cq).flow(pressure_drop=pressure_drop)
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        ETQ.Quantity.set_displayUnitSystem('mechanicalEngineering')
+
+    def test_analytic(self):
+        x = ETU.Uncertain(2., 0.1, 'x')
+        y = ETU.Uncertain(3., 0.2, 'y')
+        self.assertAlmostEqual((x + y).std, np.hypot(0.1, 0.2))
+        self.assertAlmostEqual((x / y).std, 2. / 3. * np.hypot(0.1 / 2., 0.2 / 3.))
+        self.assertAlmostEqual((x**3).std, 3. * 4. * 0.1)
+        self.assertAlmostEqual((2.**x).std, 4. * np.log(2.) * 0.1)
+        self.assertAlmostEqual(np.sin(x).std, abs(np.cos(2.)) * 0.1)
+        self.assertEqual((x - x).std, 0.)
+        self.assertTrue(x < y and x == 2.)
+
+    def test_functions_and_units(self):
+        D = ETU.uncertain(ETQ.Distance(20., 'mm'), ETQ.Distance(0.1, 'mm'), 'D')
+        A = ETQ.Area(D**2 * ETQ.PI / 4.)
+        self.assertAlmostEqual(ETU.std(A).get_value('mm^2'), 2. * 0.1 / 20. * ETU.nominal_value(A).get_value('mm^2'))
+        self.assertEqual(ETU.nominal_value(ETTF.sqrt(A.uval)).get_value(), 0.02 / np.sqrt(4. / np.pi))
+        alpha = ETU.uncertain(ETQ.Angle(30., 'deg'), ETQ.Angle(1., 'deg'))
+        self.assertAlmostEqual(ETU.std(ETTF.sin(alpha)).get_value(), np.cos(np.pi / 6.) * np.pi / 180.)
+        with self.assertRaises(EngineeringTools_uval_Error):
+            _ = D.uval + ETQ.Force(1., 'N').uval
+        with self.assertRaises(ETQ.ParaDInF_quantity_ErrorQuantitiesDoNotMatch):
+            ETU.uncertain(ETQ.Distance(20., 'mm'), ETQ.Force(1., 'N'))
+        self.assertIn('±', str(A))
+
+    def test_correlated(self):
+        a, b = ETU.correlated([10., 20.], [1., 2.], [[1., 0.5], [0.5, 1.]], names=['a', 'b'])
+        self.assertAlmostEqual(ETU.correlation(a, b), 0.5)
+        self.assertAlmostEqual((a + b).std, np.sqrt(1. + 4. + 2. * 0.5 * 2.))
+        self.assertAlmostEqual((a - b).std, np.sqrt(1. + 4. - 2. * 0.5 * 2.))
+        with self.assertRaises(ETU.EngineeringTools_uncertainty_Error):
+            ETU.correlated([1., 2.], [1., 1.], [[1., 2.], [2., 1.]])
+
+    def test_array(self):
+        dp = ETU.uncertain(ETQ.Pressure(np.array([10., 50., 100.]), 'bar'), ETQ.Pressure(1., 'bar'), 'dp')
+        Q = orifice_flow(ETU.uncertain(ETQ.Scalar(0.6), 0.01, 'Cq'), ETQ.Area(2., 'mm^2'), dp)
+        value = Q.get_value()
+        self.assertEqual(value.value.shape, (3,))
+        np.testing.assert_allclose(value.std / value.value, np.hypot(0.01 / 0.6, 0.5 / np.array([10., 50., 100.])))
+        names = [name for name, _, _ in ETU.budget(Q)]
+        self.assertEqual(sorted(names), ['Cq', 'dp'])
+
+    def test_budget_matches_monte_carlo(self):
+        Q = orifice_flow(ETU.uncertain(ETQ.Scalar(0.6), 0.01, 'Cq'), ETU.uncertain(ETQ.Area(2., 'mm^2'), ETQ.Area(0.02, 'mm^2'), 'A'),
+                         ETU.uncertain(ETQ.Pressure(50., 'bar'), ETQ.Pressure(1., 'bar'), 'dp'))
+        res = ETTmc.monte_carlo(orifice_flow, {'Cq':ETTmc.Normal(ETQ.Scalar(0.6), 0.01), 'A':ETTmc.Normal(ETQ.Area(2., 'mm^2'), ETQ.Area(0.02, 'mm^2')),
+                                               'pressure_drop':ETTmc.Normal(ETQ.Pressure(50., 'bar'), ETQ.Pressure(1., 'bar'))}, n=200000, seed=3)
+        self.assertAlmostEqual(ETU.std(Q).get_value() / res.std('out').get_value(), 1., places=2)
+        self.assertEqual(ETU.budget(Q)[0][0], 'Cq')
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# eof
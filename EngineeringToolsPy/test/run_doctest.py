@@ -16,11 +16,12 @@ sys.path.insert(0, ppath)
 import EngineeringTools.quantities as Q
 
 # ------------------------------------------------------------------------
-MODULE_LIST = ['EngineeringTools.qnt', 'EngineeringTools.uval', 'EngineeringTools.quantities.quantitiesbase', 'EngineeringTools.quantities',
+MODULE_LIST = ['EngineeringTools.qnt', 'EngineeringTools.uval', 'EngineeringTools.firstorder', 'EngineeringTools.uncertainty', 'EngineeringTools.autodiff', 'EngineeringTools.quantities.quantitiesbase', 'EngineeringTools.quantities',
                'EngineeringTools.quantities.electrical', 'EngineeringTools.quantities.mechanics', 'EngineeringTools.quantities.money',
-               'EngineeringTools.tools.functions', 'EngineeringTools.tools.calc', 'EngineeringTools.tools.interpolate', 'EngineeringTools.tools.geo_circle', 'EngineeringTools.tools.volume',
-               'EngineeringTools.mechanical_eng.material', 'EngineeringTools.mechanical_eng.buckling', 'EngineeringTools.mechanical_eng.beamsection',
-               'EngineeringTools.fluidpower_eng.cylinder', 'EngineeringTools.fluidpower_eng.hydraulicServoSystem', 'EngineeringTools.fluidpower_eng.oil', 'EngineeringTools.fluidpower_eng.orifice', 'EngineeringTools.fluidpower_eng.proportionalValve'
+               'EngineeringTools.tools.functions', 'EngineeringTools.tools.calc', 'EngineeringTools.tools.interpolate', 'EngineeringTools.tools.geo_circle', 'EngineeringTools.tools.volume', 'EngineeringTools.tools.catalog', 'EngineeringTools.tools.sweep', 'EngineeringTools.tools.montecarlo', 'EngineeringTools.tools.solve', 'EngineeringTools.tools.lti',
+               'EngineeringTools.mechanical_eng.material', 'EngineeringTools.mechanical_eng.buckling', 'EngineeringTools.mechanical_eng.sectionlibrary', 'EngineeringTools.mechanical_eng.beamsection',
+               'EngineeringTools.fluidpower_eng.cylinder', 'EngineeringTools.fluidpower_eng.hydraulicServoSystem', 'EngineeringTools.fluidpower_eng.oil', 'EngineeringTools.fluidpower_eng.orifice', 'EngineeringTools.fluidpower_eng.proportionalValve', 'EngineeringTools.fluidpower_eng.simulation', 'EngineeringTools.fluidpower_eng.network', 'EngineeringTools.fluidpower_eng.line',
+               'EngineeringTools.special.etp'
                 ]
 
 